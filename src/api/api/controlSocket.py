@@ -0,0 +1,267 @@
+"""Bidirectional control channel of the CNC, over a WebSocket.
+
+The client authenticates once, binds the socket to its CNC session, and
+then sends JSON frames:
+
+* ``{"type": "jog", "x": 1, "y": 0, "z": 0, "feedrate": 500, "units": ...,
+  "mode": ..., "machine": false}``
+* ``{"type": "jog_hold", "x": 1, "y": 0, "z": 0, "feedrate": 500, "units": ...}``,
+  continuous jog along a direction, sent again every
+  ``JOG_HOLD_REFRESH_INTERVAL`` while held.
+* ``{"type": "jog_cancel"}``, on release of the held direction.
+* ``{"type": "realtime", "action": "pause"}``
+* ``{"type": "command", "command": "G0 X0"}``
+* ``{"type": "renew"}``, renews the session TTL.
+
+The status is streamed back on the same socket, as
+``{"type": "status", "data": {...}}``. Invalid frames are answered with
+``{"type": "error", "detail": "..."}``.
+
+Jogs are coalesced: while the Gateway didn't take the last jog of the
+client from its queue, a new one is merged into it instead of queued
+behind it (see `JogCoalescer`).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from dataclasses import dataclass, replace
+from typing import Any, Optional
+
+from core.schemas.cnc import CncJogCommand
+from core.utilities.gateway.constants import (
+    ACTION_SOFT_RESET,
+    ACTION_STOP,
+    REALTIME_ACTIONS,
+    STATUS_CHANNEL,
+)
+from core.utilities.gateway.gatewayClient import AsyncGatewayClient
+from core.utilities.grbl.grblUtils import JOG_DISTANCE_ABSOLUTE, JOG_DISTANCE_INCREMENTAL
+from fastapi import WebSocket, WebSocketDisconnect, status
+from pydantic import ValidationError
+
+from api.pubsubHub import PubSubHub, Subscription
+
+logger = logging.getLogger(__name__)
+
+FRAME_JOG = "jog"
+FRAME_JOG_HOLD = "jog_hold"
+FRAME_JOG_CANCEL = "jog_cancel"
+FRAME_REALTIME = "realtime"
+FRAME_COMMAND = "command"
+FRAME_RENEW = "renew"
+
+# Actions after which a queued jog must not run
+CANCEL_JOG_ACTIONS = {ACTION_STOP, ACTION_SOFT_RESET}
+
+
+@dataclass(frozen=True)
+class Jog:
+    x: float
+    y: float
+    z: float
+    feedrate: float
+    units: str
+    mode: str
+    machine: bool = False
+
+
+def merge_jogs(previous: Jog, jog: Jog) -> Optional[Jog]:
+    """Returns a single jog with the motion of *previous* followed by *jog*,
+    or ``None`` if they can't be merged."""
+    if (previous.units, previous.mode, previous.machine) != (jog.units, jog.mode, jog.machine):
+        return None
+    if jog.mode == JOG_DISTANCE_ABSOLUTE:
+        # The last target is the one reached
+        return jog
+    if jog.mode == JOG_DISTANCE_INCREMENTAL and jog.feedrate == previous.feedrate:
+        return replace(jog, x=previous.x + jog.x, y=previous.y + jog.y, z=previous.z + jog.z)
+    return None
+
+
+class JogCoalescer:
+    """Sends the jogs of a client, merged while the Gateway is behind.
+
+    The last jog queued is kept: if the Gateway didn't take it yet, the next
+    jog replaces it in the queue by their merge, so a client sending faster
+    than the Gateway drains never builds a backlog of jogs.
+    """
+
+    def __init__(self, gateway: AsyncGatewayClient, session_id: str):
+        self._gateway = gateway
+        self._session_id = session_id
+        # Last jog queued, and its message
+        self._queued: Optional[tuple[Jog, bytes]] = None
+
+        self.sent = 0
+        self.coalesced = 0
+
+    async def send(self, jog: Jog) -> None:
+        if self._queued is not None:
+            previous, message = self._queued
+            merged = merge_jogs(previous, jog)
+            if merged is not None:
+                replaced = await self._gateway.replace_jog(
+                    self._session_id, message, **self._arguments(merged)
+                )
+                if replaced is not None:
+                    self._queued = (merged, replaced)
+                    self.coalesced += 1
+                    return
+
+        message = await self._gateway.send_jog(self._session_id, **self._arguments(jog))
+        self._queued = (jog, message)
+        self.sent += 1
+
+    async def cancel(self) -> None:
+        """Remove the last jog from the queue, if the Gateway didn't take it yet."""
+        if self._queued is not None:
+            await self._gateway.cancel_jog(self._queued[1])
+            self._queued = None
+
+    @staticmethod
+    def _arguments(jog: Jog) -> dict[str, Any]:
+        return {
+            "x": jog.x,
+            "y": jog.y,
+            "z": jog.z,
+            "feedrate": jog.feedrate,
+            "units": jog.units,
+            "distance_mode": jog.mode,
+            "machine_coordinates": jog.machine,
+        }
+
+
+class FrameError(Exception):
+    """A frame from the client is invalid, answered with an error frame."""
+
+
+class SessionLost(Exception):
+    """The CNC session of the socket expired or was released."""
+
+
+class ControlSocket:
+    """Serves an accepted WebSocket, bound to the CNC session *session_id*."""
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        gateway: AsyncGatewayClient,
+        hub: PubSubHub,
+        session_id: str,
+    ):
+        self._websocket = websocket
+        self._gateway = gateway
+        self._hub = hub
+        self._session_id = session_id
+        self._jogs = JogCoalescer(gateway, session_id)
+        # Whether a direction is held (continuous jog)
+        self._holding = False
+        # The status and the replies are sent from different tasks
+        self._send_lock = asyncio.Lock()
+
+    async def serve(self) -> None:
+        async with self._hub.subscription(STATUS_CHANNEL) as subscription:
+            forwarder = asyncio.create_task(self._forward_status(subscription))
+            try:
+                await self._receive()
+            except WebSocketDisconnect:
+                pass
+            except SessionLost:
+                await self._websocket.close(
+                    status.WS_1008_POLICY_VIOLATION, reason="Sesión no encontrada o expirada"
+                )
+            finally:
+                forwarder.cancel()
+                await asyncio.gather(forwarder, return_exceptions=True)
+                # Don't move a machine nobody is watching
+                await self._jogs.cancel()
+                if self._holding:
+                    await self._gateway.send_jog_cancel(self._session_id)
+
+        logger.debug(
+            "Control socket closed: %d jogs sent, %d coalesced",
+            self._jogs.sent,
+            self._jogs.coalesced,
+        )
+
+    async def _receive(self) -> None:
+        while True:
+            text = await self._websocket.receive_text()
+            try:
+                await self._handle(text)
+            except FrameError as error:
+                await self._send(json.dumps({"type": "error", "detail": str(error)}))
+
+    async def _handle(self, text: str) -> None:
+        try:
+            frame = json.loads(text)
+        except json.JSONDecodeError as error:
+            raise FrameError("Mensaje JSON inválido") from error
+        if not isinstance(frame, dict):
+            raise FrameError("Mensaje JSON inválido")
+
+        kind = frame.get("type")
+        if kind == FRAME_JOG:
+            await self._jogs.send(self._parse_jog(frame))
+        elif kind == FRAME_JOG_HOLD:
+            x, y, z, feedrate = (frame.get(key, 0) for key in ("x", "y", "z", "feedrate"))
+            if not all(
+                isinstance(value, (int, float)) and not isinstance(value, bool)
+                for value in (x, y, z, feedrate)
+            ):
+                raise FrameError("Jog inválido")
+            # The Gateway would take it as a release of the direction
+            if feedrate <= 0:
+                raise FrameError(f"Velocidad de avance inválida: {feedrate}")
+            await self._gateway.send_jog_hold(
+                self._session_id, x, y, z, feedrate, units=frame.get("units")
+            )
+            self._holding = True
+        elif kind == FRAME_JOG_CANCEL:
+            await self._jogs.cancel()
+            await self._gateway.send_jog_cancel(self._session_id)
+            self._holding = False
+        elif kind == FRAME_REALTIME:
+            action = frame.get("action")
+            if action not in REALTIME_ACTIONS:
+                raise FrameError(f"Acción inválida: {action}")
+            if action in CANCEL_JOG_ACTIONS:
+                await self._jogs.cancel()
+            await self._gateway.send_realtime(self._session_id, action)
+        elif kind == FRAME_COMMAND:
+            command = frame.get("command")
+            if not isinstance(command, str) or not command:
+                raise FrameError("Comando inválido")
+            await self._gateway.send_command(self._session_id, command)
+        elif kind == FRAME_RENEW:
+            if not await self._gateway.renew_session(self._session_id):
+                raise SessionLost
+        else:
+            raise FrameError(f"Tipo de mensaje inválido: {kind}")
+
+    @staticmethod
+    def _parse_jog(frame: dict[str, Any]) -> Jog:
+        try:
+            request = CncJogCommand.model_validate(frame)
+        except ValidationError as error:
+            raise FrameError(f"Jog inválido: {error}") from error
+        return Jog(
+            request.x,
+            request.y,
+            request.z,
+            request.feedrate,
+            request.units,
+            request.mode,
+            machine=bool(frame.get("machine", False)),
+        )
+
+    async def _forward_status(self, subscription: Subscription) -> None:
+        async for message in subscription:
+            await self._send(f'{{"type": "status", "data": {message}}}')
+
+    async def _send(self, text: str) -> None:
+        async with self._send_lock:
+            await self._websocket.send_text(text)
@@ -10,6 +10,7 @@ from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy import text
 
 from api.exceptions import register_exception_handlers
+from api.middleware.gatewayMiddleware import close_gateway_connections
 from api.routes.cncRoutes import cncRoutes
 from api.routes.fileRoutes import fileRoutes
 from api.routes.logRoutes import logRoutes
@@ -44,6 +45,8 @@ async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
     logger.info("Shutting down API server...")
     engine.dispose()
     logger.info("Database connections closed")
+    await close_gateway_connections()
+    logger.info("Gateway connections closed")
 
 
 app = FastAPI(lifespan=lifespan)
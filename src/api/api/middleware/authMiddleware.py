@@ -3,19 +3,22 @@ from typing import Annotated
 from core.database.models import User
 from core.database.repositories.userRepository import UserRepository
 from core.utilities.security import verify_token
-from fastapi import Depends, HTTPException, Request
+from fastapi import Depends, HTTPException, Request, WebSocket, WebSocketException, status
 from jwt import ExpiredSignatureError, InvalidSignatureError
+from sqlalchemy.orm import Session
+from starlette.requests import HTTPConnection
 
 from api.middleware.dbMiddleware import GetDbSession
 
 
-def auth_user(request: Request, db_session: GetDbSession) -> User:
-    token = None
+def _get_token(connection: HTTPConnection) -> str | None:
+    if "Authorization" in connection.headers:
+        return connection.headers["Authorization"].split(" ")[1]
+    return connection.query_params.get("token")
+
 
-    if "Authorization" in request.headers:
-        token = request.headers["Authorization"].split(" ")[1]
-    elif request.query_params.get("token"):
-        token = request.query_params.get("token")
+def _authenticate(connection: HTTPConnection, db_session: Session, role: str | None) -> User:
+    token = _get_token(connection)
 
     if not token:
         raise HTTPException(401, detail="Unauthorized: Authentication Token is missing!")
@@ -30,14 +33,33 @@ def auth_user(request: Request, db_session: GetDbSession) -> User:
     except Exception as error:
         raise HTTPException(400, detail=str(error)) from error
 
+    if role is not None and user.role != role:
+        raise HTTPException(401, detail=f"Unauthorized: This endpoint requires {role} permission")
+
     return user
 
 
+def auth_user(request: Request, db_session: GetDbSession) -> User:
+    return _authenticate(request, db_session, role=None)
+
+
 def auth_admin(request: Request, db_session: GetDbSession) -> User:
-    user = auth_user(request, db_session)
+    return _authenticate(request, db_session, role="admin")
+
 
-    if user.role != "admin":
-        raise HTTPException(401, detail="Unauthorized: This endpoint requires admin permission")
+def auth_websocket_admin(websocket: WebSocket, db_session: GetDbSession) -> User:
+    """Authenticate an admin once, when the WebSocket connects.
+
+    Browsers can't set headers on a WebSocket, the token is usually sent
+    in the ``token`` query parameter.
+    """
+    try:
+        user = _authenticate(websocket, db_session, role="admin")
+    except HTTPException as error:
+        raise WebSocketException(status.WS_1008_POLICY_VIOLATION, reason=error.detail) from error
+    finally:
+        # Don't hold a DB connection for the lifetime of the socket
+        db_session.close()
 
     return user
 
@@ -46,3 +68,4 @@ def auth_admin(request: Request, db_session: GetDbSession) -> User:
 
 GetUserDep = Annotated[User, Depends(auth_user)]
 GetAdminDep = Annotated[User, Depends(auth_admin)]
+GetWebSocketAdminDep = Annotated[User, Depends(auth_websocket_admin)]
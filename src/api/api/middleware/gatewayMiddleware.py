@@ -1,11 +1,19 @@
-"""FastAPI dependency for the CNC GatewayClient singleton."""
+"""FastAPI dependencies for the CNC GatewayClient and PubSubHub singletons."""
 
 from typing import Annotated
 
-from core.utilities.gateway.gatewayClient import GatewayClient
+from core.utilities.gateway.constants import EVENTS_CHANNEL, MESSAGES_CHANNEL, STATUS_CHANNEL
+from core.utilities.gateway.gatewayClient import AsyncGatewayClient, GatewayClient
 from fastapi import Depends
 
+from api.pubsubHub import PubSubHub
+
+# Gateway PubSub channels that clients can subscribe to
+MONITOR_CHANNELS = (STATUS_CHANNEL, MESSAGES_CHANNEL, EVENTS_CHANNEL)
+
 _gateway_client: GatewayClient | None = None
+_async_gateway_client: AsyncGatewayClient | None = None
+_pubsub_hub: PubSubHub | None = None
 
 
 def get_gateway_client() -> GatewayClient:
@@ -16,5 +24,39 @@ def get_gateway_client() -> GatewayClient:
     return _gateway_client
 
 
-# Type alias for FastAPI dependency injection
+def get_async_gateway_client() -> AsyncGatewayClient:
+    """Return a shared AsyncGatewayClient instance (lazy-initialised).
+
+    All the requests share its connection pool, so ``async`` routes don't
+    open a connection to Redis each.
+    """
+    global _async_gateway_client  # noqa: PLW0603
+    if _async_gateway_client is None:
+        _async_gateway_client = AsyncGatewayClient()
+    return _async_gateway_client
+
+
+def get_pubsub_hub() -> PubSubHub:
+    """Return the shared PubSubHub of the monitor channels (lazy-initialised)."""
+    global _pubsub_hub  # noqa: PLW0603
+    if _pubsub_hub is None:
+        _pubsub_hub = PubSubHub(get_async_gateway_client(), MONITOR_CHANNELS)
+    return _pubsub_hub
+
+
+async def close_gateway_connections() -> None:
+    """Close the subscriptions of the PubSubHub and the connections of the
+    shared AsyncGatewayClient, if any."""
+    global _async_gateway_client, _pubsub_hub  # noqa: PLW0603
+    if _pubsub_hub is not None:
+        await _pubsub_hub.close()
+        _pubsub_hub = None
+    if _async_gateway_client is not None:
+        await _async_gateway_client.aclose()
+        _async_gateway_client = None
+
+
+# Type aliases for FastAPI dependency injection
 GetGateway = Annotated[GatewayClient, Depends(get_gateway_client)]
+GetAsyncGateway = Annotated[AsyncGatewayClient, Depends(get_async_gateway_client)]
+GetPubSubHub = Annotated[PubSubHub, Depends(get_pubsub_hub)]
@@ -0,0 +1,236 @@
+"""In-process fan-out of the Gateway PubSub channels to the SSE clients.
+
+Instead of a Redis subscription for every connected client, `PubSubHub`
+holds a single one per channel, while the channel has subscribers, and
+broadcasts each message to a bounded queue per client. A client that
+can't keep up loses its oldest messages, the drops are counted in the
+stats of the channel.
+
+Messages are converted to JSON once, for all the clients. The status is
+rebuilt from its deltas once too, clients get the complete status (see
+``core.utilities.gateway.statusDelta``), starting with the current one.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from collections.abc import AsyncIterator, Iterable
+from contextlib import asynccontextmanager, suppress
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+import redis
+from core.utilities.gateway.codec import CodecError, decode, to_json
+from core.utilities.gateway.constants import STATUS_CHANNEL
+from core.utilities.gateway.gatewayClient import AsyncGatewayClient
+from core.utilities.gateway.statusDelta import StatusReassembler
+
+logger = logging.getLogger(__name__)
+
+# Messages kept for each client, the oldest are dropped beyond it
+QUEUE_SIZE = 64
+# Delay before subscribing again after a Redis error (seconds)
+RETRY_DELAY = 1.0
+
+
+@dataclass
+class ChannelStats:
+    """Stats of a channel, since the hub was created."""
+
+    subscribers: int = 0
+    # Messages received from Redis, and dropped for slow clients
+    received: int = 0
+    dropped: int = 0
+
+
+class Subscription:
+    """Queue of the messages (JSON strings) of a channel for one client."""
+
+    def __init__(self, channel: str, maxsize: int = QUEUE_SIZE):
+        self.channel = channel
+        self.dropped = 0
+        self._queue: asyncio.Queue[str] = asyncio.Queue(maxsize)
+
+    def put(self, message: str) -> bool:
+        """Queue a message, dropping the oldest one if full.
+
+        Returns ``False`` if a message was dropped.
+        """
+        dropped = False
+        if self._queue.full():
+            self._queue.get_nowait()
+            self.dropped += 1
+            dropped = True
+        self._queue.put_nowait(message)
+        return not dropped
+
+    async def get(self) -> str:
+        return await self._queue.get()
+
+    def __aiter__(self) -> Subscription:
+        return self
+
+    async def __anext__(self) -> str:
+        return await self.get()
+
+
+@dataclass
+class _Channel:
+    subscribers: set[Subscription] = field(default_factory=set)
+    reader: Optional[asyncio.Task] = None
+    stats: ChannelStats = field(default_factory=ChannelStats)
+    # Status channel only: the status rebuilt from the deltas, and its last
+    # complete value, for the new subscribers
+    reassembler: Optional[StatusReassembler] = None
+    latest: Optional[str] = None
+
+
+class PubSubHub:
+    """One Redis subscription per channel, shared by all the clients.
+
+    Must be used from a single event loop, and closed with `close`.
+    """
+
+    def __init__(
+        self,
+        gateway: AsyncGatewayClient,
+        channels: Iterable[str],
+        queue_size: int = QUEUE_SIZE,
+    ):
+        self._gateway = gateway
+        self._queue_size = queue_size
+        self._channels = {channel: _Channel() for channel in channels}
+
+    @property
+    def channels(self) -> set[str]:
+        return set(self._channels)
+
+    def subscribe(self, channel: str) -> Subscription:
+        """Start receiving the messages of *channel*, see `unsubscribe`."""
+        state = self._channels[channel]
+        subscription = Subscription(channel, self._queue_size)
+        state.subscribers.add(subscription)
+        state.stats.subscribers = len(state.subscribers)
+
+        if state.latest is not None:
+            subscription.put(state.latest)
+        if state.reader is None:
+            state.reader = asyncio.create_task(self._read(channel), name=f"pubsub_hub:{channel}")
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """Stop receiving messages, the Redis subscription ends with the last client."""
+        state = self._channels[subscription.channel]
+        state.subscribers.discard(subscription)
+        state.stats.subscribers = len(state.subscribers)
+
+        if not state.subscribers and state.reader is not None:
+            state.reader.cancel()
+            state.reader = None
+            state.reassembler, state.latest = None, None
+
+    @asynccontextmanager
+    async def subscription(self, channel: str) -> AsyncIterator[Subscription]:
+        subscription = self.subscribe(channel)
+        try:
+            yield subscription
+        finally:
+            self.unsubscribe(subscription)
+
+    def stats(self) -> dict[str, ChannelStats]:
+        return {channel: state.stats for channel, state in self._channels.items()}
+
+    async def close(self) -> None:
+        """Cancel the Redis subscriptions."""
+        readers = [state.reader for state in self._channels.values() if state.reader]
+        for state in self._channels.values():
+            state.reader = None
+            state.subscribers.clear()
+            state.stats.subscribers = 0
+        for reader in readers:
+            reader.cancel()
+        for reader in readers:
+            with suppress(asyncio.CancelledError):
+                await reader
+
+    # ------------------------------------------------------------------
+    # Internal
+    # ------------------------------------------------------------------
+
+    async def _read(self, channel: str) -> None:
+        state = self._channels[channel]
+        while True:
+            pubsub = None
+            try:
+                pubsub = await self._gateway.subscribe_channels(channel)
+                if channel == STATUS_CHANNEL:
+                    # Changes before the subscription were not received
+                    state.reassembler = StatusReassembler()
+                    await self._resync(state)
+
+                async for message in pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    state.stats.received += 1
+                    try:
+                        if channel == STATUS_CHANNEL:
+                            await self._on_status(state, message["data"])
+                        else:
+                            self._on_message(state, message["data"])
+                    except redis.RedisError:
+                        raise
+                    except Exception:
+                        # A malformed message must not stop the channel for every client
+                        logger.exception("Error handling a message of the %s channel", channel)
+                        if channel == STATUS_CHANNEL:
+                            state.reassembler = StatusReassembler()
+                            await self._resync(state)
+            except redis.RedisError:
+                logger.warning("Error reading the %s channel, retrying", channel, exc_info=True)
+                await asyncio.sleep(RETRY_DELAY)
+            except Exception:
+                logger.exception("Unexpected error reading the %s channel, retrying", channel)
+                await asyncio.sleep(RETRY_DELAY)
+            finally:
+                if pubsub is not None:
+                    with suppress(redis.RedisError):
+                        await pubsub.unsubscribe(channel)
+                    with suppress(redis.RedisError):
+                        await pubsub.aclose()
+
+    def _on_message(self, state: _Channel, data: bytes) -> None:
+        try:
+            text = to_json(data)
+        except CodecError:
+            return
+        self._broadcast(state, text)
+
+    async def _on_status(self, state: _Channel, data: bytes) -> None:
+        assert state.reassembler is not None
+        try:
+            status = state.reassembler.apply(decode(data))
+        except CodecError:
+            return
+        if status is not None:
+            self._broadcast_status(state, status)
+        elif state.reassembler.needs_keyframe:
+            # A delta was missed, don't wait for the next keyframe
+            await self._resync(state)
+
+    async def _resync(self, state: _Channel) -> None:
+        assert state.reassembler is not None
+        snapshot = await self._gateway.get_last_status()
+        status = state.reassembler.apply(snapshot) if snapshot is not None else None
+        if status is not None:
+            self._broadcast_status(state, status)
+
+    def _broadcast_status(self, state: _Channel, status: dict[str, Any]) -> None:
+        state.latest = json.dumps(status)
+        self._broadcast(state, state.latest)
+
+    def _broadcast(self, state: _Channel, message: str) -> None:
+        for subscription in tuple(state.subscribers):
+            if not subscription.put(message):
+                state.stats.dropped += 1
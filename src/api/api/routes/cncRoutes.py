@@ -10,17 +10,13 @@ from core.schemas.session import (
     SessionRenewResponse,
     SessionResponse,
 )
-from core.utilities.gateway.constants import (
-    ACTION_PAUSE,
-    ACTION_RESUME,
-    ACTION_SOFT_RESET,
-    ACTION_STOP,
-)
-from core.utilities.serial import SerialService
-from fastapi import APIRouter, Header, HTTPException
+from core.utilities.gateway.constants import REALTIME_ACTIONS
+from core.utilities.serial.serialService import SerialService
+from fastapi import APIRouter, Header, HTTPException, Query, WebSocket, WebSocketException, status
 
-from api.middleware.authMiddleware import GetAdminDep
-from api.middleware.gatewayMiddleware import GetGateway
+from api.controlSocket import ControlSocket
+from api.middleware.authMiddleware import GetAdminDep, GetWebSocketAdminDep
+from api.middleware.gatewayMiddleware import GetAsyncGateway, GetPubSubHub
 
 cncRoutes = APIRouter(prefix="/cnc", tags=["CNC"])
 
@@ -45,26 +41,26 @@ def get_available_ports(admin: GetAdminDep):
 
 
 @cncRoutes.get("/gateway/state", response_model=GatewayStateResponse)
-def get_gateway_state(admin: GetAdminDep, gateway: GetGateway):
+async def get_gateway_state(admin: GetAdminDep, gateway: GetAsyncGateway):
     """Return the current CNC Gateway state."""
-    state = gateway.get_gateway_state()
+    state = await gateway.get_gateway_state()
     return {"state": state, "running": state is not None}
 
 
 @cncRoutes.get("/gateway/running")
-def check_gateway_running(admin: GetAdminDep, gateway: GetGateway):
+async def check_gateway_running(admin: GetAdminDep, gateway: GetAsyncGateway):
     """Returns whether the CNC Gateway process is running."""
-    return {"running": gateway.is_gateway_running()}
+    return {"running": await gateway.is_gateway_running()}
 
 
 @cncRoutes.get("/status")
-def get_cnc_status(admin: GetAdminDep, gateway: GetGateway):
+async def get_cnc_status(admin: GetAdminDep, gateway: GetAsyncGateway):
     """Return the last published CNC status snapshot.
 
     This is a REST-friendly alternative to the PubSub stream, useful for
     polling the current state of the device and file-execution progress.
     """
-    status = gateway.get_last_status()
+    status = await gateway.get_last_status()
     if status is None:
         return {"running": False}
     return status
@@ -76,56 +72,56 @@ def get_cnc_status(admin: GetAdminDep, gateway: GetGateway):
 
 
 @cncRoutes.post("/session", response_model=SessionResponse)
-def acquire_session(
+async def acquire_session(
     admin: GetAdminDep,
-    gateway: GetGateway,
+    gateway: GetAsyncGateway,
     request: SessionAcquireRequest,
 ):
     """Acquire the exclusive CNC session (distributed lock)."""
-    if not gateway.is_gateway_running():
+    if not await gateway.is_gateway_running():
         raise HTTPException(503, detail="CNC Gateway no está disponible")
 
-    session_id = gateway.acquire_session(
+    session_id = await gateway.acquire_session(
         user_id=admin.id,
         client_type=request.client_type,
     )
     if session_id is None:
         raise HTTPException(409, detail="El CNC ya está en uso por otra sesión")
 
-    session_data = gateway.get_active_session()
+    session_data = await gateway.get_active_session()
     return session_data
 
 
 @cncRoutes.get("/session", response_model=SessionResponse)
-def get_session(admin: GetAdminDep, gateway: GetGateway):
+async def get_session(admin: GetAdminDep, gateway: GetAsyncGateway):
     """Get the current active session, if any."""
-    session = gateway.get_active_session()
+    session = await gateway.get_active_session()
     if session is None:
         raise HTTPException(404, detail="No hay sesión activa")
     return session
 
 
 @cncRoutes.put("/session/renew", response_model=SessionRenewResponse)
-def renew_session(
+async def renew_session(
     admin: GetAdminDep,
-    gateway: GetGateway,
+    gateway: GetAsyncGateway,
     x_cnc_session: GetSessionId,
 ):
     """Heartbeat — renew the session TTL."""
-    renewed = gateway.renew_session(x_cnc_session)
+    renewed = await gateway.renew_session(x_cnc_session)
     if not renewed:
         raise HTTPException(404, detail="Sesión no encontrada o expirada")
     return {"renewed": True}
 
 
 @cncRoutes.delete("/session", response_model=GenericResponse)
-def release_session(
+async def release_session(
     admin: GetAdminDep,
-    gateway: GetGateway,
+    gateway: GetAsyncGateway,
     x_cnc_session: GetSessionId,
 ):
     """Release the CNC session."""
-    released = gateway.release_session(x_cnc_session)
+    released = await gateway.release_session(x_cnc_session)
     if not released:
         raise HTTPException(404, detail="Sesión no encontrada o no le pertenece")
     return {"success": "Sesión liberada correctamente"}
@@ -137,33 +133,33 @@ def release_session(
 
 
 @cncRoutes.post("/command", response_model=GenericResponse)
-def send_command(
+async def send_command(
     admin: GetAdminDep,
-    gateway: GetGateway,
+    gateway: GetAsyncGateway,
     request: CncCommand,
     x_cnc_session: GetSessionId,
 ):
     """Send a G-code command to the CNC via the Gateway."""
-    if not gateway.is_gateway_running():
+    if not await gateway.is_gateway_running():
         raise HTTPException(503, detail="CNC Gateway no está disponible")
 
-    gateway.send_command(x_cnc_session, request.command)
+    await gateway.send_command(x_cnc_session, request.command)
     return {"success": "El comando fue enviado para su ejecución"}
 
 
 @cncRoutes.post("/jog", response_model=CncJogResponse)
-def send_jog_command(
+async def send_jog_command(
     admin: GetAdminDep,
-    gateway: GetGateway,
+    gateway: GetAsyncGateway,
     request: CncJogCommand,
     x_cnc_session: GetSessionId,
     machine: bool = False,
 ):
     """Send a jog command to the CNC via the Gateway."""
-    if not gateway.is_gateway_running():
+    if not await gateway.is_gateway_running():
         raise HTTPException(503, detail="CNC Gateway no está disponible")
 
-    gateway.send_jog(
+    await gateway.send_jog(
         x_cnc_session,
         request.x,
         request.y,
@@ -188,23 +184,56 @@ def send_jog_command(
 
 
 @cncRoutes.post("/realtime", response_model=GenericResponse)
-def send_realtime_command(
+async def send_realtime_command(
     admin: GetAdminDep,
-    gateway: GetGateway,
+    gateway: GetAsyncGateway,
     request: RealtimeRequest,
     x_cnc_session: GetSessionId,
 ):
-    """Send a realtime action (pause / resume / stop / soft_reset) to the CNC."""
-    valid_actions = {ACTION_PAUSE, ACTION_RESUME, ACTION_STOP, ACTION_SOFT_RESET}
-    if request.action not in valid_actions:
+    """Send a realtime action (pause / resume / stop / soft_reset, or a feed,
+    rapid or spindle override) to the CNC."""
+    if request.action not in REALTIME_ACTIONS:
         raise HTTPException(
             400,
             detail=f"Acción inválida: {request.action}. "
-            f"Opciones: {', '.join(sorted(valid_actions))}",
+            f"Opciones: {', '.join(sorted(REALTIME_ACTIONS))}",
         )
 
-    if not gateway.is_gateway_running():
+    if not await gateway.is_gateway_running():
         raise HTTPException(503, detail="CNC Gateway no está disponible")
 
-    gateway.send_realtime(x_cnc_session, request.action)
+    await gateway.send_realtime(x_cnc_session, request.action)
     return {"success": f"Acción '{request.action}' enviada correctamente"}
+
+
+# ---------------------------------------------------------------------------
+# Control channel (WebSocket)
+# ---------------------------------------------------------------------------
+
+
+@cncRoutes.websocket("/ws")
+async def control_socket(
+    websocket: WebSocket,
+    admin: GetWebSocketAdminDep,
+    gateway: GetAsyncGateway,
+    hub: GetPubSubHub,
+    session: Annotated[str, Query(description="Active CNC session ID")],
+):
+    """Bidirectional control channel, bound to the CNC session *session*.
+
+    Accepts jog, realtime, command and renew frames and streams the status
+    back, see ``api.controlSocket``. Authentication happens once, on connect.
+    """
+    if not await gateway.is_gateway_running():
+        raise WebSocketException(
+            status.WS_1013_TRY_AGAIN_LATER, reason="CNC Gateway no está disponible"
+        )
+
+    active = await gateway.get_active_session()
+    if active is None or active["session_id"] != session or active["user_id"] != admin.id:
+        raise WebSocketException(
+            status.WS_1008_POLICY_VIOLATION, reason="Sesión no encontrada o no le pertenece"
+        )
+
+    await websocket.accept()
+    await ControlSocket(websocket, gateway, hub, session).serve()
@@ -1,10 +1,15 @@
 from core.config import FILES_FOLDER_PATH
+from core.database.exceptions import EntityNotFoundError
 from core.database.repositories.fileRepository import FileRepository
 from core.database.types import FileReport
 from core.schemas.files import FileContentResponse, FileResponse, FileUpdate
 from core.schemas.general import GenericResponse
 from core.utilities.fileManager import FileManager
+from core.utilities.files import streamJsonContent
+from core.utilities.gcode.gcodePreview import get_preview_path, select_preview_size
 from fastapi import APIRouter, HTTPException, UploadFile
+from fastapi.responses import FileResponse as FileContent
+from fastapi.responses import StreamingResponse
 
 from api.middleware.authMiddleware import GetAdminDep, GetUserDep
 from api.middleware.dbMiddleware import GetDbSession
@@ -40,7 +45,9 @@ def get_file(file_id: int, user: GetUserDep, db_session: GetDbSession):
 @fileRoutes.get("/{file_id}/content", response_model=FileContentResponse)
 def get_file_content(file_id: int, user: GetUserDep, db_session: GetDbSession):
     file_manager = FileManager(FILES_FOLDER_PATH, db_session)
-    return {"content": file_manager.read_file(file_id)}
+    reader = file_manager.open_file_lines(file_id)
+    # Stream the JSON document, so big files are never loaded in memory
+    return StreamingResponse(streamJsonContent(reader), media_type="application/json")
 
 
 @fileRoutes.get("/{file_id}/report")
@@ -50,6 +57,20 @@ def get_file_report(file_id: int, user: GetUserDep, db_session: GetDbSession) ->
     return file.report
 
 
+@fileRoutes.get("/{file_id}/preview")
+def get_file_preview(file_id: int, user: GetUserDep, db_session: GetDbSession, size: int = 800):
+    repository = FileRepository(db_session)
+    file = repository.get_file_by_id(file_id)
+    # Another user's file is not found either, only admins can see them
+    if file is None or (file.user_id != user.id and user.role != "admin"):
+        raise EntityNotFoundError(f"File with ID {file_id} was not found")
+    # The pyramid is built with the thumbnail, pick the smallest level for the viewport
+    preview = get_preview_path(file.file_hash, select_preview_size(size))
+    if not preview.is_file():
+        raise HTTPException(404, detail="La vista previa del archivo no está disponible")
+    return FileContent(preview, media_type="application/json")
+
+
 @fileRoutes.post("", response_model_by_alias=False, response_model=FileResponse)
 @fileRoutes.post("/", response_model_by_alias=False, response_model=FileResponse)
 def upload_file(file: UploadFile, user: GetUserDep, db_session: GetDbSession, worker: GetWorker):
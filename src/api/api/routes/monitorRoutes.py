@@ -1,53 +1,42 @@
-import asyncio
+from dataclasses import asdict
 
-import redis.asyncio as aioredis
-from core.config import REDIS_DB_STORAGE, REDIS_HOST, REDIS_PORT
-from fastapi import APIRouter, HTTPException, Request
+from fastapi import APIRouter, HTTPException
 from sse_starlette.sse import EventSourceResponse
 
-from api.middleware.authMiddleware import GetUserDep
+from api.middleware.authMiddleware import GetAdminDep, GetUserDep
+from api.middleware.gatewayMiddleware import GetPubSubHub
 
 monitorRoutes = APIRouter(prefix="/monitor", tags=["Monitor"])
 
-# Allowed PubSub channels that clients can subscribe to.
-_ALLOWED_CHANNELS = {"grbl_status", "grbl_messages", "cnc:events"}
-
 
 @monitorRoutes.get("/stream/{channel}")
-async def stream(channel: str, user: GetUserDep, req: Request):
+async def stream(channel: str, user: GetUserDep, hub: GetPubSubHub):
     """SSE endpoint — subscribe to a Gateway PubSub channel.
 
     Streams real-time CNC status, GRBL messages, or lifecycle events
     depending on the *channel* parameter.
+
+    The Gateway only publishes the changes of the status, which are merged
+    here: clients receive the complete status, starting with the current
+    one, every time it changes. Messages are always sent as JSON, whichever
+    codec the Gateway uses.
+
+    All the clients of a channel share its subscription to Redis (see
+    ``api.pubsubHub``). A client that falls behind loses its oldest messages.
     """
-    if channel not in _ALLOWED_CHANNELS:
+    if channel not in hub.channels:
         raise HTTPException(400, detail=f"Canal no permitido: {channel}")
 
     async def subscribe():
-        conn = aioredis.Redis(
-            host=REDIS_HOST,
-            port=REDIS_PORT,
-            db=REDIS_DB_STORAGE,
-            auto_close_connection_pool=False,
-        )
-        pubsub = conn.pubsub()
-        await pubsub.subscribe(channel)
-        try:
-            while True:
-                if await req.is_disconnected():
-                    break
-                message = await pubsub.get_message(
-                    ignore_subscribe_messages=True,
-                    timeout=1.0,
-                )
-                if message is not None and "data" in message:
-                    data: bytes = message["data"]
-                    yield {"event": channel, "data": data.decode()}
-                else:
-                    await asyncio.sleep(0.05)
-        finally:
-            await pubsub.unsubscribe(channel)
-            await pubsub.aclose()
-            await conn.aclose()
+        # Cancelled by EventSourceResponse when the client disconnects
+        async with hub.subscription(channel) as subscription:
+            async for message in subscription:
+                yield {"event": channel, "data": message}
 
     return EventSourceResponse(subscribe())
+
+
+@monitorRoutes.get("/stats")
+async def get_stats(admin: GetAdminDep, hub: GetPubSubHub):
+    """Subscribers of each channel, messages received and dropped for slow clients."""
+    return {channel: asdict(stats) for channel, stats in hub.stats().items()}
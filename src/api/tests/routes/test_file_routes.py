@@ -0,0 +1,93 @@
+import datetime
+import hashlib
+import json
+from pathlib import Path
+
+import pytest
+from core.config import settings
+from core.database.exceptions import EntityNotFoundError
+from core.database.models import File
+from core.database.repositories.fileRepository import FileRepository
+from core.utilities.gcode.gcodePreview import PREVIEW_SIZES, get_preview_path
+from pytest_mock.plugin import MockerFixture
+
+# Test data
+creation_time = datetime.datetime(2000, 1, 1, 0, 0, 0)
+file_hash = hashlib.sha256(b"G54").hexdigest()
+user_file = File(1, "file_1.gcode", file_hash, creation_time)
+other_user_file = File(2, "file_3.gcode", file_hash, creation_time)
+
+
+class TestFilePreviewRoutes:
+    @pytest.fixture(autouse=True)
+    def previews(self, mocker: MockerFixture, tmp_path: Path):
+        mocker.patch.object(settings, "images_folder_path", str(tmp_path))
+        for size in PREVIEW_SIZES:
+            preview = get_preview_path(file_hash, size)
+            preview.parent.mkdir(parents=True, exist_ok=True)
+            preview.write_text(json.dumps({"size": size}))
+
+    def test_get_file_preview(self, client, mocker: MockerFixture):
+        headers = {"Authorization": "Bearer a-valid-token"}
+        mocker.patch.object(FileRepository, "get_file_by_id", return_value=user_file)
+
+        # Query endpoint under test
+        response = client.get("/files/1/preview", headers=headers)
+
+        # Assertions
+        # 800 px are drawn from the 1024 level
+        assert response.status_code == 200
+        assert response.json() == {"size": 1024}
+
+    @pytest.mark.parametrize(
+        "size,expected",
+        [(100, 256), (256, 256), (300, 512), (2048, 2048), (5000, 2048)],
+    )
+    def test_get_file_preview_size(self, client, mocker: MockerFixture, size, expected):
+        headers = {"Authorization": "Bearer a-valid-token"}
+        mocker.patch.object(FileRepository, "get_file_by_id", return_value=user_file)
+
+        # Query endpoint under test
+        response = client.get(f"/files/1/preview?size={size}", headers=headers)
+
+        # Assertions
+        assert response.status_code == 200
+        assert response.json() == {"size": expected}
+
+    def test_get_file_preview_unknown_file(self, client, mocker: MockerFixture):
+        headers = {"Authorization": "Bearer a-valid-token"}
+        mocker.patch.object(
+            FileRepository,
+            "get_file_by_id",
+            side_effect=EntityNotFoundError("File with ID 99 was not found"),
+        )
+
+        # Query endpoint under test
+        response = client.get("/files/99/preview", headers=headers)
+
+        # Assertions
+        assert response.status_code == 404
+        assert response.json()["detail"] == "File with ID 99 was not found"
+
+    def test_get_file_preview_other_user(self, client, mocker: MockerFixture):
+        headers = {"Authorization": "Bearer a-valid-token"}
+        mocker.patch.object(FileRepository, "get_file_by_id", return_value=other_user_file)
+
+        # Query endpoint under test
+        response = client.get("/files/3/preview", headers=headers)
+
+        # Assertions
+        assert response.status_code == 404
+        assert response.json()["detail"] == "File with ID 3 was not found"
+
+    def test_get_file_preview_not_generated(self, client, mocker: MockerFixture):
+        headers = {"Authorization": "Bearer a-valid-token"}
+        mocker.patch.object(FileRepository, "get_file_by_id", return_value=user_file)
+        get_preview_path(file_hash, 1024).unlink()
+
+        # Query endpoint under test
+        response = client.get("/files/1/preview", headers=headers)
+
+        # Assertions
+        assert response.status_code == 404
+        assert response.json()["detail"] == "La vista previa del archivo no está disponible"
@@ -0,0 +1,128 @@
+import asyncio
+import json
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+from api.controlSocket import ControlSocket, FrameError, Jog, JogCoalescer, merge_jogs
+from core.utilities.grbl.grblUtils import JOG_DISTANCE_ABSOLUTE, JOG_DISTANCE_INCREMENTAL
+
+
+def incremental(x=0.0, y=0.0, z=0.0, feedrate=500.0, units="milimeters"):
+    return Jog(x, y, z, feedrate, units, JOG_DISTANCE_INCREMENTAL)
+
+
+class FakeGateway:
+    """Command queue of the Gateway, the jogs are taken with `take`."""
+
+    def __init__(self):
+        self.queue: list[tuple[bytes, dict]] = []
+        self.messages = 0
+
+    def _message(self, jog: dict) -> bytes:
+        self.messages += 1
+        return f"jog-{self.messages}".encode()
+
+    async def send_jog(self, session_id, **jog):
+        message = self._message(jog)
+        self.queue.append((message, jog))
+        return message
+
+    async def replace_jog(self, session_id, queued, **jog):
+        for index, (message, _) in enumerate(self.queue):
+            if message == queued:
+                self.queue[index] = (self._message(jog), jog)
+                return self.queue[index][0]
+        return None
+
+    async def cancel_jog(self, queued):
+        before = len(self.queue)
+        self.queue = [item for item in self.queue if item[0] != queued]
+        return len(self.queue) < before
+
+    def take(self) -> dict:
+        return self.queue.pop(0)[1]
+
+
+def test_merge_incremental_jogs():
+    merged = merge_jogs(incremental(x=1, z=-0.5), incremental(x=1, y=2))
+    assert merged == incremental(x=2, y=2, z=-0.5)
+
+
+def test_merge_absolute_jogs_keeps_the_last_target():
+    previous = Jog(10, 10, 0, 500, "milimeters", JOG_DISTANCE_ABSOLUTE)
+    jog = Jog(20, 5, 0, 800, "milimeters", JOG_DISTANCE_ABSOLUTE)
+    assert merge_jogs(previous, jog) == jog
+
+
+def test_jogs_not_merged():
+    assert merge_jogs(incremental(x=1), incremental(x=1, feedrate=800)) is None
+    assert merge_jogs(incremental(x=1), incremental(x=1, units="inches")) is None
+    assert (
+        merge_jogs(incremental(x=1), Jog(1, 0, 0, 500, "milimeters", JOG_DISTANCE_ABSOLUTE)) is None
+    )
+
+
+def test_jogs_are_coalesced_while_queued():
+    async def scenario():
+        gateway = FakeGateway()
+        coalescer = JogCoalescer(gateway, "session")
+
+        for _ in range(4):
+            await coalescer.send(incremental(x=1))
+        assert len(gateway.queue) == 1
+        assert gateway.take()["x"] == 4
+
+        # Taken by the Gateway, the next one is queued
+        await coalescer.send(incremental(x=1))
+        await coalescer.send(incremental(x=1, feedrate=800))
+        assert [jog["x"] for _, jog in gateway.queue] == [1, 1]
+        assert (coalescer.sent, coalescer.coalesced) == (3, 3)
+
+    asyncio.run(scenario())
+
+
+def test_cancel_removes_the_queued_jog():
+    async def scenario():
+        gateway = FakeGateway()
+        coalescer = JogCoalescer(gateway, "session")
+
+        await coalescer.send(incremental(x=1))
+        await coalescer.cancel()
+        assert gateway.queue == []
+
+        # Not merged into the cancelled one
+        await coalescer.send(incremental(x=1))
+        assert gateway.take()["x"] == 1
+
+    asyncio.run(scenario())
+
+
+@pytest.mark.parametrize("feedrate", [0, -500, "fast"])
+def test_jog_hold_invalid_feedrate(feedrate):
+    gateway = AsyncMock()
+    control = ControlSocket(Mock(), gateway, Mock(), "session")
+    frame = {"type": "jog_hold", "x": 1, "y": 0, "z": 0, "feedrate": feedrate}
+
+    with pytest.raises(FrameError):
+        asyncio.run(control._handle(json.dumps(frame)))
+    gateway.send_jog_hold.assert_not_called()
+
+
+@pytest.mark.parametrize("key", ["x", "feedrate"])
+def test_jog_hold_boolean_value(key):
+    gateway = AsyncMock()
+    control = ControlSocket(Mock(), gateway, Mock(), "session")
+    frame = {"type": "jog_hold", "x": 1, "y": 0, "z": 0, "feedrate": 500, key: True}
+
+    with pytest.raises(FrameError):
+        asyncio.run(control._handle(json.dumps(frame)))
+    gateway.send_jog_hold.assert_not_called()
+
+
+def test_jog_hold():
+    gateway = AsyncMock()
+    control = ControlSocket(Mock(), gateway, Mock(), "session")
+    frame = {"type": "jog_hold", "x": 1, "y": 0, "z": 0, "feedrate": 500, "units": "milimeters"}
+
+    asyncio.run(control._handle(json.dumps(frame)))
+    gateway.send_jog_hold.assert_awaited_once_with("session", 1, 0, 0, 500, units="milimeters")
@@ -0,0 +1,190 @@
+import asyncio
+import json
+
+from api.pubsubHub import PubSubHub
+from core.utilities.gateway.codec import encode
+from core.utilities.gateway.constants import MESSAGES_CHANNEL, STATUS_CHANNEL
+
+
+class FakePubSub:
+    def __init__(self):
+        self.messages: asyncio.Queue = asyncio.Queue()
+        self.closed = False
+
+    async def listen(self):
+        while True:
+            yield await self.messages.get()
+
+    def publish(self, message: dict) -> None:
+        self.messages.put_nowait({"type": "message", "data": encode(message)})
+
+    async def unsubscribe(self, *channels):
+        pass
+
+    async def aclose(self):
+        self.closed = True
+
+
+class FakeGateway:
+    def __init__(self, last_status=None):
+        self.last_status = last_status
+        self.pubsubs: dict[str, list[FakePubSub]] = {}
+
+    async def subscribe_channels(self, *channels):
+        pubsub = FakePubSub()
+        self.pubsubs.setdefault(channels[0], []).append(pubsub)
+        return pubsub
+
+    async def get_last_status(self):
+        return self.last_status
+
+
+async def receive(subscription) -> str:
+    return await asyncio.wait_for(subscription.get(), timeout=1)
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_messages_are_broadcast_on_a_single_subscription():
+    async def scenario():
+        gateway = FakeGateway()
+        hub = PubSubHub(gateway, [MESSAGES_CHANNEL])
+        first = hub.subscribe(MESSAGES_CHANNEL)
+        second = hub.subscribe(MESSAGES_CHANNEL)
+        await settle()
+
+        assert len(gateway.pubsubs[MESSAGES_CHANNEL]) == 1
+        gateway.pubsubs[MESSAGES_CHANNEL][0].publish({"type": "received", "message": "ok"})
+
+        expected = {"type": "received", "message": "ok"}
+        assert json.loads(await first.get()) == expected
+        assert json.loads(await second.get()) == expected
+        assert hub.stats()[MESSAGES_CHANNEL].subscribers == 2
+        assert hub.stats()[MESSAGES_CHANNEL].received == 1
+        await hub.close()
+
+    asyncio.run(scenario())
+
+
+def test_slow_subscriber_drops_oldest_messages():
+    async def scenario():
+        gateway = FakeGateway()
+        hub = PubSubHub(gateway, [MESSAGES_CHANNEL], queue_size=2)
+        subscription = hub.subscribe(MESSAGES_CHANNEL)
+        await settle()
+
+        pubsub = gateway.pubsubs[MESSAGES_CHANNEL][0]
+        for line in range(5):
+            pubsub.publish({"line": line})
+        await settle()
+
+        assert json.loads(await subscription.get()) == {"line": 3}
+        assert json.loads(await subscription.get()) == {"line": 4}
+        assert subscription.dropped == 3
+        assert hub.stats()[MESSAGES_CHANNEL].dropped == 3
+        await hub.close()
+
+    asyncio.run(scenario())
+
+
+def test_subscription_ends_with_the_last_subscriber():
+    async def scenario():
+        gateway = FakeGateway()
+        hub = PubSubHub(gateway, [MESSAGES_CHANNEL])
+        async with hub.subscription(MESSAGES_CHANNEL):
+            await settle()
+        await settle()
+
+        assert gateway.pubsubs[MESSAGES_CHANNEL][0].closed
+        assert hub.stats()[MESSAGES_CHANNEL].subscribers == 0
+
+        # Subscribes again for the next client
+        async with hub.subscription(MESSAGES_CHANNEL):
+            await settle()
+        assert len(gateway.pubsubs[MESSAGES_CHANNEL]) == 2
+        await hub.close()
+
+    asyncio.run(scenario())
+
+
+def test_status_starts_from_the_current_one_and_merges_deltas():
+    async def scenario():
+        keyframe = {
+            "type": "keyframe",
+            "seq": 7,
+            "status": {"activeState": "Idle", "mpos": {"x": 0.0, "y": 0.0, "z": 0.0}},
+        }
+        gateway = FakeGateway(last_status=keyframe)
+        hub = PubSubHub(gateway, [STATUS_CHANNEL])
+        first = hub.subscribe(STATUS_CHANNEL)
+        await settle()
+
+        assert json.loads(await first.get())["status"]["activeState"] == "Idle"
+
+        gateway.pubsubs[STATUS_CHANNEL][0].publish(
+            {"type": "delta", "seq": 8, "status": {"activeState": "Jog"}}
+        )
+        await settle()
+        state = json.loads(await first.get())
+        assert state["status"] == {"activeState": "Jog", "mpos": {"x": 0.0, "y": 0.0, "z": 0.0}}
+
+        # Late subscribers get the current status right away
+        second = hub.subscribe(STATUS_CHANNEL)
+        assert json.loads(await second.get()) == state
+        await hub.close()
+
+    asyncio.run(scenario())
+
+
+def test_malformed_status_doesnt_stop_the_reader():
+    async def scenario():
+        keyframe = {"type": "keyframe", "seq": 7, "status": {"activeState": "Idle"}}
+        gateway = FakeGateway(last_status=keyframe)
+        hub = PubSubHub(gateway, [STATUS_CHANNEL])
+        subscription = hub.subscribe(STATUS_CHANNEL)
+        await settle()
+        assert json.loads(await receive(subscription))["status"] == {"activeState": "Idle"}
+
+        # The section can't be merged, the status starts over from the current one
+        pubsub = gateway.pubsubs[STATUS_CHANNEL][0]
+        pubsub.publish({"type": "delta", "seq": 8, "status": "Jog"})
+        await settle()
+        assert json.loads(await receive(subscription))["status"] == {"activeState": "Idle"}
+
+        pubsub.publish({"type": "delta", "seq": 8, "status": {"activeState": "Jog"}})
+        await settle()
+        assert json.loads(await receive(subscription))["status"] == {"activeState": "Jog"}
+        assert len(gateway.pubsubs[STATUS_CHANNEL]) == 1
+        await hub.close()
+
+    asyncio.run(scenario())
+
+
+def test_unexpected_error_restarts_the_reader(monkeypatch):
+    async def scenario():
+        keyframe = {"type": "keyframe", "seq": 7, "status": {"activeState": "Idle"}}
+        gateway = FakeGateway(last_status=keyframe)
+        failures = [KeyError("status")]
+        get_last_status = gateway.get_last_status
+
+        async def failing_get_last_status():
+            if failures:
+                raise failures.pop()
+            return await get_last_status()
+
+        gateway.get_last_status = failing_get_last_status
+        hub = PubSubHub(gateway, [STATUS_CHANNEL])
+        subscription = hub.subscribe(STATUS_CHANNEL)
+        await settle()
+
+        # Subscribes again and starts from the current status
+        assert len(gateway.pubsubs[STATUS_CHANNEL]) == 2
+        assert gateway.pubsubs[STATUS_CHANNEL][0].closed
+        assert json.loads(await receive(subscription))["status"] == {"activeState": "Idle"}
+        await hub.close()
+
+    monkeypatch.setattr("api.pubsubHub.RETRY_DELAY", 0)
+    asyncio.run(scenario())
@@ -0,0 +1,147 @@
+"""Benchmark: requests per second of the CNC routes of the API.
+
+Sends concurrent requests to ``GET /cnc/status`` and ``POST /cnc/jog``, as
+served by the ``async`` routes on `AsyncGatewayClient`, and by the former
+sync routes on `GatewayClient`, which FastAPI runs in its thread pool. The
+app is called in-process (through ``httpx.ASGITransport``), authentication
+is bypassed.
+
+Requires a Redis server (``REDIS_HOST``, ``REDIS_PORT`` and
+``REDIS_DB_STORAGE`` from env), its state, status and queue keys are
+cleared.
+
+Usage::
+
+    PYTHONPATH=core:api:$PYTHONPATH python -m benchmarks.bench_api_load \\
+        [--requests 2000] [--concurrency 50]
+"""
+
+import argparse
+import asyncio
+import time
+from types import SimpleNamespace
+
+import core.utilities.grbl.grblUtils as grblUtils
+import httpx
+import redis
+from api.middleware.authMiddleware import auth_admin
+from api.middleware.gatewayMiddleware import GetGateway, close_gateway_connections
+from api.routes.cncRoutes import GetSessionId, cncRoutes
+from core.config import GATEWAY_CODEC, REDIS_DB_STORAGE, REDIS_HOST, REDIS_PORT
+from core.schemas.cnc import CncJogCommand
+from core.utilities.gateway.codec import encode
+from core.utilities.gateway.constants import (
+    ALL_QUEUES,
+    GATEWAY_STATE_KEY,
+    GW_STATE_IDLE,
+    LAST_STATUS_KEY,
+)
+from fastapi import APIRouter, FastAPI, HTTPException
+
+from benchmarks.bench_codec import MESSAGES
+
+SESSION_ID = "3f1e5a9c0b7d4e2a8c6f1b0d9e7a5c3b"
+JOG = {
+    "x": 1.0,
+    "y": 0,
+    "z": 0,
+    "feedrate": 500.0,
+    "units": "milimeters",
+    "mode": "distance_incremental",
+}
+
+# The routes before they were ported to AsyncGatewayClient
+legacyRoutes = APIRouter(prefix="/cnc", tags=["CNC"])
+
+
+@legacyRoutes.get("/status")
+def get_cnc_status(gateway: GetGateway):
+    status = gateway.get_last_status()
+    if status is None:
+        return {"running": False}
+    return status
+
+
+@legacyRoutes.post("/jog")
+def send_jog_command(gateway: GetGateway, request: CncJogCommand, x_cnc_session: GetSessionId):
+    if not gateway.is_gateway_running():
+        raise HTTPException(503, detail="CNC Gateway no está disponible")
+    gateway.send_jog(
+        x_cnc_session,
+        request.x,
+        request.y,
+        request.z,
+        request.feedrate,
+        units=request.units,
+        distance_mode=request.mode,
+    )
+    code = grblUtils.build_jog_command(
+        request.x,
+        request.y,
+        request.z,
+        request.feedrate,
+        units=request.units,
+        distance_mode=request.mode,
+    )
+    return {"command": code}
+
+
+def create_app(router: APIRouter) -> FastAPI:
+    app = FastAPI()
+    app.include_router(router)
+    app.dependency_overrides[auth_admin] = lambda: SimpleNamespace(id=1)
+    return app
+
+
+async def load(app: FastAPI, method: str, path: str, requests: int, concurrency: int) -> float:
+    """Returns the requests per second served by *app*."""
+    remaining = iter(range(requests))
+    headers = {"X-CNC-Session": SESSION_ID}
+    kwargs = {"json": JOG} if method == "POST" else {}
+
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://bench"
+    ) as client:
+
+        async def worker() -> None:
+            for _ in remaining:
+                response = await client.request(method, path, headers=headers, **kwargs)
+                response.raise_for_status()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return requests / (time.perf_counter() - start)
+
+
+async def run(args: argparse.Namespace) -> None:
+    apps = {"sync": create_app(legacyRoutes), "async": create_app(cncRoutes)}
+    endpoints = (("GET", "/cnc/status"), ("POST", "/cnc/jog"))
+
+    print(f"{'endpoint':<18}{'routes':<8}{'req/s':>10}")
+    for method, path in endpoints:
+        for name, app in apps.items():
+            # Warm up the connection pools
+            await load(app, method, path, args.concurrency, args.concurrency)
+            rate = await load(app, method, path, args.requests, args.concurrency)
+            print(f"{method + ' ' + path:<18}{name:<8}{rate:>10.0f}")
+
+    await close_gateway_connections()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000, help="Requests to each endpoint")
+    parser.add_argument("--concurrency", type=int, default=50, help="Requests in flight")
+    args = parser.parse_args()
+
+    conn = redis.Redis(host=REDIS_HOST, port=REDIS_PORT, db=REDIS_DB_STORAGE)
+    conn.set(GATEWAY_STATE_KEY, GW_STATE_IDLE)
+    conn.set(LAST_STATUS_KEY, encode(MESSAGES["status keyframe"], GATEWAY_CODEC))
+    try:
+        asyncio.run(run(args))
+    finally:
+        conn.delete(GATEWAY_STATE_KEY, LAST_STATUS_KEY, *ALL_QUEUES)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""Benchmark: JSON against MessagePack for the messages of the CNC Gateway.
+
+Encodes and decodes, with every available codec, the kinds of message the
+Gateway exchanges: a status keyframe, a status delta while moving, a GRBL
+line, a file progress event and a jog command. Reports the mean time to
+encode and decode each message, and its size.
+
+Usage::
+
+    PYTHONPATH=core:$PYTHONPATH python -m benchmarks.bench_codec [--repeat 20000]
+"""
+
+import argparse
+import time
+
+from core.utilities.gateway.codec import available_codecs, decode, encode
+
+STATUS = {
+    "activeState": "Run",
+    "subState": None,
+    "mpos": {"x": 120.512, "y": -43.1, "z": -1.5},
+    "wpos": {"x": 20.512, "y": 56.9, "z": 3.5},
+    "wco": {"x": 100.0, "y": -100.0, "z": -5.0},
+    "feedrate": 1200.0,
+    "spindle": 10000.0,
+    "buffer": {"planner": 15, "rx": 80},
+    "line": 24810,
+    "ov": [100, 100, 100],
+    "pinstate": None,
+    "accessoryState": "S",
+}
+
+MESSAGES = {
+    "status keyframe": {
+        "type": "keyframe",
+        "seq": 4101,
+        "status": STATUS,
+        "parserstate": {
+            "modal": {
+                "motion": "G1",
+                "coordinate_system": "G54",
+                "plane": "G17",
+                "units": "G21",
+                "distance": "G90",
+                "feedrate": "G94",
+                "program": "M0",
+                "spindle": "M3",
+                "coolant": "M9",
+            },
+            "tool": 1,
+            "feedrate": 1200.0,
+            "spindle": 10000.0,
+        },
+        "gateway_state": "file_execution",
+        "session": {
+            "session_id": "3f1e5a9c0b7d4e2a8c6f1b0d9e7a5c3b",
+            "user_id": 1,
+            "client_type": "desktop",
+            "created_at": 1760000000.123,
+        },
+        "file_progress": {"sent_lines": 24830, "processed_lines": 24810, "total_lines": 120000},
+    },
+    "status delta": {
+        "type": "delta",
+        "seq": 4102,
+        "status": {
+            "mpos": {"x": 120.812, "y": -43.1, "z": -1.5},
+            "wpos": {"x": 20.812, "y": 56.9, "z": 3.5},
+            "line": 24811,
+        },
+        "file_progress": {"sent_lines": 24831, "processed_lines": 24811, "total_lines": 120000},
+    },
+    "grbl line": {"type": "received", "message": "ok"},
+    "file progress event": {
+        "type": "file_progress",
+        "task_id": 12,
+        "sent_lines": 24831,
+        "processed_lines": 24811,
+        "total_lines": 120000,
+    },
+    "jog command": {
+        "type": "jog",
+        "payload": {
+            "x": 1.0,
+            "y": 0,
+            "z": 0,
+            "feedrate": 500.0,
+            "units": None,
+            "distance_mode": None,
+            "machine_coordinates": False,
+        },
+        "session_id": "3f1e5a9c0b7d4e2a8c6f1b0d9e7a5c3b",
+        "timestamp": 1760000000.123,
+    },
+}
+
+
+def measure(function, argument, repeat: int) -> float:
+    """Returns the best mean time (in seconds) of a call, out of 5 runs."""
+    best = float("inf")
+    for _ in range(5):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            function(argument)
+        best = min(best, (time.perf_counter() - start) / repeat)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20000, help="Calls of each measure")
+    args = parser.parse_args()
+
+    codecs = available_codecs()
+    print(f"{'message':<22}{'codec':<10}{'encode':>10}{'decode':>10}{'bytes':>8}")
+    for name, message in MESSAGES.items():
+        for codec in codecs:
+            raw = encode(message, codec)
+            assert decode(raw) == message
+            encoding = measure(
+                lambda message, codec=codec: encode(message, codec), message, args.repeat
+            )
+            decoding = measure(decode, raw, args.repeat)
+            print(
+                f"{name:<22}{codec:<10}{encoding * 1e9:>7.0f} ns{decoding * 1e9:>7.0f} ns"
+                f"{len(raw):>8}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+"""Benchmark: command-to-wire latency of the Gateway.
+
+Runs the Gateway main loop against a simulated GRBL, sends commands through
+`GatewayClient` and measures the time until each one is written to the
+serial port. Commands are sent while the machine is idle and while a file
+is being executed in each mode; the p50 and p99 latencies are reported for
+the event loop and for the former ``BLPOP`` polling loop.
+
+Requires a Redis server (``REDIS_HOST``, ``REDIS_PORT`` and
+``REDIS_DB_STORAGE`` from env), its session and queue keys are cleared.
+
+Usage::
+
+    python -m benchmarks.bench_command_latency [--commands 200] [--interval 0.02]
+"""
+
+import argparse
+import logging
+import random
+import statistics
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import redis
+from core.config import REDIS_DB_STORAGE, REDIS_HOST, REDIS_PORT
+from core.utilities.gateway.constants import EXEC_MODES, SESSION_KEY
+from core.utilities.gateway.gatewayClient import GatewayClient
+from gateway.commandProcessor import CommandProcessor
+from gateway.fileExecutor import FileExecutor
+from gateway.main import STATUS_POLL_INTERVAL, run_gateway
+from gateway.redisBatch import RedisBatch
+from gateway.sessionManager import SessionManager
+from gateway.statusPublisher import StatusPublisher
+
+from benchmarks.simulatedGrbl import SimulatedGrbl, start_controller, stop_controller
+
+SCENARIOS = ("idle",) + EXEC_MODES
+LOOPS = ("event", "polling")
+FILE_LINES = 20000
+
+
+class RecordingGrbl(SimulatedGrbl):
+    """Simulated GRBL that records when each line reaches the wire."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.wire_times: dict[str, float] = {}
+
+    def write(self, data: bytes) -> int:
+        now = time.perf_counter()
+        for line in data.split(b"\n"):
+            if line:
+                self.wire_times.setdefault(line.decode(), now)
+        return super().write(data)
+
+
+def run_polling_loop(controller, command_processor, file_executor) -> None:
+    """The Gateway main loop before the event loop: BLPOP with a timeout, then housekeeping."""
+    last_status_poll = time.time()
+    while not command_processor.should_stop:
+        now = time.time()
+        if now - last_status_poll >= STATUS_POLL_INTERVAL:
+            controller.queryStatusReport()
+            last_status_poll = now
+
+        blpop_timeout = 0.1 if file_executor.is_running else None
+        command_processor.process_one(timeout=blpop_timeout)
+        if command_processor.should_stop:
+            break
+        file_executor.tick()
+
+
+def write_program(path: Path, lines: int) -> None:
+    with open(path, "w") as program:
+        program.write("G21 G90\n")
+        for i in range(lines - 1):
+            program.write(f"G1 X{(i % 100) * 0.1:.3f} Y{(i // 100) * 0.1:.3f} F3000\n")
+
+
+def run_scenario(
+    loop: str,
+    scenario: str,
+    program: Path,
+    commands: int,
+    interval: float,
+    redis_conn: redis.Redis,
+) -> list[float]:
+    logger = logging.getLogger("bench")
+    logger.setLevel(logging.WARNING)
+
+    device = RecordingGrbl()
+    controller = start_controller(device, logger)
+
+    # The event loop sends the writes of each iteration together
+    redis_batch = RedisBatch(redis_conn)
+    redis_store = redis_batch if loop == "event" else redis_conn
+    session_manager = SessionManager(redis_conn=redis_store)
+    file_executor = FileExecutor(controller, redis_conn=redis_store)
+    status_publisher = StatusPublisher(
+        controller, session_manager, file_executor, redis_conn=redis_store
+    )
+    command_processor = CommandProcessor(
+        controller, session_manager, file_executor, redis_conn=redis_conn
+    )
+
+    client = GatewayClient(REDIS_HOST, REDIS_PORT, REDIS_DB_STORAGE)
+    client.flush_queues()
+    redis_conn.delete(SESSION_KEY)
+    session_id = client.acquire_session(user_id=1, client_type="benchmark")
+    assert session_id is not None
+
+    if loop == "event":
+        target = run_gateway
+        args = (
+            controller,
+            command_processor,
+            status_publisher,
+            file_executor,
+            session_manager,
+            redis_batch,
+            logger,
+        )
+    else:
+        target = run_polling_loop
+        args = (controller, command_processor, file_executor)
+    gateway_thread = threading.Thread(target=target, args=args, daemon=True)
+    gateway_thread.start()
+
+    if scenario != "idle":
+        client.request_file_execution(session_id, str(program), mode=scenario)
+        while not file_executor.is_running:
+            time.sleep(0.01)
+
+    sent_times: dict[str, float] = {}
+    for i in range(commands):
+        command = f"G4 P0.{i:05d}"
+        sent_times[command] = time.perf_counter()
+        client.send_command(session_id, command)
+        time.sleep(interval * random.uniform(0.5, 1.5))
+
+    # Give the last commands some time to reach the wire
+    deadline = time.monotonic() + 2.0
+    while time.monotonic() < deadline and not set(sent_times) <= set(device.wire_times):
+        time.sleep(0.01)
+
+    client.request_disconnect(session_id)
+    gateway_thread.join(timeout=5)
+    file_executor.stop()
+    client.release_session(session_id)
+    stop_controller(controller, device)
+
+    return [
+        device.wire_times[command] - sent
+        for command, sent in sent_times.items()
+        if command in device.wire_times
+    ]
+
+
+def percentile(samples: list[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--commands", type=int, default=200, help="Commands per scenario")
+    parser.add_argument(
+        "--interval", type=float, default=0.02, help="Mean time between commands (s)"
+    )
+    args = parser.parse_args()
+
+    redis_conn = redis.Redis(host=REDIS_HOST, port=REDIS_PORT, db=REDIS_DB_STORAGE)
+
+    with tempfile.TemporaryDirectory() as folder:
+        program = Path(folder) / "program.gcode"
+        write_program(program, FILE_LINES)
+
+        print(
+            f"{'loop':<10}{'scenario':<12}"
+            f"{'p50 (ms)':>10}{'p99 (ms)':>10}{'mean (ms)':>11}{'lost':>6}"
+        )
+        for loop in LOOPS:
+            for scenario in SCENARIOS:
+                latencies = run_scenario(
+                    loop, scenario, program, args.commands, args.interval, redis_conn
+                )
+                print(
+                    f"{loop:<10}{scenario:<12}"
+                    f"{percentile(latencies, 0.50) * 1000:>10.2f}"
+                    f"{percentile(latencies, 0.99) * 1000:>10.2f}"
+                    f"{statistics.mean(latencies) * 1000:>11.2f}"
+                    f"{args.commands - len(latencies):>6d}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Benchmark: file execution throughput of `FileExecutor` against a simulated GRBL.
+
+Runs the same G-code program (short 0.1 mm segments) with every execution
+mode and reports the achieved lines/s, together with how long the simulated
+planner was starved.
+
+Usage::
+
+    python -m benchmarks.bench_file_streaming [--lines 200] [--block-time 0.002]
+"""
+
+import argparse
+import logging
+import tempfile
+import time
+from pathlib import Path
+
+from core.utilities.gateway.constants import EXEC_MODES
+from gateway.eventLoop import GatewayEventLoop
+from gateway.fileExecutor import FileExecutor
+from gateway.main import FILE_TICK_INTERVAL, STATUS_POLL_INTERVAL
+
+from benchmarks.simulatedGrbl import NullRedis, SimulatedGrbl, start_controller, stop_controller
+
+
+def write_program(path: Path, lines: int) -> None:
+    with open(path, "w") as program:
+        program.write("G21 G90\n")
+        for i in range(lines - 1):
+            program.write(f"G1 X{(i % 100) * 0.1:.3f} Y{(i // 100) * 0.1:.3f} F3000\n")
+
+
+def run_mode(mode: str, program: Path, lines: int, block_time: float) -> dict[str, float]:
+    logger = logging.getLogger("bench")
+    logger.setLevel(logging.WARNING)
+
+    device = SimulatedGrbl(block_time=block_time)
+    controller = start_controller(device, logger)
+
+    executor = FileExecutor(controller, redis_conn=NullRedis())
+    executor.start(str(program), mode=mode)
+
+    # Mimic the gateway event loop while no commands arrive
+    loop = GatewayEventLoop()
+    loop.call_every(STATUS_POLL_INTERVAL, controller.queryStatusReport)
+    loop.call_every(FILE_TICK_INTERVAL, executor.tick)
+    loop.on_wake(executor.tick)
+    controller.add_ack_listener(loop.wake)
+
+    start = time.monotonic()
+    loop.run(lambda: controller.get_commands_count() >= lines)
+    elapsed = time.monotonic() - start
+
+    loop.close()
+    stop_controller(controller, device)
+
+    return {
+        "elapsed": elapsed,
+        "lines_per_second": lines / elapsed,
+        "starved": device.starved_time,
+        "overflows": device.rx_overflows,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=200, help="Lines in the program")
+    parser.add_argument(
+        "--block-time", type=float, default=0.002, help="Execution time of each block (s)"
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        program = Path(folder) / "program.gcode"
+        write_program(program, args.lines)
+
+        print(f"{'mode':<12}{'lines/s':>10}{'elapsed (s)':>14}{'starved (s)':>14}{'overflows':>11}")
+        for mode in EXEC_MODES:
+            result = run_mode(mode, program, args.lines, args.block_time)
+            print(
+                f"{mode:<12}{result['lines_per_second']:>10.1f}{result['elapsed']:>14.2f}"
+                f"{result['starved']:>14.2f}{result['overflows']:>11d}"
+            )
+
+
+if __name__ == "__main__":
+    main()
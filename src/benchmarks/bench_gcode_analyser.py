@@ -0,0 +1,84 @@
+"""Benchmark: single-pass `GcodeAnalyser` against the former seven-pass analysis.
+
+Generates a G-code file (1M lines by default) and analyses it with both
+implementations, reporting the elapsed time of each one.
+
+Usage::
+
+    python -m benchmarks.bench_gcode_analyser [--lines 1000000]
+"""
+
+import argparse
+import random
+import re
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+
+from core.utilities.gcode.gcodeAnalyser import GcodeAnalyser
+
+# Patterns of the former analyser, each one scanning the whole text
+SEVEN_PASS_PATTERNS = {
+    "pause": re.compile(r"^(?:N\d+\s+)?M(0|1|00|01)\s*", re.MULTILINE),
+    "move": re.compile(r"^(?:N\d+\s+)?G(0|1|00|01)\s*", re.MULTILINE),
+    "comment": re.compile(r"(^\(.*\)$)|(^;.*)", re.MULTILINE),
+    "gcode": re.compile(r"^(?!;|\().*(G\d+(?:.\d)?)", re.MULTILINE),
+    "mcode": re.compile(r"^(?!;|\().*(M\d+)", re.MULTILINE),
+    "feedrate": re.compile(r"^(?!;|\().*F(\d+)", re.MULTILINE),
+    "tool": re.compile(r"^(?!;|\().*(T\d+)", re.MULTILINE),
+}
+
+
+def seven_pass_analysis(file_path: Path) -> None:
+    with open(file_path, "r") as gcode:
+        content = gcode.read()
+    len(content.splitlines())
+    for pattern in SEVEN_PASS_PATTERNS.values():
+        Counter(pattern.findall(content))
+
+
+def write_program(path: Path, lines: int) -> None:
+    generator = random.Random(1)
+    with open(path, "w") as program:
+        program.write("G21 G90\nT1 M6\nM3 S10000\n")
+        for i in range(lines - 5):
+            step = i % 200
+            if step == 0:
+                program.write("; next pass\n")
+            elif step == 1:
+                program.write("G0 Z5\n")
+            elif step == 2:
+                program.write("G1 Z-1 F300\n")
+            else:
+                x = generator.uniform(0, 300)
+                y = generator.uniform(0, 300)
+                program.write(f"G1 X{x:.3f} Y{y:.3f} F1200\n")
+        program.write("M5\nM30\n")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=1_000_000, help="Lines in the program")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        program = Path(folder) / "program.gcode"
+        write_program(program, args.lines)
+
+        start = time.perf_counter()
+        seven_pass_analysis(program)
+        seven_pass = time.perf_counter() - start
+
+        start = time.perf_counter()
+        GcodeAnalyser(program).analyse()
+        single_pass = time.perf_counter() - start
+
+    print(f"{'analysis':<14}{'elapsed (s)':>12}")
+    print(f"{'seven-pass':<14}{seven_pass:>12.2f}")
+    print(f"{'single-pass':<14}{single_pass:>12.2f}")
+    print(f"Speedup: {seven_pass / single_pass:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Benchmark: routed `GrblLineParser` against trying every parser in turn.
+
+Parses the GRBL traffic of a session (benchmarks/data/grbl_traffic.txt: the
+handshake, the settings and parameters printouts and a streamed job, with
+a status report every 12 responses) with both strategies, reporting the
+mean time per line of each kind of message and of the whole session.
+
+Usage::
+
+    PYTHONPATH=core:$PYTHONPATH python -m benchmarks.bench_grbl_parser [--repeat 20]
+"""
+
+import argparse
+import time
+from collections import defaultdict
+from pathlib import Path
+
+from core.utilities.grbl.grblLineParser import GrblLineParser
+from core.utilities.grbl.parsers.grblParserMsgAlarm import GrblParserMsgAlarm
+from core.utilities.grbl.parsers.grblParserMsgEcho import GrblParserMsgEcho
+from core.utilities.grbl.parsers.grblParserMsgFeedback import GrblParserMsgFeedback
+from core.utilities.grbl.parsers.grblParserMsgHelp import GrblParserMsgHelp
+from core.utilities.grbl.parsers.grblParserMsgOptions import GrblParserMsgOptions
+from core.utilities.grbl.parsers.grblParserMsgParameters import GrblParserMsgParameters
+from core.utilities.grbl.parsers.grblParserMsgParserState import GrblParserMsgParserState
+from core.utilities.grbl.parsers.grblParserMsgSettings import GrblParserMsgSettings
+from core.utilities.grbl.parsers.grblParserMsgStartup import GrblParserMsgStartup
+from core.utilities.grbl.parsers.grblParserMsgStatus import GrblParserMsgStatus
+from core.utilities.grbl.parsers.grblParserMsgUserDefinedStartup import (
+    GrblParserMsgUserDefinedStartup,
+)
+from core.utilities.grbl.parsers.grblParserMsgVersion import GrblParserMsgVersion
+from core.utilities.grbl.parsers.grblParserResultError import GrblParserResultError
+from core.utilities.grbl.parsers.grblParserResultOk import GrblParserResultOk
+
+TRAFFIC_PATH = Path(__file__).parent / "data" / "grbl_traffic.txt"
+
+# Order of the former parser, which tried them all until one matched
+SEQUENTIAL_PARSERS = [
+    GrblParserMsgStatus,
+    GrblParserResultOk,
+    GrblParserResultError,
+    GrblParserMsgAlarm,
+    GrblParserMsgParserState,
+    GrblParserMsgParameters,
+    GrblParserMsgHelp,
+    GrblParserMsgVersion,
+    GrblParserMsgOptions,
+    GrblParserMsgEcho,
+    GrblParserMsgFeedback,
+    GrblParserMsgUserDefinedStartup,
+    GrblParserMsgSettings,
+    GrblParserMsgStartup,
+]
+
+
+def sequential_parse(line: str):
+    for parser in SEQUENTIAL_PARSERS:
+        result = parser.parse(line)
+        if result:
+            result[1].update({"raw": line})
+            return result
+    return None, {"raw": line}
+
+
+STRATEGIES = {
+    "sequential": sequential_parse,
+    "routed": GrblLineParser.parse,
+}
+
+
+def measure(parse, lines: list[str], repeat: int) -> float:
+    """Returns the mean time (in seconds) to parse the lines."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for line in lines:
+            parse(line)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20, help="Runs of each measure")
+    args = parser.parse_args()
+
+    lines = TRAFFIC_PATH.read_text().splitlines()
+    kinds: dict[str, list[str]] = defaultdict(list)
+    for line in lines:
+        assert sequential_parse(line) == GrblLineParser.parse(line), line
+        kinds[str(GrblLineParser.parse(line)[0])].append(line)
+    print(f"Lines: {len(lines)}")
+
+    print(f"{'message':<28}{'lines':>7}" + "".join(f"{name:>14}" for name in STRATEGIES))
+    for kind, kind_lines in sorted(kinds.items(), key=lambda item: -len(item[1])):
+        times = [measure(parse, kind_lines, args.repeat) for parse in STRATEGIES.values()]
+        columns = "".join(f"{elapsed / len(kind_lines) * 1e9:>11.0f} ns" for elapsed in times)
+        print(f"{kind:<28}{len(kind_lines):>7}{columns}")
+
+    times = [measure(parse, lines, args.repeat) for parse in STRATEGIES.values()]
+    columns = "".join(f"{elapsed / len(lines) * 1e9:>11.0f} ns" for elapsed in times)
+    print(f"{'session':<28}{len(lines):>7}{columns}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Benchmark: time and peak memory when reading big G-code files.
+
+Generates a synthetic G-code file of the requested size and runs each
+reader over it in a fresh process, reporting the elapsed time and the peak
+RSS of that process. The ``baseline`` row is a process that only imports
+the modules, so the difference is what the reader itself needs.
+
+Usage::
+
+    python -m benchmarks.bench_large_files [--megabytes 100]
+"""
+
+import argparse
+import multiprocessing
+import resource
+import tempfile
+import time
+from pathlib import Path
+
+from core.utilities.files import LineReader, streamJsonContent
+from core.utilities.gcode.gcodeAnalyser import GcodeAnalyser
+from core.utilities.gcode.gcodeProgram import compile_program
+
+
+def write_program(path: Path, megabytes: int) -> int:
+    target = megabytes * 1024 * 1024
+    lines = 0
+    with open(path, "w") as program:
+        program.write("G21 G90\n")
+        while program.tell() < target:
+            for i in range(1000):
+                if i % 100 == 0:
+                    program.write("; surfacing pass\n")
+                program.write(f"G1 X{i * 0.1:.3f} Y{lines * 0.001:.3f} F1200\n")
+            lines += 1000
+    return lines
+
+
+def _baseline(path: Path) -> None:
+    pass
+
+
+def _analyse(path: Path) -> None:
+    GcodeAnalyser(path).analyse()
+
+
+def _compile(path: Path) -> None:
+    compile_program(path)
+
+
+def _stream_json(path: Path) -> None:
+    for _ in streamJsonContent(LineReader(path)):
+        pass
+
+
+TASKS = {
+    "baseline": _baseline,
+    "analyse": _analyse,
+    "compile": _compile,
+    "stream_json": _stream_json,
+}
+
+
+def _run_task(name: str, path: Path, results: multiprocessing.Queue) -> None:
+    start = time.perf_counter()
+    TASKS[name](path)
+    elapsed = time.perf_counter() - start
+    # ru_maxrss is reported in KiB on Linux
+    results.put((elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--megabytes", type=int, default=100, help="Size of the G-code file")
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context("spawn")
+
+    with tempfile.TemporaryDirectory() as folder:
+        program = Path(folder) / "program.gcode"
+        write_program(program, args.megabytes)
+        print(f"File: {args.megabytes} MiB")
+
+        print(f"{'task':<14}{'elapsed (s)':>12}{'peak RSS (MiB)':>16}")
+        for name in TASKS:
+            results = context.Queue()
+            process = context.Process(target=_run_task, args=(name, program, results))
+            process.start()
+            elapsed, peak_rss = results.get()
+            process.join()
+            print(f"{name:<14}{elapsed:>12.2f}{peak_rss:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Benchmark: time from requesting an override to writing it, while streaming.
+
+Streams a program to a simulated GRBL with the RX buffer kept full, and
+requests a feed override every few milliseconds meanwhile. Reports the
+median time from `GrblController.grbl_override` to the serial write, and
+how many lines ran meanwhile: the overrides don't wait for the program.
+
+Usage::
+
+    python -m benchmarks.bench_override_latency [--lines 5000] [--overrides 100]
+"""
+
+import argparse
+import logging
+import time
+
+from core.utilities.grbl.constants import GrblRealtimeCommand
+
+from benchmarks.simulatedGrbl import SimulatedGrbl, start_controller, stop_controller
+
+# The feed override goes up and down, to stay within its limits
+COMMANDS = (GrblRealtimeCommand.FEED_OVR_FINE_PLUS, GrblRealtimeCommand.FEED_OVR_FINE_MINUS)
+
+
+def run(lines: int, overrides: int, interval: float, block_time: float) -> dict[str, float]:
+    logger = logging.getLogger("bench")
+    logger.setLevel(logging.WARNING)
+
+    device = SimulatedGrbl(block_time=block_time)
+    controller = start_controller(device, logger)
+    for i in range(lines):
+        controller.send_program_command(f"G1 X{(i % 100) * 0.1:.3f} F3000")
+
+    for i in range(overrides):
+        controller.grbl_override(COMMANDS[i % 2])
+        time.sleep(interval)
+    latency = controller.get_override_latency() or 0.0
+    commands_count = controller.get_commands_count()
+    feed_override = device.emulator.overrides[0]
+
+    stop_controller(controller, device)
+
+    return {
+        "p50_ms": latency * 1000,
+        "commands_count": commands_count,
+        "feed_override": feed_override,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=5000, help="Lines of the program")
+    parser.add_argument("--overrides", type=int, default=100, help="Overrides to request")
+    parser.add_argument("--interval", type=float, default=0.005, help="Seconds between them")
+    parser.add_argument("--block-time", type=float, default=0.001, help="Seconds per block")
+    args = parser.parse_args()
+
+    result = run(args.lines, args.overrides, args.interval, args.block_time)
+    print(
+        f"override to wire: p50 {result['p50_ms']:.3f} ms "
+        f"({result['commands_count']} of {args.lines} lines done meanwhile, "
+        f"feed override {result['feed_override']}% at the end)"
+    )
+
+
+if __name__ == "__main__":
+    main()
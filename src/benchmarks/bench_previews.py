@@ -0,0 +1,59 @@
+"""Benchmark: level-of-detail pyramid of the toolpath previews.
+
+Generates a G-code file (1M lines by default), builds the pyramid of its
+toolpath and renders every level, reporting the time to build and store
+the pyramid, the points kept at each level and the time to draw it. The
+rendering time of a level does not depend on the size of the file.
+
+Usage::
+
+    PYTHONPATH=core:worker:$PYTHONPATH python -m benchmarks.bench_previews [--lines 1000000]
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from worker.utils.gcodeLod import build_levels, save_levels
+from worker.utils.gcodeParser import GcodeParser
+from worker.utils.gcodeRaster import GcodeRasterRenderer
+
+from benchmarks.bench_thumbnails import write_program
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=1_000_000, help="Lines of the G-code file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        source = Path(folder) / "program.gcode"
+        write_program(source, args.lines)
+
+        model = GcodeParser().parseFile(str(source))
+        print(f"Lines: {args.lines}, moves: {len(model)}")
+
+        start = time.perf_counter()
+        levels = build_levels(model)
+        built = time.perf_counter() - start
+        paths = save_levels(levels, model, "benchmark", Path(folder) / "previews")
+        saved = time.perf_counter() - start - built
+        print(f"Pyramid built in {built:.2f} s, stored in {saved:.2f} s")
+
+        renderer = GcodeRasterRenderer()
+        start = time.perf_counter()
+        renderer.render(model.toolpath())
+        print(f"Full toolpath rendered in {time.perf_counter() - start:.3f} s")
+
+        print(f"{'size':>6}{'points':>10}{'JSON (KiB)':>12}{'render (s)':>12}")
+        for level, path in zip(levels, paths, strict=True):
+            start = time.perf_counter()
+            renderer.render(level.toolpath())
+            elapsed = time.perf_counter() - start
+            size = path.stat().st_size / 1024
+            print(f"{level.size:>6}{len(level.points):>10}{size:>12.1f}{elapsed:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Benchmark: RX buffer accounting of `GrblController.serial_io` at full streaming rate.
+
+Keeps the RX buffer full of commands and, for every iteration, accounts
+the 'ok' of the oldest command and sends a new one, which is what
+serial_io does while streaming a file. Compares the former lists (summed
+for every check, drained from their front) against `RxBufferTracker`,
+for short and long commands and for the 128 bytes RX buffer of GRBL and
+the bigger ones of other firmwares.
+
+Usage::
+
+    PYTHONPATH=core:$PYTHONPATH python -m benchmarks.bench_rx_buffer [--iterations 100000]
+"""
+
+import argparse
+import time
+
+from core.utilities.grbl.rxBufferTracker import RxBufferTracker
+
+COMMANDS = {
+    "short": "G1X1",
+    "typical": "G1 X12.345 Y67.890 F3000",
+}
+RX_BUFFER_SIZES = [128, 1024]
+
+
+def run_lists(command: str, size: int, iterations: int) -> float:
+    """Accounting of the former serial_io, returns the elapsed time."""
+    cline: list[int] = []
+    sline: list[str] = []
+    sumcline = 0
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        # Fetch and account the next command
+        sline.append(command)
+        cline.append(len(command) + 1)
+        # Send it if it fits, otherwise wait for an 'ok'
+        while sum(cline) >= size:
+            del cline[0]
+            sline.pop(0)
+            sumcline = sum(cline)
+        sumcline = sum(cline)
+    elapsed = time.perf_counter() - start
+    assert sumcline <= size
+    return elapsed
+
+
+def run_tracker(command: str, size: int, iterations: int) -> float:
+    """Accounting with `RxBufferTracker`, returns the elapsed time."""
+    tracker = RxBufferTracker(size)
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        # Send the next command if it fits, otherwise wait for an 'ok'
+        while not tracker.fits(command):
+            tracker.pop()
+        tracker.push(command)
+    elapsed = time.perf_counter() - start
+    assert tracker.used_bytes <= size
+    return elapsed
+
+
+STRATEGIES = {
+    "lists": run_lists,
+    "tracker": run_tracker,
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=100_000, help="Commands sent")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs of each measure")
+    args = parser.parse_args()
+
+    print(
+        f"{'command':<10}{'rx buffer':>10}{'in flight':>11}"
+        + "".join(f"{name:>14}" for name in STRATEGIES)
+    )
+    for name, command in COMMANDS.items():
+        for size in RX_BUFFER_SIZES:
+            in_flight = (size - 1) // (len(command) + 1)
+            columns = ""
+            for run in STRATEGIES.values():
+                best = min(run(command, size, args.iterations) for _ in range(args.repeat))
+                columns += f"{best / args.iterations * 1e9:>11.0f} ns"
+            print(f"{name:<10}{size:>10}{in_flight:>11}{columns}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Benchmark: serial reads of `GrblController.serial_io` against a simulated GRBL.
+
+Compares waiting on the file descriptor of the port with select ("select")
+against the former reads with the port timeout ("polling", the path kept
+for the ports without a file descriptor). For each one it reports how many
+times serial_io wakes up per second while idle, the throughput streaming a
+program, and the median time from an 'ok' freeing room in the RX buffer
+to sending the next command.
+
+Usage::
+
+    python -m benchmarks.bench_serial_io [--lines 2000] [--block-time 0.001] [--idle 2]
+"""
+
+import argparse
+import logging
+import time
+
+from benchmarks.simulatedGrbl import SimulatedGrbl, start_controller, stop_controller
+
+MODES = {
+    "polling": False,
+    "select": True,
+}
+
+
+def run_mode(selectable: bool, lines: int, block_time: float, idle: float) -> dict[str, float]:
+    logger = logging.getLogger("bench")
+    logger.setLevel(logging.WARNING)
+
+    device = SimulatedGrbl(block_time=block_time, selectable=selectable)
+    controller = start_controller(device, logger)
+
+    # Count the reads of serial_io
+    reads = 0
+    read_line = controller.serial.readLine
+
+    def counting_read_line(*args, **kwargs):
+        nonlocal reads
+        reads += 1
+        return read_line(*args, **kwargs)
+
+    controller.serial.readLine = counting_read_line
+
+    # Idle
+    time.sleep(idle)
+    idle_reads = reads
+
+    # Streaming
+    start = time.monotonic()
+    for i in range(lines):
+        controller.send_program_command(f"G1 X{(i % 100) * 0.1:.3f} Y{(i // 100) * 0.1:.3f} F3000")
+    while controller.get_commands_count() < lines:
+        time.sleep(0.001)
+    elapsed = time.monotonic() - start
+    latency = controller.get_ok_to_send_latency()
+
+    stop_controller(controller, device)
+
+    return {
+        "idle_reads_per_second": idle_reads / idle,
+        "lines_per_second": lines / elapsed,
+        "ok_to_send": latency if latency is not None else float("nan"),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=2000, help="Lines of the program")
+    parser.add_argument("--block-time", type=float, default=0.001, help="Seconds per block")
+    parser.add_argument("--idle", type=float, default=2.0, help="Seconds idle")
+    args = parser.parse_args()
+
+    print(f"{'mode':<10}{'idle reads/s':>14}{'lines/s':>10}{'ok to send (p50)':>19}")
+    for mode, selectable in MODES.items():
+        result = run_mode(selectable, args.lines, args.block_time, args.idle)
+        print(
+            f"{mode:<10}{result['idle_reads_per_second']:>14.1f}"
+            f"{result['lines_per_second']:>10.0f}{result['ok_to_send'] * 1e6:>16.0f} us"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Benchmark: serial writes of `GrblController.serial_io` streaming to a simulated GRBL.
+
+Compares one write per G-code line ("line") against draining every queued
+line that fits in the free RX buffer into a single write ("coalesced"),
+for short and typical lines. For each one it reports the writes and the
+lines sent per second, and the lines per write.
+
+Usage::
+
+    python -m benchmarks.bench_serial_writes [--lines 5000] [--block-time 0.0002]
+"""
+
+import argparse
+import logging
+import time
+
+from benchmarks.simulatedGrbl import SimulatedGrbl, start_controller, stop_controller
+
+MODES = {
+    "line": False,
+    "coalesced": True,
+}
+PROGRAMS = {
+    "short": lambda i: f"X{i % 10}",
+    "typical": lambda i: f"G1 X{(i % 100) * 0.1:.3f} Y{(i // 100) * 0.1:.3f} F3000",
+}
+
+
+def run_mode(coalesce: bool, line, lines: int, block_time: float) -> dict[str, float]:
+    logger = logging.getLogger("bench")
+    logger.setLevel(logging.WARNING)
+
+    device = SimulatedGrbl(block_time=block_time)
+    controller = start_controller(device, logger)
+    controller.coalesce_writes = coalesce
+    controller.take_write_stats()
+
+    for i in range(lines):
+        controller.send_program_command(line(i))
+    while controller.get_commands_count() < lines:
+        time.sleep(0.001)
+    stats = controller.take_write_stats()
+
+    stop_controller(controller, device)
+
+    return {
+        "writes_per_second": stats.writes_per_second,
+        "lines_per_second": stats.lines_per_second,
+        "lines_per_write": stats.lines / stats.writes,
+        "overflows": device.rx_overflows,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=5000, help="Lines of the program")
+    parser.add_argument("--block-time", type=float, default=0.0002, help="Seconds per block")
+    args = parser.parse_args()
+
+    print(
+        f"{'program':<10}{'mode':<11}{'writes/s':>10}{'lines/s':>10}"
+        f"{'lines/write':>13}{'overflows':>11}"
+    )
+    for program, line in PROGRAMS.items():
+        for mode, coalesce in MODES.items():
+            result = run_mode(coalesce, line, args.lines, args.block_time)
+            print(
+                f"{program:<10}{mode:<11}{result['writes_per_second']:>10.0f}"
+                f"{result['lines_per_second']:>10.0f}{result['lines_per_write']:>13.2f}"
+                f"{result['overflows']:>11}"
+            )
+
+
+if __name__ == "__main__":
+    main()
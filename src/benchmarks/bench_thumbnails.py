@@ -0,0 +1,97 @@
+"""Benchmark: thumbnail rendering, raster renderer against the Mayavi one.
+
+Generates a G-code file (200k lines by default) and renders its thumbnail
+with each renderer in a fresh process, reporting the elapsed time and the
+peak RSS of that process. The Mayavi renderer is skipped when Mayavi (or
+its virtual display) is not installed.
+
+Usage::
+
+    PYTHONPATH=worker:$PYTHONPATH python -m benchmarks.bench_thumbnails [--lines 200000]
+"""
+
+import argparse
+import math
+import multiprocessing
+import resource
+import tempfile
+import time
+from pathlib import Path
+
+
+def write_program(path: Path, lines: int) -> None:
+    with open(path, "w") as program:
+        program.write("G21 G90\nG0 Z5\n")
+        for i in range(lines):
+            if i % 500 == 0:
+                program.write("G0 Z5\n")
+            elif i % 500 == 1:
+                program.write(f"G1 Z{-(i // 500) % 10 * 0.2:.3f} F300\n")
+            else:
+                angle = i * 0.013
+                radius = 20 + 15 * math.sin(i * 0.0007)
+                program.write(
+                    f"G1 X{50 + radius * math.cos(angle):.3f} "
+                    f"Y{50 + radius * math.sin(angle):.3f} F1200\n"
+                )
+
+
+def _raster(source: Path, output: Path) -> None:
+    from worker.utils.gcodeRaster import GcodeRasterRenderer
+
+    GcodeRasterRenderer().run(str(source), str(output), moves=False)
+
+
+def _mayavi(source: Path, output: Path) -> None:
+    from worker.utils.gcode2png import GcodeRenderer
+
+    GcodeRenderer().run(str(source), str(output), moves=False)
+
+
+RENDERERS = {
+    "raster": _raster,
+    "mayavi": _mayavi,
+}
+
+
+def _run_renderer(name: str, source: Path, output: Path, results: multiprocessing.Queue) -> None:
+    start = time.perf_counter()
+    try:
+        RENDERERS[name](source, output)
+    except ImportError as error:
+        results.put(f"skipped ({error})")
+        return
+    elapsed = time.perf_counter() - start
+    # ru_maxrss is reported in KiB on Linux
+    results.put((elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=200_000, help="Lines of the G-code file")
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context("spawn")
+
+    with tempfile.TemporaryDirectory() as folder:
+        source = Path(folder) / "program.gcode"
+        write_program(source, args.lines)
+        print(f"Lines: {args.lines}")
+
+        print(f"{'renderer':<10}{'elapsed (s)':>12}{'peak RSS (MiB)':>16}")
+        for name in RENDERERS:
+            results = context.Queue()
+            output = Path(folder) / f"{name}.png"
+            process = context.Process(target=_run_renderer, args=(name, source, output, results))
+            process.start()
+            result = results.get()
+            process.join()
+            if isinstance(result, str):
+                print(f"{name:<10}{result:>28}")
+            else:
+                elapsed, peak_rss = result
+                print(f"{name:<10}{elapsed:>12.2f}{peak_rss:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Benchmark: machining time estimation of big G-code files.
+
+Generates a G-code file (1M lines by default) of short moves, with feedrate
+and direction changes, then parses it and estimates its machining time,
+reporting the elapsed time of each step.
+
+Usage::
+
+    PYTHONPATH=worker:$PYTHONPATH python -m benchmarks.bench_time_estimator [--lines 1000000]
+"""
+
+import argparse
+import math
+import tempfile
+import time
+from pathlib import Path
+
+from worker.utils.gcodeEstimator import MachineLimits, estimate_time
+from worker.utils.gcodeParser import GcodeParser
+
+
+def write_program(path: Path, lines: int) -> None:
+    with open(path, "w") as program:
+        program.write("G21 G90\nT1\nG0 Z5\n")
+        for i in range(lines - 3):
+            if i % 1000 == 0:
+                program.write("G0 Z5\n")
+            elif i % 1000 == 1:
+                program.write("G1 Z-1 F300\n")
+            else:
+                angle = i * 0.01
+                feed = 600 + 600 * (i // 1000 % 3)
+                program.write(
+                    f"G1 X{50 + 40 * math.cos(angle):.3f} Y{50 + 40 * math.sin(angle):.3f} "
+                    f"F{feed}\n"
+                )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=1_000_000, help="Lines of the G-code file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        program = Path(folder) / "program.gcode"
+        write_program(program, args.lines)
+
+        start = time.perf_counter()
+        model = GcodeParser().parseFile(str(program))
+        parsed = time.perf_counter()
+        estimate = estimate_time(model, MachineLimits.from_grbl_settings(None))
+        estimated = time.perf_counter()
+
+    print(f"Lines: {args.lines}, moves: {len(model)}")
+    print(f"parse:    {parsed - start:.2f} s")
+    print(f"estimate: {estimated - parsed:.2f} s")
+    print(f"total:    {estimated - start:.2f} s")
+    print(f"Estimated machining time: {estimate.total_time / 3600:.2f} h")
+
+
+if __name__ == "__main__":
+    main()
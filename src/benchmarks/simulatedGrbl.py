@@ -0,0 +1,76 @@
+"""Simulated GRBL device for benchmarks.
+
+``SimulatedGrbl`` is an open `EmulatorTransport`, whose `GrblEmulator`
+executes every block in ``block_time`` seconds, so it can replace the real
+port with::
+
+    controller.serial.interface = SimulatedGrbl()
+
+`start_controller` wires a `GrblController` to it and starts its
+``serial_io`` thread, skipping the connection handshake.
+
+Its responses are signalled through a pipe, so `SerialService` waits on its
+file descriptor like on a real port. With ``selectable=False`` it has none
+and is read with ``readline``, like the ports select can't wait on.
+"""
+
+import logging
+import threading
+
+from core.utilities.grbl.grblController import GrblController
+from core.utilities.grbl.grblStatus import GrblStatusFlag
+from core.utilities.serial.grblEmulator import GrblEmulator
+from core.utilities.serial.transports import EmulatorTransport
+
+
+class SimulatedGrbl(EmulatorTransport):
+    def __init__(self, block_time: float = 0.002, timeout: float = 0.10, selectable: bool = True):
+        super().__init__(
+            GrblEmulator(block_time=block_time), timeout=timeout, selectable=selectable
+        )
+        self.open()
+
+    # Statistics
+
+    @property
+    def executed_blocks(self) -> int:
+        return self.emulator.executed_blocks
+
+    @property
+    def rx_overflows(self) -> int:
+        """Bytes lost, received with a full RX buffer."""
+        return self.emulator.overflows
+
+    @property
+    def starved_time(self) -> float:
+        """Seconds with an empty planner between two blocks."""
+        return self.emulator.starved_time
+
+
+class NullRedis:
+    """Discards every publish, so the controller doesn't need a Redis server."""
+
+    def publish(self, channel, message):
+        return 0
+
+
+def start_controller(device: SimulatedGrbl, logger: logging.Logger) -> GrblController:
+    """Return a controller connected to *device*, with its ``serial_io`` thread running."""
+    controller = GrblController(logger)
+    controller.grbl_monitor.redis = NullRedis()
+    controller.serial.interface = device
+    # Skip the startup message
+    controller.serial.readLineUntilMessage()
+    controller.grbl_status.set_flag(GrblStatusFlag.CONNECTED.value, True)
+    controller.serial_thread = threading.Thread(target=controller.serial_io, daemon=True)
+    controller.serial_thread.start()
+    return controller
+
+
+def stop_controller(controller: GrblController, device: SimulatedGrbl) -> None:
+    thread = controller.serial_thread
+    controller.serial_thread = None
+    controller.serial.wake()
+    if thread is not None:
+        thread.join(timeout=1)
+    device.close()
@@ -29,6 +29,9 @@ class Settings(BaseSettings):
     redis_db_celery: int = 0
     redis_db_storage: int = 1
 
+    # CNC Gateway messages encoding: "json" or "msgpack"
+    gateway_codec: str = "json"
+
     # GRBL
     grbl_simulation: bool = False
 
@@ -84,6 +87,8 @@ REDIS_PORT = settings.redis_port
 REDIS_DB_CELERY = settings.redis_db_celery
 REDIS_DB_STORAGE = settings.redis_db_storage
 
+GATEWAY_CODEC = settings.gateway_codec
+
 GRBL_SIMULATION = settings.grbl_simulation
 
 SERIAL_PORT = settings.serial_port
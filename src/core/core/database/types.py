@@ -1,6 +1,6 @@
 from typing import Literal
 
-from typing_extensions import TypedDict
+from typing_extensions import NotRequired, TypedDict
 
 StatusType = Literal[
     "pending_approval", "on_hold", "in_progress", "finished", "failed", "cancelled"
@@ -19,5 +19,9 @@ FileReport = TypedDict(
         "max_feedrate": int,
         "commands_usage": dict[str, int],
         "unsupported_commands": list[str],
+        # Machining time estimation (seconds), missing in older reports
+        "estimated_time": NotRequired[float],
+        "tool_times": NotRequired[dict[str, float]],
+        "eta_index": NotRequired[list[tuple[int, float]]],
     },
 )
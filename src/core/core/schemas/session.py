@@ -27,7 +27,7 @@ class SessionRenewResponse(BaseModel):
 class RealtimeRequest(BaseModel):
     """Body for POST /cnc/realtime."""
 
-    action: str  # pause | resume | stop | soft_reset
+    action: str  # pause | resume | stop | soft_reset | an override, see OVERRIDE_ACTIONS
 
 
 class GatewayStateResponse(BaseModel):
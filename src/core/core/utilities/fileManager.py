@@ -6,7 +6,12 @@ from sqlalchemy.orm import Session
 
 from core.database.models import File
 from core.database.repositories.fileRepository import FileRepository
-from core.utilities.files import FileSystemHelper, computeSHA256, computeSHA256FromFile
+from core.utilities.files import (
+    FileSystemHelper,
+    LineReader,
+    computeSHA256,
+    computeSHA256FromFile,
+)
 
 
 class FileManager:
@@ -34,6 +39,20 @@ class FileManager:
         files_helper = FileSystemHelper(self.base_path)
         return files_helper.read_file(file.user_id, file.file_name)
 
+    def open_file_lines(self, file_id: int) -> LineReader:
+        """Opens a file in the FS for reading line by line, see `LineReader`.
+
+        Raises:
+        - DatabaseError: Error from ORM.
+        - EntityNotFoundError: The file was not found in the DB.
+        - FileSystemError: An error ocurred while opening the file.
+        """
+        repository = FileRepository(self.session)
+        file = repository.get_file_by_id(file_id)
+
+        files_helper = FileSystemHelper(self.base_path)
+        return files_helper.open_lines(file.user_id, file.file_name)
+
     def upload_file(self, user_id: int, file_name: str, file: BinaryIO) -> File:
         """Creates a file in the FS from an upload and saves it to the DB.
         If either FS or DB raises an error, it rollbacks the whole operation.
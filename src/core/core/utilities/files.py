@@ -1,8 +1,10 @@
 import hashlib
+import json
+import mmap
 import shutil
 from contextlib import suppress
 from pathlib import Path
-from typing import BinaryIO
+from typing import BinaryIO, Iterator, Optional
 
 ALLOWED_FILE_EXTENSIONS = {"txt", "gcode", "nc"}
 
@@ -62,6 +64,158 @@ def computeSHA256(filePath: str) -> str:
     return hash_sha256.hexdigest()
 
 
+class LineReader:
+    """Memory-mapped, zero-copy line reader.
+
+    Lines are yielded as ``memoryview`` slices of the mapped file, without
+    their line terminator (``\n`` or ``\r\n``), together with their offset
+    in the file. Nothing is copied: the OS pages the file in and out as
+    needed, so memory usage doesn't depend on the size of the file.
+
+    The slices are only valid until the reader is closed, consumers must
+    copy (``bytes(line)``) or decode whatever they need to keep.
+
+    Usage::
+
+        with LineReader(path) as reader:
+            for offset, line in reader:
+                ...
+    """
+
+    # Amount of bytes read before releasing them from memory
+    RELEASE_WINDOW = 16 * 1024 * 1024
+
+    def __init__(self, file_path: str | Path):
+        self.file_path = file_path
+        self._file = open(file_path, "rb")
+        self._map: Optional[mmap.mmap] = None
+        self._view = memoryview(b"")
+
+        # Empty files can't be mapped
+        self.size = Path(file_path).stat().st_size
+        if self.size:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._view = memoryview(self._map)
+            if hasattr(mmap, "MADV_SEQUENTIAL"):
+                self._map.madvise(mmap.MADV_SEQUENTIAL)
+
+    def __enter__(self) -> "LineReader":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __iter__(self) -> Iterator[tuple[int, memoryview]]:
+        if self._map is None:
+            return
+
+        view = self._view
+        find = self._map.find
+        size = self.size
+        start = 0
+        released = 0
+        while start < size:
+            end = find(b"\n", start)
+            if end < 0:
+                end = size
+            stop = end - 1 if end > start and view[end - 1] == 0x0D else end
+            yield start, view[start:stop]
+            start = end + 1
+
+            # Drop the pages already read from the resident set. They are
+            # backed by the file, so reading them again just faults them in.
+            if start - released >= self.RELEASE_WINDOW:
+                released = self._release_pages(released, start)
+
+    def lines(self) -> Iterator[memoryview]:
+        """Iterate over the lines of the file, without their offsets."""
+        for _, line in self:
+            yield line
+
+    def blocks(self, size: int = 1024 * 1024) -> Iterator[memoryview]:
+        """Iterate over the file in blocks of about *size* bytes.
+
+        Blocks always end on a line boundary (line terminators included),
+        so they can be scanned as a whole, for example by a regex.
+        """
+        if self._map is None:
+            return
+
+        find = self._map.find
+        start = 0
+        released = 0
+        while start < self.size:
+            end = start + size
+            if end < self.size:
+                newline = find(b"\n", end - 1)
+                end = newline + 1 if newline >= 0 else self.size
+            else:
+                end = self.size
+            yield self._view[start:end]
+            start = end
+
+            if start - released >= self.RELEASE_WINDOW:
+                released = self._release_pages(released, start)
+
+    def _release_pages(self, start: int, end: int) -> int:
+        """Release the whole pages in [start, end), returns where the next release starts."""
+        end -= end % mmap.PAGESIZE
+        if self._map is not None and hasattr(mmap, "MADV_DONTNEED") and end > start:
+            self._map.madvise(mmap.MADV_DONTNEED, start, end - start)
+        return end
+
+    @property
+    def ends_with_newline(self) -> bool:
+        return self.size > 0 and self._view[-1] == 0x0A
+
+    def close(self) -> None:
+        self._view.release()
+        if self._map is not None:
+            try:
+                self._map.close()
+            except BufferError:
+                # Some slices are still referenced, the mapping is released
+                # together with the last of them
+                pass
+            self._map = None
+        self._file.close()
+
+
+def streamJsonContent(reader: LineReader, key: str = "content") -> Iterator[bytes]:
+    """
+    - Name: streamJsonContent
+    - Parameter(s):
+        - reader: line reader of the file to stream
+        - key: name of the JSON field holding the content
+    - Description:
+        Generates the JSON document {key: <content of the file>} in chunks,
+        without loading the whole file in memory. Closes the reader when done.
+    """
+    chunk_size = 64 * 1024
+    try:
+        yield b"{" + json.dumps(key).encode() + b': "'
+
+        chunk: list[str] = []
+        length = 0
+        # The newline of the last line sent, unknown until the next one is read
+        separator = ""
+        for _, line in reader:
+            chunk.append(str(line, "utf-8", "replace"))
+            length += len(line) + 1
+            if length >= chunk_size:
+                yield json.dumps(separator + "\n".join(chunk))[1:-1].encode()
+                separator, chunk, length = "\n", [], 0
+
+        if chunk or separator:
+            tail = separator + "\n".join(chunk) if chunk else ""
+            tail += "\n" if reader.ends_with_newline else ""
+            yield json.dumps(tail)[1:-1].encode()
+
+        yield b'"}'
+    finally:
+        reader.close()
+
+
 def getFilesInFolder(folderPath: str) -> list[str]:
     desktop = Path(folderPath)
     return [item.name for item in desktop.iterdir()]
@@ -191,3 +345,12 @@ class FileSystemHelper:
                 return content.read()
         except Exception as error:
             raise FileSystemError(f"There was an error reading the file: {error}") from error
+
+    def open_lines(self, user_id: int, filename: str) -> LineReader:
+        """Opens a file in the file system for reading line by line, see `LineReader`."""
+
+        file_path = self.get_file_path(user_id, filename)
+        try:
+            return LineReader(file_path)
+        except Exception as error:
+            raise FileSystemError(f"There was an error reading the file: {error}") from error
@@ -0,0 +1,113 @@
+"""Wire format of the messages exchanged with the CNC Gateway.
+
+Commands in the priority queues, events, status updates and GRBL messages
+in the PubSub channels are encoded with one of these codecs:
+
+* ``json``: plain JSON text, the original format. Its messages carry no tag,
+  so they are still readable by any consumer (and by a person in redis-cli).
+* ``msgpack``: MessagePack, smaller and much cheaper to encode and decode.
+  Only available if the ``msgpack`` package is installed.
+
+Binary messages start with a tag: the byte ``0xC1`` (never used by
+MessagePack, and invalid as the first byte of a JSON text) followed by the
+version of the format. Decoding looks at the tag, so every consumer reads
+messages of any codec it supports, whichever codec the producer chose.
+
+The codec of a deployment is chosen with the ``GATEWAY_CODEC`` setting. The
+Gateway advertises the codecs it accepts in ``GATEWAY_CODECS_KEY``, clients
+only send commands in a codec both sides support (see ``negotiate``), and
+fall back to JSON otherwise.
+"""
+
+import json
+import logging
+from typing import Any, Iterable, Optional
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+logger = logging.getLogger(__name__)
+
+CODEC_JSON = "json"
+CODEC_MSGPACK = "msgpack"
+
+# First byte of the tagged (binary) messages
+TAG_MARKER = 0xC1
+# Format version of each tagged codec, second byte of the message
+MSGPACK_VERSION = 1
+
+
+class CodecError(ValueError):
+    """A message can't be encoded or decoded."""
+
+
+def available_codecs() -> tuple[str, ...]:
+    """Returns the codecs supported by this process, preferred first."""
+    if msgpack is None:
+        return (CODEC_JSON,)
+    return (CODEC_MSGPACK, CODEC_JSON)
+
+
+def resolve_codec(codec: str) -> str:
+    """Returns the given codec if it's supported, JSON otherwise."""
+    if codec in available_codecs():
+        return codec
+    if codec != CODEC_JSON:
+        logger.warning("Codec %s is not available, falling back to JSON", codec)
+    return CODEC_JSON
+
+
+def negotiate(preferred: str, remote: Optional[Iterable[str]]) -> str:
+    """Returns the codec to use with a peer supporting the ``remote`` codecs.
+
+    The ``preferred`` codec is used if both sides support it, JSON otherwise
+    (also when the codecs of the peer are unknown).
+    """
+    if remote is not None and preferred in remote and preferred in available_codecs():
+        return preferred
+    return CODEC_JSON
+
+
+def encode(message: Any, codec: str = CODEC_JSON) -> bytes:
+    """Encodes a message with the given codec.
+
+    Values that can't be encoded natively are converted with ``str``.
+    """
+    if codec == CODEC_MSGPACK and msgpack is not None:
+        return bytes((TAG_MARKER, MSGPACK_VERSION)) + msgpack.packb(message, default=str)
+    if codec not in (CODEC_JSON, CODEC_MSGPACK):
+        raise CodecError(f"Unknown codec: {codec}")
+    return json.dumps(message, default=str).encode()
+
+
+def decode(raw: bytes | str) -> Any:
+    """Decodes a message encoded with any of the supported codecs."""
+    if isinstance(raw, (bytes, bytearray, memoryview)) and raw[:1] == bytes((TAG_MARKER,)):
+        version = raw[1] if len(raw) > 1 else None
+        if version != MSGPACK_VERSION:
+            raise CodecError(f"Unknown message format: {version}")
+        if msgpack is None:
+            raise CodecError("Received a MessagePack message, but msgpack is not installed")
+        try:
+            return msgpack.unpackb(raw[2:], strict_map_key=False)
+        except (ValueError, msgpack.UnpackException) as error:
+            raise CodecError(str(error)) from error
+
+    try:
+        return json.loads(raw)
+    except (json.JSONDecodeError, UnicodeDecodeError, TypeError) as error:
+        raise CodecError(str(error)) from error
+
+
+def to_json(raw: bytes | str) -> str:
+    """Returns a message, encoded with any codec, as JSON text.
+
+    JSON messages are returned as they are, without decoding them.
+    """
+    if isinstance(raw, str):
+        return raw
+    if raw[:1] != bytes((TAG_MARKER,)):
+        return raw.decode()
+    return json.dumps(decode(raw), default=str)
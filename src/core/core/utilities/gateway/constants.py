@@ -21,9 +21,16 @@ SESSION_KEY = "cnc:session"
 # Gateway state key (published periodically)
 GATEWAY_STATE_KEY = "cnc:gateway_state"
 
-# Last published status (JSON snapshot for REST polling)
+# Last published status (snapshot for REST polling, in the codec of the Gateway)
 LAST_STATUS_KEY = "cnc:last_status"
 
+# Codecs accepted by the Gateway in the command queues (comma-separated)
+GATEWAY_CODECS_KEY = "cnc:gateway_codecs"
+
+# GRBL settings of the machine (JSON, see GrblController.settings), kept after
+# the gateway stops so that the worker can estimate machining times
+GRBL_SETTINGS_KEY = "cnc:grbl_settings"
+
 # ---------------------------------------------------------------------------
 # PubSub channels
 # ---------------------------------------------------------------------------
@@ -31,6 +38,9 @@ LAST_STATUS_KEY = "cnc:last_status"
 STATUS_CHANNEL = "grbl_status"
 MESSAGES_CHANNEL = "grbl_messages"
 EVENTS_CHANNEL = "cnc:events"
+# Notified by GatewayClient every time the session lock changes, with the
+# SESSION_* action as message
+SESSION_CHANNEL = "cnc:session_changes"
 
 # ---------------------------------------------------------------------------
 # Message types (in the command queues)
@@ -41,9 +51,16 @@ MSG_REALTIME = "realtime"
 MSG_FILE_START = "file_start"
 MSG_FILE_STOP = "file_stop"
 MSG_JOG = "jog"
+MSG_JOG_HOLD = "jog_hold"
+MSG_JOG_CANCEL = "jog_cancel"
 MSG_QUERY = "query"
 MSG_DISCONNECT = "disconnect"
 
+# Continuous jog: a held direction must be sent again (MSG_JOG_HOLD) at least
+# every JOG_HOLD_TIMEOUT seconds, or the jog is cancelled
+JOG_HOLD_TIMEOUT = 0.5
+JOG_HOLD_REFRESH_INTERVAL = 0.15
+
 # ---------------------------------------------------------------------------
 # Realtime action names (payload for MSG_REALTIME)
 # ---------------------------------------------------------------------------
@@ -53,6 +70,50 @@ ACTION_RESUME = "resume"
 ACTION_STOP = "stop"
 ACTION_SOFT_RESET = "soft_reset"
 
+# Overrides of the feed rate, the rapid rate and the spindle speed, applied
+# on the fly without stopping the program (GRBL 1.1)
+ACTION_FEED_100 = "feed_100"
+ACTION_FEED_PLUS_10 = "feed_plus_10"
+ACTION_FEED_MINUS_10 = "feed_minus_10"
+ACTION_FEED_PLUS_1 = "feed_plus_1"
+ACTION_FEED_MINUS_1 = "feed_minus_1"
+ACTION_RAPID_100 = "rapid_100"
+ACTION_RAPID_50 = "rapid_50"
+ACTION_RAPID_25 = "rapid_25"
+ACTION_SPINDLE_100 = "spindle_100"
+ACTION_SPINDLE_PLUS_10 = "spindle_plus_10"
+ACTION_SPINDLE_MINUS_10 = "spindle_minus_10"
+ACTION_SPINDLE_PLUS_1 = "spindle_plus_1"
+ACTION_SPINDLE_MINUS_1 = "spindle_minus_1"
+
+OVERRIDE_ACTIONS = (
+    ACTION_FEED_100,
+    ACTION_FEED_PLUS_10,
+    ACTION_FEED_MINUS_10,
+    ACTION_FEED_PLUS_1,
+    ACTION_FEED_MINUS_1,
+    ACTION_RAPID_100,
+    ACTION_RAPID_50,
+    ACTION_RAPID_25,
+    ACTION_SPINDLE_100,
+    ACTION_SPINDLE_PLUS_10,
+    ACTION_SPINDLE_MINUS_10,
+    ACTION_SPINDLE_PLUS_1,
+    ACTION_SPINDLE_MINUS_1,
+)
+REALTIME_ACTIONS = (ACTION_PAUSE, ACTION_RESUME, ACTION_STOP, ACTION_SOFT_RESET) + OVERRIDE_ACTIONS
+
+# ---------------------------------------------------------------------------
+# File execution modes (payload for MSG_FILE_START)
+# ---------------------------------------------------------------------------
+
+# One line every fixed interval, while the GRBL buffer is below a fill threshold
+EXEC_MODE_PACED = "paced"
+# Character-counting: keep GRBL's RX buffer full, refilled on every 'ok'
+EXEC_MODE_STREAMING = "streaming"
+
+EXEC_MODES = (EXEC_MODE_PACED, EXEC_MODE_STREAMING)
+
 # ---------------------------------------------------------------------------
 # Event types (published on EVENTS_CHANNEL)
 # ---------------------------------------------------------------------------
@@ -72,6 +133,14 @@ GW_STATE_IDLE = "idle"
 GW_STATE_STREAMING = "streaming"
 GW_STATE_FILE_EXECUTION = "file_execution"
 
+# ---------------------------------------------------------------------------
+# Session lock changes (published on SESSION_CHANNEL)
+# ---------------------------------------------------------------------------
+
+SESSION_ACQUIRED = "acquired"
+SESSION_RENEWED = "renewed"
+SESSION_RELEASED = "released"
+
 # ---------------------------------------------------------------------------
 # Session defaults
 # ---------------------------------------------------------------------------
@@ -4,6 +4,9 @@ This module is used by the API, Worker, and Desktop to send commands
 to the Gateway and manage sessions. It does NOT depend on any Gateway
 internals — only on the shared constants and Redis.
 
+`GatewayClient` is synchronous, `AsyncGatewayClient` has the same API on
+``redis.asyncio``, for the ``async`` endpoints of the API.
+
 See DR-0001, DR-0002, DR-0003 for design rationale.
 """
 
@@ -15,29 +18,43 @@ import uuid
 from typing import Any, Optional
 
 import redis
+import redis.asyncio as aioredis
 
-from core.config import REDIS_DB_STORAGE, REDIS_HOST, REDIS_PORT
+from core.config import GATEWAY_CODEC, REDIS_DB_STORAGE, REDIS_HOST, REDIS_PORT
+from core.utilities.gateway.codec import CODEC_JSON, decode, encode, negotiate
 from core.utilities.gateway.constants import (
-    ACTION_PAUSE,
-    ACTION_RESUME,
-    ACTION_SOFT_RESET,
-    ACTION_STOP,
     ALL_QUEUES,
     EVENTS_CHANNEL,
+    EXEC_MODE_PACED,
+    EXEC_MODES,
+    GATEWAY_CODECS_KEY,
     GATEWAY_STATE_KEY,
+    GRBL_SETTINGS_KEY,
     LAST_STATUS_KEY,
     MSG_COMMAND,
     MSG_DISCONNECT,
     MSG_FILE_START,
     MSG_FILE_STOP,
     MSG_JOG,
+    MSG_JOG_CANCEL,
+    MSG_JOG_HOLD,
     MSG_QUERY,
     MSG_REALTIME,
     QUEUE_CRITICAL,
     QUEUE_HIGH,
+    REALTIME_ACTIONS,
+    SESSION_ACQUIRED,
+    SESSION_CHANNEL,
     SESSION_KEY,
+    SESSION_RELEASED,
+    SESSION_RENEWED,
     SESSION_TTL_SECONDS,
 )
+from core.utilities.grbl.types import GrblSettings
+
+# How long the codec negotiated with the Gateway is used before checking the
+# codecs it accepts again, e.g. in case it was restarted (seconds)
+CODEC_NEGOTIATION_INTERVAL = 30.0
 
 # ---------------------------------------------------------------------------
 # Helpers
@@ -48,16 +65,78 @@ def _make_message(
     msg_type: str,
     payload: dict[str, Any],
     session_id: str,
-) -> str:
-    """Build a JSON message for the command queue."""
-    return json.dumps(
+    codec: str = CODEC_JSON,
+) -> bytes:
+    """Build a message for the command queue."""
+    return encode(
         {
             "type": msg_type,
             "payload": payload,
             "session_id": session_id,
             "timestamp": time.time(),
+        },
+        codec,
+    )
+
+
+def _new_session(user_id: int, client_type: str) -> tuple[str, str]:
+    """Build the ID and the data of a new session lock."""
+    session_id = uuid.uuid4().hex
+    session_data = json.dumps(
+        {
+            "session_id": session_id,
+            "user_id": user_id,
+            "client_type": client_type,
+            "created_at": time.time(),
         }
     )
+    return session_id, session_data
+
+
+def _jog_payload(
+    x: float,
+    y: float,
+    z: float,
+    feedrate: float,
+    units: Optional[str],
+    distance_mode: Optional[str],
+    machine_coordinates: bool,
+) -> dict[str, Any]:
+    return {
+        "x": x,
+        "y": y,
+        "z": z,
+        "feedrate": feedrate,
+        "units": units,
+        "distance_mode": distance_mode,
+        "machine_coordinates": machine_coordinates,
+    }
+
+
+def _parse_codecs(raw: Optional[bytes]) -> Optional[list[str]]:
+    """Parse the codecs advertised by the Gateway in GATEWAY_CODECS_KEY."""
+    return raw.decode().split(",") if raw else None
+
+
+# Deletes the session lock, only if it belongs to the given session (atomic)
+RELEASE_SESSION_SCRIPT = """
+local current = redis.call('GET', KEYS[1])
+if current == false then return 0 end
+local data = cjson.decode(current)
+if data['session_id'] == ARGV[1] then
+    redis.call('DEL', KEYS[1])
+    return 1
+end
+return 0
+"""
+
+# Replaces a message of a queue, only if it wasn't popped yet (atomic)
+REPLACE_QUEUED_SCRIPT = """
+local index = redis.call('LPOS', KEYS[1], ARGV[1])
+if index == false then return 0 end
+redis.call('LSET', KEYS[1], index, ARGV[2])
+return 1
+"""
 
 
 # ---------------------------------------------------------------------------
@@ -71,6 +150,9 @@ class GatewayClient:
 
     Thread-safe: each method creates or reuses a Redis connection from
     a connection pool.
+
+    Commands are sent in the preferred *codec* only if the Gateway accepts
+    it, in JSON otherwise (see ``core.utilities.gateway.codec``).
     """
 
     def __init__(
@@ -78,14 +160,40 @@ class GatewayClient:
         host: str = REDIS_HOST,
         port: int = REDIS_PORT,
         db: int = REDIS_DB_STORAGE,
+        codec: str = GATEWAY_CODEC,
     ):
         self._pool = redis.ConnectionPool(host=host, port=port, db=db)
+        self._preferred_codec = codec
+        self._codec = CODEC_JSON
+        self._codec_negotiated_at: Optional[float] = None
 
     def _redis(self) -> redis.Redis[bytes]:
         return redis.Redis(connection_pool=self._pool)
 
+    def _command_codec(self) -> str:
+        """Return the codec of the commands, negotiated with the Gateway."""
+        if self._preferred_codec == CODEC_JSON:
+            return CODEC_JSON
+
+        now = time.monotonic()
+        if (
+            self._codec_negotiated_at is None
+            or now - self._codec_negotiated_at > CODEC_NEGOTIATION_INTERVAL
+        ):
+            raw = self._redis().get(GATEWAY_CODECS_KEY)
+            self._codec = negotiate(self._preferred_codec, _parse_codecs(raw))
+            self._codec_negotiated_at = now
+        return self._codec
+
+    def _push(self, queue: str, msg_type: str, payload: dict[str, Any], session_id: str) -> None:
+        msg = _make_message(msg_type, payload, session_id, self._command_codec())
+        self._redis().rpush(queue, msg)
+
     # ------------------------------------------------------------------
     # Session management
+    #
+    # Every change of the lock is notified on SESSION_CHANNEL, the Gateway
+    # keeps the session in memory until then.
     # ------------------------------------------------------------------
 
     def acquire_session(
@@ -100,18 +208,11 @@ class GatewayClient:
         is already held by another client.
         """
         r = self._redis()
-        session_id = uuid.uuid4().hex
-        session_data = json.dumps(
-            {
-                "session_id": session_id,
-                "user_id": user_id,
-                "client_type": client_type,
-                "created_at": time.time(),
-            }
-        )
+        session_id, session_data = _new_session(user_id, client_type)
         acquired = r.set(SESSION_KEY, session_data, nx=True, ex=ttl)
         if not acquired:
             return None
+        r.publish(SESSION_CHANNEL, SESSION_ACQUIRED)
         return session_id
 
     def renew_session(self, session_id: str, ttl: int = SESSION_TTL_SECONDS) -> bool:
@@ -127,7 +228,10 @@ class GatewayClient:
         stored = json.loads(raw)
         if stored.get("session_id") != session_id:
             return False
-        r.expire(SESSION_KEY, ttl)
+        pipe = r.pipeline(transaction=False)
+        pipe.expire(SESSION_KEY, ttl)
+        pipe.publish(SESSION_CHANNEL, SESSION_RENEWED)
+        pipe.execute()
         return True
 
     def release_session(self, session_id: str) -> bool:
@@ -135,19 +239,12 @@ class GatewayClient:
 
         Uses a Lua script to make the check-and-delete atomic.
         """
-        lua = """
-        local current = redis.call('GET', KEYS[1])
-        if current == false then return 0 end
-        local data = cjson.decode(current)
-        if data['session_id'] == ARGV[1] then
-            redis.call('DEL', KEYS[1])
-            return 1
-        end
-        return 0
-        """
         r = self._redis()
-        result = r.eval(lua, 1, SESSION_KEY, session_id)
-        return result == 1
+        result = r.eval(RELEASE_SESSION_SCRIPT, 1, SESSION_KEY, session_id)
+        if result != 1:
+            return False
+        r.publish(SESSION_CHANNEL, SESSION_RELEASED)
+        return True
 
     def get_active_session(self) -> Optional[dict[str, Any]]:
         """Return the current session info, or ``None`` if no active session."""
@@ -163,8 +260,7 @@ class GatewayClient:
 
     def send_command(self, session_id: str, command: str) -> None:
         """Send a G-code command with *high* priority."""
-        msg = _make_message(MSG_COMMAND, {"command": command}, session_id)
-        self._redis().rpush(QUEUE_HIGH, msg)
+        self._push(QUEUE_HIGH, MSG_COMMAND, {"command": command}, session_id)
 
     def send_jog(
         self,
@@ -179,59 +275,76 @@ class GatewayClient:
         machine_coordinates: bool = False,
     ) -> None:
         """Send a jog command with *high* priority."""
-        msg = _make_message(
-            MSG_JOG,
-            {
-                "x": x,
-                "y": y,
-                "z": z,
-                "feedrate": feedrate,
-                "units": units,
-                "distance_mode": distance_mode,
-                "machine_coordinates": machine_coordinates,
-            },
-            session_id,
-        )
-        self._redis().rpush(QUEUE_HIGH, msg)
+        payload = _jog_payload(x, y, z, feedrate, units, distance_mode, machine_coordinates)
+        self._push(QUEUE_HIGH, MSG_JOG, payload, session_id)
+
+    def send_jog_hold(
+        self,
+        session_id: str,
+        x: float,
+        y: float,
+        z: float,
+        feedrate: float,
+        *,
+        units: Optional[str] = None,
+    ) -> None:
+        """Jog continuously along the direction (*x*, *y*, *z*), with *high* priority.
+
+        Must be sent again every ``JOG_HOLD_REFRESH_INTERVAL`` while the
+        direction is held, and followed by `send_jog_cancel` on release.
+        """
+        payload = {"x": x, "y": y, "z": z, "feedrate": feedrate, "units": units}
+        self._push(QUEUE_HIGH, MSG_JOG_HOLD, payload, session_id)
+
+    def send_jog_cancel(self, session_id: str) -> None:
+        """Cancel the current jog and the queued ones, with *critical* priority."""
+        self._push(QUEUE_CRITICAL, MSG_JOG_CANCEL, {}, session_id)
 
     def send_realtime(self, session_id: str, action: str) -> None:
-        """Send a realtime action (pause/resume/stop) with *critical* priority."""
-        assert action in (ACTION_PAUSE, ACTION_RESUME, ACTION_STOP, ACTION_SOFT_RESET)
-        msg = _make_message(MSG_REALTIME, {"action": action}, session_id)
-        self._redis().rpush(QUEUE_CRITICAL, msg)
+        """Send a realtime action (pause/resume/stop or an override) with *critical* priority."""
+        assert action in REALTIME_ACTIONS
+        self._push(QUEUE_CRITICAL, MSG_REALTIME, {"action": action}, session_id)
 
     def send_query(self, session_id: str, query_type: str) -> None:
         """Send a read-only query (e.g. settings, params) with *critical* priority."""
-        msg = _make_message(MSG_QUERY, {"query": query_type}, session_id)
-        self._redis().rpush(QUEUE_CRITICAL, msg)
+        self._push(QUEUE_CRITICAL, MSG_QUERY, {"query": query_type}, session_id)
 
     def request_file_execution(
         self,
         session_id: str,
         file_path: str,
         task_id: int | None = None,
+        mode: str = EXEC_MODE_PACED,
+        file_hash: str | None = None,
     ) -> None:
         """Request the Gateway to start executing a G-code file.
 
         *task_id* may be ``None`` for ad-hoc executions initiated from the
         Desktop's ControlView (no DB task involved).
+
+        *mode* selects how lines are fed to GRBL: ``EXEC_MODE_PACED`` (fixed
+        interval) or ``EXEC_MODE_STREAMING`` (character-counting). Raises
+        ``ValueError`` for any other mode.
+
+        *file_hash* is the hash of the file stored in the DB, if known. The
+        Gateway uses it to look up the compiled program without reading the file.
         """
-        msg = _make_message(
+        if mode not in EXEC_MODES:
+            raise ValueError(f"Unknown file execution mode: {mode}")
+        self._push(
+            QUEUE_HIGH,
             MSG_FILE_START,
-            {"file_path": file_path, "task_id": task_id},
+            {"file_path": file_path, "task_id": task_id, "mode": mode, "file_hash": file_hash},
             session_id,
         )
-        self._redis().rpush(QUEUE_HIGH, msg)
 
     def request_file_stop(self, session_id: str) -> None:
         """Request the Gateway to stop the current file execution."""
-        msg = _make_message(MSG_FILE_STOP, {}, session_id)
-        self._redis().rpush(QUEUE_CRITICAL, msg)
+        self._push(QUEUE_CRITICAL, MSG_FILE_STOP, {}, session_id)
 
     def request_disconnect(self, session_id: str) -> None:
         """Request the Gateway to release the session (graceful)."""
-        msg = _make_message(MSG_DISCONNECT, {}, session_id)
-        self._redis().rpush(QUEUE_CRITICAL, msg)
+        self._push(QUEUE_CRITICAL, MSG_DISCONNECT, {}, session_id)
 
     # ------------------------------------------------------------------
     # Gateway state queries (read-only, no session required)
@@ -253,6 +366,17 @@ class GatewayClient:
         """
         r = self._redis()
         raw = r.get(LAST_STATUS_KEY)
+        if raw is None:
+            return None
+        return decode(raw)
+
+    def get_grbl_settings(self) -> Optional[GrblSettings]:
+        """Return the last known GRBL settings of the machine, or ``None``.
+
+        The CNC Gateway persists them in Redis whenever they change.
+        """
+        r = self._redis()
+        raw = r.get(GRBL_SETTINGS_KEY)
         if raw is None:
             return None
         return json.loads(raw)
@@ -284,3 +408,265 @@ class GatewayClient:
         ps = r.pubsub()
         ps.subscribe(*channels)
         return ps
+
+
+# ---------------------------------------------------------------------------
+# AsyncGatewayClient
+# ---------------------------------------------------------------------------
+
+
+class AsyncGatewayClient:
+    """Same as `GatewayClient`, on ``redis.asyncio``.
+
+    Every call takes a connection from the pool of the client, so a single
+    instance is meant to be shared by all the requests of the process (see
+    ``api.middleware.gatewayMiddleware``). It must be used from a single
+    event loop, and closed with `aclose`.
+    """
+
+    def __init__(
+        self,
+        host: str = REDIS_HOST,
+        port: int = REDIS_PORT,
+        db: int = REDIS_DB_STORAGE,
+        codec: str = GATEWAY_CODEC,
+    ):
+        self._redis: aioredis.Redis = aioredis.Redis(host=host, port=port, db=db)
+        self._preferred_codec = codec
+        self._codec = CODEC_JSON
+        self._codec_negotiated_at: Optional[float] = None
+
+    async def aclose(self) -> None:
+        """Close the connections of the pool."""
+        await self._redis.aclose()
+
+    async def _command_codec(self) -> str:
+        """Return the codec of the commands, negotiated with the Gateway."""
+        if self._preferred_codec == CODEC_JSON:
+            return CODEC_JSON
+
+        now = time.monotonic()
+        if (
+            self._codec_negotiated_at is None
+            or now - self._codec_negotiated_at > CODEC_NEGOTIATION_INTERVAL
+        ):
+            raw = await self._redis.get(GATEWAY_CODECS_KEY)
+            self._codec = negotiate(self._preferred_codec, _parse_codecs(raw))
+            self._codec_negotiated_at = now
+        return self._codec
+
+    async def _push(
+        self, queue: str, msg_type: str, payload: dict[str, Any], session_id: str
+    ) -> bytes:
+        msg = _make_message(msg_type, payload, session_id, await self._command_codec())
+        await self._redis.rpush(queue, msg)
+        return msg
+
+    # ------------------------------------------------------------------
+    # Session management
+    # ------------------------------------------------------------------
+
+    async def acquire_session(
+        self,
+        user_id: int,
+        client_type: str,
+        ttl: int = SESSION_TTL_SECONDS,
+    ) -> Optional[str]:
+        """Try to acquire the CNC session lock, see `GatewayClient.acquire_session`."""
+        session_id, session_data = _new_session(user_id, client_type)
+        acquired = await self._redis.set(SESSION_KEY, session_data, nx=True, ex=ttl)
+        if not acquired:
+            return None
+        await self._redis.publish(SESSION_CHANNEL, SESSION_ACQUIRED)
+        return session_id
+
+    async def renew_session(self, session_id: str, ttl: int = SESSION_TTL_SECONDS) -> bool:
+        """Renew the TTL of the session lock, see `GatewayClient.renew_session`."""
+        stored = await self.get_active_session()
+        if stored is None or stored.get("session_id") != session_id:
+            return False
+        pipe = self._redis.pipeline(transaction=False)
+        pipe.expire(SESSION_KEY, ttl)
+        pipe.publish(SESSION_CHANNEL, SESSION_RENEWED)
+        await pipe.execute()
+        return True
+
+    async def release_session(self, session_id: str) -> bool:
+        """Release the session lock, but only if we own it."""
+        result = await self._redis.eval(RELEASE_SESSION_SCRIPT, 1, SESSION_KEY, session_id)
+        if result != 1:
+            return False
+        await self._redis.publish(SESSION_CHANNEL, SESSION_RELEASED)
+        return True
+
+    async def get_active_session(self) -> Optional[dict[str, Any]]:
+        """Return the current session info, or ``None`` if no active session."""
+        raw = await self._redis.get(SESSION_KEY)
+        if raw is None:
+            return None
+        return json.loads(raw)
+
+    # ------------------------------------------------------------------
+    # Command sending
+    # ------------------------------------------------------------------
+
+    async def send_command(self, session_id: str, command: str) -> None:
+        """Send a G-code command with *high* priority."""
+        await self._push(QUEUE_HIGH, MSG_COMMAND, {"command": command}, session_id)
+
+    async def send_jog(
+        self,
+        session_id: str,
+        x: float = 0,
+        y: float = 0,
+        z: float = 0,
+        feedrate: float = 0,
+        *,
+        units: Optional[str] = None,
+        distance_mode: Optional[str] = None,
+        machine_coordinates: bool = False,
+    ) -> bytes:
+        """Send a jog command with *high* priority.
+
+        Returns the queued message, which can be replaced with `replace_jog`
+        or removed with `cancel_jog` until the Gateway takes it.
+        """
+        payload = _jog_payload(x, y, z, feedrate, units, distance_mode, machine_coordinates)
+        return await self._push(QUEUE_HIGH, MSG_JOG, payload, session_id)
+
+    async def replace_jog(
+        self,
+        session_id: str,
+        queued: bytes,
+        x: float = 0,
+        y: float = 0,
+        z: float = 0,
+        feedrate: float = 0,
+        *,
+        units: Optional[str] = None,
+        distance_mode: Optional[str] = None,
+        machine_coordinates: bool = False,
+    ) -> Optional[bytes]:
+        """Replace a jog sent with `send_jog`, keeping its place in the queue.
+
+        Returns the new message, or ``None`` if the Gateway already took
+        the *queued* one.
+        """
+        payload = _jog_payload(x, y, z, feedrate, units, distance_mode, machine_coordinates)
+        msg = _make_message(MSG_JOG, payload, session_id, await self._command_codec())
+        replaced = await self._redis.eval(REPLACE_QUEUED_SCRIPT, 1, QUEUE_HIGH, queued, msg)
+        return msg if replaced == 1 else None
+
+    async def cancel_jog(self, queued: bytes) -> bool:
+        """Remove a jog sent with `send_jog`, if the Gateway didn't take it yet."""
+        return await self._redis.lrem(QUEUE_HIGH, 1, queued) == 1
+
+    async def send_jog_hold(
+        self,
+        session_id: str,
+        x: float,
+        y: float,
+        z: float,
+        feedrate: float,
+        *,
+        units: Optional[str] = None,
+    ) -> None:
+        """Jog continuously along the direction (*x*, *y*, *z*), see
+        `GatewayClient.send_jog_hold`."""
+        payload = {"x": x, "y": y, "z": z, "feedrate": feedrate, "units": units}
+        await self._push(QUEUE_HIGH, MSG_JOG_HOLD, payload, session_id)
+
+    async def send_jog_cancel(self, session_id: str) -> None:
+        """Cancel the current jog and the queued ones, with *critical* priority."""
+        await self._push(QUEUE_CRITICAL, MSG_JOG_CANCEL, {}, session_id)
+
+    async def send_realtime(self, session_id: str, action: str) -> None:
+        """Send a realtime action (pause/resume/stop or an override) with *critical* priority."""
+        assert action in REALTIME_ACTIONS
+        await self._push(QUEUE_CRITICAL, MSG_REALTIME, {"action": action}, session_id)
+
+    async def send_query(self, session_id: str, query_type: str) -> None:
+        """Send a read-only query (e.g. settings, params) with *critical* priority."""
+        await self._push(QUEUE_CRITICAL, MSG_QUERY, {"query": query_type}, session_id)
+
+    async def request_file_execution(
+        self,
+        session_id: str,
+        file_path: str,
+        task_id: int | None = None,
+        mode: str = EXEC_MODE_PACED,
+        file_hash: str | None = None,
+    ) -> None:
+        """Request the Gateway to start executing a G-code file, see
+        `GatewayClient.request_file_execution`."""
+        if mode not in EXEC_MODES:
+            raise ValueError(f"Unknown file execution mode: {mode}")
+        await self._push(
+            QUEUE_HIGH,
+            MSG_FILE_START,
+            {"file_path": file_path, "task_id": task_id, "mode": mode, "file_hash": file_hash},
+            session_id,
+        )
+
+    async def request_file_stop(self, session_id: str) -> None:
+        """Request the Gateway to stop the current file execution."""
+        await self._push(QUEUE_CRITICAL, MSG_FILE_STOP, {}, session_id)
+
+    async def request_disconnect(self, session_id: str) -> None:
+        """Request the Gateway to release the session (graceful)."""
+        await self._push(QUEUE_CRITICAL, MSG_DISCONNECT, {}, session_id)
+
+    # ------------------------------------------------------------------
+    # Gateway state queries (read-only, no session required)
+    # ------------------------------------------------------------------
+
+    async def get_gateway_state(self) -> Optional[str]:
+        """Return the current gateway state string, or ``None``."""
+        raw = await self._redis.get(GATEWAY_STATE_KEY)
+        if raw is None:
+            return None
+        return raw.decode() if isinstance(raw, bytes) else str(raw)
+
+    async def get_last_status(self) -> Optional[dict[str, Any]]:
+        """Return the last published status snapshot, or ``None``."""
+        raw = await self._redis.get(LAST_STATUS_KEY)
+        if raw is None:
+            return None
+        return decode(raw)
+
+    async def get_grbl_settings(self) -> Optional[GrblSettings]:
+        """Return the last known GRBL settings of the machine, or ``None``."""
+        raw = await self._redis.get(GRBL_SETTINGS_KEY)
+        if raw is None:
+            return None
+        return json.loads(raw)
+
+    async def is_gateway_running(self) -> bool:
+        """Check if the gateway is publishing state."""
+        return await self.get_gateway_state() is not None
+
+    async def flush_queues(self) -> int:
+        """Delete all pending commands from all queues. Returns count deleted."""
+        pipe = self._redis.pipeline(transaction=True)
+        for q in ALL_QUEUES:
+            pipe.llen(q)
+        pipe.delete(*ALL_QUEUES)
+        *lengths, _ = await pipe.execute()
+        return sum(lengths)
+
+    # ------------------------------------------------------------------
+    # Subscriptions
+    # ------------------------------------------------------------------
+
+    async def subscribe_events(self) -> aioredis.client.PubSub:
+        """Return a PubSub object subscribed to the events channel."""
+        return await self.subscribe_channels(EVENTS_CHANNEL)
+
+    async def subscribe_channels(self, *channels: str) -> aioredis.client.PubSub:
+        """Return a PubSub object subscribed to one or more channels.
+
+        It holds a connection of the pool until closed with ``aclose``.
+        """
+        ps = self._redis.pubsub()
+        await ps.subscribe(*channels)
+        return ps
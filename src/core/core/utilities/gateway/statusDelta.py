@@ -0,0 +1,131 @@
+"""Delta encoding of the messages of the ``grbl_status`` channel.
+
+The CNC Gateway only publishes what changed since its previous message:
+
+* A **keyframe** holds every section of the status::
+
+    {
+        "type": "keyframe",
+        "seq": 41,
+        "status": {...},            # see GrblStatus.get_status_report
+        "parserstate": {...},
+        "gateway_state": "idle",
+        "session": {...} | None,
+        "file_progress": {...} | None,
+    }
+
+* A **delta** only holds the sections that changed, and only the changed
+  keys of ``status``, which are merged into the previous ones (the other
+  sections are replaced)::
+
+    {"type": "delta", "seq": 42, "status": {"mpos": {...}, "line": 120}}
+
+Nothing is published while nothing changes, except a keyframe every few
+seconds. The last complete status is persisted in ``LAST_STATUS_KEY`` (as a
+keyframe), so a new subscriber starts from it and then applies the deltas
+that follow its ``seq``.
+
+Messages without a ``type`` are complete payloads (as published by former
+gateways) and are handled as keyframes.
+"""
+
+import copy
+from typing import Any, Optional
+
+STATUS_KEYFRAME = "keyframe"
+STATUS_DELTA = "delta"
+
+STATUS_SECTIONS = ("status", "parserstate", "gateway_state", "session", "file_progress")
+
+
+class StatusEncoder:
+    """Builds the messages of the publisher, keeping the last published status.
+
+    The published sections are copied, so changes made in place to the
+    given values (e.g. to the parser state of GrblStatus) are detected.
+    """
+
+    def __init__(self) -> None:
+        self.seq = 0
+        self._state: dict[str, Any] = {}
+
+    def keyframe(self, sections: dict[str, Any]) -> dict[str, Any]:
+        """Returns a keyframe with all the sections."""
+        self.seq += 1
+        self._state = {section: copy.deepcopy(sections.get(section)) for section in STATUS_SECTIONS}
+        return {"type": STATUS_KEYFRAME, "seq": self.seq, **self._state}
+
+    def delta(
+        self, status_changes: dict[str, Any], sections: dict[str, Any]
+    ) -> Optional[dict[str, Any]]:
+        """Returns a delta with the changed keys of the status and the sections
+        that differ from the published ones, or ``None`` if nothing changed.
+
+        ``sections`` may leave out ``status``, its changes are given apart
+        (see StatusReport.to_dict). A keyframe must have been built before.
+        """
+        changes: dict[str, Any] = {}
+        if status_changes:
+            changes["status"] = status_changes
+            self._state["status"] = {**(self._state["status"] or {}), **status_changes}
+        for section, value in sections.items():
+            if section != "status" and value != self._state.get(section):
+                changes[section] = value
+                self._state[section] = copy.deepcopy(value)
+
+        if not changes:
+            return None
+        self.seq += 1
+        return {"type": STATUS_DELTA, "seq": self.seq, **changes}
+
+    def snapshot(self) -> dict[str, Any]:
+        """Returns the last published status, as a keyframe."""
+        return {"type": STATUS_KEYFRAME, "seq": self.seq, **self._state}
+
+
+class StatusReassembler:
+    """Rebuilds the complete status from the messages of the ``grbl_status`` channel."""
+
+    def __init__(self) -> None:
+        self.seq: Optional[int] = None
+        self._state: Optional[dict[str, Any]] = None
+
+    @property
+    def needs_keyframe(self) -> bool:
+        """Whether a keyframe (or a snapshot) is needed to rebuild the status."""
+        return self._state is None
+
+    def apply(self, message: dict[str, Any]) -> Optional[dict[str, Any]]:
+        """Applies a message, returns the complete status or ``None`` if it can't
+        be rebuilt (or the message is older than the current status).
+
+        A missing delta drops the status until the next keyframe.
+        """
+        kind = message.get("type", STATUS_KEYFRAME)
+
+        if kind == STATUS_KEYFRAME:
+            self.seq = message.get("seq")
+            self._state = {section: message.get(section) for section in STATUS_SECTIONS}
+            return dict(self._state)
+
+        if kind != STATUS_DELTA or self._state is None:
+            return None
+
+        seq = message.get("seq")
+        if self.seq is not None and seq is not None:
+            if seq <= self.seq:
+                # Already included, e.g. in the snapshot the status started from
+                return None
+            if seq != self.seq + 1:
+                self.seq, self._state = None, None
+                return None
+        self.seq = seq
+
+        for section in STATUS_SECTIONS:
+            if section not in message:
+                continue
+            if section == "status":
+                self._state["status"] = {**(self._state["status"] or {}), **message["status"]}
+            else:
+                self._state[section] = message[section]
+        return dict(self._state)
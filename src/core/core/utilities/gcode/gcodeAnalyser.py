@@ -1,68 +1,113 @@
 import re
 from collections import Counter
 from pathlib import Path
-from typing import Pattern
 
+from core.utilities.files import LineReader
 from core.utilities.gcode.constants import GCODE_VALID_GCODES, GCODE_VALID_MCODES
 
-# Regular expressions to classify commands
-pause_pattern = re.compile(r"^(?:N\d+\s+)?M(0|1|00|01)\s*", re.MULTILINE)
-move_pattern = re.compile(r"^(?:N\d+\s+)?G(0|1|00|01)\s*", re.MULTILINE)
-comment_pattern = re.compile(r"(^\(.*\)$)|(^;.*)", re.MULTILINE)
-
-# Regular expressions to extract parts of a command (not comments)
-gcode_pattern = re.compile(r"^(?!;|\().*(G\d+(?:.\d)?)", re.MULTILINE)
-mcode_pattern = re.compile(r"^(?!;|\().*(M\d+)", re.MULTILINE)
-feedrate_pattern = re.compile(r"^(?!;|\().*F(\d+)", re.MULTILINE)
-t_pattern = re.compile(r"^(?!;|\().*(T\d+)", re.MULTILINE)
+# Single tokenizer for the whole analysis. Each match skips the characters
+# that don't matter for the report (axis words, line numbers, ...) and then
+# consumes one token. Only the interesting part of the token is captured:
+#   - b"\n": the end of a line, followed by ";" or "(" if the next line is
+#     a comment line, e.g. b"\n;". The rest of the comment line is skipped.
+#   - A G, M or T word, e.g. b"G1" or b"M30".
+#   - A F word, e.g. b"F1200".
+# Comments are consumed without capturing anything (b"").
+token_pattern = re.compile(
+    rb"""
+    [^\n;(GgMmTtFf]*
+    (?:
+        \([^\n)]*\)? | ;[^\n]*
+      | (
+          \n(?:[ \t]*(?:;|\((?=[^\n]*\)[ \t]*\r?(?:\n|\Z))))?
+        | [GgMmTt][ \t]*\d+(?:\.\d+)?
+        | [Ff][ \t]*\d+(?:\.\d*)?
+        )
+        (?:(?<=[;(])[^\n]*)?
+    )
+    """,
+    re.VERBOSE,
+)
+
+# Comment line at the beginning of a block (not preceded by a line end)
+first_comment_pattern = re.compile(rb"[ \t]*(?:;[^\n]*|\([^\n]*\)[ \t]*\r?(?=\n|\Z))")
+
+# Size of the blocks scanned at once (bytes)
+BLOCK_SIZE = 1024 * 1024
+
+MOVEMENT_CODES = {0, 1}  # G0, G1
+PAUSE_CODES = {0, 1}  # M0, M1
 
 
 class GcodeAnalyser:
-    """Utility class to get values of interest from a gcode file."""
+    """Utility class to get values of interest from a gcode file.
+
+    The file is scanned once, block by block, through a `LineReader`, so
+    the memory usage doesn't depend on the size of the file. Tokens are
+    tallied while scanning and the report is built from those counts.
+    """
 
     def __init__(self, file_path: str | Path):
         # Attributes definition
         self.file_path = file_path
 
     def analyse(self):
+        # Static analysis
+        tokens: Counter[bytes] = Counter()
+        first_line_comments = 0
+        with LineReader(self.file_path) as gcode:
+            for block in gcode.blocks(BLOCK_SIZE):
+                start = 0
+                if match := first_comment_pattern.match(block):
+                    first_line_comments += 1
+                    start = match.end()
+                tokens.update(token_pattern.findall(block, start))
+            unterminated_line = gcode.size > 0 and not gcode.ends_with_newline
+
         # Initialize values of interest
-        total_lines = 0
-        comment_count = 0
+        total_lines = 1 if unterminated_line else 0
+        comment_count = first_line_comments
         movement_lines = 0
         pause_count = 0
-        tools = []
+        tools: set[str] = set()
         max_feedrate = 0
-        commands_gcode = {}
-        commands_mcode = {}
-        unsupported_commands = []
-
-        # Static analysis
-        with open(self.file_path, "r") as gcode:
-            content = gcode.read()
-
-            total_lines = len(content.splitlines())
-
-            pause_count = self._count(pause_pattern, content)
-            movement_lines = self._count(move_pattern, content)
-            comment_count = self._count(comment_pattern, content)
-
-            tools = self._find_all_unique(t_pattern, content)
-
-            max_feedrate = self._find_max(feedrate_pattern, content)
-
-            commands_gcode = self._count_all(gcode_pattern, content)
-            commands_mcode = self._count_all(mcode_pattern, content)
-
-            unsupported_commands = list(
-                filter(lambda x: x not in GCODE_VALID_GCODES, commands_gcode.keys())
-            ) + list(filter(lambda x: x not in GCODE_VALID_MCODES, commands_mcode.keys()))
+        commands_gcode: dict[str, int] = {}
+        commands_mcode: dict[str, int] = {}
+
+        for token, count in tokens.items():
+            if not token:
+                continue
+            if token[0] == 0x0A:  # \n
+                total_lines += count
+                if len(token) > 1:
+                    comment_count += count
+                continue
+
+            word = token.decode().upper().replace(" ", "").replace("\t", "")
+            letter, number = word[0], word[1:]
+            if letter == "G":
+                self._count(commands_gcode, word, count)
+                if float(number) in MOVEMENT_CODES:
+                    movement_lines += count
+            elif letter == "M":
+                self._count(commands_mcode, word, count)
+                if float(number) in PAUSE_CODES:
+                    pause_count += count
+            elif letter == "T":
+                tools.add(word)
+            else:
+                max_feedrate = max(max_feedrate, int(float(number)))
+
+        unsupported_commands = list(
+            filter(lambda x: x not in GCODE_VALID_GCODES, commands_gcode.keys())
+        ) + list(filter(lambda x: x not in GCODE_VALID_MCODES, commands_mcode.keys()))
 
         return {
             "total_lines": total_lines,
             "pause_count": pause_count,
             "movement_lines": movement_lines,
             "comment_count": comment_count,
-            "tools": tools,
+            "tools": sorted(tools),
             "max_feedrate": max_feedrate,
             "commands_usage": {**commands_gcode, **commands_mcode},
             "unsupported_commands": unsupported_commands,
@@ -70,27 +115,5 @@ class GcodeAnalyser:
 
     # UTILITIES
 
-    def _count(self, regex: Pattern, text: str):
-        matches = regex.findall(text)
-        return len(matches)
-
-    def _count_all(self, regex: Pattern, text: str):
-        matches = regex.findall(text)
-        return dict(Counter(matches))
-
-    def _find_all_unique(self, regex: Pattern, text: str):
-        matches = regex.findall(text)
-        if not matches:
-            return []
-
-        list_set = list(set(matches))
-        list_set.sort()
-        return list_set
-
-    def _find_max(self, regex: Pattern, text: str):
-        matches = regex.findall(text)
-        if not matches:
-            return 0
-
-        values = [int(x) for x in matches]
-        return max(values)
+    def _count(self, counter: dict[str, int], command: str, count: int):
+        counter[command] = counter.get(command, 0) + count
@@ -0,0 +1,44 @@
+"""Toolpath previews of G-code files.
+
+The worker builds a level-of-detail pyramid of the toolpath of each file:
+one simplified polyline per preview size, detailed enough to be drawn in a
+viewport of that size (in pixels). Each level is a JSON document, stored
+next to the thumbnails and keyed by the hash of the file, so it can be
+served as is::
+
+    {
+        "size": 512,                # viewport size of the level (pixels)
+        "tolerance": 0.2,           # maximum deviation from the toolpath (mm)
+        "total_moves": 120000,      # moves of the whole toolpath
+        "bbox": {"xmin": ..., "xmax": ..., "ymin": ..., ..., "zmax": ...},
+        "x": [...], "y": [...], "z": [...],  # points of the polyline
+        "type": [...],              # type of each segment, len(x) - 1 items
+    }
+
+Segment types are 0 for rapid moves, 1 for linear moves and 2 for arcs.
+"""
+
+from pathlib import Path
+
+from core.config import settings
+
+# Viewport sizes of the levels (pixels)
+PREVIEW_SIZES = (256, 512, 1024, 2048)
+
+
+def get_previews_folder() -> Path:
+    return Path(settings.images_folder_path) / "previews"
+
+
+def get_preview_path(file_hash: str, size: int, folder: str | Path | None = None) -> Path:
+    """Returns the path to the level of the given size of a file's preview."""
+    base = Path(folder) if folder is not None else get_previews_folder()
+    return base / file_hash / f"{size}.json"
+
+
+def select_preview_size(viewport: int) -> int:
+    """Returns the size of the smallest level that can fill the given viewport."""
+    for size in PREVIEW_SIZES:
+        if size >= viewport:
+            return size
+    return PREVIEW_SIZES[-1]
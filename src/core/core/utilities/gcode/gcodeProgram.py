@@ -0,0 +1,147 @@
+"""Compiled G-code programs.
+
+`compile_program` turns a G-code file into a `GcodeProgram`: a compact,
+pre-stripped image of the commands that have to be sent to GRBL. Comments
+and blank lines are removed at compile time and every command keeps the
+number of the source line it came from, so the send path does no parsing
+at all.
+
+Compiled programs are immutable, so they can be kept in a `ProgramCache`
+keyed by the hash of the file they were compiled from.
+"""
+
+import re
+from array import array
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+from core.utilities.files import LineReader
+
+# Whole-line comments, as understood by GrblController.send_command
+comment_pattern = re.compile(r"(^\(.*\)$)|(^;.*)")
+
+# Same patterns, applied to the raw lines of the file when compiling
+_comment_pattern = re.compile(comment_pattern.pattern.encode())
+_inline_comment_pattern = re.compile(rb"\([^)]*\)|;.*")
+
+
+class GcodeProgram:
+    """Pre-stripped G-code commands with a map back to their source lines.
+
+    All commands are stored back to back in a single byte buffer, delimited
+    by an array of offsets, which keeps the memory footprint close to the
+    size of the program itself.
+    """
+
+    __slots__ = ("_data", "_offsets", "_source_lines", "total_lines")
+
+    def __init__(self, data: bytearray, offsets: array, source_lines: array, total_lines: int):
+        self._data = data
+        self._offsets = offsets
+        self._source_lines = source_lines
+        # Amount of lines in the source file, including comments and blanks
+        self.total_lines = total_lines
+
+    def __len__(self) -> int:
+        return len(self._source_lines)
+
+    def command(self, index: int) -> str:
+        """Return the command at *index*, ready to be sent."""
+        return self._data[self._offsets[index] : self._offsets[index + 1]].decode(
+            "utf-8", "replace"
+        )
+
+    def size(self, index: int) -> int:
+        """Length of the command at *index*, without the line terminator."""
+        return self._offsets[index + 1] - self._offsets[index]
+
+    def find_longer(self, limit: int) -> Optional[int]:
+        """Index of the first command longer than *limit*, None if there's none."""
+        offsets = self._offsets
+        for index in range(len(self)):
+            if offsets[index + 1] - offsets[index] > limit:
+                return index
+        return None
+
+    def source_line(self, index: int) -> int:
+        """Line number (1-based) of the command at *index* in the source file."""
+        return self._source_lines[index]
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory used by the program image."""
+        return (
+            len(self._data)
+            + self._offsets.itemsize * len(self._offsets)
+            + self._source_lines.itemsize * len(self._source_lines)
+        )
+
+
+def compile_program(file_path: str | Path) -> GcodeProgram:
+    """Read a G-code file and compile it into a `GcodeProgram`.
+
+    The file is read through a `LineReader`, so only the compiled commands
+    are kept in memory.
+    """
+    data = bytearray()
+    offsets = array("Q", [0])
+    source_lines = array("I")
+    total_lines = 0
+
+    with LineReader(file_path) as gcode:
+        for total_lines, line in enumerate(gcode.lines(), start=1):
+            command = bytes(line).strip()
+            if not command or _comment_pattern.match(command):
+                continue
+            if b"(" in command or b";" in command:
+                command = _inline_comment_pattern.sub(b"", command).strip()
+                if not command:
+                    continue
+
+            data += command
+            offsets.append(len(data))
+            source_lines.append(total_lines)
+
+    return GcodeProgram(data, offsets, source_lines, total_lines)
+
+
+class ProgramCache:
+    """Least-recently-used cache of compiled programs, keyed by file hash.
+
+    Programs are evicted once their total size exceeds *max_bytes*, but the
+    most recently used one is always kept.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._programs: OrderedDict[str, GcodeProgram] = OrderedDict()
+        self._nbytes = 0
+
+    def __len__(self) -> int:
+        return len(self._programs)
+
+    def get(self, file_hash: str) -> Optional[GcodeProgram]:
+        program = self._programs.get(file_hash)
+        if program is not None:
+            self._programs.move_to_end(file_hash)
+        return program
+
+    def put(self, file_hash: str, program: GcodeProgram) -> None:
+        previous = self._programs.pop(file_hash, None)
+        if previous is not None:
+            self._nbytes -= previous.nbytes
+
+        self._programs[file_hash] = program
+        self._nbytes += program.nbytes
+        while self._nbytes > self.max_bytes and len(self._programs) > 1:
+            _, evicted = self._programs.popitem(last=False)
+            self._nbytes -= evicted.nbytes
+
+    def get_or_compile(self, file_hash: str, file_path: str | Path) -> GcodeProgram:
+        """Return the cached program for *file_hash*, compiling *file_path* on a miss."""
+        program = self.get(file_hash)
+        if program is None:
+            program = compile_program(file_path)
+            self.put(file_hash, program)
+        return program
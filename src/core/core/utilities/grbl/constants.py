@@ -32,6 +32,21 @@ class GrblRealtimeCommand(Enum):
     FEED_HOLD = b'!'            # Feed Hold
     STATUS_REPORT = b'?'        # Current Status
     SOFT_RESET = b'\x18'        # Reset Grbl (Ctrl-X)
+    JOG_CANCEL = b'\x85'        # Jog Cancel
+    # Overrides, applied on the fly (GRBL 1.1)
+    FEED_OVR_RESET = b'\x90'           # Feed override to 100%
+    FEED_OVR_COARSE_PLUS = b'\x91'     # Feed override +10%
+    FEED_OVR_COARSE_MINUS = b'\x92'    # Feed override -10%
+    FEED_OVR_FINE_PLUS = b'\x93'       # Feed override +1%
+    FEED_OVR_FINE_MINUS = b'\x94'      # Feed override -1%
+    RAPID_OVR_RESET = b'\x95'          # Rapid override to 100%
+    RAPID_OVR_MEDIUM = b'\x96'         # Rapid override to 50%
+    RAPID_OVR_LOW = b'\x97'            # Rapid override to 25%
+    SPINDLE_OVR_RESET = b'\x99'        # Spindle speed override to 100%
+    SPINDLE_OVR_COARSE_PLUS = b'\x9a'  # Spindle speed override +10%
+    SPINDLE_OVR_COARSE_MINUS = b'\x9b' # Spindle speed override -10%
+    SPINDLE_OVR_FINE_PLUS = b'\x9c'    # Spindle speed override +1%
+    SPINDLE_OVR_FINE_MINUS = b'\x9d'   # Spindle speed override -1%
 
 # https://github.com/gnea/grbl
 # http://linuxcnc.org/docs/html/gcode/overview.html#cap:modal-groups
@@ -1,14 +1,18 @@
 import logging
+import statistics
 import sys
 import threading
 import time
+from collections import deque
+from dataclasses import dataclass, field
 from queue import Empty, Queue
-from typing import Optional
+from typing import Callable, Optional
 
 from serial import SerialException
 
 from core.config import GRBL_SIMULATION
 from core.utilities.gcode.constants import GCODE_PROGRAM_END_CODES
+from core.utilities.gcode.gcodeProgram import comment_pattern
 from core.utilities.grbl.constants import GrblCommand, GrblRealtimeCommand
 from core.utilities.grbl.grblLineParser import GrblLineParser
 from core.utilities.grbl.grblMonitor import GrblMonitor
@@ -28,13 +32,14 @@ from core.utilities.grbl.parsers.grblMsgTypes import (
     GRBL_RESULT_ERROR,
     GRBL_RESULT_OK,
 )
+from core.utilities.grbl.rxBufferTracker import RxBufferTracker
 from core.utilities.grbl.types import (
     GrblBuildInfo,
     GrblControllerParameters,
     GrblSetting,
     GrblSettings,
 )
-from core.utilities.serial import SerialService
+from core.utilities.serial.serialService import SerialService
 
 # Constants
 DISCONNECTED = "DISCONNECTED"
@@ -45,6 +50,33 @@ GRBL_HELP_MESSAGE = "$$ $# $G $I $N $x=val $Nx=line $J=line $C $X $H ~ ! ? ctrl-
 # GRBL query commands: these commands request information and are safe to send
 # in any controller state (including paused/error).
 GRBL_QUERY_COMMANDS = {"$G", "$$", "$#", "$I", "$N"}
+# Prefix of the jog commands, dropped from the queue by a jog cancel
+JOG_COMMAND_PREFIX = "$J="
+# Weight of the last measure in the (smoothed) status report latency
+STATUS_LATENCY_SMOOTHING = 0.2
+# Longest wait for GRBL while there's nothing to send (seconds). Requests from
+# other threads wake serial_io up right away, this is only a safety net.
+IDLE_READ_TIMEOUT = 1.0
+# Samples of the 'ok' to next send latency kept for its median
+OK_LATENCY_SAMPLES = 256
+
+
+@dataclass
+class SerialWriteStats:
+    """Writes of G-code lines to the serial port since the stats were taken."""
+
+    writes: int = 0
+    lines: int = 0
+    started_at: float = field(default_factory=time.monotonic)
+    elapsed: float = 0.0  # Set when taken
+
+    @property
+    def writes_per_second(self) -> float:
+        return self.writes / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def lines_per_second(self) -> float:
+        return self.lines / self.elapsed if self.elapsed else 0.0
 
 
 class GrblController:
@@ -87,10 +119,23 @@ class GrblController:
         self.grbl_status = GrblStatus()
 
         # State variables
-        self._sumcline = 0  # Amount of bytes in GRBL buffer
+        self.rx_buffer = RxBufferTracker(RX_BUFFER_SIZE)  # Commands waiting for their 'ok'
         self.commands_count = 0  # Amount of already processed commands
         self._serial_io_alive = False  # True while the serial_io thread is running
         self._status_query_pending = False  # Set True from main thread; consumed inside serial_io
+        self._jog_cancel_pending = False  # Set True from main thread; consumed inside serial_io
+        # Overrides to send and when they were requested (time.time()), see grbl_override
+        self._overrides_pending: deque[tuple[bytes, float]] = deque()
+        # Seconds from requesting an override to writing it, over the last ones
+        self._override_latencies: deque[float] = deque(maxlen=OK_LATENCY_SAMPLES)
+        self._status_query_sent_at: Optional[float] = None  # When the last '?' was sent
+        self.status_latency: Optional[float] = None  # Smoothed '?' to report time (seconds)
+        self._ack_listeners: list[Callable[[], None]] = []  # Called on every 'ok'
+        # Seconds from an 'ok' freeing RX space to sending the command waiting for it
+        self._ok_to_send_latencies: deque[float] = deque(maxlen=OK_LATENCY_SAMPLES)
+        # Send all the queued commands that fit in the RX buffer in one write
+        self.coalesce_writes = True
+        self.write_stats = SerialWriteStats()
 
     def connect(self, port: str, baudrate: int) -> dict[str, str] | None:
         """Starts the GRBL device connected to the given port."""
@@ -158,6 +203,7 @@ class GrblController:
 
         # Stops communication with serial port
         self.serial_thread = None
+        self.serial.wake()
         self.serial.stopConnection()
         self.grbl_monitor.info("**Disconnected from device**")
 
@@ -165,16 +211,8 @@ class GrblController:
         self.grbl_status.set_flag(GrblStatusFlag.CONNECTED.value, False)
         self.grbl_status.set_active_state(DISCONNECTED)
 
-    def parse_response(self, response: str, cline: list[int], sline: list[str]):
+    def parse_response(self, response: str):
         """Process the response from GRBL and update controller state."""
-
-        def removeProcessedCommand() -> str:
-            if cline:
-                del cline[0]
-            if sline:
-                return sline.pop(0)
-            return ""
-
         try:
             msgType, payload = GrblLineParser.parse(response)
         except Exception as error:
@@ -186,24 +224,24 @@ class GrblController:
 
         # Process parsed response
         if msgType == GRBL_RESULT_OK:
-            done_cmd = removeProcessedCommand()
-            self._sumcline = sum(cline)
+            done_cmd = self.rx_buffer.pop()
             self.commands_count += 1
             self.grbl_monitor.debug(
                 f"[Buffer] ok — drained '{done_cmd}', "
-                f"cline_sum={self._sumcline}/{RX_BUFFER_SIZE}, pending={len(cline)}"
+                f"used={self.rx_buffer.used_bytes}/{RX_BUFFER_SIZE}, "
+                f"pending={len(self.rx_buffer)}"
             )
+            for listener in self._ack_listeners:
+                listener()
             return
 
         if msgType == GRBL_RESULT_ERROR:
             self.set_paused(True)
-            error_line = removeProcessedCommand()
+            error_line = self.rx_buffer.pop()
             # GRBL discards all remaining buffered commands on error — they will
             # never receive ok responses.  Clear the phantom entries so that
             # buffer accounting resets to zero and subsequent queries can be sent.
-            cline.clear()
-            sline.clear()
-            self._sumcline = 0
+            self.rx_buffer.clear()
             del payload["raw"]
             self.grbl_status.set_error(error_line, payload)
             self.grbl_monitor.error(
@@ -215,11 +253,9 @@ class GrblController:
         if msgType == GRBL_MSG_ALARM:
             self.grbl_status.set_flag(GrblStatusFlag.ALARM.value, True)
             self.grbl_status.set_flag(GrblStatusFlag.PAUSED.value, True)
-            error_line = removeProcessedCommand()
+            error_line = self.rx_buffer.pop()
             # Same as error: GRBL abandons buffered commands on alarm.
-            cline.clear()
-            sline.clear()
-            self._sumcline = 0
+            self.rx_buffer.clear()
             del payload["raw"]
             self.grbl_status.set_error(error_line, payload)
             self.grbl_monitor.critical(
@@ -255,8 +291,8 @@ class GrblController:
             # The [GC:...] message is the data payload for a $G query.
             # GRBL still sends a trailing 'ok' for $G, which is the real
             # acknowledgment that the RX buffer slot has been freed.  Do NOT
-            # call removeProcessedCommand() here — the subsequent 'ok' handler
-            # is responsible for draining sline/cline.  Calling it here too
+            # drain the RX buffer tracker here — the subsequent 'ok' handler
+            # is responsible for it.  Calling it here too
             # would remove an extra entry for every $G sent, causing buffer
             # accounting drift and eventual RX buffer overflow (error:1).
             del payload["raw"]
@@ -267,6 +303,7 @@ class GrblController:
             return
 
         if msgType == GRBL_MSG_STATUS:
+            self._update_status_latency()
             del payload["raw"]
             self.grbl_status.update_status(payload)
             self.grbl_monitor.debug(
@@ -313,6 +350,20 @@ class GrblController:
         """Get the count of already processed commands."""
         return self.commands_count
 
+    def add_ack_listener(self, listener: Callable[[], None]):
+        """Register a callable to be notified every time GRBL acknowledges a command.
+
+        Listeners run in the ``serial_io`` thread, right after the
+        acknowledged command was removed from the RX buffer accounting, so
+        they must be fast and thread-safe.
+        """
+        self._ack_listeners.append(listener)
+
+    def remove_ack_listener(self, listener: Callable[[], None]):
+        """Unregister a callable added with `add_ack_listener`."""
+        if listener in self._ack_listeners:
+            self._ack_listeners.remove(listener)
+
     # ACTIONS
 
     def set_paused(self, paused: bool):
@@ -323,6 +374,8 @@ class GrblController:
             return
 
         self.grbl_resume()
+        # The queued commands can be sent again
+        self.serial.wake()
 
     def send_command(self, command: str):
         """Adds a GCODE line or a GRBL command to the serial queue."""
@@ -332,14 +385,19 @@ class GrblController:
             self.commands_count += 1
             return
 
-        import re
-
-        comment_pattern = re.compile(r"(^\(.*\)$)|(^;.*)")
         if comment_pattern.match(tosend):
             self.commands_count += 1
             return
 
-        self.queue.put(tosend)
+        self._queue_command(tosend)
+
+    def send_program_command(self, command: str):
+        """Adds a command of a compiled `GcodeProgram` to the serial queue.
+
+        Program commands are already stripped and never comments, so
+        they skip the checks done by `send_command`.
+        """
+        self._queue_command(command)
 
     def handle_homing_cycle(self):
         """Runs the GRBL device's homing cycle."""
@@ -431,6 +489,38 @@ class GrblController:
 
         # Tell the serial_io thread to stop streaming
         self.grbl_status.set_flag(GrblStatusFlag.STOP.value, True)
+        self.serial.wake()
+
+    def grbl_jog_cancel(self):
+        """
+        Jog Cancel: Immediately cancels the current jog by a feed hold, and
+        flushes the remaining jog motions from the GRBL planner buffer.
+
+        Like `queryStatusReport`, the byte is sent by the ``serial_io``
+        thread, which also drops the jog commands not sent yet.
+        """
+        self._jog_cancel_pending = True
+        self.serial.wake()
+
+    def grbl_override(self, command: GrblRealtimeCommand, requested_at: Optional[float] = None):
+        """
+        Feed, rapid or spindle speed override: GRBL applies it right away,
+        even in the middle of a program.
+
+        Like `grbl_jog_cancel`, the byte is sent by the ``serial_io`` thread,
+        ahead of the commands in the queue. *requested_at* is when the
+        override was requested, as a ``time.time()`` timestamp (now if None),
+        to measure the time until it's written (see `get_override_latency`).
+        """
+        self._overrides_pending.append(
+            (command.value, requested_at if requested_at is not None else time.time())
+        )
+        self.serial.wake()
+
+    @property
+    def jog_cancel_pending(self) -> bool:
+        """Whether a jog cancel was requested, but not sent yet."""
+        return self._jog_cancel_pending
 
     def queryStatusReport(self):
         """Queries the GRBL device's current status.
@@ -441,6 +531,7 @@ class GrblController:
         by the serial thread, which would corrupt the GRBL response stream.
         """
         self._status_query_pending = True
+        self.serial.wake()
 
     # QUERIES
 
@@ -486,10 +577,130 @@ class GrblController:
         Returns how filled the GRBL command buffer is as a percentage,
         useful to monitor buffer usage.
         """
-        return self._sumcline * 100.0 / RX_BUFFER_SIZE
+        return self.rx_buffer.fill
+
+    def get_commands_in_flight(self) -> int:
+        """Returns the amount of commands sent to GRBL and not acknowledged yet."""
+        return self.rx_buffer.in_flight
+
+    def get_oldest_in_flight_age(self) -> Optional[float]:
+        """
+        Returns the seconds since the oldest command not acknowledged yet was
+        sent, None if there's none. Grows steadily while GRBL is stalled.
+        """
+        return self.rx_buffer.oldest_age()
+
+    def get_ok_to_send_latency(self) -> Optional[float]:
+        """
+        Returns the median time (in seconds) from an 'ok' freeing room in the
+        GRBL RX buffer to sending the command that was waiting for it, over
+        the last commands sent. None until measured.
+        """
+        samples = list(self._ok_to_send_latencies)  # snapshot, the serial thread may append
+        if not samples:
+            return None
+        return statistics.median(samples)
+
+    def get_override_latency(self) -> Optional[float]:
+        """
+        Returns the median time (in seconds) from requesting an override to
+        writing it to the serial port, over the last overrides. None until measured.
+        """
+        samples = list(self._override_latencies)  # snapshot, the serial thread may append
+        if not samples:
+            return None
+        return statistics.median(samples)
+
+    def take_write_stats(self) -> SerialWriteStats:
+        """Returns the serial write stats since the last call, and resets them."""
+        now = time.monotonic()
+        stats, self.write_stats = self.write_stats, SerialWriteStats(started_at=now)
+        stats.elapsed = now - stats.started_at
+        return stats
+
+    def get_pending_bytes(self) -> int:
+        """
+        Returns the amount of bytes either in the GRBL RX buffer or waiting
+        in the command queue, useful to know how much more data can be sent
+        without overflowing the device.
+        """
+        queued = list(self.queue.queue)  # snapshot, the serial thread may be consuming
+        return self.rx_buffer.used_bytes + sum(len(command) + 1 for command in queued)
 
     # COMMUNICATION
 
+    def _update_status_latency(self):
+        """Accounts the time since the last '?' was sent, if it's the report it asked for."""
+        sent_at, self._status_query_sent_at = self._status_query_sent_at, None
+        if sent_at is None:
+            return
+
+        latency = time.monotonic() - sent_at
+        if self.status_latency is None:
+            self.status_latency = latency
+        else:
+            self.status_latency += STATUS_LATENCY_SMOOTHING * (latency - self.status_latency)
+
+    def _drop_queued_jogs(self) -> int:
+        """Removes the jog commands from the command queue, returns how many."""
+        with self.queue.mutex:
+            commands = self.queue.queue
+            kept = [command for command in commands if not command.startswith(JOG_COMMAND_PREFIX)]
+            dropped = len(commands) - len(kept)
+            commands.clear()
+            commands.extend(kept)
+        return dropped
+
+    def _queue_command(self, command: str):
+        """Adds a command to the serial queue, waking serial_io up if it was idle."""
+        idle = self.queue.empty()
+        self.queue.put(command)
+        if idle:
+            # Otherwise serial_io is busy with the previous commands, no need to wake it
+            self.serial.wake()
+
+    def _take_batch(self, command: str) -> list[str]:
+        """Returns *command* followed by the queued commands that fit along
+        with it in the RX buffer, to send them all in a single write.
+
+        Stops after a program end code, since serial_io stops sending there,
+        and as soon as a real-time command is requested, not to delay it.
+        """
+        batch = [command]
+        pending = self.rx_buffer.command_bytes(command)
+        paused = self.grbl_status.paused()
+        while command.strip() not in GCODE_PROGRAM_END_CODES:
+            if self._status_query_pending or self._jog_cancel_pending or self._overrides_pending:
+                break
+            try:
+                command = self.queue.queue[0]  # peek, serial_io is the sole consumer
+            except IndexError:
+                break
+            if paused and command not in GRBL_QUERY_COMMANDS:
+                break
+            if not self.rx_buffer.fits(command, pending):
+                break
+            self.queue.get_nowait()
+            batch.append(command)
+            pending += self.rx_buffer.command_bytes(command)
+        return batch
+
+    def _send_overrides(self):
+        """Sends the pending overrides, in a single write."""
+        overrides = []
+        while self._overrides_pending:
+            overrides.append(self._overrides_pending.popleft())
+        try:
+            self.serial.sendBytes(b"".join(command for command, _ in overrides))
+        except SerialException as e:
+            self.grbl_monitor.error(f"Error sending OVERRIDE: {e}")
+            return
+
+        sent_at = time.time()
+        for command, requested_at in overrides:
+            self._override_latencies.append(sent_at - requested_at)
+            self.grbl_monitor.sent(repr(command)[2:-1])
+
     def _empty_queue(self):
         """Empties the command queue."""
         while self.queue.qsize() > 0:
@@ -502,15 +713,16 @@ class GrblController:
         """Thread performing I/O on serial line.
 
         Responsible only for:
+        - Sending the real-time commands requested by other threads
         - Dequeueing commands from the internal queue
-        - Tracking the GRBL RX buffer via ``cline``
+        - Tracking the GRBL RX buffer via ``rx_buffer``
         - Sending commands over serial when buffer space is available
         - Reading and parsing GRBL responses
         - Handling stop requests and program-end codes
         """
-        cline: list[int] = []  # length of pipeline commands
-        sline: list[str] = []  # pipeline commands
         tosend = None  # next string to send
+        ok_at = None  # when an 'ok' made room for tosend
+        self.rx_buffer.clear()
         exit_reason = "loop ended (serial_thread set to None)"
 
         self._serial_io_alive = True
@@ -518,12 +730,20 @@ class GrblController:
 
         while self.serial_thread:
             try:
+                # Send pending overrides (set by grbl_override() from other threads),
+                # ahead of the queued commands and in any state. Like '?' below,
+                # they get an iteration of their own, never in a G-code burst.
+                if self._overrides_pending:
+                    self._send_overrides()
+                    continue
+
                 # Send pending status query (set by queryStatusReport() from main thread).
                 # Doing this here ensures the '?' byte is never written concurrently with
-                # a readLine() or sendLine() call in this same thread.
+                # a readLine() or sendLines() call in this same thread.
                 if self._status_query_pending:
                     try:
                         self.serial.sendBytes(GrblRealtimeCommand.STATUS_REPORT.value)
+                        self._status_query_sent_at = time.monotonic()
                         self.grbl_monitor.sent("?", debug=True)
                     except SerialException as e:
                         self.grbl_monitor.error(f"Error sending STATUS: {e}")
@@ -536,6 +756,19 @@ class GrblController:
                     # the stream and permanently stalling the 'ok' flow.
                     continue
 
+                # Send pending jog cancel (set by grbl_jog_cancel() from main thread).
+                # The jogs not sent yet are dropped first, so none is sent after it.
+                if self._jog_cancel_pending:
+                    dropped = self._drop_queued_jogs()
+                    if tosend is not None and tosend.startswith(JOG_COMMAND_PREFIX):
+                        tosend = ok_at = None
+                        dropped += 1
+                    self._send_realtime(GrblRealtimeCommand.JOG_CANCEL.value, "JOG CANCEL")
+                    # Cleared last, jogs queued from now on are sent after the cancel
+                    self._jog_cancel_pending = False
+                    self.grbl_monitor.debug(f"[Jog] Dropped {dropped} queued jog commands")
+                    continue
+
                 # Fetch new command to send if the queue has work and either:
                 # (a) the controller is not paused, or
                 # (b) the next command is a query (safe in any state).
@@ -550,19 +783,12 @@ class GrblController:
                         except Empty:
                             continue
 
-                    if tosend is not None:
-                        # If necessary, all modifications in tosend should be
-                        # done before adding it to cline
-
-                        # Bookkeeping of the buffers
-                        # +1 accounts for the '\n' appended by sendLine()
-                        sline.append(tosend)
-                        cline.append(len(tosend) + 1)
-
-                # Anything to receive?
-                if self.serial.waiting() or tosend is None:
+                # Anything to receive? With nothing to send, or no room to send it,
+                # wait for GRBL: readLine() returns as soon as a line arrives, or
+                # as soon as another thread wakes serial_io up with a request.
+                if self.serial.waiting() or tosend is None or not self.rx_buffer.fits(tosend):
                     try:
-                        response = self.serial.readLine()
+                        response = self.serial.readLine(IDLE_READ_TIMEOUT)
                     except SerialException:
                         self.grbl_monitor.error(
                             f"Error reading response from GRBL: {str(sys.exc_info()[1])}"
@@ -575,21 +801,28 @@ class GrblController:
                     if not response:
                         pass
                     else:
-                        self.parse_response(response, cline, sline)
+                        in_flight = len(self.rx_buffer)
+                        self.parse_response(response)
+                        # And the ones received along with it, so all the room
+                        # they free in the RX buffer is filled in one write
+                        for response in self.serial.readPendingLines():
+                            if response:
+                                self.parse_response(response)
+                        if tosend is not None and ok_at is None and len(self.rx_buffer) < in_flight:
+                            ok_at = time.monotonic()
 
                 # Received external message to stop
                 if self.grbl_status.get_flag(GrblStatusFlag.STOP.value):
                     self._empty_queue()
-                    tosend = None
+                    tosend = ok_at = None
                     self.grbl_status.set_flag(GrblStatusFlag.STOP.value, False)
                     self.grbl_monitor.info("STOP request processed")
 
-                # Send command to GRBL
-                if tosend is not None and sum(cline) < RX_BUFFER_SIZE:
-                    self._sumcline = sum(cline)
-
+                # Send command to GRBL, along with the next ones that fit
+                if tosend is not None and self.rx_buffer.fits(tosend):
+                    batch = self._take_batch(tosend) if self.coalesce_writes else [tosend]
                     try:
-                        self.serial.sendLine(tosend)
+                        self.serial.sendLines(batch)
                     except SerialException:
                         self.grbl_monitor.error(
                             f"Error sending command to GRBL: {str(sys.exc_info()[1])}"
@@ -605,13 +838,23 @@ class GrblController:
                         exit_reason = "SerialException on write"
                         break
 
-                    self.grbl_monitor.sent(tosend)
+                    if ok_at is not None:
+                        self._ok_to_send_latencies.append(time.monotonic() - ok_at)
+                        ok_at = None
+                    # Accounted once sent, GRBL answers each one with an 'ok' or an error
+                    for command in batch:
+                        self.rx_buffer.push(command)
+                        self.grbl_monitor.sent(command)
+                    self.write_stats.writes += 1
+                    self.write_stats.lines += len(batch)
                     self.grbl_monitor.debug(
-                        f"[Buffer] Sent '{tosend}', "
-                        f"cline_sum={self._sumcline}/{RX_BUFFER_SIZE}, pending={len(cline)}"
+                        f"[Buffer] Sent {len(batch)} command(s) up to '{batch[-1]}', "
+                        f"used={self.rx_buffer.used_bytes}/{RX_BUFFER_SIZE}, "
+                        f"pending={len(self.rx_buffer)}"
                     )
 
-                    # Check if end of program
+                    # Check if end of program, always the last one of the batch
+                    tosend = batch[-1]
                     if tosend.strip() in GCODE_PROGRAM_END_CODES:
                         self.grbl_monitor.info(f"A program end command was found: {tosend}")
                         self.grbl_status.set_flag(GrblStatusFlag.FINISHED.value, True)
@@ -623,7 +866,8 @@ class GrblController:
                 elif tosend is not None:
                     self.grbl_monitor.debug(
                         f"[Buffer] Full — waiting to send '{tosend}', "
-                        f"cline_sum={sum(cline)}/{RX_BUFFER_SIZE}, pending={len(cline)}"
+                        f"used={self.rx_buffer.used_bytes}/{RX_BUFFER_SIZE}, "
+                        f"pending={len(self.rx_buffer)}"
                     )
 
             except Exception:
@@ -639,5 +883,5 @@ class GrblController:
         self._serial_io_alive = False
         self.grbl_monitor.info(
             f"serial_io thread exiting — reason='{exit_reason}', "
-            f"cline_sum={sum(cline)}, pending={len(cline)}"
+            f"used={self.rx_buffer.used_bytes}, pending={len(self.rx_buffer)}"
         )
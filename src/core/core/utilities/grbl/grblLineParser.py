@@ -1,3 +1,5 @@
+import string
+
 from core.utilities.grbl.parsers.grblParserGeneric import GrblParserGeneric
 from core.utilities.grbl.parsers.grblParserMsgAlarm import GrblParserMsgAlarm
 from core.utilities.grbl.parsers.grblParserMsgEcho import GrblParserMsgEcho
@@ -17,63 +19,87 @@ from core.utilities.grbl.parsers.grblParserResultError import GrblParserResultEr
 from core.utilities.grbl.parsers.grblParserResultOk import GrblParserResultOk
 from core.utilities.grbl.types import GrblResponse
 
+# Types definition
+Parsers = tuple[type[GrblParserGeneric], ...]
+
+# Lines starting with a letter or a digit may be a startup message:
+# Grbl X.Xx ['$' for help]
+_STARTUP: Parsers = (GrblParserMsgStartup,)
+# Push messages between brackets, [] (v0.9) and [MSG:] (v1.1), or a v0.9 parser state
+_BRACKETS: Parsers = (GrblParserMsgParserState, GrblParserMsgFeedback)
+
+# Parsers of each message, by its first character, tried in order
+ROUTES: dict[str, Parsers] = {
+    **dict.fromkeys(string.ascii_letters + string.digits, _STARTUP),
+    # * Grbl v1.1
+    #   <Idle|MPos:3.000,2.000,0.000|FS:0,0>
+    #   <Hold:0|MPos:5.000,2.000,0.000|FS:0,0>
+    #   <Idle|MPos:5.000,2.000,0.000|FS:0,0|Ov:100,100,100>
+    #   <Idle|MPos:5.000,2.000,0.000|FS:0,0|WCO:0.000,0.000,0.000>
+    #   <Run|MPos:23.036,1.620,0.000|FS:500,0>
+    "<": (GrblParserMsgStatus,),
+    # ok
+    "o": (GrblParserResultOk, *_STARTUP),
+    # error:x
+    "e": (GrblParserResultError, *_STARTUP),
+    # ALARM:
+    "A": (GrblParserMsgAlarm, *_STARTUP),
+    # $N=line
+    # $x=val
+    "$": (GrblParserMsgUserDefinedStartup, GrblParserMsgSettings),
+    # [...], see BRACKET_ROUTES
+    "[": _BRACKETS,
+}
+
+# Parsers of the messages between brackets, by their tag: [TAG:...]
+BRACKET_ROUTES: dict[str, Parsers] = {
+    # [GC:G38.2 G54 G17 G21 G91 G94 M0 M5 M9 T0 F20. S0.] (v1.1)
+    "GC": _BRACKETS,
+    # [G54:0.000,0.000,0.000]
+    # ...
+    # [G92:0.000,0.000,0.000]
+    # [TLO:0.000]
+    # [PRB:0.000,0.000,0.000:0]
+    **dict.fromkeys(
+        ("G54", "G55", "G56", "G57", "G58", "G59", "G28", "G30", "G92", "TLO", "PRB"),
+        (GrblParserMsgParameters, *_BRACKETS),
+    ),
+    # [HLP:] (v1.1)
+    "HLP": (GrblParserMsgHelp, *_BRACKETS),
+    # [VER:] (v1.1)
+    "VER": (GrblParserMsgVersion, *_BRACKETS),
+    # [OPT:] (v1.1)
+    "OPT": (GrblParserMsgOptions, *_BRACKETS),
+    # [echo:] (v1.1)
+    "echo": (GrblParserMsgEcho, *_BRACKETS),
+}
+
 
 class GrblLineParser:
+    """Parses the lines received from GRBL.
+
+    Each line is routed by its first character (and the tag of the messages
+    between brackets) to the parser of its message, instead of trying every
+    parser in turn: status reports and `ok` responses take a single check.
+    """
+
     @staticmethod
     def parse(line: str) -> GrblResponse:
-        parsers: list[type[GrblParserGeneric]] = [
-            # * Grbl v1.1
-            #   <Idle|MPos:3.000,2.000,0.000|FS:0,0>
-            #   <Hold:0|MPos:5.000,2.000,0.000|FS:0,0>
-            #   <Idle|MPos:5.000,2.000,0.000|FS:0,0|Ov:100,100,100>
-            #   <Idle|MPos:5.000,2.000,0.000|FS:0,0|WCO:0.000,0.000,0.000>
-            #   <Run|MPos:23.036,1.620,0.000|FS:500,0>
-            GrblParserMsgStatus,
-            # ok
-            GrblParserResultOk,
-            # error:x
-            GrblParserResultError,
-            # ALARM:
-            GrblParserMsgAlarm,
-            # [G38.2 G54 G17 G21 G91 G94 M0 M5 M9 T0 F20. S0.] (v0.9)
-            # [GC:G38.2 G54 G17 G21 G91 G94 M0 M5 M9 T0 F20. S0.] (v1.1)
-            GrblParserMsgParserState,
-            # [G54:0.000,0.000,0.000]
-            # [G55:0.000,0.000,0.000]
-            # [G56:0.000,0.000,0.000]
-            # [G57:0.000,0.000,0.000]
-            # [G58:0.000,0.000,0.000]
-            # [G59:0.000,0.000,0.000]
-            # [G28:0.000,0.000,0.000]
-            # [G30:0.000,0.000,0.000]
-            # [G92:0.000,0.000,0.000]
-            # [TLO:0.000]
-            # [PRB:0.000,0.000,0.000:0]
-            GrblParserMsgParameters,
-            # [HLP:] (v1.1)
-            GrblParserMsgHelp,
-            # [VER:] (v1.1)
-            GrblParserMsgVersion,
-            # [OPT:] (v1.1)
-            GrblParserMsgOptions,
-            # [echo:] (v1.1)
-            GrblParserMsgEcho,
-            # [] (v0.9)
-            # [MSG:] (v1.1)
-            GrblParserMsgFeedback,
-            # $N=line
-            GrblParserMsgUserDefinedStartup,
-            # $x=val
-            GrblParserMsgSettings,
-            # Grbl X.Xx ['$' for help]
-            GrblParserMsgStartup,
-        ]
-
-        for parser in parsers:
+        for parser in GrblLineParser.get_parsers(line):
             result = parser.parse(line)
             if result:
                 # Add a "rawline" field to the payload dictionary
-                result[1].update({"raw": line})
+                result[1]["raw"] = line
                 return result
 
         return None, {"raw": line}
+
+    @staticmethod
+    def get_parsers(line: str) -> Parsers:
+        """Returns the parsers that may detect the message of a line, in order."""
+        if not line:
+            return ()
+        if line[0] == "[":
+            tag, found, _ = line[1:].partition(":")
+            return BRACKET_ROUTES.get(tag, _BRACKETS) if found else _BRACKETS
+        return ROUTES.get(line[0], ())
@@ -1,8 +1,9 @@
-import json
 import logging
 from queue import Empty, Queue
-from typing import Optional
+from typing import Optional, Protocol
 
+from core.config import GATEWAY_CODEC
+from core.utilities.gateway.codec import encode, resolve_codec
 from core.utilities.grbl.parsers.grblMsgTypes import GRBL_MSG_STATUS
 from core.utilities.redisPubSubManager import RedisPubSubManagerSync
 
@@ -11,6 +12,10 @@ PUBSUB_CHANNEL = "grbl_messages"
 LOG_LEVELS = ["critical", "error", "warning", "info", "debug"]
 
 
+class MessagePublisher(Protocol):
+    def publish(self, channel: str, message: str | bytes) -> None: ...
+
+
 class GrblMonitor:
     def __init__(self, logger: logging.Logger):
         # Configure logs queue for external monitor
@@ -22,6 +27,8 @@ class GrblMonitor:
         # Start a PubSub manager to notify updates to external apps
         self.redis = RedisPubSubManagerSync()
         self.redis.connect()
+        self.publisher: MessagePublisher = self.redis
+        self.codec = resolve_codec(GATEWAY_CODEC)
 
     def __del__(self):
         # Removes the file handler from the logger
@@ -113,6 +120,11 @@ class GrblMonitor:
 
     # PUBSUB
 
+    def set_publisher(self, publisher: MessagePublisher):
+        """Publishes the messages through another publisher, e.g. one that
+        batches them (see the RedisBatch of the CNC Gateway)."""
+        self.publisher = publisher
+
     def _publish(self, msgType: str, message: str):
-        pubsub_message = json.dumps({"type": msgType, "message": message})
-        self.redis.publish(PUBSUB_CHANNEL, pubsub_message)
+        pubsub_message = encode({"type": msgType, "message": message}, self.codec)
+        self.publisher.publish(PUBSUB_CHANNEL, pubsub_message)
@@ -1,8 +1,10 @@
+import copy
 from enum import Enum
 from typing import Optional
 
 from core.utilities.grbl.constants import GrblActiveState
-from core.utilities.grbl.types import Coordinates, GrblControllerState, GrblError, PositionType
+from core.utilities.grbl.grblStatusReport import StatusReport
+from core.utilities.grbl.types import Coordinates, GrblError, ParserState, PositionType, Status
 
 # Flags
 
@@ -18,41 +20,28 @@ class GrblStatusFlag(Enum):
 # Constants
 
 
-DEFAULT_GRBL_CONTROLLER_STATE = {
-    "status": {
-        "activeState": "",
-        "mpos": {"x": 0.0, "y": 0.0, "z": 0.0},
-        "wpos": {"x": 0.0, "y": 0.0, "z": 0.0},
-        "ov": [],
-        "subState": None,
-        "wco": {"x": 0.0, "y": 0.0, "z": 0.0},
-        "pinstate": None,
-        "buffer": None,
-        "line": None,
-        "accessoryState": None,
-    },
-    "parserstate": {
-        "modal": {
-            "motion": "G0",
-            "wcs": "G54",
-            "plane": "G17",
-            "units": "G21",
-            "distance": "G90",
-            "feedrate": "G94",
-            "program": "M0",
-            "spindle": "M5",
-            "coolant": "M9",
-        },
-        "tool": 0,
-        "feedrate": 0.0,
-        "spindle": 0.0,
+DEFAULT_GRBL_PARSER_STATE: ParserState = {
+    "modal": {
+        "motion": "G0",
+        "wcs": "G54",
+        "plane": "G17",
+        "units": "G21",
+        "distance": "G90",
+        "feedrate": "G94",
+        "program": "M0",
+        "spindle": "M5",
+        "coolant": "M9",
     },
+    "tool": 0,
+    "feedrate": 0.0,
+    "spindle": 0.0,
 }
 
 
 class GrblStatus:
     def __init__(self):
-        self._state: GrblControllerState = DEFAULT_GRBL_CONTROLLER_STATE
+        self._status = StatusReport()
+        self._parser_state: ParserState = copy.deepcopy(DEFAULT_GRBL_PARSER_STATE)
 
         # Errors management
         self._error_line: Optional[str] = None
@@ -67,17 +56,17 @@ class GrblStatus:
         self._flags[key] = value
 
     def set_active_state(self, state: str):
-        self._state["status"]["activeState"] = state
+        self._status.set_active_state(state)
 
     def update_status(self, status: dict[str, str]):
-        self._state["status"].update(status)
+        self._status.update(status)
 
     def update_parser_state(self, parser_state: dict[str, str]):
-        self._state["parserstate"].update(parser_state)
+        self._parser_state.update(parser_state)
 
     def set_tool(self, tool_index: int):
         """Sets the GRBL device's current tool."""
-        self._state["parserstate"]["tool"] = tool_index
+        self._parser_state["tool"] = tool_index
 
     def set_error(self, line: str, data: GrblError):
         self._error_line = line
@@ -102,7 +91,7 @@ class GrblStatus:
 
         Example: { 'x': 0.000, 'y': 0.000, 'z': 0.000 }
         """
-        return self._state["status"][pos_type]
+        return self._status.get_position(pos_type)
 
     def get_modal(self) -> dict[str, str]:
         """Returns the GRBL device's current modal state.
@@ -130,33 +119,38 @@ class GrblStatus:
             - 'spindle': M3: Spindle (cw), M4: Spindle (ccw), M5: Spindle off
             - 'coolant': M7: Mist coolant, M8: Flood coolant, M9: Coolant off, [M7,M8]: Both on
         """
-        return self._state["parserstate"]["modal"]
+        return self._parser_state["modal"]
 
     def get_feedrate(self) -> float:
         """Returns the GRBL device's current feed rate."""
-        return self._state["parserstate"]["feedrate"]
+        return self._parser_state["feedrate"]
 
     def get_spindle(self) -> float:
         """Returns the GRBL device's current spindle speed."""
-        return self._state["parserstate"]["spindle"]
+        return self._parser_state["spindle"]
 
     def get_tool(self) -> int:
         """Returns the GRBL device's current tool."""
-        return self._state["parserstate"]["tool"]
+        return self._parser_state["tool"]
 
-    def get_status_report(self):
+    def get_status_report(self) -> Status:
         """Returns a status report of the device."""
-        return self._state["status"]
+        return self._status.to_dict()
+
+    def get_status_record(self) -> StatusReport:
+        """Returns the record of the device's status, to read its fields and
+        which of them changed without building the whole report."""
+        return self._status
 
-    def get_parser_state(self):
+    def get_parser_state(self) -> ParserState:
         """Returns the current status of the Gcode parser."""
-        return self._state["parserstate"]
+        return self._parser_state
 
     # Checkers
 
     def _check_active_state(self, state: GrblActiveState) -> bool:
         """Helper method to check the active state."""
-        return self._state["status"].get("activeState") == state.value
+        return self._status.active_state == state.value
 
     def is_alarm(self) -> bool:
         """Checks if the GRBL device is currently in ALARM state."""
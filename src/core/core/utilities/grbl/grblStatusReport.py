@@ -0,0 +1,210 @@
+"""Fixed-layout record of GRBL's real-time status report.
+
+`StatusReport` keeps the last known value of each field of the `?` status
+reports, merging every new report into it: fields missing from a report
+(e.g. WCO, which GRBL only sends every few reports) keep their value.
+
+Each update sets, in a bitmask, the bit of every field whose value changed,
+so readers can tell what changed without diffing the whole status.
+
+The record is updated from the serial thread and read from others, e.g. the
+gateway's status publisher: a lock keeps the dirty mask and the values in
+step, so no change is cleared before it is read.
+"""
+
+import threading
+from array import array
+from typing import Any
+
+from core.utilities.grbl.types import Coordinates, Status
+
+AXES = ("x", "y", "z")
+
+
+class StatusField:
+    """Bits of the dirty mask of a `StatusReport`."""
+
+    STATE = 1 << 0  # activeState, subState
+    MPOS = 1 << 1
+    WPOS = 1 << 2
+    WCO = 1 << 3
+    FEEDRATE = 1 << 4
+    SPINDLE = 1 << 5
+    BUFFER = 1 << 6
+    LINE = 1 << 7
+    OVERRIDES = 1 << 8
+    PINSTATE = 1 << 9
+    ACCESSORY_STATE = 1 << 10
+
+    NONE = 0
+    ALL = (1 << 11) - 1
+
+
+# Positions in `StatusReport.positions`: key, field and offset
+_POSITION_FIELDS = (
+    ("mpos", StatusField.MPOS, 0),
+    ("wpos", StatusField.WPOS, 3),
+    ("wco", StatusField.WCO, 6),
+)
+_POSITION_OFFSETS = {key: offset for key, _, offset in _POSITION_FIELDS}
+
+
+class StatusReport:
+    __slots__ = (
+        "active_state",
+        "sub_state",
+        "positions",
+        "feedrate",
+        "spindle",
+        "planner_buffer",
+        "rx_buffer",
+        "line",
+        "overrides",
+        "pinstate",
+        "accessory_state",
+        "dirty",
+        "_lock",
+    )
+
+    def __init__(self):
+        self.active_state = ""
+        self.sub_state: int | None = None
+        # Machine position, work position and work coordinate offset (x, y, z)
+        self.positions = array("d", bytes(9 * 8))
+        # Not reported until GRBL sends them (F: or FS:)
+        self.feedrate: float | None = None
+        self.spindle: float | None = None
+        self.planner_buffer: int | None = None
+        self.rx_buffer: int | None = None
+        self.line: int | None = None
+        self.overrides: tuple[int, ...] = ()
+        self.pinstate: str | None = None
+        self.accessory_state: str | None = None
+        # Fields changed since the last call to `clear_dirty`
+        self.dirty = StatusField.NONE
+        self._lock = threading.Lock()
+
+    # SETTERS
+
+    def set_active_state(self, state: str) -> int:
+        """Sets the active state, returns the changed fields."""
+        with self._lock:
+            if state == self.active_state:
+                return StatusField.NONE
+            self.active_state = state
+            self.dirty |= StatusField.STATE
+            return StatusField.STATE
+
+    def update(self, status: dict[str, Any]) -> int:
+        """Merges a status report, as parsed by `GrblParserMsgStatus`.
+
+        Returns the fields whose value changed, which are also added to the
+        dirty mask.
+        """
+        with self._lock:
+            changed = StatusField.NONE
+
+            state = status.get("activeState")
+            if state is not None and state != self.active_state:
+                self.active_state = state
+                changed |= StatusField.STATE
+            sub_state = status.get("subState")
+            if sub_state is not None and sub_state != self.sub_state:
+                self.sub_state = sub_state
+                changed |= StatusField.STATE
+
+            positions = self.positions
+            for key, field, offset in _POSITION_FIELDS:
+                coordinates = status.get(key)
+                if coordinates is None:
+                    continue
+                for index, axis in enumerate(AXES, start=offset):
+                    value = coordinates.get(axis)
+                    if value is not None and value != positions[index]:
+                        positions[index] = value
+                        changed |= field
+
+            feedrate = status.get("feedrate")
+            if feedrate is not None and feedrate != self.feedrate:
+                self.feedrate = feedrate
+                changed |= StatusField.FEEDRATE
+            spindle = status.get("spindle")
+            if spindle is not None and spindle != self.spindle:
+                self.spindle = spindle
+                changed |= StatusField.SPINDLE
+
+            buffer = status.get("buffer")
+            if buffer is not None and (
+                buffer["planner"] != self.planner_buffer or buffer["rx"] != self.rx_buffer
+            ):
+                self.planner_buffer, self.rx_buffer = buffer["planner"], buffer["rx"]
+                changed |= StatusField.BUFFER
+
+            line = status.get("line")
+            if line is not None and line != self.line:
+                self.line = line
+                changed |= StatusField.LINE
+
+            overrides = status.get("ov")
+            if overrides is not None and tuple(overrides) != self.overrides:
+                self.overrides = tuple(overrides)
+                changed |= StatusField.OVERRIDES
+
+            pinstate = status.get("pinstate")
+            if pinstate is not None and pinstate != self.pinstate:
+                self.pinstate = pinstate
+                changed |= StatusField.PINSTATE
+            accessory_state = status.get("accessoryState")
+            if accessory_state is not None and accessory_state != self.accessory_state:
+                self.accessory_state = accessory_state
+                changed |= StatusField.ACCESSORY_STATE
+
+            self.dirty |= changed
+            return changed
+
+    def clear_dirty(self) -> int:
+        """Returns the fields changed since the last call, and clears them."""
+        with self._lock:
+            dirty, self.dirty = self.dirty, StatusField.NONE
+        return dirty
+
+    # GETTERS
+
+    def get_position(self, key: str) -> Coordinates:
+        """Returns the "mpos", "wpos" or "wco" coordinates."""
+        offset = _POSITION_OFFSETS[key]
+        x, y, z = self.positions[offset : offset + 3]
+        return {"x": x, "y": y, "z": z}
+
+    def to_dict(self, fields: int = StatusField.ALL) -> Status:
+        """Returns the given fields in the dict shape of `GrblStatus.get_status_report`.
+
+        The feed rate and spindle speed are left out until GRBL reports them.
+        """
+        result: dict[str, Any] = {}
+        with self._lock:
+            if fields & StatusField.STATE:
+                result["activeState"] = self.active_state
+                result["subState"] = self.sub_state
+            for key, field, _ in _POSITION_FIELDS:
+                if fields & field:
+                    result[key] = self.get_position(key)
+            if fields & StatusField.FEEDRATE and self.feedrate is not None:
+                result["feedrate"] = self.feedrate
+            if fields & StatusField.SPINDLE and self.spindle is not None:
+                result["spindle"] = self.spindle
+            if fields & StatusField.BUFFER:
+                result["buffer"] = (
+                    None
+                    if self.planner_buffer is None
+                    else {"planner": self.planner_buffer, "rx": self.rx_buffer}
+                )
+            if fields & StatusField.LINE:
+                result["line"] = self.line
+            if fields & StatusField.OVERRIDES:
+                result["ov"] = list(self.overrides)
+            if fields & StatusField.PINSTATE:
+                result["pinstate"] = self.pinstate
+            if fields & StatusField.ACCESSORY_STATE:
+                result["accessoryState"] = self.accessory_state
+        return result  # type: ignore[return-value]
@@ -5,6 +5,10 @@ from core.utilities.grbl.parsers.grblMsgTypes import GRBL_MSG_ALARM
 from core.utilities.grbl.parsers.grblParserGeneric import GrblParserGeneric
 from core.utilities.grbl.types import GrblError
 
+PATTERN = re.compile(r"^ALARM:\s*(.+)$")
+# The first entry of each code wins
+GRBL_ALARMS_BY_CODE = {el["code"]: el for el in reversed(GRBL_ALARMS)}
+
 
 class GrblParserMsgAlarm(GrblParserGeneric):
     """Detects a GRBL ALARM message.
@@ -15,21 +19,16 @@ class GrblParserMsgAlarm(GrblParserGeneric):
 
     @staticmethod
     def parse(line):
-        matches = re.search(r"^ALARM:\s*(.+)$", line)
+        matches = PATTERN.match(line)
 
         if not matches:
             return None
 
-        code = matches.group(1)
-        # Find dictionary matching value in list
-        alarm = None
-        for el in GRBL_ALARMS:
-            if el["code"] == int(code):
-                alarm = el
-                break
+        code = int(matches.group(1))
+        alarm = GRBL_ALARMS_BY_CODE.get(code)
 
         payload: GrblError = {
-            "code": int(code),
+            "code": code,
             "message": alarm["message"] if alarm else "",
             "description": alarm["description"] if alarm else "",
         }
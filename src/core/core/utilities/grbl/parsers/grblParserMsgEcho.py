@@ -3,6 +3,8 @@ import re
 from core.utilities.grbl.parsers.grblMsgTypes import GRBL_MSG_ECHO
 from core.utilities.grbl.parsers.grblParserGeneric import GrblParserGeneric
 
+PATTERN = re.compile(r"^\[(?:echo:)(.+)\]$")
+
 
 class GrblParserMsgEcho(GrblParserGeneric):
     """Detects a GRBL echo message.
@@ -16,7 +18,7 @@ class GrblParserMsgEcho(GrblParserGeneric):
 
     @staticmethod
     def parse(line):
-        matches = re.search(r"^\[(?:echo:)(.+)\]$", line)
+        matches = PATTERN.match(line)
 
         if not matches:
             return None
@@ -3,6 +3,8 @@ import re
 from core.utilities.grbl.parsers.grblMsgTypes import GRBL_MSG_FEEDBACK
 from core.utilities.grbl.parsers.grblParserGeneric import GrblParserGeneric
 
+PATTERN = re.compile(r"^\[(?:MSG:)?(.+)\]$")
+
 
 class GrblParserMsgFeedback(GrblParserGeneric):
     """Detects a GRBL non-queried feedback message.
@@ -17,7 +19,7 @@ class GrblParserMsgFeedback(GrblParserGeneric):
 
     @staticmethod
     def parse(line):
-        matches = re.search(r"^\[(?:MSG:)?(.+)\]$", line)
+        matches = PATTERN.match(line)
 
         if not matches:
             return None
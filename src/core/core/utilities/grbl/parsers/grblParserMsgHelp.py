@@ -3,6 +3,8 @@ import re
 from core.utilities.grbl.parsers.grblMsgTypes import GRBL_MSG_HELP
 from core.utilities.grbl.parsers.grblParserGeneric import GrblParserGeneric
 
+PATTERN = re.compile(r"^\[(?:HLP:)(.+)\]$")
+
 
 class GrblParserMsgHelp(GrblParserGeneric):
     """Detects a GRBL help response, initiated by the user via a `$` print help command.
@@ -13,7 +15,7 @@ class GrblParserMsgHelp(GrblParserGeneric):
 
     @staticmethod
     def parse(line):
-        matches = re.search(r"^\[(?:HLP:)(.+)\]$", line)
+        matches = PATTERN.match(line)
 
         if not matches:
             return None
@@ -3,6 +3,8 @@ import re
 from core.utilities.grbl.parsers.grblMsgTypes import GRBL_MSG_OPTIONS
 from core.utilities.grbl.parsers.grblParserGeneric import GrblParserGeneric
 
+PATTERN = re.compile(r"^\[(?:OPT:)(.+)\]$")
+
 
 class GrblParserMsgOptions(GrblParserGeneric):
     """Detects a GRBL compile-time options message,
@@ -20,14 +22,14 @@ class GrblParserMsgOptions(GrblParserGeneric):
 
     @staticmethod
     def parse(line):
-        matches = re.search(r"^\[(?:OPT:)(.+)\]$", line)
+        matches = PATTERN.match(line)
 
         if not matches:
             return None
 
         # Values are split by commas (,)
         # We ignore the first "[OPT:" and the last character "]"
-        values = re.split(r",", line[5:-1])
+        values = line[5:-1].split(",")
 
         payload = {"optionCode": values[0], "blockBufferSize": values[1], "rxBufferSize": values[2]}
 
@@ -3,6 +3,8 @@ import re
 from core.utilities.grbl.parsers.grblMsgTypes import GRBL_MSG_PARAMS
 from core.utilities.grbl.parsers.grblParserGeneric import GrblParserGeneric
 
+PATTERN = re.compile(r"^\[(G54|G55|G56|G57|G58|G59|G28|G30|G92|TLO|PRB):(.+)\]$")
+
 
 class GrblParserMsgParameters(GrblParserGeneric):
     """Detects a GRBL parameters response, initiated by the user via a `$#` print help command.
@@ -24,7 +26,7 @@ class GrblParserMsgParameters(GrblParserGeneric):
 
     @staticmethod
     def parse(line):
-        matches = re.search(r"^\[(G54|G55|G56|G57|G58|G59|G28|G30|G92|TLO|PRB):(.+)\]$", line)
+        matches = PATTERN.match(line)
 
         if not matches:
             return None
@@ -36,7 +38,7 @@ class GrblParserMsgParameters(GrblParserGeneric):
         payload = {"name": name}
 
         # [Gxx:0.000,0.000,0.000]
-        if re.search(r"^G\d+$", name):
+        if name[0] == "G":
             axes = ["x", "y", "z"]
             values = value.split(",")
             payload["value"] = {}
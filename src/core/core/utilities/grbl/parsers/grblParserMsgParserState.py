@@ -5,12 +5,16 @@ from core.utilities.grbl.constants import GRBL_MODAL_GROUPS
 from core.utilities.grbl.parsers.grblMsgTypes import GRBL_MSG_PARSER_STATE
 from core.utilities.grbl.parsers.grblParserGeneric import GrblParserGeneric
 
+PATTERN = re.compile(r"^\[(?:GC:)?((?:[a-zA-Z][0-9]+(?:\.[0-9]*)?\s*)+)\]$")
+
+# Modal group of each code, the first group listing it wins
+MODAL_GROUP_BY_CODE: dict[str, str] = {}
+for element in reversed(GRBL_MODAL_GROUPS):
+    MODAL_GROUP_BY_CODE.update(dict.fromkeys(element["modes"], element["group"]))
+
 
 def findGroup(code: str) -> str:
-    for element in GRBL_MODAL_GROUPS:
-        if code in element["modes"]:
-            return element["group"]
-    return ""
+    return MODAL_GROUP_BY_CODE.get(code, "")
 
 
 class GrblParserMsgParserState(GrblParserGeneric):
@@ -26,7 +30,7 @@ class GrblParserMsgParserState(GrblParserGeneric):
 
     @staticmethod
     def parse(line):
-        matches = re.search(r"^\[(?:GC:)?((?:[a-zA-Z][0-9]+(?:\.[0-9]*)?\s*)+)\]$", line)
+        matches = PATTERN.match(line)
 
         if not matches:
             return None
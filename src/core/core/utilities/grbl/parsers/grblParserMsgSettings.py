@@ -3,6 +3,8 @@ import re
 from core.utilities.grbl.parsers.grblMsgTypes import GRBL_MSG_SETTING
 from core.utilities.grbl.parsers.grblParserGeneric import GrblParserGeneric
 
+PATTERN = re.compile(r"^(\$[^=]+)=([^ ]*)\s*")
+
 
 class GrblParserMsgSettings(GrblParserGeneric):
     """Detects a GRBL settings message, initiated by the user via a `$$` settings print command.
@@ -13,7 +15,7 @@ class GrblParserMsgSettings(GrblParserGeneric):
 
     @staticmethod
     def parse(line):
-        matches = re.search(r"^(\$[^=]+)=([^ ]*)\s*", line)
+        matches = PATTERN.match(line)
 
         if not matches:
             return None
@@ -3,6 +3,8 @@ import re
 from core.utilities.grbl.parsers.grblMsgTypes import GRBL_MSG_STARTUP
 from core.utilities.grbl.parsers.grblParserGeneric import GrblParserGeneric
 
+PATTERN = re.compile(r"^([a-zA-Z0-9]+)\s+((?:\d+\.){1,2}\d+[a-zA-Z0-9\-\.]*)([^\[]*\[[^\]]+\].*)?")
+
 
 class GrblParserMsgStartup(GrblParserGeneric):
     """Detects a GRBL startup (welcome) message.
@@ -18,9 +20,7 @@ class GrblParserMsgStartup(GrblParserGeneric):
 
     @staticmethod
     def parse(line):
-        matches = re.search(
-            r"^([a-zA-Z0-9]+)\s+((?:\d+\.){1,2}\d+[a-zA-Z0-9\-\.]*)([^\[]*\[[^\]]+\].*)?", line
-        )
+        matches = PATTERN.match(line)
 
         if not matches:
             return None
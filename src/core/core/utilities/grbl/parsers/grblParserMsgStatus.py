@@ -3,6 +3,9 @@ import re
 from core.utilities.grbl.parsers.grblMsgTypes import GRBL_MSG_STATUS
 from core.utilities.grbl.parsers.grblParserGeneric import GrblParserGeneric
 
+PATTERN = re.compile(r"^<(.+)>$")
+AXES = ("x", "y", "z")
+
 
 class GrblParserMsgStatus(GrblParserGeneric):
     """Detects a GRBL real-time status response, initiated by the user via a `?` status command.
@@ -22,7 +25,7 @@ class GrblParserMsgStatus(GrblParserGeneric):
 
     @staticmethod
     def parse(line):
-        matches = re.search(r"^<(.+)>$", line)
+        matches = PATTERN.match(line)
 
         if not matches:
             return None
@@ -30,7 +33,6 @@ class GrblParserMsgStatus(GrblParserGeneric):
         payload = {}
         result = {}
         params = matches.group(1).split("|")
-        axes = ["x", "y", "z"]
 
         # Active State (v1.1)
         # * Valid states types: Idle, Run, Hold, Jog, Alarm, Door, Check, Home, Sleep
@@ -50,56 +52,45 @@ class GrblParserMsgStatus(GrblParserGeneric):
 
         # Identify fields
         for param in params:
-            nv = re.search(r"^(.+):(.+)", param)
-            if nv:
-                type = nv.group(1)
-                value = nv.group(2).split(",")
-                result[type] = value
+            name, _, value = param.rpartition(":")
+            if name and value:
+                result[name] = value.split(",")
 
         # Machine position
-        if "MPos" in result.keys():
-            mPos = result["MPos"]
-            payload["mpos"] = {}
-            for i in range(len(mPos)):
-                payload["mpos"][axes[i]] = float(mPos[i])
+        if "MPos" in result:
+            payload["mpos"] = dict(zip(AXES, map(float, result["MPos"]), strict=False))
 
         # Work position
-        if "WPos" in result.keys():
-            wPos = result["WPos"]
-            payload["wpos"] = {}
-            for i in range(len(mPos)):
-                payload["wpos"][axes[i]] = float(wPos[i])
+        if "WPos" in result:
+            payload["wpos"] = dict(zip(AXES, map(float, result["WPos"]), strict=False))
 
         # Work Coordinate Offset
-        if "WCO" in result.keys():
-            wco = result["WCO"]
-            payload["wco"] = {}
-            for i in range(len(wco)):
-                payload["wco"][axes[i]] = float(wco[i])
+        if "WCO" in result:
+            payload["wco"] = dict(zip(AXES, map(float, result["WCO"]), strict=False))
 
         # Ignored: Planner Buffer (v0.9)
         # Ignored: RX Buffer (v0.9)
 
         # Buffer State
-        if "Bf" in result.keys():
+        if "Bf" in result:
             payload["buffer"] = {}
             payload["buffer"]["planner"] = int(result["Bf"][0])
             payload["buffer"]["rx"] = int(result["Bf"][1])
 
         # Line number
         # Ln:99999 indicates line 99999 is currently being executed.
-        if "Ln" in result.keys():
+        if "Ln" in result:
             payload["line"] = int(result["Ln"][0])
 
         # Feed Rate
         # F:500 contains real-time feed rate data as the value.
         # This appears only when VARIABLE_SPINDLE is disabled.
-        if "F" in result.keys():
+        if "F" in result:
             payload["feedrate"] = float(result["F"][0])
 
         # Current Feed and Speed
         # FS:500,8000 contains real-time feed rate, followed by spindle speed, data as the values.
-        if "FS" in result.keys():
+        if "FS" in result:
             payload["feedrate"] = float(result["FS"][0])
             payload["spindle"] = float(result["FS"][1])
 
@@ -113,13 +104,13 @@ class GrblParserMsgStatus(GrblParserGeneric):
         # - D H R S the door, hold, soft-reset, and cycle-start pins, respectively.
         # - Example: Pn:PZ indicates the probe and z-limit pins are 'triggered'.
         # - Note: A may be added in later versions for an A-axis limit pin.
-        if "Pn" in result.keys():
+        if "Pn" in result:
             payload["pinstate"] = result["Pn"][0]
 
         # Override Values
         # Ov:100,100,100 indicates current override values in percent of programmed values
         # for feed, rapids, and spindle speed, respectively.
-        if "Ov" in result.keys():
+        if "Ov" in result:
             payload["ov"] = [int(ov) for ov in result["Ov"]]
 
         # Accessory State
@@ -132,7 +123,7 @@ class GrblParserMsgStatus(GrblParserGeneric):
         # - C indicates spindle is enabled in the CCW direction. This does not appear with S.
         # - F indicates flood coolant is enabled.
         # - M indicates mist coolant is enabled.
-        if "A" in result.keys():
+        if "A" in result:
             payload["accessoryState"] = result["A"][0]
 
         return GRBL_MSG_STATUS, payload
@@ -3,6 +3,8 @@ import re
 from core.utilities.grbl.parsers.grblMsgTypes import GRBL_MSG_USER_DEFINED_STARTUP
 from core.utilities.grbl.parsers.grblParserGeneric import GrblParserGeneric
 
+PATTERN = re.compile(r"^(\$N[^=]+)=(.*)\s*")
+
 
 class GrblParserMsgUserDefinedStartup(GrblParserGeneric):
     """Detects a GRBL user-defined startup lines message,
@@ -14,7 +16,7 @@ class GrblParserMsgUserDefinedStartup(GrblParserGeneric):
 
     @staticmethod
     def parse(line):
-        matches = re.search(r"^(\$N[^=]+)=(.*)\s*", line)
+        matches = PATTERN.match(line)
 
         if not matches:
             return None
@@ -3,6 +3,8 @@ import re
 from core.utilities.grbl.parsers.grblMsgTypes import GRBL_MSG_VERSION
 from core.utilities.grbl.parsers.grblParserGeneric import GrblParserGeneric
 
+PATTERN = re.compile(r"^\[(?:VER:)(.+)\]$")
+
 
 class GrblParserMsgVersion(GrblParserGeneric):
     """Detects a GRBL version message, initiated by the user via a `$I` print help command.
@@ -18,13 +20,13 @@ class GrblParserMsgVersion(GrblParserGeneric):
 
     @staticmethod
     def parse(line):
-        matches = re.search(r"^\[(?:VER:)(.+)\]$", line)
+        matches = PATTERN.match(line)
 
         if not matches:
             return None
 
         # Use the colons (:) to split the values, ignoring the last character "]"
-        values = re.split(r":", line[:-1])
+        values = line[:-1].split(":")
 
         payload = {"version": values[1], "comment": values[2]}
 
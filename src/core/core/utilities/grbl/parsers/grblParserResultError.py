@@ -5,6 +5,10 @@ from core.utilities.grbl.parsers.grblMsgTypes import GRBL_RESULT_ERROR
 from core.utilities.grbl.parsers.grblParserGeneric import GrblParserGeneric
 from core.utilities.grbl.types import GrblError
 
+PATTERN = re.compile(r"^error:\s*(.+)$")
+# The first entry of each code wins
+GRBL_ERRORS_BY_CODE = {el["code"]: el for el in reversed(GRBL_ERRORS)}
+
 
 class GrblParserResultError(GrblParserGeneric):
     """Detects an error GRBL response.
@@ -15,21 +19,16 @@ class GrblParserResultError(GrblParserGeneric):
 
     @staticmethod
     def parse(line):
-        matches = re.search(r"^error:\s*(.+)$", line)
+        matches = PATTERN.match(line)
 
         if not matches:
             return None
 
-        code = matches.group(1)
-        # Find dictionary matching value in list
-        error = None
-        for el in GRBL_ERRORS:
-            if el["code"] == int(code):
-                error = el
-                break
+        code = int(matches.group(1))
+        error = GRBL_ERRORS_BY_CODE.get(code)
 
         payload: GrblError = {
-            "code": int(code),
+            "code": code,
             "message": error["message"] if error else "",
             "description": error["description"] if error else "",
         }
@@ -1,5 +1,3 @@
-import re
-
 from core.utilities.grbl.parsers.grblMsgTypes import GRBL_RESULT_OK
 from core.utilities.grbl.parsers.grblParserGeneric import GrblParserGeneric
 
@@ -13,9 +11,7 @@ class GrblParserResultOk(GrblParserGeneric):
 
     @staticmethod
     def parse(line):
-        matches = re.match(r"^ok$", line)
-
-        if not matches:
+        if line != "ok":
             return None
 
         return GRBL_RESULT_OK, {}
@@ -0,0 +1,81 @@
+import time
+from collections import deque
+from typing import Optional
+
+
+class RxBufferTracker:
+    """Commands sent to GRBL and not acknowledged yet, in the order they were sent.
+
+    GRBL answers every line with an 'ok' or an error, in order, so the
+    oldest command is the one acknowledged. The amount of bytes the commands
+    take in the GRBL RX buffer is kept as a running total, so sending a
+    command and receiving its 'ok' are both O(1).
+
+    Updated by the serial thread only, but the metrics (`used_bytes`,
+    `fill`, `in_flight`, `oldest_age`) may be read from any thread.
+    """
+
+    def __init__(self, size: int):
+        self.size = size  # Capacity of the GRBL RX buffer (bytes)
+        self._entries: deque[tuple[str, int, float]] = deque()  # command, bytes, sent at
+        self._used = 0
+
+    @staticmethod
+    def command_bytes(command: str) -> int:
+        """Bytes a command takes in the RX buffer, +1 for the '\\n' appended by sendLine()."""
+        return len(command) + 1
+
+    @property
+    def used_bytes(self) -> int:
+        return self._used
+
+    @property
+    def fill(self) -> float:
+        """How filled the RX buffer is, as a percentage."""
+        return self._used * 100.0 / self.size
+
+    @property
+    def in_flight(self) -> int:
+        """Amount of commands waiting for their 'ok'."""
+        return len(self._entries)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def fits(self, command: str, pending: int = 0) -> bool:
+        """Whether *command* can be sent without overflowing the RX buffer.
+
+        *pending* are the bytes of the commands to be sent before it, in the
+        same write.
+        """
+        return self._used + pending + self.command_bytes(command) < self.size
+
+    def push(self, command: str) -> None:
+        """Accounts a command just sent."""
+        size = self.command_bytes(command)
+        self._entries.append((command, size, time.monotonic()))
+        self._used += size
+
+    def pop(self) -> str:
+        """Removes the oldest command, acknowledged by GRBL, and returns it.
+
+        Returns an empty string if there are no commands in flight.
+        """
+        if not self._entries:
+            return ""
+        command, size, _ = self._entries.popleft()
+        self._used -= size
+        return command
+
+    def clear(self) -> None:
+        """Forgets all the commands, e.g. when GRBL discards them on an error."""
+        self._entries.clear()
+        self._used = 0
+
+    def oldest_age(self) -> Optional[float]:
+        """Seconds since the oldest command in flight was sent, None if there's none."""
+        try:
+            _, _, sent_at = self._entries[0]
+        except IndexError:
+            return None
+        return time.monotonic() - sent_at
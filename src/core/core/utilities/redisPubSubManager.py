@@ -44,7 +44,7 @@ class RedisPubSubManagerSync:
         self.redis_connection = redis.Redis(host=self._host, port=self._port, db=self._db)
         self.pubsub = self.redis_connection.pubsub()
 
-    def publish(self, channel: str, message: str) -> None:
+    def publish(self, channel: str, message: str | bytes) -> None:
         assert self.redis_connection is not None, "Call connect() first"
         self.redis_connection.publish(channel, message)
 
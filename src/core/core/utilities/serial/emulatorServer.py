@@ -0,0 +1,88 @@
+"""Serves a `GrblEmulator` over TCP, like a GRBL behind a serial-to-network bridge.
+
+Every client gets a freshly reset device. Connect to it with the port
+``socket://<host>:<port>``.
+
+Usage::
+
+    python -m core.utilities.serial.emulatorServer --port 2323 [--speed 10]
+"""
+
+import argparse
+import logging
+import select
+import socket
+
+from core.utilities.serial.grblEmulator import GrblEmulator
+from core.utilities.serial.transports import EmulatorTransport
+
+RECV_SIZE = 4096
+
+
+def serve_client(client: socket.socket, emulator: GrblEmulator) -> None:
+    """Forwards bytes between *client* and the emulator until the client disconnects."""
+    transport = EmulatorTransport(emulator)
+    transport.open()
+    try:
+        while True:
+            readable, _, _ = select.select([client, transport.fileno()], [], [])
+            if transport.fileno() in readable:
+                client.sendall(transport.read(transport.in_waiting))
+            if client in readable:
+                data = client.recv(RECV_SIZE)
+                if not data:
+                    return
+                transport.write(data)
+    except OSError:
+        return  # Connection lost
+    finally:
+        transport.close()
+
+
+def serve(host: str, port: int, emulator: GrblEmulator, logger: logging.Logger) -> None:
+    """Serves one client at a time, forever."""
+    with socket.create_server((host, port)) as server:
+        logger.info("GRBL emulator listening at socket://%s:%d", host, port)
+        while True:
+            client, address = server.accept()
+            logger.info("Client connected from %s:%d", *address[:2])
+            with client:
+                client.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                serve_client(client, emulator)
+            logger.info(
+                "Client disconnected, emulator stats: %d blocks, %d bytes lost",
+                emulator.executed_blocks,
+                emulator.overflows,
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="GRBL emulator served over TCP")
+    parser.add_argument("--host", default="localhost", help="Address to listen at")
+    parser.add_argument("--port", type=int, default=2323, help="TCP port to listen at")
+    parser.add_argument("--speed", type=float, default=1.0, help="Motion speed multiplier")
+    parser.add_argument("--ok-delay", type=float, default=0.0, help="Seconds to parse a line")
+    parser.add_argument("--block-time", type=float, default=None, help="Seconds per block")
+    # pyserial discards what arrives while opening a socket:// port, the
+    # startup message must come after that
+    parser.add_argument(
+        "--startup-delay", type=float, default=0.1, help="Seconds from connection to startup"
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    logger = logging.getLogger("grbl_emulator")
+    emulator = GrblEmulator(
+        block_time=args.block_time,
+        ok_delay=args.ok_delay,
+        speed=args.speed,
+        startup_delay=args.startup_delay,
+    )
+    try:
+        serve(args.host, args.port, emulator, logger)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
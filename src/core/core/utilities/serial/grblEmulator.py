@@ -0,0 +1,552 @@
+"""Deterministic GRBL emulator, to run the controller without a machine.
+
+`GrblEmulator` models what matters for streaming G-code to GRBL 1.1:
+
+* The serial RX buffer (128 bytes): the bytes received beyond it are lost,
+  as on the device, and counted in `overflows`.
+* The planner (15 blocks): a line is only parsed, and answered with 'ok',
+  when there's room in the planner for its block.
+* The time to parse a line (``ok_delay``) and to execute a block: the
+  distance at the feed rate, or a fixed ``block_time``.
+* Status reports, feed hold, cycle start, soft reset, jog cancel and the
+  feed, rapid and spindle overrides, and the replies to the ``$`` queries
+  of the controller.
+
+Arcs are executed as straight lines and most G-codes are just accepted.
+
+It does no I/O and keeps no time of its own: `update` advances it to the
+time read from ``clock``, processing the events in order, so a test can
+drive it with a fake clock and always get the same result. `EmulatorTransport`
+runs it in real time, behind the transport interface of `SerialService`.
+"""
+
+import math
+import re
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+# Capacities of the device
+RX_BUFFER_SIZE = 128
+PLANNER_SIZE = 15
+
+VERSION = "1.1h"
+STARTUP_MESSAGE = f"Grbl {VERSION} ['$' for help]"
+UNLOCK_MESSAGE = "[MSG:'$H'|'$X' to unlock]"
+HELP_MESSAGE = "[HLP:$$ $# $G $I $N $x=val $Nx=line $J=line $SLP $C $X $H ~ ! ? ctrl-x]"
+
+# Rate of the rapid moves (mm/min)
+RAPID_RATE = 5000.0
+MM_PER_INCH = 25.4
+
+# Settings reported by '$$'
+SETTINGS = {
+    "$0": "10",
+    "$1": "25",
+    "$22": "0",
+    "$100": "250.000",
+    "$101": "250.000",
+    "$102": "250.000",
+    "$110": f"{RAPID_RATE:.3f}",
+    "$111": f"{RAPID_RATE:.3f}",
+    "$112": f"{RAPID_RATE:.3f}",
+}
+
+# Real-time commands, acted upon as soon as received (bytes >= 0x80 too)
+STATUS_REPORT = ord("?")
+FEED_HOLD = ord("!")
+CYCLE_START = ord("~")
+SOFT_RESET = 0x18
+JOG_CANCEL = 0x85
+FEED_OVR_RESET = 0x90
+FEED_OVR_COARSE_PLUS = 0x91
+FEED_OVR_COARSE_MINUS = 0x92
+FEED_OVR_FINE_PLUS = 0x93
+FEED_OVR_FINE_MINUS = 0x94
+RAPID_OVR_RESET = 0x95
+RAPID_OVR_MEDIUM = 0x96
+RAPID_OVR_LOW = 0x97
+SPINDLE_OVR_RESET = 0x99
+SPINDLE_OVR_COARSE_PLUS = 0x9A
+SPINDLE_OVR_COARSE_MINUS = 0x9B
+SPINDLE_OVR_FINE_PLUS = 0x9C
+SPINDLE_OVR_FINE_MINUS = 0x9D
+REALTIME_PATTERN = re.compile(rb"[?!~\x18\x80-\xff]")
+
+WORD_PATTERN = re.compile(r"([A-Z])([-+]?(?:\d+\.?\d*|\.\d+))")
+COMMENT_PATTERN = re.compile(r"\([^)]*\)|;.*")
+
+# Feed and spindle overrides (%): change of each command and limits
+FEED_OVERRIDE_STEPS = {
+    FEED_OVR_COARSE_PLUS: 10,
+    FEED_OVR_COARSE_MINUS: -10,
+    FEED_OVR_FINE_PLUS: 1,
+    FEED_OVR_FINE_MINUS: -1,
+}
+SPINDLE_OVERRIDE_STEPS = {
+    SPINDLE_OVR_COARSE_PLUS: 10,
+    SPINDLE_OVR_COARSE_MINUS: -10,
+    SPINDLE_OVR_FINE_PLUS: 1,
+    SPINDLE_OVR_FINE_MINUS: -1,
+}
+OVERRIDE_MIN = 10
+OVERRIDE_MAX = 200
+# Rapid override (%) set by each command
+RAPID_OVERRIDES = {RAPID_OVR_RESET: 100, RAPID_OVR_MEDIUM: 50, RAPID_OVR_LOW: 25}
+
+# GRBL error codes
+ERROR_EXPECTED_COMMAND_LETTER = 1
+ERROR_INVALID_STATEMENT = 3
+ERROR_SETTING_DISABLED = 8
+ERROR_SYSTEM_GC_LOCK = 9
+ERROR_UNDEFINED_FEED_RATE = 22
+# GRBL alarm codes
+ALARM_ABORT_CYCLE = 3
+
+
+@dataclass
+class _Block:
+    target: tuple[float, float, float]
+    duration: float  # seconds
+    feedrate: float
+    jog: bool = False
+    rapid: bool = False
+
+
+class GrblEmulator:
+    """Emulated GRBL device, see the module documentation."""
+
+    def __init__(
+        self,
+        *,
+        rx_buffer_size: int = RX_BUFFER_SIZE,
+        planner_size: int = PLANNER_SIZE,
+        block_time: Optional[float] = None,
+        ok_delay: float = 0.0,
+        speed: float = 1.0,
+        startup_delay: float = 0.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.rx_buffer_size = rx_buffer_size
+        self.planner_size = planner_size
+        self.block_time = block_time  # Duration of every block, instead of its motion
+        self.ok_delay = ok_delay  # Time to parse a line
+        self.speed = speed  # Motions run this many times faster than at their feed rate
+        self.startup_delay = startup_delay  # Boot time after a reset
+        self._clock = clock
+
+        # Statistics
+        self.overflows = 0  # Bytes lost, received with a full RX buffer
+        self.executed_blocks = 0
+        self.starved_time = 0.0  # Seconds with an empty planner between two blocks
+
+        self._time = clock()
+        self._output = bytearray()
+        self._position = (0.0, 0.0, 0.0)
+        self._alarm = False
+        self._check_mode = False
+        self.reset()
+
+    # ------------------------------------------------------------------
+    # Host side
+    # ------------------------------------------------------------------
+
+    def reset(self) -> None:
+        """Power-on or soft reset: everything received and planned is lost."""
+        self._rx = bytearray()
+        self._planner: deque[_Block] = deque()
+        self._block_end: Optional[float] = None  # When the running block ends
+        self._block_duration = 0.0  # Of the running block, with the overrides
+        self._held_remaining: Optional[float] = None  # Time left of the block on hold
+        self._hold = False
+        self._parsing: Optional[tuple[bytes, float]] = None  # Line being parsed, done at
+        self._starved_since: Optional[float] = None
+        # Modal state
+        self._absolute = True
+        self._units_scale = 1.0
+        self._motion = "G0"
+        self._feedrate = 0.0
+        # Overrides (%): feed, rapid and spindle
+        self._overrides = [100, 100, 100]
+        # Booting, the bytes received meanwhile are lost
+        self._startup_at: Optional[float] = self._time + self.startup_delay
+
+    def receive(self, data: bytes) -> None:
+        """Bytes written by the host."""
+        self.update()
+        if self._startup_at is not None:
+            return
+
+        start = 0
+        for match in REALTIME_PATTERN.finditer(data):
+            self._buffer(data[start : match.start()])
+            self._realtime(data[match.start()])
+            start = match.end()
+        self._buffer(data[start:])
+        self._advance(self._time)
+
+    def read_output(self) -> bytes:
+        """Returns the bytes sent to the host since the last call."""
+        self.update()
+        output = bytes(self._output)
+        self._output.clear()
+        return output
+
+    def update(self) -> None:
+        """Advances the emulation to the current time."""
+        self._advance(max(self._clock(), self._time))
+
+    def next_event(self) -> Optional[float]:
+        """When the emulation has something to do, None if waiting for the host."""
+        times = [self._startup_at, self._block_end]
+        if self._parsing is not None:
+            times.append(self._parsing[1])
+        pending = [event for event in times if event is not None]
+        return min(pending) if pending else None
+
+    # ------------------------------------------------------------------
+    # State
+    # ------------------------------------------------------------------
+
+    @property
+    def state(self) -> str:
+        self.update()
+        return self._state()
+
+    @property
+    def position(self) -> tuple[float, float, float]:
+        """Machine position, interpolated along the running block."""
+        self.update()
+        return self._position_now()
+
+    @property
+    def overrides(self) -> tuple[int, int, int]:
+        """Feed, rapid and spindle overrides (%)."""
+        feed, rapid, spindle = self._overrides
+        return feed, rapid, spindle
+
+    def _state(self) -> str:
+        if self._alarm:
+            return "Alarm"
+        if self._check_mode:
+            return "Check"
+        if self._hold:
+            return "Hold:0" if self._block_end is None else "Hold:1"
+        if self._planner:
+            return "Jog" if self._planner[0].jog else "Run"
+        return "Idle"
+
+    def _position_now(self) -> tuple[float, float, float]:
+        if not self._planner:
+            return self._position
+        block = self._planner[0]
+        if self._block_end is not None:
+            remaining = self._block_end - self._time
+        elif self._held_remaining is not None:
+            remaining = self._held_remaining
+        else:
+            return self._position
+        duration = self._block_duration
+        done = 1.0 - remaining / duration if duration > 0 else 1.0
+        (x, y, z), (tx, ty, tz) = self._position, block.target
+        return (x + (tx - x) * done, y + (ty - y) * done, z + (tz - z) * done)
+
+    def _status_report(self) -> str:
+        x, y, z = self._position_now()
+        running = 0.0
+        if self._planner and self._block_end:
+            block = self._planner[0]
+            running = block.feedrate * self._override_factor(block)
+        free_blocks = self.planner_size - len(self._planner)
+        free_bytes = self.rx_buffer_size - len(self._rx)
+        # GRBL only adds the overrides to some reports, here they're always there
+        feed, rapid, spindle = self._overrides
+        return (
+            f"<{self._state()}|MPos:{x:.3f},{y:.3f},{z:.3f}"
+            f"|Bf:{free_blocks},{free_bytes}|FS:{running:.0f},0|Ov:{feed},{rapid},{spindle}>"
+        )
+
+    # ------------------------------------------------------------------
+    # Emulation
+    # ------------------------------------------------------------------
+
+    def _advance(self, now: float) -> None:
+        """Processes the events until *now*, in order."""
+        while True:
+            self._start_parsing()
+            event = self.next_event()
+            if event is None or event > now:
+                break
+            self._time = max(self._time, event)
+            if self._startup_at is not None and self._startup_at <= self._time:
+                self._startup()
+            elif self._parsing is not None and self._parsing[1] <= self._time:
+                line, _ = self._parsing
+                self._parsing = None
+                self._execute(line)
+            elif self._block_end is not None and self._block_end <= self._time:
+                self._finish_block()
+        self._time = now
+
+    def _send(self, *lines: str) -> None:
+        for line in lines:
+            self._output += line.encode() + b"\r\n"
+
+    def _buffer(self, data: bytes) -> None:
+        room = self.rx_buffer_size - len(self._rx)
+        if len(data) > room:
+            self.overflows += len(data) - room
+            data = data[:room]
+        self._rx += data
+
+    def _realtime(self, command: int) -> None:
+        self._advance(self._time)
+        if command == STATUS_REPORT:
+            self._send(self._status_report())
+        elif command == FEED_HOLD:
+            if self._planner and not self._hold:
+                self._hold = True
+                if self._block_end is not None:
+                    self._held_remaining = self._block_end - self._time
+                    self._block_end = None
+        elif command == CYCLE_START:
+            if self._hold:
+                self._hold = False
+                self._start_block()
+        elif command == SOFT_RESET:
+            if self._planner and self._block_end is not None:
+                # Stopped while moving, the position may be lost
+                self._position = self._position_now()
+                self._alarm = True
+                self._send(f"ALARM:{ALARM_ABORT_CYCLE}")
+            self.reset()
+        elif command == JOG_CANCEL:
+            if self._planner and self._planner[0].jog:
+                self._position = self._position_now()
+                self._planner = deque(block for block in self._planner if not block.jog)
+                self._block_end = self._held_remaining = None
+                self._hold = False
+                self._start_block()
+        elif command == FEED_OVR_RESET or command in FEED_OVERRIDE_STEPS:
+            feed = self._overrides[0] + FEED_OVERRIDE_STEPS.get(command, 0)
+            self._set_override(0, 100 if command == FEED_OVR_RESET else feed)
+        elif command in RAPID_OVERRIDES:
+            self._set_override(1, RAPID_OVERRIDES[command])
+        elif command == SPINDLE_OVR_RESET or command in SPINDLE_OVERRIDE_STEPS:
+            spindle = self._overrides[2] + SPINDLE_OVERRIDE_STEPS.get(command, 0)
+            self._set_override(2, 100 if command == SPINDLE_OVR_RESET else spindle)
+        # The other real-time commands are ignored
+
+    def _override_factor(self, block: _Block) -> float:
+        """Rate of *block* relative to its programmed rate, jogs aren't overridden."""
+        if block.jog:
+            return 1.0
+        return self._overrides[1 if block.rapid else 0] / 100
+
+    def _set_override(self, index: int, value: int) -> None:
+        """Sets an override, the running block goes on at the new rate."""
+        block = self._planner[0] if self._planner else None
+        before = self._override_factor(block) if block is not None else 1.0
+        self._overrides[index] = min(max(value, OVERRIDE_MIN), OVERRIDE_MAX)
+        if block is None:
+            return
+        scale = before / self._override_factor(block)
+        if scale == 1.0:
+            return
+        self._block_duration *= scale
+        if self._block_end is not None:
+            self._block_end = self._time + (self._block_end - self._time) * scale
+        elif self._held_remaining is not None:
+            self._held_remaining *= scale
+
+    def _startup(self) -> None:
+        self._startup_at = None
+        self._send("", STARTUP_MESSAGE)
+        if self._alarm:
+            self._send(UNLOCK_MESSAGE)
+
+    def _start_parsing(self) -> None:
+        """Takes the next line from the RX buffer, if there's room for its block."""
+        if self._parsing is not None or self._startup_at is not None:
+            return
+        if len(self._planner) >= self.planner_size:
+            return
+        eol = self._rx.find(b"\n")
+        if eol < 0:
+            return
+        line = bytes(self._rx[:eol])
+        del self._rx[: eol + 1]
+        self._parsing = (line, self._time + self.ok_delay)
+
+    def _start_block(self) -> None:
+        """Starts executing the first block of the planner, if not already running."""
+        if self._hold or self._block_end is not None or not self._planner:
+            return
+        if self._held_remaining is not None:
+            self._block_end = self._time + self._held_remaining
+            self._held_remaining = None
+        else:
+            block = self._planner[0]
+            self._block_duration = block.duration / self._override_factor(block)
+            self._block_end = self._time + self._block_duration
+        if self._starved_since is not None:
+            self.starved_time += self._time - self._starved_since
+            self._starved_since = None
+
+    def _finish_block(self) -> None:
+        block = self._planner.popleft()
+        self._position = block.target
+        self._block_end = None
+        self.executed_blocks += 1
+        if self._planner:
+            self._start_block()
+        else:
+            self._starved_since = self._time
+
+    def _plan(
+        self,
+        target: tuple[float, float, float],
+        rate: float,
+        jog: bool = False,
+        rapid: bool = False,
+    ) -> None:
+        start = self._planner[-1].target if self._planner else self._position_now()
+        distance = math.dist(start, target)
+        if distance == 0:
+            return
+        duration = self.block_time if self.block_time is not None else distance / rate * 60
+        self._planner.append(_Block(target, duration / self.speed, rate, jog, rapid))
+        self._start_block()
+
+    # ------------------------------------------------------------------
+    # Lines
+    # ------------------------------------------------------------------
+
+    def _execute(self, raw: bytes) -> None:
+        line = COMMENT_PATTERN.sub("", raw.decode("ascii", "ignore")).replace(" ", "").upper()
+        line = line.strip()
+        if not line:
+            self._send("ok")
+            return
+        if line.startswith("$"):
+            self._execute_system(line)
+            return
+        if self._alarm:
+            self._send(f"error:{ERROR_SYSTEM_GC_LOCK}")
+            return
+        error = self._execute_gcode(line)
+        self._send(f"error:{error}" if error else "ok")
+
+    def _execute_system(self, line: str) -> None:
+        if line.startswith("$J="):
+            if self._alarm:
+                self._send(f"error:{ERROR_SYSTEM_GC_LOCK}")
+                return
+            error = self._execute_gcode(line[3:], jog=True)
+            self._send(f"error:{error}" if error else "ok")
+            return
+
+        if line == "$":
+            self._send(HELP_MESSAGE)
+        elif line == "$$":
+            self._send(*(f"{key}={value}" for key, value in SETTINGS.items()))
+        elif line == "$#":
+            coordinates = ("G54", "G55", "G56", "G57", "G58", "G59", "G28", "G30", "G92")
+            self._send(*(f"[{name}:0.000,0.000,0.000]" for name in coordinates))
+            self._send("[TLO:0.000]", "[PRB:0.000,0.000,0.000:0]")
+        elif line == "$G":
+            distance = "G90" if self._absolute else "G91"
+            units = "G21" if self._units_scale == 1.0 else "G20"
+            self._send(
+                f"[GC:{self._motion} G54 G17 {units} {distance} G94 M5 M9 T0 "
+                f"F{self._feedrate:g} S0]"
+            )
+        elif line == "$I":
+            self._send(
+                f"[VER:{VERSION}.20190830:]", f"[OPT:V,{self.planner_size},{self.rx_buffer_size}]"
+            )
+        elif line == "$N":
+            self._send("$N0=", "$N1=")
+        elif line == "$X":
+            self._alarm = False
+            self._send("[MSG:Caution: Unlocked]")
+        elif line == "$H":
+            self._alarm = False
+            self._position = (0.0, 0.0, 0.0)
+        elif line == "$C":
+            self._check_mode = not self._check_mode
+            self._send("[MSG:Enabled]" if self._check_mode else "[MSG:Disabled]")
+        elif re.fullmatch(r"\$\d+=.+", line):
+            pass
+        else:
+            self._send(f"error:{ERROR_INVALID_STATEMENT}")
+            return
+        self._send("ok")
+
+    def _execute_gcode(self, line: str, jog: bool = False) -> int:
+        """Executes a G-code line, returns the GRBL error code, 0 if none."""
+        words = WORD_PATTERN.findall(line)
+        if not words or "".join(letter + value for letter, value in words) != line:
+            return ERROR_EXPECTED_COMMAND_LETTER
+
+        absolute, scale, motion = self._absolute, self._units_scale, self._motion
+        feedrate = None
+        axes: dict[str, float] = {}
+        for letter, value in words:
+            number = float(value)
+            if letter == "G":
+                code = f"G{number:g}"
+                if code in ("G0", "G1", "G2", "G3"):
+                    motion = code
+                elif code in ("G90", "G91"):
+                    absolute = code == "G90"
+                elif code in ("G20", "G21"):
+                    scale = MM_PER_INCH if code == "G20" else 1.0
+            elif letter == "F":
+                feedrate = number
+            elif letter in "XYZ":
+                axes[letter] = number
+
+        if jog:
+            # Modal changes only apply to the jog
+            if feedrate is None or not axes:
+                return ERROR_INVALID_STATEMENT
+            if self._planner and not self._planner[0].jog:
+                return ERROR_SETTING_DISABLED
+            self._move(axes, absolute, scale, feedrate * scale, jog=True)
+            return 0
+
+        if feedrate is not None:
+            feedrate *= scale
+        self._absolute, self._units_scale, self._motion = absolute, scale, motion
+        if feedrate is not None:
+            self._feedrate = feedrate
+        if axes and not self._check_mode:
+            rate = RAPID_RATE if motion == "G0" else self._feedrate
+            if rate <= 0:
+                return ERROR_UNDEFINED_FEED_RATE
+            self._move(axes, absolute, scale, rate, rapid=motion == "G0")
+        return 0
+
+    def _move(
+        self,
+        axes: dict[str, float],
+        absolute: bool,
+        scale: float,
+        rate: float,
+        jog: bool = False,
+        rapid: bool = False,
+    ) -> None:
+        start = self._planner[-1].target if self._planner else self._position_now()
+
+        def axis_target(axis: str, current: float) -> float:
+            if axis not in axes:
+                return current
+            value = axes[axis] * scale
+            return value if absolute else current + value
+
+        x, y, z = start
+        self._plan(
+            (axis_target("X", x), axis_target("Y", y), axis_target("Z", z)), rate, jog, rapid
+        )
@@ -0,0 +1,206 @@
+import io
+import os
+import select
+import threading
+import time
+from typing import Optional
+
+import serial
+import serial.tools.list_ports as serial_ports
+
+from core.utilities.serial.transports import SerialTransport, create_transport
+
+# Max bytes read from the port at once
+READ_CHUNK_SIZE = 4096
+
+
+class SerialService:
+    def __init__(self):
+        self.interface: SerialTransport = serial.Serial()
+        self._write_lock = threading.Lock()
+        # Bytes received and not returned by readLine() yet, partial lines included
+        self._rx = bytearray()
+        # Pipe to interrupt a readLine() waiting on the port, see wake()
+        self._wake_pipe: Optional[tuple[int, int]] = None
+
+    @classmethod
+    def get_ports(cls):
+        return serial_ports.comports()
+
+    def startConnection(self, port: str, baudrate: int, timeout: float = 2) -> str:
+        """Closes any previous connection and starts a new one.
+
+        The port is a device name or a URL, see `create_transport`.
+        """
+        # Close any previous serial connection
+        if self.interface.is_open:
+            self.interface.close()
+        # A serial port keeps its interface, the other transports depend on the URL
+        if "://" in port or type(self.interface) is not serial.Serial:
+            self.interface = create_transport(port)
+
+        # Configure the new values
+        self.interface.port = port
+        self.interface.baudrate = baudrate
+        self.interface.timeout = timeout
+
+        # Start the connection
+        self.interface.open()
+        self._rx.clear()
+
+        # Dump any data already received
+        # self.interface.reset_input_buffer()
+
+        # Wait for the response
+        return self.readLineUntilMessage()
+
+    def waiting(self) -> bool:
+        return (b"\n" in self._rx) or self.interface.in_waiting
+
+    def sendBytes(self, code: bytes):
+        """Sends byte(s) via serial port.
+
+        Thread-safe: acquires ``_write_lock`` so that concurrent writes
+        from this method and ``sendLine`` never interleave on the wire.
+        """
+        with self._write_lock:
+            self.interface.write(code)
+
+    def sendLine(self, code: str):
+        """Sends a line via serial port.
+
+        Thread-safe: acquires ``_write_lock`` so that concurrent writes
+        from this method and ``sendBytes`` never interleave on the wire.
+        """
+        # Strip all EOL characters for consistency
+        message = code.strip() + "\n"
+        # Send line
+        with self._write_lock:
+            self.interface.write(message.encode())
+
+    def sendLines(self, codes: list[str]):
+        """Sends several lines via serial port, in a single write.
+
+        Thread-safe, like `sendLine`.
+        """
+        message = "".join(code.strip() + "\n" for code in codes).encode()
+        with self._write_lock:
+            self.interface.write(message)
+
+    def readLine(self, timeout: Optional[float] = None) -> str:
+        """Waits for response with carriage return.
+
+        Returns an empty string if no complete line arrives within *timeout*
+        seconds (the port timeout if None), or if `wake` is called meanwhile.
+
+        Waits on the file descriptor of the port, the bytes received are kept
+        across calls, so a line received in parts is never lost nor waited for
+        twice. Ports without a file descriptor are read with ``readline``,
+        which always waits for the port timeout.
+        """
+        line = self._pop_line()
+        if line is not None:
+            return line
+
+        fd = self._fileno()
+        if fd is None:
+            return str(self.interface.readline().decode("ascii", "ignore")).strip()
+
+        wake_fd = self._get_wake_pipe()[0]
+        if timeout is None:
+            timeout = self.interface.timeout
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = None if deadline is None else max(deadline - time.monotonic(), 0)
+            try:
+                readable, _, _ = select.select([fd, wake_fd], [], [], remaining)
+            except (OSError, ValueError) as error:
+                # The port was closed while waiting
+                raise serial.SerialException(f"Error waiting for the port: {error}") from error
+
+            if fd in readable:
+                self._rx += self.interface.read(self.interface.in_waiting or 1)
+                line = self._pop_line()
+                if line is not None:
+                    return line
+            if wake_fd in readable:
+                self._drain_wake_pipe()
+                return ""
+            if not readable:
+                return ""
+
+    def readPendingLines(self) -> list[str]:
+        """Returns the lines already received, without waiting for more.
+
+        Only for ports waited on with select, see `readLine`.
+        """
+        if self._fileno() is not None and self.interface.in_waiting:
+            self._rx += self.interface.read(self.interface.in_waiting)
+        lines = []
+        while (line := self._pop_line()) is not None:
+            lines.append(line)
+        return lines
+
+    def wake(self):
+        """Interrupts a `readLine` waiting on the port, from any thread.
+
+        If no `readLine` is waiting, the next one returns right away.
+        """
+        if self._wake_pipe is None:
+            return  # Never waited on the port
+        _, wake_write = self._wake_pipe
+        try:
+            os.write(wake_write, b"\0")
+        except BlockingIOError:
+            pass  # Already woken up
+
+    def readLineUntilMessage(self, max_retries: int = 30) -> str:
+        """Waits for response with carriage return.
+        Ignores empty messages and timeouts until an actual message arrives.
+        """
+        response = ""
+        retries = 0
+        while not response and retries <= max_retries:
+            response = self.readLine().strip()
+            retries = retries + 1
+        return response
+
+    def stopConnection(self):
+        """Closes any previous connection."""
+        if self.interface.is_open:
+            self.interface.close()
+        return
+
+    def _pop_line(self) -> Optional[str]:
+        """Removes the first complete line from the received bytes and returns it."""
+        eol = self._rx.find(b"\n")
+        if eol < 0:
+            return None
+        line = self._rx[:eol].decode("ascii", "ignore").strip()
+        del self._rx[: eol + 1]
+        return line
+
+    def _fileno(self) -> Optional[int]:
+        """File descriptor of the port, None if it can't be waited on with select."""
+        if os.name == "nt":
+            return None
+        try:
+            return self.interface.fileno()
+        except (AttributeError, io.UnsupportedOperation, serial.SerialException):
+            return None
+
+    def _get_wake_pipe(self) -> tuple[int, int]:
+        if self._wake_pipe is None:
+            wake_read, wake_write = os.pipe()
+            os.set_blocking(wake_read, False)
+            os.set_blocking(wake_write, False)
+            self._wake_pipe = (wake_read, wake_write)
+        return self._wake_pipe
+
+    def _drain_wake_pipe(self):
+        wake_read, _ = self._get_wake_pipe()
+        try:
+            while os.read(wake_read, READ_CHUNK_SIZE):
+                pass
+        except BlockingIOError:
+            pass
@@ -0,0 +1,203 @@
+"""Transports of `SerialService`: the connection to the GRBL device.
+
+The port given to `SerialService.startConnection` selects the transport:
+
+* A device name (``/dev/ttyUSB0``, ``COM3``): a serial port (pyserial).
+* A pyserial URL, like ``socket://host:port`` for GRBL over TCP (see
+  ``core.utilities.serial.emulatorServer``) or ``rfc2217://host:port``.
+* ``emulator://``: a `GrblEmulator` run in-process by `EmulatorTransport`.
+  It takes the emulator parameters as a query string, for example
+  ``emulator://?speed=10&ok_delay=0.001``.
+"""
+
+import io
+import os
+import threading
+import time
+from typing import Optional, Protocol
+from urllib.parse import parse_qsl, urlsplit
+
+import serial
+
+from core.utilities.serial.grblEmulator import GrblEmulator
+
+EMULATOR_URL = "emulator://"
+# Parameters of the emulator accepted in its URL
+EMULATOR_PARAMETERS = ("block_time", "ok_delay", "speed", "startup_delay")
+
+
+class SerialTransport(Protocol):
+    """Subset of the ``serial.Serial`` interface used by `SerialService`."""
+
+    port: Optional[str]
+    baudrate: int
+    timeout: Optional[float]
+    is_open: bool
+
+    def open(self) -> None: ...
+
+    def close(self) -> None: ...
+
+    @property
+    def in_waiting(self) -> int: ...
+
+    def read(self, size: int = 1) -> bytes: ...
+
+    def readline(self) -> bytes: ...
+
+    def write(self, data: bytes) -> Optional[int]: ...
+
+    def fileno(self) -> int: ...
+
+
+def create_transport(port: str) -> SerialTransport:
+    """Returns a transport, not open yet, for *port*."""
+    if port.startswith(EMULATOR_URL):
+        return EmulatorTransport.from_url(port)
+    if "://" in port:
+        return serial.serial_for_url(port, do_not_open=True)
+    return serial.Serial()
+
+
+class EmulatorTransport:
+    """In-process transport to a `GrblEmulator`, run in real time by a thread.
+
+    The device is reset when the port is opened, like an Arduino. The bytes
+    it sends are kept until read; on POSIX a pipe is readable meanwhile,
+    so `SerialService` can wait on `fileno` like on a serial port.
+    """
+
+    def __init__(
+        self,
+        emulator: Optional[GrblEmulator] = None,
+        *,
+        timeout: Optional[float] = None,
+        selectable: bool = True,
+    ):
+        self.emulator = emulator if emulator is not None else GrblEmulator()
+        self.port: Optional[str] = EMULATOR_URL
+        self.baudrate = 115200
+        self.timeout = timeout
+        self.is_open = False
+        self._selectable = selectable and os.name != "nt"
+
+        self._cond = threading.Condition()
+        self._output = bytearray()
+        self._pipe: Optional[tuple[int, int]] = None  # Readable while there's output
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def from_url(cls, url: str) -> "EmulatorTransport":
+        parameters = {
+            key: float(value)
+            for key, value in parse_qsl(urlsplit(url).query)
+            if key in EMULATOR_PARAMETERS
+        }
+        return cls(GrblEmulator(**parameters))
+
+    # serial.Serial interface
+
+    def open(self) -> None:
+        if self.is_open:
+            raise serial.SerialException("Port is already open.")
+        with self._cond:
+            self.is_open = True
+            self._output.clear()
+            if self._selectable:
+                self._pipe = os.pipe()
+                for fd in self._pipe:
+                    os.set_blocking(fd, False)
+            # Power on now, what was sent while the port was closed is lost
+            self.emulator.read_output()
+            self.emulator.reset()
+            self._collect()
+        self._thread = threading.Thread(target=self._run, name="grbl_emulator", daemon=True)
+        self._thread.start()
+
+    def close(self) -> None:
+        with self._cond:
+            if not self.is_open:
+                return
+            self.is_open = False
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._pipe is not None:
+            for fd in self._pipe:
+                os.close(fd)
+            self._pipe = None
+
+    @property
+    def in_waiting(self) -> int:
+        with self._cond:
+            return len(self._output)
+
+    def fileno(self) -> int:
+        if self._pipe is None:
+            raise io.UnsupportedOperation("fileno")
+        return self._pipe[0]
+
+    def read(self, size: int = 1) -> bytes:
+        with self._cond:
+            self._wait(lambda: bool(self._output))
+            return self._take(size)
+
+    def readline(self) -> bytes:
+        with self._cond:
+            self._wait(lambda: b"\n" in self._output)
+            eol = self._output.find(b"\n")
+            return self._take(eol + 1 if eol >= 0 else len(self._output))
+
+    def write(self, data: bytes) -> int:
+        with self._cond:
+            if not self.is_open:
+                raise serial.PortNotOpenError()
+            self.emulator.receive(data)
+            self._collect()
+            self._cond.notify_all()
+        return len(data)
+
+    def reset_input_buffer(self) -> None:
+        with self._cond:
+            self._take(len(self._output))
+
+    # Internal
+
+    def _run(self) -> None:
+        with self._cond:
+            while self.is_open:
+                self.emulator.update()
+                self._collect()
+                next_event = self.emulator.next_event()
+                timeout = None if next_event is None else max(next_event - time.monotonic(), 0)
+                self._cond.wait(timeout)
+
+    def _wait(self, ready) -> None:
+        """Waits, holding the condition, until *ready* or the port timeout."""
+        deadline = None if self.timeout is None else time.monotonic() + self.timeout
+        while not ready() and self.is_open:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return
+            self._cond.wait(remaining)
+
+    def _collect(self) -> None:
+        """Moves the output of the emulator to the input of the host."""
+        output = self.emulator.read_output()
+        if not output:
+            return
+        if not self._output and self._pipe is not None:
+            os.write(self._pipe[1], b"\0")
+        self._output += output
+        self._cond.notify_all()
+
+    def _take(self, size: int) -> bytes:
+        data = bytes(self._output[:size])
+        del self._output[:size]
+        if not self._output and self._pipe is not None:
+            try:
+                os.read(self._pipe[0], 1)
+            except BlockingIOError:
+                pass
+        return data
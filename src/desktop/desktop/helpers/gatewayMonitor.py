@@ -11,15 +11,19 @@ Signal interface
 * ``file_finished()``                       — G-code file completed successfully
 * ``file_failed(error_msg)``                — G-code file execution failed
 
+The ``grbl_status`` channel only carries the changes of the status (see
+``core.utilities.gateway.statusDelta``), the complete status is rebuilt
+from them before emitting ``new_status``.
+
 See DR-0001 for the architecture rationale.
 """
 
 from __future__ import annotations
 
-import json
 import logging
 import threading
 
+from core.utilities.gateway.codec import CodecError, decode
 from core.utilities.gateway.constants import (
     EVENT_FILE_FAILED,
     EVENT_FILE_FINISHED,
@@ -28,7 +32,9 @@ from core.utilities.gateway.constants import (
     STATUS_CHANNEL,
 )
 from core.utilities.gateway.gatewayClient import GatewayClient
+from core.utilities.gateway.statusDelta import StatusReassembler
 from PyQt5.QtCore import QObject, pyqtSignal
+from redis.exceptions import RedisError
 
 logger = logging.getLogger(__name__)
 
@@ -48,6 +54,7 @@ class GatewayMonitor(QObject):
     def __init__(self) -> None:
         super().__init__()
         self._gateway = GatewayClient()
+        self._reassembler = StatusReassembler()
         self._thread: threading.Thread | None = None
         self._running = False
 
@@ -77,6 +84,8 @@ class GatewayMonitor(QObject):
             MESSAGES_CHANNEL,
         )
         try:
+            # Start from the last status, the channel only carries its changes
+            self._resync()
             while self._running:
                 raw = pubsub.get_message(timeout=1.0)
                 if raw is None or raw["type"] != "message":
@@ -87,8 +96,8 @@ class GatewayMonitor(QObject):
                     channel = channel.decode()
 
                 try:
-                    data = json.loads(raw["data"])
-                except (json.JSONDecodeError, TypeError):
+                    data = decode(raw["data"])
+                except CodecError:
                     continue
 
                 if channel == STATUS_CHANNEL:
@@ -106,8 +115,30 @@ class GatewayMonitor(QObject):
             except Exception:
                 pass
 
+    def _resync(self) -> None:
+        """Rebuild the status from the last snapshot persisted by the Gateway."""
+        try:
+            snapshot = self._gateway.get_last_status()
+        except RedisError:
+            logger.warning("Could not read the last status from the Gateway")
+            return
+        if snapshot:
+            self._emit_status(self._reassembler.apply(snapshot))
+
     def _handle_status(self, data: dict) -> None:
         """Process a ``grbl_status`` message."""
+        state = self._reassembler.apply(data)
+        if state is None and self._reassembler.needs_keyframe:
+            # A delta was missed, don't wait for the next keyframe
+            self._resync()
+            return
+        self._emit_status(state)
+
+    def _emit_status(self, data: dict | None) -> None:
+        """Emit the signals of a complete status."""
+        if data is None:
+            return
+
         status = data.get("status")
         parserstate = data.get("parserstate")
         if status and parserstate:
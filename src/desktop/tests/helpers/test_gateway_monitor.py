@@ -219,3 +219,53 @@ class TestGatewayMonitor:
 
         assert handle_status.call_count == 1
         assert handle_event.call_count == 1
+
+    def test_status_deltas_are_merged(self, qtbot: QtBot):
+        """Deltas are merged into the last keyframe before emitting new_status."""
+        parser_data = {"feedrate": 500, "spindle": 1000, "tool": 1}
+        self.monitor._handle_status(
+            {
+                "type": "keyframe",
+                "seq": 1,
+                "status": {"activeState": "Idle", "line": None},
+                "parserstate": parser_data,
+                "file_progress": None,
+            }
+        )
+
+        def validate_signal(status, parserstate):
+            return status == {"activeState": "Run", "line": None} and parserstate == parser_data
+
+        with qtbot.waitSignal(
+            self.monitor.new_status,
+            check_params_cb=validate_signal,
+            raising=True,
+        ):
+            self.monitor._handle_status(
+                {"type": "delta", "seq": 2, "status": {"activeState": "Run"}}
+            )
+
+    def test_missed_status_delta_resyncs(self, qtbot: QtBot):
+        """A missed delta rebuilds the status from the last snapshot."""
+        self.monitor._gateway.get_last_status.return_value = {
+            "type": "keyframe",
+            "seq": 3,
+            "status": {"activeState": "Hold"},
+            "parserstate": {"tool": 1},
+            "file_progress": None,
+        }
+        self.monitor._handle_status(
+            {"type": "keyframe", "seq": 1, "status": {}, "parserstate": {}, "file_progress": None}
+        )
+
+        def validate_signal(status, parserstate):
+            return status == {"activeState": "Hold"}
+
+        with qtbot.waitSignal(
+            self.monitor.new_status,
+            check_params_cb=validate_signal,
+            raising=True,
+        ):
+            self.monitor._handle_status(
+                {"type": "delta", "seq": 3, "status": {"activeState": "Hold"}}
+            )
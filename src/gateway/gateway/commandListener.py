@@ -0,0 +1,92 @@
+"""Background listener for the Gateway priority queues.
+
+Waits on the Redis priority queues with ``BLPOP`` in a dedicated thread,
+so the Gateway event loop never blocks on Redis. Messages are handed over
+to the loop **one at a time**: the listener does not pop the next message
+until the previous one was consumed, which keeps the backlog in Redis and
+preserves the order of ``ALL_QUEUES`` (``critical`` > ``high`` >
+``normal``) for every single pop.
+"""
+
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+import time
+from typing import Callable, Optional
+
+import redis
+from core.utilities.gateway.constants import ALL_QUEUES
+
+logger = logging.getLogger(__name__)
+
+# BLPOP timeout in seconds — controls how often the listener can check
+# whether it was asked to stop.
+LISTENER_BLPOP_TIMEOUT = 1
+# Delay before retrying after a Redis error (seconds)
+LISTENER_RETRY_DELAY = 1.0
+
+
+class CommandListener:
+    """Pops raw messages from the priority queues in a background thread.
+
+    *on_message* is called from the listener thread every time a message
+    is ready to be consumed with `get_message`. Messages are stamped with
+    the time they were popped, by the Gateway's clock.
+    """
+
+    def __init__(self, redis_conn: redis.Redis, on_message: Callable[[], None]):
+        self._redis = redis_conn
+        self._on_message = on_message
+        self._inbox: queue.Queue[tuple[bytes, bytes, float]] = queue.Queue(maxsize=1)
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="command_listener", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=LISTENER_BLPOP_TIMEOUT + 1)
+            self._thread = None
+
+    def get_message(self) -> Optional[tuple[bytes, bytes, float]]:
+        """Return the pending ``(queue_name, raw_message, received_at)``, if any."""
+        try:
+            return self._inbox.get_nowait()
+        except queue.Empty:
+            return None
+
+    # ------------------------------------------------------------------
+    # Thread body
+    # ------------------------------------------------------------------
+
+    def _run(self) -> None:
+        while not self._stop_event.is_set():
+            try:
+                result = self._redis.blpop(ALL_QUEUES, timeout=LISTENER_BLPOP_TIMEOUT)
+            except redis.RedisError:
+                logger.error("Error reading the command queues", exc_info=True)
+                self._stop_event.wait(LISTENER_RETRY_DELAY)
+                continue
+
+            if result is None:
+                continue
+
+            queue_name, raw_message = result
+            self._hand_over((queue_name, raw_message, time.time()))
+
+    def _hand_over(self, message: tuple[bytes, bytes, float]) -> None:
+        while not self._stop_event.is_set():
+            try:
+                self._inbox.put(message, timeout=LISTENER_BLPOP_TIMEOUT)
+            except queue.Full:
+                continue
+            self._on_message()
+            return
+
+        logger.warning("Command listener stopped, dropping message from %s", message[0])
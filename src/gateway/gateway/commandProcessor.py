@@ -1,33 +1,56 @@
 """Command processor for the CNC Gateway.
 
-Consumes commands from the priority Redis queues via ``BLPOP`` and
-dispatches them to the appropriate handler on the GrblController.
+Consumes commands from the priority Redis queues via ``BLPOP`` (directly
+or through a background `CommandListener`) and dispatches them to the
+appropriate handler on the GrblController.
 """
 
 from __future__ import annotations
 
-import json
 import logging
-from typing import TYPE_CHECKING, Any
+import time
+from typing import TYPE_CHECKING, Any, Callable, Optional
 
 import redis
 from core.config import REDIS_DB_STORAGE, REDIS_HOST, REDIS_PORT
+from core.utilities.gateway.codec import CodecError, decode
 from core.utilities.gateway.constants import (
+    ACTION_FEED_100,
+    ACTION_FEED_MINUS_1,
+    ACTION_FEED_MINUS_10,
+    ACTION_FEED_PLUS_1,
+    ACTION_FEED_PLUS_10,
     ACTION_PAUSE,
+    ACTION_RAPID_25,
+    ACTION_RAPID_50,
+    ACTION_RAPID_100,
     ACTION_RESUME,
     ACTION_SOFT_RESET,
+    ACTION_SPINDLE_100,
+    ACTION_SPINDLE_MINUS_1,
+    ACTION_SPINDLE_MINUS_10,
+    ACTION_SPINDLE_PLUS_1,
+    ACTION_SPINDLE_PLUS_10,
     ACTION_STOP,
     ALL_QUEUES,
+    EXEC_MODE_PACED,
     MSG_COMMAND,
     MSG_DISCONNECT,
     MSG_FILE_START,
     MSG_FILE_STOP,
     MSG_JOG,
+    MSG_JOG_CANCEL,
+    MSG_JOG_HOLD,
     MSG_QUERY,
     MSG_REALTIME,
+    QUEUE_HIGH,
 )
+from core.utilities.grbl.constants import GrblRealtimeCommand
 from core.utilities.grbl.grblUtils import build_jog_command
 
+from gateway.commandListener import CommandListener
+from gateway.continuousJog import ContinuousJog
+
 if TYPE_CHECKING:
     from core.utilities.grbl.grblController import GrblController
 
@@ -40,13 +63,32 @@ logger = logging.getLogger(__name__)
 # shutdown signals when no commands are queued.
 BLPOP_TIMEOUT = 1
 
+# GRBL real-time command of each override action
+OVERRIDE_COMMANDS = {
+    ACTION_FEED_100: GrblRealtimeCommand.FEED_OVR_RESET,
+    ACTION_FEED_PLUS_10: GrblRealtimeCommand.FEED_OVR_COARSE_PLUS,
+    ACTION_FEED_MINUS_10: GrblRealtimeCommand.FEED_OVR_COARSE_MINUS,
+    ACTION_FEED_PLUS_1: GrblRealtimeCommand.FEED_OVR_FINE_PLUS,
+    ACTION_FEED_MINUS_1: GrblRealtimeCommand.FEED_OVR_FINE_MINUS,
+    ACTION_RAPID_100: GrblRealtimeCommand.RAPID_OVR_RESET,
+    ACTION_RAPID_50: GrblRealtimeCommand.RAPID_OVR_MEDIUM,
+    ACTION_RAPID_25: GrblRealtimeCommand.RAPID_OVR_LOW,
+    ACTION_SPINDLE_100: GrblRealtimeCommand.SPINDLE_OVR_RESET,
+    ACTION_SPINDLE_PLUS_10: GrblRealtimeCommand.SPINDLE_OVR_COARSE_PLUS,
+    ACTION_SPINDLE_MINUS_10: GrblRealtimeCommand.SPINDLE_OVR_COARSE_MINUS,
+    ACTION_SPINDLE_PLUS_1: GrblRealtimeCommand.SPINDLE_OVR_FINE_PLUS,
+    ACTION_SPINDLE_MINUS_1: GrblRealtimeCommand.SPINDLE_OVR_FINE_MINUS,
+}
+
 
 class CommandProcessor:
     """Reads from the priority queues and dispatches commands.
 
-    The processor runs in the main thread of the Gateway. It blocks on
-    ``BLPOP`` for up to *BLPOP_TIMEOUT* seconds, then returns to let the
-    caller perform housekeeping (status publishing, etc.).
+    The processor runs in the main thread of the Gateway. Commands are
+    either popped by a background `CommandListener` and processed with
+    `process_pending` when the event loop wakes up, or popped directly
+    with `process_one`, which blocks on ``BLPOP`` for up to
+    *BLPOP_TIMEOUT* seconds.
     """
 
     def __init__(
@@ -58,14 +100,19 @@ class CommandProcessor:
         host: str = REDIS_HOST,
         port: int = REDIS_PORT,
         db: int = REDIS_DB_STORAGE,
+        continuous_jog: ContinuousJog | None = None,
     ):
         self.controller = controller
         self.session_manager = session_manager
         self.file_executor = file_executor
+        self.continuous_jog = (
+            continuous_jog if continuous_jog is not None else ContinuousJog(controller)
+        )
         self._redis: redis.Redis[bytes] = (
             redis_conn if redis_conn is not None else redis.Redis(host=host, port=port, db=db)
         )
         self._disconnect_requested = False
+        self._listener: Optional[CommandListener] = None
 
     @property
     def should_stop(self) -> bool:
@@ -92,6 +139,55 @@ class CommandProcessor:
             return False
 
         queue_name_bytes, raw_message = result
+        self.process_message(queue_name_bytes, raw_message)
+        return True
+
+    def start_listening(self, on_message: Callable[[], None]) -> None:
+        """Start popping commands in a background thread.
+
+        *on_message* is called from that thread whenever a command is
+        ready, the caller is expected to run `process_pending` afterwards.
+        """
+        self._listener = CommandListener(self._redis, on_message)
+        self._listener.start()
+
+    def stop_listening(self) -> None:
+        if self._listener is not None:
+            self._listener.stop()
+            self._listener = None
+
+    def process_pending(self) -> int:
+        """Process every command handed over by the background listener.
+
+        Returns the number of commands processed.
+        """
+        if self._listener is None:
+            return 0
+
+        processed = 0
+        while not self._disconnect_requested:
+            result = self._listener.get_message()
+            if result is None:
+                break
+            queue_name_bytes, raw_message, received_at = result
+            self.process_message(queue_name_bytes, raw_message, received_at)
+            processed += 1
+        return processed
+
+    def process_message(
+        self,
+        queue_name_bytes: bytes | str,
+        raw_message: bytes | str,
+        received_at: Optional[float] = None,
+    ) -> None:
+        """Decode a message popped from one of the priority queues and dispatch it.
+
+        *received_at* is when the message was popped (now if None), by the
+        Gateway's clock: the ``timestamp`` of the message comes from the
+        client's, only comparable to other client timestamps.
+        """
+        if received_at is None:
+            received_at = time.time()
         queue_name = (
             queue_name_bytes.decode()
             if isinstance(queue_name_bytes, bytes)
@@ -99,19 +195,18 @@ class CommandProcessor:
         )
 
         try:
-            message = json.loads(raw_message)
-        except (json.JSONDecodeError, TypeError):
+            message = decode(raw_message)
+        except CodecError:
             logger.warning("Malformed message on %s: %s", queue_name, raw_message)
-            return True
+            return
 
-        self._dispatch(message, queue_name)
-        return True
+        self._dispatch(message, queue_name, received_at)
 
     # ------------------------------------------------------------------
     # Dispatch
     # ------------------------------------------------------------------
 
-    def _dispatch(self, message: dict[str, Any], queue_name: str) -> None:
+    def _dispatch(self, message: dict[str, Any], queue_name: str, received_at: float) -> None:
         msg_type = message.get("type", "")
         session_id = message.get("session_id", "")
         payload = message.get("payload", {})
@@ -126,11 +221,20 @@ class CommandProcessor:
             return
 
         if msg_type == MSG_REALTIME:
-            self._handle_realtime(payload)
+            self._handle_realtime(payload, received_at)
         elif msg_type == MSG_COMMAND:
             self._handle_command(payload)
+        elif msg_type in (MSG_JOG, MSG_JOG_HOLD) and self.continuous_jog.is_stale(
+            message.get("timestamp")
+        ):
+            # Sent before a jog cancel, but popped after it
+            logger.debug("Dropped %s sent before the last jog cancel", msg_type)
         elif msg_type == MSG_JOG:
             self._handle_jog(payload)
+        elif msg_type == MSG_JOG_HOLD:
+            self._handle_jog_hold(payload)
+        elif msg_type == MSG_JOG_CANCEL:
+            self._handle_jog_cancel(message.get("timestamp"))
         elif msg_type == MSG_FILE_START:
             self._handle_file_start(payload)
         elif msg_type == MSG_FILE_STOP:
@@ -146,8 +250,18 @@ class CommandProcessor:
     # Handlers
     # ------------------------------------------------------------------
 
-    def _handle_realtime(self, payload: dict[str, Any]) -> None:
+    def _handle_realtime(
+        self, payload: dict[str, Any], received_at: Optional[float] = None
+    ) -> None:
         action = payload.get("action", "")
+        override = OVERRIDE_COMMANDS.get(action)
+        if override is not None:
+            # Applied on the fly, the program or the jog goes on
+            self.controller.grbl_override(override, requested_at=received_at)
+            logger.debug("Override requested: %s", action)
+            return
+        # A feed hold or a reset also ends a jog
+        self.continuous_jog.stop()
         if action == ACTION_PAUSE:
             self.controller.set_paused(True)
             if self.file_executor.is_running:
@@ -188,14 +302,56 @@ class CommandProcessor:
         self.controller.send_command(jog_cmd)
         logger.debug("Jog command queued: %s", jog_cmd)
 
+    def _handle_jog_hold(self, payload: dict[str, Any]) -> None:
+        if self.file_executor.is_running:
+            logger.warning("Continuous jog rejected, a file is being executed")
+            return
+        self.continuous_jog.hold(
+            payload.get("x", 0),
+            payload.get("y", 0),
+            payload.get("z", 0),
+            payload.get("feedrate", 0),
+            units=payload.get("units"),
+        )
+
+    def _handle_jog_cancel(self, timestamp: Optional[float]) -> None:
+        self.continuous_jog.release(timestamp)
+        flushed = self._flush_queued_jogs()
+        logger.debug("Jog cancelled, %d queued jog messages flushed", flushed)
+
+    def _flush_queued_jogs(self) -> int:
+        """Remove the jog messages still waiting in the queue, returns how many."""
+        try:
+            queued = self._redis.lrange(QUEUE_HIGH, 0, -1)
+            jogs = []
+            for raw in queued:
+                try:
+                    message = decode(raw)
+                except CodecError:
+                    continue
+                if message.get("type") in (MSG_JOG, MSG_JOG_HOLD):
+                    jogs.append(raw)
+            if not jogs:
+                return 0
+
+            pipe = self._redis.pipeline(transaction=False)
+            for raw in jogs:
+                pipe.lrem(QUEUE_HIGH, 1, raw)
+            return sum(pipe.execute())
+        except redis.RedisError:
+            logger.warning("Error flushing the queued jogs", exc_info=True)
+            return 0
+
     def _handle_file_start(self, payload: dict[str, Any]) -> None:
         file_path = payload.get("file_path", "")
         task_id = payload.get("task_id")
+        mode = payload.get("mode", EXEC_MODE_PACED)
+        file_hash = payload.get("file_hash")
         if not file_path:
             logger.error("file_start without file_path")
             return
-        self.file_executor.start(file_path, task_id)
-        logger.info("File execution started: %s (task %s)", file_path, task_id)
+        self.file_executor.start(file_path, task_id, mode=mode, file_hash=file_hash)
+        logger.info("File execution started: %s (task %s, mode %s)", file_path, task_id, mode)
 
     def _handle_file_stop(self) -> None:
         if self.file_executor.is_running:
@@ -0,0 +1,179 @@
+"""Continuous jog for the CNC Gateway.
+
+While a client holds a jog direction (``MSG_JOG_HOLD``, sent again at least
+every ``JOG_HOLD_TIMEOUT``), the GRBL planner is kept topped up with short
+incremental ``$J=`` segments along it. When the direction is released
+(``MSG_JOG_CANCEL``) or not refreshed in time, a jog cancel (``0x85``)
+stops the machine right away and flushes the planner, instead of letting
+the queued segments run to completion.
+
+Each segment lasts about the time GRBL takes to answer a status report (see
+`GrblController.status_latency`), so that the motion sent ahead is always
+enough to cover a refill, but never much more than needed: that is the
+distance the machine keeps moving if the jog cancel is lost.
+
+Like the `FileExecutor`, it is non-blocking: the main Gateway loop calls
+`tick` periodically, and every time GRBL acknowledges a command.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import time
+from typing import TYPE_CHECKING, Optional
+
+from core.utilities.gateway.constants import JOG_HOLD_TIMEOUT
+from core.utilities.grbl.grblUtils import JOG_DISTANCE_INCREMENTAL, build_jog_command
+
+if TYPE_CHECKING:
+    from core.utilities.grbl.grblController import GrblController
+
+logger = logging.getLogger(__name__)
+
+# Duration of a segment, as a multiple of the status report latency
+LATENCY_FACTOR = 2.0
+# Bounds of the duration of a segment (seconds)
+MIN_SEGMENT_TIME = 0.05
+MAX_SEGMENT_TIME = 0.25
+# Duration of a segment until the status latency is known (seconds)
+DEFAULT_SEGMENT_TIME = 0.1
+# Segments of motion kept ahead of the machine
+LOOKAHEAD_SEGMENTS = 3
+# Don't queue segments beyond this many bytes pending for GRBL
+MAX_PENDING_BYTES = 96
+# Decimals of the segment distances
+DISTANCE_DECIMALS = 3
+# Tolerance of the lookahead (seconds): the clock readings are large, the
+# segment times added to them are rounded
+TIME_TOLERANCE = 1e-6
+
+
+class ContinuousJog:
+    """Keeps jogging along a held direction, until released."""
+
+    def __init__(self, controller: GrblController):
+        self.controller = controller
+
+        # Unit vector of the held direction, None when not jogging
+        self._direction: Optional[tuple[float, float, float]] = None
+        self._feedrate = 0.0
+        self._units: Optional[str] = None
+        # When the hold expires, and when the motion sent so far ends (monotonic)
+        self._held_until = 0.0
+        self._motion_until = 0.0
+        # Timestamp of the last cancel, jogs sent before it are stale
+        self._cancelled_at: Optional[float] = None
+
+        self.segments_sent = 0
+
+    @property
+    def is_active(self) -> bool:
+        return self._direction is not None
+
+    def is_stale(self, timestamp: Optional[float]) -> bool:
+        """Whether a jog message sent at *timestamp* predates the last cancel."""
+        return (
+            self._cancelled_at is not None
+            and timestamp is not None
+            and timestamp <= self._cancelled_at
+        )
+
+    def hold(
+        self, x: float, y: float, z: float, feedrate: float, units: Optional[str] = None
+    ) -> None:
+        """Start jogging along (*x*, *y*, *z*), or keep jogging if already held."""
+        norm = math.sqrt(x * x + y * y + z * z)
+        if norm == 0 or feedrate <= 0:
+            self.release()
+            return
+        direction = (x / norm, y / norm, z / norm)
+
+        if self.is_active and (direction, feedrate, units) != (
+            self._direction,
+            self._feedrate,
+            self._units,
+        ):
+            # Changed direction or speed: stop before starting over
+            self._cancel()
+
+        now = time.monotonic()
+        if not self.is_active:
+            self._direction, self._feedrate, self._units = direction, feedrate, units
+            self._motion_until = now
+            logger.info("Continuous jog started: direction=%s, feedrate=%s", direction, feedrate)
+        self._held_until = now + JOG_HOLD_TIMEOUT
+        self.tick()
+
+    def release(self, timestamp: Optional[float] = None) -> None:
+        """Stop jogging right away, jogs sent before *timestamp* are ignored.
+
+        The jog cancel is sent even if not holding a direction, to stop
+        discrete jogs too.
+        """
+        if timestamp is not None:
+            self._cancelled_at = max(self._cancelled_at or timestamp, timestamp)
+        self._cancel()
+
+    def stop(self) -> None:
+        """Forget the held direction without a jog cancel, e.g. after a feed
+        hold or a reset, which already stop the jog."""
+        self._direction = None
+
+    def tick(self) -> None:
+        """Top up the planner with segments, called periodically."""
+        if self._direction is None:
+            return
+
+        now = time.monotonic()
+        if now >= self._held_until:
+            logger.warning("Continuous jog not held anymore, cancelling")
+            self._cancel()
+            return
+
+        if self.controller.jog_cancel_pending:
+            # The segments queued now would be dropped by the cancel
+            return
+
+        segment_time = self.segment_time()
+        self._motion_until = max(self._motion_until, now)
+        while (
+            self._motion_until - now < LOOKAHEAD_SEGMENTS * segment_time - TIME_TOLERANCE
+            and self.controller.get_pending_bytes() < MAX_PENDING_BYTES
+        ):
+            self._send_segment(segment_time)
+            self._motion_until += segment_time
+
+    def segment_time(self) -> float:
+        """Duration of the next segment, from the status report latency."""
+        latency = self.controller.status_latency
+        if latency is None:
+            return DEFAULT_SEGMENT_TIME
+        return min(max(LATENCY_FACTOR * latency, MIN_SEGMENT_TIME), MAX_SEGMENT_TIME)
+
+    # ------------------------------------------------------------------
+    # Internal
+    # ------------------------------------------------------------------
+
+    def _send_segment(self, segment_time: float) -> None:
+        assert self._direction is not None
+        # Feed rates are per minute
+        distance = self._feedrate / 60 * segment_time
+        x, y, z = (round(axis * distance, DISTANCE_DECIMALS) for axis in self._direction)
+        command = build_jog_command(
+            x,
+            y,
+            z,
+            self._feedrate,
+            units=self._units,
+            distance_mode=JOG_DISTANCE_INCREMENTAL,
+        )
+        self.controller.send_command(command)
+        self.segments_sent += 1
+
+    def _cancel(self) -> None:
+        if self._direction is not None:
+            logger.info("Continuous jog cancelled after %d segments", self.segments_sent)
+        self._direction = None
+        self.segments_sent = 0
+        self.controller.grbl_jog_cancel()
@@ -0,0 +1,133 @@
+"""Selector-based event loop for the CNC Gateway.
+
+The Gateway sleeps in ``select()`` until there is something to do, which
+is one of:
+
+* The *wakeup* socket was signalled from another thread (a command arrived
+  on the Redis queues, GRBL acknowledged a line, ...), see `wake`.
+* A file object registered with `add_reader` became readable.
+* The deadline of a timer registered with `call_every` elapsed.
+
+Callbacks registered with `on_wake` run after every wakeup, whatever
+its cause.
+"""
+
+from __future__ import annotations
+
+import selectors
+import socket
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+
+@dataclass
+class _Timer:
+    interval: float
+    callback: Callable[[], None]
+    deadline: float
+
+
+class GatewayEventLoop:
+    """Single-threaded loop multiplexing readers, timers and cross-thread wakeups."""
+
+    def __init__(self) -> None:
+        self._selector = selectors.DefaultSelector()
+        self._timers: list[_Timer] = []
+        self._wake_handlers: list[Callable[[], None]] = []
+
+        # Self-pipe used by other threads to interrupt select()
+        self._wakeup_recv, self._wakeup_send = socket.socketpair()
+        self._wakeup_recv.setblocking(False)
+        self._wakeup_send.setblocking(False)
+        # A byte is in the socket: set and cleared along with it, under the lock
+        self._wakeup_pending = False
+        self._wakeup_lock = threading.Lock()
+        self._selector.register(self._wakeup_recv, selectors.EVENT_READ, self._drain_wakeup)
+
+    # ------------------------------------------------------------------
+    # Registration
+    # ------------------------------------------------------------------
+
+    def add_reader(self, fileobj: Any, callback: Callable[[], None]) -> None:
+        """Run *callback* every time *fileobj* becomes readable."""
+        self._selector.register(fileobj, selectors.EVENT_READ, callback)
+
+    def remove_reader(self, fileobj: Any) -> None:
+        self._selector.unregister(fileobj)
+
+    def call_every(self, interval: float, callback: Callable[[], None]) -> None:
+        """Run *callback* every *interval* seconds, starting one interval from now."""
+        self._timers.append(_Timer(interval, callback, time.monotonic() + interval))
+
+    def on_wake(self, callback: Callable[[], None]) -> None:
+        """Run *callback* after every wakeup of the loop."""
+        self._wake_handlers.append(callback)
+
+    # ------------------------------------------------------------------
+    # Thread-safe API
+    # ------------------------------------------------------------------
+
+    def wake(self) -> None:
+        """Interrupt the current (or next) ``select()``. Safe to call from any thread."""
+        with self._wakeup_lock:
+            if self._wakeup_pending:
+                return
+            self._wakeup_pending = True
+            try:
+                self._wakeup_send.send(b"\0")
+            except (BlockingIOError, OSError):
+                # The socket buffer is full (a wakeup is pending anyway) or closed
+                pass
+
+    # ------------------------------------------------------------------
+    # Running
+    # ------------------------------------------------------------------
+
+    def next_timeout(self) -> Optional[float]:
+        """Seconds until the next timer deadline, or ``None`` if there are no timers."""
+        if not self._timers:
+            return None
+        deadline = min(timer.deadline for timer in self._timers)
+        return max(0.0, deadline - time.monotonic())
+
+    def run_once(self) -> None:
+        """Wait for the next event and run every callback that became due."""
+        for key, _ in self._selector.select(self.next_timeout()):
+            key.data()
+
+        now = time.monotonic()
+        for timer in self._timers:
+            if now >= timer.deadline:
+                timer.callback()
+                # Skip missed deadlines instead of running them in a burst
+                timer.deadline = max(timer.deadline + timer.interval, now)
+
+        for handler in self._wake_handlers:
+            handler()
+
+    def run(self, should_stop: Callable[[], bool]) -> None:
+        """Run the loop until *should_stop* returns ``True``."""
+        while not should_stop():
+            self.run_once()
+
+    def close(self) -> None:
+        self._selector.close()
+        self._wakeup_recv.close()
+        self._wakeup_send.close()
+
+    # ------------------------------------------------------------------
+    # Internal
+    # ------------------------------------------------------------------
+
+    def _drain_wakeup(self) -> None:
+        # Drained and cleared together: a wake() can't send its byte in between
+        # and have it swallowed, the flag would stay set and later wakeups lost
+        with self._wakeup_lock:
+            try:
+                while self._wakeup_recv.recv(4096):
+                    pass
+            except BlockingIOError:
+                pass
+            self._wakeup_pending = False
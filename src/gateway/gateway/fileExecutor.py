@@ -4,39 +4,65 @@ Manages the lifecycle of executing a complete G-code file through the
 `GrblController`.  Lines are fed into the controller's internal queue
 at a controlled rate, respecting the GRBL buffer fill level.
 
+Files are compiled into a `GcodeProgram` before execution (comments and
+blank lines removed, commands pre-stripped), and compiled programs are
+cached by file hash, so repeated runs of the same job start instantly.
+
 File execution here is *non-blocking*: the main Gateway loop calls
 `tick` periodically, which sends one line if conditions are met.
 This allows the `CommandProcessor` to keep consuming priority commands
 (pause/stop) between line sends.
+
+Two execution modes are supported, selected on each file start:
+
+* ``EXEC_MODE_PACED``: one line every ``SEND_INTERVAL`` seconds, as long as
+  the GRBL buffer is below ``MAX_BUFFER_FILL``.
+* ``EXEC_MODE_STREAMING``: character-counting protocol. Lines are queued as
+  long as they fit in GRBL's free RX buffer space, and the buffer is refilled
+  every time GRBL acknowledges a command with ``ok`` (from the serial thread),
+  so the device never starves waiting for the next ``tick``.
 """
 
 from __future__ import annotations
 
-import json
 import logging
+import threading
 import time
 from pathlib import Path
 from typing import TYPE_CHECKING, Any, Optional
 
 import redis
-from core.config import REDIS_DB_STORAGE, REDIS_HOST, REDIS_PORT
+from core.config import GATEWAY_CODEC, REDIS_DB_STORAGE, REDIS_HOST, REDIS_PORT
+from core.utilities.files import computeSHA256
+from core.utilities.gateway.codec import encode, resolve_codec
 from core.utilities.gateway.constants import (
     EVENT_FILE_FAILED,
     EVENT_FILE_FINISHED,
     EVENT_FILE_PROGRESS,
     EVENT_FILE_STARTED,
     EVENTS_CHANNEL,
+    EXEC_MODE_PACED,
+    EXEC_MODE_STREAMING,
+    EXEC_MODES,
 )
+from core.utilities.gcode.gcodeProgram import GcodeProgram, ProgramCache
+from core.utilities.grbl.grblController import RX_BUFFER_SIZE
 
 if TYPE_CHECKING:
     from core.utilities.grbl.grblController import GrblController
 
+    from gateway.redisBatch import RedisBatch
+
 logger = logging.getLogger(__name__)
 
 # Constants
 SEND_INTERVAL = 0.10  # seconds between line sends
 MAX_BUFFER_FILL = 75  # percentage — don't exceed this
 PROGRESS_PUBLISH_INTERVAL = 1.0  # seconds between progress events
+PROGRAM_CACHE_MAX_BYTES = 256 * 1024 * 1024  # memory budget for compiled programs
+# Longest command the controller can send: with its '\n' it must fit in an
+# empty RX buffer, see RxBufferTracker.fits
+MAX_COMMAND_SIZE = RX_BUFFER_SIZE - 2
 
 
 class FileExecutor:
@@ -45,16 +71,23 @@ class FileExecutor:
     def __init__(
         self,
         controller: GrblController,
-        redis_conn: redis.Redis | None = None,
+        redis_conn: redis.Redis | RedisBatch | None = None,
         host: str = REDIS_HOST,
         port: int = REDIS_PORT,
         db: int = REDIS_DB_STORAGE,
+        codec: str = GATEWAY_CODEC,
     ):
         self.controller = controller
         self._redis = (
             redis_conn if redis_conn is not None else redis.Redis(host=host, port=port, db=db)
         )
+        self._codec = resolve_codec(codec)
+        # Guards the file state, which is also accessed from the serial thread
+        # when streaming (see `_on_ack`)
+        self._lock = threading.RLock()
+        self._programs = ProgramCache(PROGRAM_CACHE_MAX_BYTES)
         self._reset_state()
+        self.controller.add_ack_listener(self._on_ack)
 
     # ------------------------------------------------------------------
     # State
@@ -64,12 +97,16 @@ class FileExecutor:
     def is_running(self) -> bool:
         return self._running
 
+    @property
+    def mode(self) -> str:
+        return self._mode
+
     def get_progress(self) -> dict[str, Any]:
         return {
             "task_id": self._task_id,
             "file_path": self._file_path,
             "sent_lines": self._sent_lines,
-            "processed_lines": self.controller.get_commands_count() if self._running else 0,
+            "processed_lines": self._processed_lines() if self._running else 0,
             "total_lines": self._total_lines,
         }
 
@@ -77,12 +114,33 @@ class FileExecutor:
     # Lifecycle
     # ------------------------------------------------------------------
 
-    def start(self, file_path: str, task_id: Optional[int] = None) -> None:
-        """Open the G-code file and prepare for line-by-line execution."""
+    def start(
+        self,
+        file_path: str,
+        task_id: Optional[int] = None,
+        mode: str = EXEC_MODE_PACED,
+        file_hash: Optional[str] = None,
+    ) -> None:
+        """Compile the G-code file (unless cached) and prepare for execution.
+
+        *file_hash* is the SHA-256 of the file as stored in the DB; when not
+        given, it is computed from the file content.
+        """
         if self._running:
             logger.warning("File execution already in progress, ignoring start request")
             return
 
+        if mode not in EXEC_MODES:
+            logger.error("Unknown file execution mode: %s", mode)
+            self._publish_event(
+                EVENT_FILE_FAILED,
+                {
+                    "task_id": task_id,
+                    "error": f"Unknown execution mode: {mode}",
+                },
+            )
+            return
+
         path = Path(file_path)
         if not path.is_file():
             logger.error("File not found: %s", file_path)
@@ -96,7 +154,9 @@ class FileExecutor:
             return
 
         try:
-            self._gcode = open(path, "r")
+            if file_hash is None:
+                file_hash = computeSHA256(file_path)
+            self._program = self._programs.get_or_compile(file_hash, path)
         except OSError as exc:
             logger.error("Cannot open file %s: %s", file_path, exc)
             self._publish_event(
@@ -108,12 +168,24 @@ class FileExecutor:
             )
             return
 
-        # Count total lines
-        self._total_lines = sum(1 for _ in self._gcode)
-        self._gcode.seek(0)
+        too_long = self._program.find_longer(MAX_COMMAND_SIZE)
+        if too_long is not None:
+            line = self._program.source_line(too_long)
+            self._program = None
+            logger.error("Line %d of %s doesn't fit in the GRBL RX buffer", line, file_path)
+            self._publish_event(
+                EVENT_FILE_FAILED,
+                {
+                    "task_id": task_id,
+                    "error": f"Line {line} is longer than {MAX_COMMAND_SIZE} characters",
+                },
+            )
+            return
 
+        self._total_lines = self._program.total_lines
         self._file_path = file_path
         self._task_id = task_id
+        self._mode = mode
         self._sent_lines = 0
         self._paused = False
         self._running = True
@@ -128,9 +200,15 @@ class FileExecutor:
                 "task_id": task_id,
                 "file_path": file_path,
                 "total_lines": self._total_lines,
+                "mode": mode,
             },
         )
-        logger.info("File execution started: %s (%d lines)", file_path, self._total_lines)
+        logger.info(
+            "File execution started: %s (%d lines, %s mode)",
+            file_path,
+            self._total_lines,
+            mode,
+        )
 
     def pause(self) -> None:
         self._paused = True
@@ -140,76 +218,167 @@ class FileExecutor:
 
     def stop(self) -> None:
         """Stop file execution (user-requested or error)."""
-        if not self._running:
-            return
-        self._close_file()
-        self._publish_event(
-            EVENT_FILE_FAILED,
-            {
-                "task_id": self._task_id,
-                "error": "Stopped by user",
-            },
-        )
-        self._reset_state()
+        with self._lock:
+            if not self._running:
+                return
+            self._close_file()
+            self._publish_event(
+                EVENT_FILE_FAILED,
+                {
+                    "task_id": self._task_id,
+                    "error": "Stopped by user",
+                },
+            )
+            self._reset_state()
         logger.info("File execution stopped")
 
     def tick(self) -> None:
-        """Called from the main loop. Sends one line if conditions are met."""
+        """Called from the main loop. Sends one line (or, when streaming,
+        as many lines as fit in the GRBL RX buffer) if conditions are met.
+        """
         if not self._running or self._paused:
             return
 
         now = time.time()
 
-        # Rate-limit sends
-        if now - self._last_send < SEND_INTERVAL:
-            return
+        if self._mode == EXEC_MODE_PACED:
+            # Rate-limit sends
+            if now - self._last_send < SEND_INTERVAL:
+                return
 
-        # Don't over-fill the GRBL buffer
-        if self.controller.get_buffer_fill() > MAX_BUFFER_FILL:
-            return
+            # Don't over-fill the GRBL buffer
+            if self.controller.get_buffer_fill() > MAX_BUFFER_FILL:
+                return
 
         # Check for CNC errors
         if self.controller.grbl_status.failed():
             error_msg = self.controller.grbl_status.get_error_message() or "Unknown error"
-            self._close_file()
-            self._publish_event(
-                EVENT_FILE_FAILED,
-                {
-                    "task_id": self._task_id,
-                    "error": error_msg,
-                },
-            )
+            with self._lock:
+                self._close_file()
+                self._publish_event(
+                    EVENT_FILE_FAILED,
+                    {
+                        "task_id": self._task_id,
+                        "error": error_msg,
+                    },
+                )
+                self._reset_state()
             logger.error("File execution failed: %s", error_msg)
-            self._reset_state()
             return
 
         # Check if GRBL finished processing (program end code detected)
         if self.controller.grbl_status.finished():
-            self._close_file()
-            self._publish_event(
-                EVENT_FILE_FINISHED,
-                {
-                    "task_id": self._task_id,
-                    "sent_lines": self._sent_lines,
-                    "total_lines": self._total_lines,
-                },
-            )
-            logger.info(
-                "File execution finished: %d/%d lines",
-                self._sent_lines,
-                self._total_lines,
-            )
-            self._reset_state()
+            with self._lock:
+                self._close_file()
+                self._publish_event(
+                    EVENT_FILE_FINISHED,
+                    {
+                        "task_id": self._task_id,
+                        "sent_lines": self._sent_lines,
+                        "total_lines": self._total_lines,
+                    },
+                )
+                logger.info(
+                    "File execution finished: %d/%d lines",
+                    self._sent_lines,
+                    self._total_lines,
+                )
+                self._reset_state()
             return
 
-        # Read and send next line
-        if self._gcode is None:
+        if self._mode == EXEC_MODE_STREAMING:
+            self._stream_lines()
+            if self._eof:
+                self._finish()
+                return
+            self._publish_progress_if_due(now)
             return
-        line = self._gcode.readline()
-        if not line:
+
+        # Send next command
+        if self._program is None:
+            return
+        if self._index >= len(self._program):
             # EOF — wait for GRBL to finish processing remaining commands
             # The finished() flag will be set when the program end code is consumed
             # If no program end code, we still mark as finished after sending all lines
+            self._finish()
+            return
+
+        self._send_next_command()
+        self._last_send = now
+
+        self._publish_progress_if_due(now)
+
+    # ------------------------------------------------------------------
+    # Internal
+    # ------------------------------------------------------------------
+
+    def _reset_state(self) -> None:
+        self._running = False
+        self._paused = False
+        self._program: Optional[GcodeProgram] = None
+        self._index = 0  # index of the next program command to send
+        self._file_path = ""
+        self._task_id: Optional[int] = None
+        self._mode = EXEC_MODE_PACED
+        self._sent_lines = 0
+        self._total_lines = 0
+        self._last_send = 0.0
+        self._last_progress_publish = 0.0
+        self._eof = False
+
+    def _on_ack(self) -> None:
+        """Called from the serial thread every time GRBL answers ``ok``."""
+        if self._mode == EXEC_MODE_STREAMING:
+            self._stream_lines()
+
+    def _stream_lines(self) -> None:
+        """Queue as many lines as fit in the free space of GRBL's RX buffer.
+
+        Bytes already queued in the controller count as used, so the
+        ``serial_io`` thread never has to hold back a line it dequeued.
+        """
+        with self._lock:
+            if not self._running or self._paused or self._eof or self._program is None:
+                return
+            if self.controller.grbl_status.failed():
+                return
+
+            program = self._program
+            pending = self.controller.get_pending_bytes()
+            while self._index < len(program):
+                # +1 accounts for the '\n' appended when sending the line.
+                # Same bound as RxBufferTracker.fits, so serial_io sends every
+                # line queued here; lines that never fit are rejected by start().
+                size = program.size(self._index) + 1
+                if pending + size >= RX_BUFFER_SIZE:
+                    return
+
+                self._send_next_command()
+                pending += size
+
+            self._eof = True
+
+    def _send_next_command(self) -> None:
+        program = self._program
+        assert program is not None
+        self.controller.send_program_command(program.command(self._index))
+        self._sent_lines = program.source_line(self._index)
+        self._index += 1
+
+    def _processed_lines(self) -> int:
+        """Source lines already processed by GRBL, according to its acknowledgements."""
+        program = self._program
+        processed = self.controller.get_commands_count()
+        if program is None or not len(program) or processed <= 0:
+            return 0
+        return program.source_line(min(processed, len(program)) - 1)
+
+    def _finish(self) -> None:
+        """All lines were sent to the controller, notify and clean up."""
+        with self._lock:
+            # Trailing comments and blank lines were consumed as well
+            self._sent_lines = self._total_lines
             self._close_file()
             self._publish_event(
                 EVENT_FILE_FINISHED,
@@ -225,37 +394,16 @@ class FileExecutor:
                 self._total_lines,
             )
             self._reset_state()
-            return
-
-        self.controller.send_command(line)
-        self._sent_lines += 1
-        self._last_send = now
 
-        # Periodic progress event
+    def _publish_progress_if_due(self, now: float) -> None:
         if now - self._last_progress_publish > PROGRESS_PUBLISH_INTERVAL:
             self._publish_event(EVENT_FILE_PROGRESS, self.get_progress())
             self._last_progress_publish = now
 
-    # ------------------------------------------------------------------
-    # Internal
-    # ------------------------------------------------------------------
-
-    def _reset_state(self) -> None:
-        self._running = False
-        self._paused = False
-        self._gcode = None
-        self._file_path = ""
-        self._task_id: Optional[int] = None
-        self._sent_lines = 0
-        self._total_lines = 0
-        self._last_send = 0.0
-        self._last_progress_publish = 0.0
-
     def _close_file(self) -> None:
-        if self._gcode is not None:
-            self._gcode.close()
-            self._gcode = None
+        # The compiled program stays in the cache for later runs
+        self._program = None
 
     def _publish_event(self, event_type: str, data: dict[str, Any]) -> None:
-        event = json.dumps({"type": event_type, **data})
+        event = encode({"type": event_type, **data}, self._codec)
         self._redis.publish(EVENTS_CHANNEL, event)
@@ -18,7 +18,6 @@ import argparse
 import logging
 import signal
 import sys
-import time
 
 import redis
 from core.config import (
@@ -28,33 +27,41 @@ from core.config import (
     SERIAL_BAUDRATE,
     SERIAL_PORT,
 )
-from core.utilities.gateway.constants import (
-    GW_STATE_FILE_EXECUTION,
-    GW_STATE_IDLE,
-    GW_STATE_STREAMING,
-)
+from core.utilities.gateway.constants import GW_STATE_IDLE
 from core.utilities.grbl.grblController import GrblController
 from core.utilities.loggerFactory import setup_stream_logger
 
 from gateway.commandProcessor import CommandProcessor
-from gateway.fileExecutor import FileExecutor
+from gateway.continuousJog import MIN_SEGMENT_TIME, ContinuousJog
+from gateway.eventLoop import GatewayEventLoop
+from gateway.fileExecutor import SEND_INTERVAL, FileExecutor
+from gateway.redisBatch import RedisBatch
+from gateway.sessionCache import SessionCache
 from gateway.sessionManager import SessionManager
-from gateway.statusPublisher import StatusPublisher
+from gateway.statusPublisher import STATUS_INTERVAL, StatusPublisher
 
 logger = logging.getLogger(__name__)
 
 # ---------------------------------------------------------------------------
-# Polling intervals
+# Timer intervals
 # ---------------------------------------------------------------------------
 
 # How often to send a status report query (seconds)
 STATUS_POLL_INTERVAL = 0.125
 # How often to send a parser-state query (seconds)
 PARSER_STATE_POLL_INTERVAL = 10
-# BLPOP timeout when a file is being executed (seconds)
-FILE_EXEC_BLPOP_TIMEOUT = 0.1
+# How often to tick the file executor, so paced sends are not delayed by more
+# than a fraction of their interval (seconds)
+FILE_TICK_INTERVAL = SEND_INTERVAL / 5
+# How often to top up a continuous jog, so segments are sent well before the
+# previous ones end (seconds)
+JOG_TICK_INTERVAL = MIN_SEGMENT_TIME / 2
+# How often to check that the serial_io thread is still alive (seconds)
+SERIAL_HEALTH_CHECK_INTERVAL = 0.5
 # How often to log a pipeline-health summary (seconds)
 PIPELINE_SUMMARY_INTERVAL = 5.0
+# How often to persist the GRBL settings, when they change (seconds)
+SETTINGS_PUBLISH_INTERVAL = 1.0
 
 # ---------------------------------------------------------------------------
 # Graceful shutdown
@@ -78,32 +85,41 @@ def create_gateway(
     serial_port: str,
     serial_baudrate: int,
     logger: logging.Logger,
-) -> tuple[GrblController, CommandProcessor, StatusPublisher, FileExecutor, SessionManager]:
+) -> tuple[
+    GrblController, CommandProcessor, StatusPublisher, FileExecutor, SessionManager, RedisBatch
+]:
     """Wire up all Gateway components and return them."""
     redis_conn = redis.Redis(
         host=REDIS_HOST,
         port=REDIS_PORT,
         db=REDIS_DB_STORAGE,
     )
+    # Writes of each loop iteration are sent together, see run_gateway
+    redis_batch = RedisBatch(redis_conn)
 
     # GrblController — the serial owner
     grbl_logger = setup_stream_logger("controller", logging.INFO)
     controller = GrblController(logger=grbl_logger)
+    controller.grbl_monitor.set_publisher(redis_batch)
 
     # Sub-systems
-    session_manager = SessionManager(redis_conn=redis_conn)
-    file_executor = FileExecutor(controller, redis_conn=redis_conn)
+    session_manager = SessionManager(
+        redis_conn=redis_batch,
+        session_cache=SessionCache(redis_conn),
+    )
+    file_executor = FileExecutor(controller, redis_conn=redis_batch)
     status_publisher = StatusPublisher(
         controller,
         session_manager,
         file_executor,
-        redis_conn=redis_conn,
+        redis_conn=redis_batch,
     )
     command_processor = CommandProcessor(
         controller,
         session_manager,
         file_executor,
         redis_conn=redis_conn,
+        continuous_jog=ContinuousJog(controller),
     )
 
     # Connect to the CNC device
@@ -119,8 +135,19 @@ def create_gateway(
 
     logger.info("Connected to CNC device: %s", response)
     status_publisher.gateway_state = GW_STATE_IDLE
+    status_publisher.advertise_codecs()
+
+    # Load the GRBL settings, used by the worker to estimate machining times
+    controller.query_grbl_settings()
 
-    return controller, command_processor, status_publisher, file_executor, session_manager
+    return (
+        controller,
+        command_processor,
+        status_publisher,
+        file_executor,
+        session_manager,
+        redis_batch,
+    )
 
 
 def run_gateway(
@@ -129,85 +156,107 @@ def run_gateway(
     status_publisher: StatusPublisher,
     file_executor: FileExecutor,
     session_manager: SessionManager,
+    redis_batch: RedisBatch,
     logger: logging.Logger,
 ) -> None:
     """Main event-loop of the Gateway.
 
-    1. Poll GRBL status (``?``) and parser state (``$G``) periodically.
-    2. Process one command from the priority queues.
-    3. Tick the file executor (sends one G-code line if due).
-    4. Publish CNC status if the interval has elapsed.
-    5. Update the gateway state label.
-    """
-    logger.info("CNC Gateway is running.  Waiting for commands…")
+    The loop sleeps until something needs to be done, which is one of:
 
-    last_status_poll = time.time()
-    last_parser_state_poll = time.time()
-    last_pipeline_summary = time.time()
+    1. A command arrived on the priority queues (popped by a background
+       listener, see `CommandListener`).
+    2. GRBL acknowledged a command, so more file lines may fit in its buffer.
+    3. A timer is due: GRBL status (``?``) and parser state (``$G``) polls,
+       status and settings publishing, paced file sends, continuous jog
+       segments and the pipeline-health summary.
 
-    while not _shutdown_requested:
-        now = time.time()
+    After every wakeup, pending commands are processed and the file
+    executor and the continuous jog are ticked. Then, the writes to Redis of the iteration are
+    sent in a single round trip.
+    """
+    loop = GatewayEventLoop()
+    serial_thread_dead = False
 
-        # 0. Check serial thread health
+    def check_serial_thread() -> None:
+        nonlocal serial_thread_dead
         if controller.serial_thread is not None and not controller.serial_thread.is_alive():
             logger.critical(
                 "serial_io thread is dead! _serial_io_alive=%s. Aborting gateway loop.",
                 controller._serial_io_alive,
             )
-            break
-
-        # 1. Periodic GRBL queries
-        if now - last_status_poll >= STATUS_POLL_INTERVAL:
-            controller.queryStatusReport()
-            last_status_poll = now
-
-        if now - last_parser_state_poll >= PARSER_STATE_POLL_INTERVAL:
-            controller.query_gcode_parser_state()
-            last_parser_state_poll = now
-
-        # 2. Process commands — use a short timeout during file execution
-        # so that tick() is called frequently enough.
-        blpop_timeout = FILE_EXEC_BLPOP_TIMEOUT if file_executor.is_running else None
-        command_processor.process_one(timeout=blpop_timeout)
-
-        if command_processor.should_stop:
-            logger.info("Disconnect requested, shutting down…")
-            break
-
-        # 3. File execution tick
-        file_executor.tick()
-
-        # 4. Publish status
-        status_publisher.publish_if_due()
-
-        # 5. Update gateway state
-        if file_executor.is_running:
-            status_publisher.gateway_state = GW_STATE_FILE_EXECUTION
-        elif session_manager.has_active_session():
-            status_publisher.gateway_state = GW_STATE_STREAMING
-        else:
-            status_publisher.gateway_state = GW_STATE_IDLE
-
-        # 6. Periodic pipeline-health summary
-        if now - last_pipeline_summary >= PIPELINE_SUMMARY_INTERVAL:
-            serial_alive = (
-                controller.serial_thread is not None and controller.serial_thread.is_alive()
-            )
-            logger.info(
-                "[Gateway] queue=%d, buffer_fill=%.1f%%, "
-                "commands_count=%d, file_running=%s, serial_alive=%s",
-                controller.queue.qsize(),
-                controller.get_buffer_fill(),
-                controller.commands_count,
-                file_executor.is_running,
-                serial_alive,
-            )
-            last_pipeline_summary = now
+            serial_thread_dead = True
+
+    def log_pipeline_summary() -> None:
+        serial_alive = controller.serial_thread is not None and controller.serial_thread.is_alive()
+        redis_stats = redis_batch.take_stats()
+        write_stats = controller.take_write_stats()
+        logger.info(
+            "[Gateway] queue=%d, buffer_fill=%.1f%%, in_flight=%d (oldest %.3fs), "
+            "ok_to_send_p50=%.1fms, override_to_wire_p50=%.1fms, "
+            "serial_writes/s=%.1f (lines/s=%.1f), "
+            "commands_count=%d, file_running=%s, serial_alive=%s, "
+            "redis_round_trips/tick=%.2f (max %d), redis_writes=%d (%d skipped)",
+            controller.queue.qsize(),
+            controller.get_buffer_fill(),
+            controller.get_commands_in_flight(),
+            controller.get_oldest_in_flight_age() or 0.0,
+            (controller.get_ok_to_send_latency() or 0.0) * 1000,
+            (controller.get_override_latency() or 0.0) * 1000,
+            write_stats.writes_per_second,
+            write_stats.lines_per_second,
+            controller.commands_count,
+            file_executor.is_running,
+            serial_alive,
+            redis_stats.per_tick,
+            redis_stats.max_per_tick,
+            redis_stats.commands,
+            redis_stats.skipped,
+        )
+
+    def on_wake() -> None:
+        command_processor.process_pending()
+        if not command_processor.should_stop:
+            file_executor.tick()
+            command_processor.continuous_jog.tick()
+
+    def should_stop() -> bool:
+        return _shutdown_requested or serial_thread_dead or command_processor.should_stop
+
+    loop.call_every(SERIAL_HEALTH_CHECK_INTERVAL, check_serial_thread)
+    loop.call_every(STATUS_POLL_INTERVAL, controller.queryStatusReport)
+    loop.call_every(PARSER_STATE_POLL_INTERVAL, controller.query_gcode_parser_state)
+    loop.call_every(STATUS_INTERVAL, status_publisher.publish_now)
+    loop.call_every(FILE_TICK_INTERVAL, file_executor.tick)
+    loop.call_every(JOG_TICK_INTERVAL, command_processor.continuous_jog.tick)
+    loop.call_every(PIPELINE_SUMMARY_INTERVAL, log_pipeline_summary)
+    loop.call_every(SETTINGS_PUBLISH_INTERVAL, status_publisher.publish_settings)
+    loop.on_wake(on_wake)
+    # Last, so it sends the writes of every callback of the iteration
+    loop.on_wake(redis_batch.end_tick)
+
+    controller.add_ack_listener(loop.wake)
+    session_manager.start_watching()
+    command_processor.start_listening(on_message=loop.wake)
+
+    logger.info("CNC Gateway is running.  Waiting for commands…")
+
+    try:
+        loop.run(should_stop)
+    finally:
+        command_processor.stop_listening()
+        session_manager.stop_watching()
+        controller.remove_ack_listener(loop.wake)
+        loop.close()
+        redis_batch.flush()
+
+    if command_processor.should_stop:
+        logger.info("Disconnect requested, shutting down…")
 
 
 def shutdown(
     controller: GrblController,
     status_publisher: StatusPublisher,
+    redis_batch: RedisBatch,
     logger: logging.Logger,
 ) -> None:
     """Clean up resources."""
@@ -215,6 +264,7 @@ def shutdown(
 
     try:
         status_publisher.cleanup()
+        redis_batch.flush()
     except Exception:
         logger.warning("Error cleaning up status publisher", exc_info=True)
 
@@ -260,17 +310,24 @@ def main() -> None:
 
     controller = None
     status_publisher = None
+    redis_batch = None
 
     try:
-        controller, command_processor, status_publisher, file_executor, session_manager = (
-            create_gateway(args.port, args.baudrate, gateway_logger)
-        )
+        (
+            controller,
+            command_processor,
+            status_publisher,
+            file_executor,
+            session_manager,
+            redis_batch,
+        ) = create_gateway(args.port, args.baudrate, gateway_logger)
         run_gateway(
             controller,
             command_processor,
             status_publisher,
             file_executor,
             session_manager,
+            redis_batch,
             gateway_logger,
         )
     except KeyboardInterrupt:
@@ -279,8 +336,8 @@ def main() -> None:
         gateway_logger.critical("Fatal error in CNC Gateway", exc_info=True)
         sys.exit(1)
     finally:
-        if controller is not None and status_publisher is not None:
-            shutdown(controller, status_publisher, gateway_logger)
+        if controller is not None and status_publisher is not None and redis_batch is not None:
+            shutdown(controller, status_publisher, redis_batch, gateway_logger)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,169 @@
+"""Write-coalescing access to Redis for the CNC Gateway.
+
+Every iteration of the Gateway loop (a *tick*) may publish the status, set
+the state keys, publish events and a message per line sent to or received
+from GRBL. Instead of one round trip each, `RedisBatch` buffers the writes
+of the tick and sends them all in a single pipeline at its end (see
+`end_tick`).
+
+Setting a key to the value it already holds is skipped, but the value is
+written again every `REFRESH_INTERVAL`, in case Redis lost it.
+
+Reads go straight to Redis, they are only accounted: the number of round
+trips of every tick is kept in `stats`.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Optional
+
+import redis
+
+logger = logging.getLogger(__name__)
+
+# How often an unchanged value is written again (seconds)
+REFRESH_INTERVAL = 5.0
+
+_PUBLISH = "publish"
+_SET = "set"
+_DELETE = "delete"
+
+
+@dataclass
+class RoundTripStats:
+    """Round trips to Redis of the ticks since the stats were taken."""
+
+    ticks: int = 0
+    round_trips: int = 0
+    max_per_tick: int = 0
+    # Commands sent in the pipelines, and writes skipped because unchanged
+    commands: int = 0
+    skipped: int = 0
+
+    @property
+    def per_tick(self) -> float:
+        return self.round_trips / self.ticks if self.ticks else 0.0
+
+
+class RedisBatch:
+    """Buffers the writes of a tick and sends them in a single pipeline.
+
+    Writes may come from any thread (e.g. the GRBL messages, published from
+    the serial thread), reads are meant for the loop thread. The buffer and
+    the round trip accounting are guarded by a lock.
+    """
+
+    def __init__(self, redis_conn: redis.Redis):
+        self._redis = redis_conn
+        self._lock = threading.Lock()
+        self._pending: list[tuple[str, str, Any]] = []
+        # Last value written to each key, and when
+        self._written: dict[str, tuple[Any, float]] = {}
+
+        self.stats = RoundTripStats()
+        self.last_tick_round_trips = 0
+        self._tick_round_trips = 0
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def publish(self, channel: str, message: str | bytes) -> None:
+        with self._lock:
+            self._pending.append((_PUBLISH, channel, message))
+
+    def set(self, key: str, value: str | bytes) -> bool:
+        """Buffer a ``SET``, unless the key already holds *value*.
+
+        Returns ``True`` if the write was buffered.
+        """
+        now = time.monotonic()
+        with self._lock:
+            written = self._written.get(key)
+            if written is not None and written[0] == value and now - written[1] < REFRESH_INTERVAL:
+                self.stats.skipped += 1
+                return False
+            self._written[key] = (value, now)
+            self._pending.append((_SET, key, value))
+        return True
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._written.pop(key, None)
+            self._pending.append((_DELETE, key, None))
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def get(self, key: str) -> Optional[bytes]:
+        self._count_round_trip()
+        return self._redis.get(key)
+
+    def exists(self, key: str) -> int:
+        self._count_round_trip()
+        return self._redis.exists(key)
+
+    # ------------------------------------------------------------------
+    # Ticks
+    # ------------------------------------------------------------------
+
+    def flush(self) -> int:
+        """Send the buffered writes in a single pipeline.
+
+        Returns the number of commands sent. If Redis fails, the writes are
+        lost: the status and the state keys are written again later on.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, []
+        if not pending:
+            return 0
+
+        pipe = self._redis.pipeline(transaction=False)
+        for command, key, value in pending:
+            if command == _PUBLISH:
+                pipe.publish(key, value)
+            elif command == _SET:
+                pipe.set(key, value)
+            else:
+                pipe.delete(key)
+
+        with self._lock:
+            self._tick_round_trips += 1
+            self.stats.commands += len(pending)
+        try:
+            pipe.execute()
+        except redis.RedisError:
+            logger.warning("Lost %d writes to Redis", len(pending), exc_info=True)
+            with self._lock:
+                self._written.clear()
+        return len(pending)
+
+    def end_tick(self) -> None:
+        """Flush the writes of the tick and account its round trips."""
+        self.flush()
+
+        with self._lock:
+            round_trips, self._tick_round_trips = self._tick_round_trips, 0
+            self.last_tick_round_trips = round_trips
+            self.stats.ticks += 1
+            self.stats.round_trips += round_trips
+            self.stats.max_per_tick = max(self.stats.max_per_tick, round_trips)
+
+    def take_stats(self) -> RoundTripStats:
+        """Return the stats since the last call, and reset them."""
+        with self._lock:
+            stats, self.stats = self.stats, RoundTripStats()
+        return stats
+
+    # ------------------------------------------------------------------
+    # Internal
+    # ------------------------------------------------------------------
+
+    def _count_round_trip(self) -> None:
+        with self._lock:
+            self._tick_round_trips += 1
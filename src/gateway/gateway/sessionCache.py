@@ -0,0 +1,126 @@
+"""In-process cache of the CNC session lock for the Gateway.
+
+The session is validated for every command and read for every status
+publish. Instead of reading ``SESSION_KEY`` from Redis each time, the
+Gateway keeps it in memory and only reads it again when it may have
+changed:
+
+* `GatewayClient` publishes on ``SESSION_CHANNEL`` every time it acquires,
+  renews or releases the session.
+* Changes made by anything else (e.g. from redis-cli) are notified on the
+  keyspace channel of the key, if keyspace notifications are enabled in
+  the Redis server (``notify-keyspace-events``).
+* The lock has a TTL, the cached session expires with it.
+
+A background thread listens to both channels and invalidates the cache,
+which is read again on the next access. As a safety net for lost
+notifications, it is also read again every `SESSION_REFRESH_INTERVAL`.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+from typing import Any, Optional
+
+import redis
+from core.utilities.gateway.constants import SESSION_CHANNEL, SESSION_KEY
+
+logger = logging.getLogger(__name__)
+
+# How often the session is read again, even if it wasn't notified (seconds)
+SESSION_REFRESH_INTERVAL = 5.0
+# Timeout of the listener waits, controls how often it can check whether
+# it was asked to stop (seconds)
+LISTENER_TIMEOUT = 1.0
+# Delay before retrying after a Redis error (seconds)
+LISTENER_RETRY_DELAY = 1.0
+
+
+class SessionCache:
+    """Keeps the active session in memory, invalidated by notifications."""
+
+    def __init__(self, redis_conn: redis.Redis):
+        self._redis = redis_conn
+        db = redis_conn.connection_pool.connection_kwargs.get("db", 0)
+        self._keyspace_channel = f"__keyspace@{db}__:{SESSION_KEY}"
+
+        # Incremented by every notification, a session read before the last
+        # one is stale
+        self._version = 0
+        self._session: Optional[dict[str, Any]] = None
+        self._session_version = -1
+        # When the session must be read again (monotonic)
+        self._valid_until = 0.0
+
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="session_cache", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=LISTENER_TIMEOUT + 1)
+            self._thread = None
+
+    def get(self) -> Optional[dict[str, Any]]:
+        """Return the active session, reading it from Redis only if needed."""
+        if self._session_version != self._version or time.monotonic() >= self._valid_until:
+            self._load()
+        return self._session
+
+    def refresh(self) -> Optional[dict[str, Any]]:
+        """Read the session from Redis, whether it was notified or not."""
+        self._load()
+        return self._session
+
+    def invalidate(self) -> None:
+        """Read the session again on the next access. Safe to call from any thread."""
+        self._version += 1
+
+    # ------------------------------------------------------------------
+    # Internal
+    # ------------------------------------------------------------------
+
+    def _load(self) -> None:
+        version = self._version
+        pipe = self._redis.pipeline(transaction=False)
+        pipe.get(SESSION_KEY)
+        pipe.pttl(SESSION_KEY)
+        raw, ttl_ms = pipe.execute()
+        now = time.monotonic()
+
+        self._session = json.loads(raw) if raw is not None else None
+        self._session_version = version
+        self._valid_until = now + SESSION_REFRESH_INTERVAL
+        if self._session is not None and ttl_ms >= 0:
+            self._valid_until = min(self._valid_until, now + ttl_ms / 1000)
+
+    def _run(self) -> None:
+        while not self._stop_event.is_set():
+            pubsub = self._redis.pubsub()
+            try:
+                pubsub.subscribe(SESSION_CHANNEL, self._keyspace_channel)
+                # Changes before the subscription were not notified
+                self.invalidate()
+                while not self._stop_event.is_set():
+                    message = pubsub.get_message(
+                        ignore_subscribe_messages=True, timeout=LISTENER_TIMEOUT
+                    )
+                    if message is not None:
+                        self.invalidate()
+            except redis.RedisError:
+                logger.warning("Error listening to the session changes, retrying", exc_info=True)
+                self.invalidate()
+                self._stop_event.wait(LISTENER_RETRY_DELAY)
+            finally:
+                try:
+                    pubsub.close()
+                except redis.RedisError:
+                    pass
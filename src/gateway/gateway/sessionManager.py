@@ -5,17 +5,18 @@ session lifecycle events.
 
 The distributed lock itself lives in Redis and is managed by `GatewayClient`.
 This module provides the *server-side* validation that runs inside the
-Gateway process.
+Gateway process, reading the session from a `SessionCache` if given one.
 """
 
 from __future__ import annotations
 
 import json
 import logging
-from typing import Any, Optional
+from typing import TYPE_CHECKING, Any, Optional
 
 import redis
-from core.config import REDIS_DB_STORAGE, REDIS_HOST, REDIS_PORT
+from core.config import GATEWAY_CODEC, REDIS_DB_STORAGE, REDIS_HOST, REDIS_PORT
+from core.utilities.gateway.codec import encode, resolve_codec
 from core.utilities.gateway.constants import (
     EVENT_SESSION_ACQUIRED,
     EVENT_SESSION_RELEASED,
@@ -23,6 +24,10 @@ from core.utilities.gateway.constants import (
     SESSION_KEY,
 )
 
+if TYPE_CHECKING:
+    from gateway.redisBatch import RedisBatch
+    from gateway.sessionCache import SessionCache
+
 logger = logging.getLogger(__name__)
 
 
@@ -31,23 +36,47 @@ class SessionManager:
 
     def __init__(
         self,
-        redis_conn: redis.Redis | None = None,
+        redis_conn: redis.Redis | RedisBatch | None = None,
         host: str = REDIS_HOST,
         port: int = REDIS_PORT,
         db: int = REDIS_DB_STORAGE,
+        codec: str = GATEWAY_CODEC,
+        session_cache: Optional[SessionCache] = None,
     ):
-        self._redis: redis.Redis[bytes]
+        self._redis: redis.Redis[bytes] | RedisBatch
         if redis_conn is not None:
             self._redis = redis_conn
         else:
             self._redis = redis.Redis(host=host, port=port, db=db)
+        self._codec = resolve_codec(codec)
+        self._cache = session_cache
+
+    # ------------------------------------------------------------------
+    # Cache
+    # ------------------------------------------------------------------
+
+    def start_watching(self) -> None:
+        """Start listening to the session changes, if there is a cache."""
+        if self._cache is not None:
+            self._cache.start()
+
+    def stop_watching(self) -> None:
+        if self._cache is not None:
+            self._cache.stop()
 
     # ------------------------------------------------------------------
     # Validation
     # ------------------------------------------------------------------
 
     def get_active_session(self) -> Optional[dict[str, Any]]:
-        """Read and decode the current session from Redis."""
+        """Return the current session, from the cache if there is one.
+
+        The session is always stored as JSON, the Lua script of
+        `GatewayClient.release_session` decodes it.
+        """
+        if self._cache is not None:
+            return self._cache.get()
+
         raw = self._redis.get(SESSION_KEY)
         if raw is None:
             return None
@@ -56,12 +85,17 @@ class SessionManager:
     def validate_session(self, session_id: str) -> bool:
         """Return ``True`` if *session_id* matches the active session."""
         session = self.get_active_session()
+        if self._cache is not None and (session is None or session.get("session_id") != session_id):
+            # The command may come from a session whose change wasn't notified yet
+            session = self._cache.refresh()
         if session is None:
             return False
         return session.get("session_id") == session_id
 
     def has_active_session(self) -> bool:
         """Check if there is any active session."""
+        if self._cache is not None:
+            return self._cache.get() is not None
         return self._redis.exists(SESSION_KEY) == 1
 
     # ------------------------------------------------------------------
@@ -70,7 +104,7 @@ class SessionManager:
 
     def publish_session_acquired(self, session_data: dict[str, Any]) -> None:
         """Publish a session-acquired event on the events channel."""
-        event = json.dumps({"type": EVENT_SESSION_ACQUIRED, "session": session_data})
+        event = encode({"type": EVENT_SESSION_ACQUIRED, "session": session_data}, self._codec)
         self._redis.publish(EVENTS_CHANNEL, event)
         logger.info(
             "Session acquired by user %s (%s)",
@@ -80,6 +114,6 @@ class SessionManager:
 
     def publish_session_released(self, session_id: str) -> None:
         """Publish a session-released event on the events channel."""
-        event = json.dumps({"type": EVENT_SESSION_RELEASED, "session_id": session_id})
+        event = encode({"type": EVENT_SESSION_RELEASED, "session_id": session_id}, self._codec)
         self._redis.publish(EVENTS_CHANNEL, event)
         logger.info("Session %s released", session_id[:8])
@@ -4,7 +4,10 @@ Periodically reads CNC state from the GrblController and publishes a
 unified JSON payload to the ``grbl_status`` Redis PubSub channel.
 
 The payload format is designed so that **all** consumers receive the
-same data structure regardless of gateway mode.
+same data structure regardless of gateway mode. Only the changes are
+published, as deltas between periodic keyframes (see
+``core.utilities.gateway.statusDelta``), encoded with the codec of the
+Gateway (see ``core.utilities.gateway.codec``).
 """
 
 from __future__ import annotations
@@ -15,24 +18,34 @@ import time
 from typing import TYPE_CHECKING, Any
 
 import redis
-from core.config import REDIS_DB_STORAGE, REDIS_HOST, REDIS_PORT
+from core.config import GATEWAY_CODEC, REDIS_DB_STORAGE, REDIS_HOST, REDIS_PORT
+from core.utilities.gateway.codec import available_codecs, encode, resolve_codec
 from core.utilities.gateway.constants import (
+    GATEWAY_CODECS_KEY,
     GATEWAY_STATE_KEY,
+    GRBL_SETTINGS_KEY,
+    GW_STATE_FILE_EXECUTION,
     GW_STATE_IDLE,
+    GW_STATE_STREAMING,
     LAST_STATUS_KEY,
     STATUS_CHANNEL,
 )
+from core.utilities.gateway.statusDelta import StatusEncoder
+from core.utilities.grbl.grblStatusReport import StatusField
 
 if TYPE_CHECKING:
     from core.utilities.grbl.grblController import GrblController
 
     from gateway.fileExecutor import FileExecutor
+    from gateway.redisBatch import RedisBatch
     from gateway.sessionManager import SessionManager
 
 logger = logging.getLogger(__name__)
 
 # How often to publish status (seconds)
 STATUS_INTERVAL = 0.10
+# How often to publish the complete status, even if nothing changed (seconds)
+KEYFRAME_INTERVAL = 5.0
 
 
 class StatusPublisher:
@@ -43,10 +56,11 @@ class StatusPublisher:
         controller: GrblController,
         session_manager: SessionManager,
         file_executor: FileExecutor,
-        redis_conn: redis.Redis | None = None,
+        redis_conn: redis.Redis | RedisBatch | None = None,
         host: str = REDIS_HOST,
         port: int = REDIS_PORT,
         db: int = REDIS_DB_STORAGE,
+        codec: str = GATEWAY_CODEC,
     ):
         self.controller = controller
         self.session_manager = session_manager
@@ -55,7 +69,11 @@ class StatusPublisher:
             redis_conn if redis_conn is not None else redis.Redis(host=host, port=port, db=db)
         )
         self._last_publish = 0.0
+        self._last_keyframe = 0.0
+        self._encoder = StatusEncoder()
+        self._codec = resolve_codec(codec)
         self._gateway_state = GW_STATE_IDLE
+        self._last_settings: dict[str, Any] = {}
 
     @property
     def gateway_state(self) -> str:
@@ -75,40 +93,98 @@ class StatusPublisher:
         if now - self._last_publish < STATUS_INTERVAL:
             return False
 
-        self._publish_status()
+        published = self._publish_status()
         self._last_publish = now
-        return True
+        return published
+
+    def publish_now(self) -> bool:
+        """Force an immediate status publish (e.g. after an event).
 
-    def publish_now(self) -> None:
-        """Force an immediate status publish (e.g. after an event)."""
-        self._publish_status()
+        Nothing is published if the status didn't change, returns ``True``
+        if a message was published.
+        """
+        published = self._publish_status()
         self._last_publish = time.time()
+        return published
+
+    def publish_keyframe(self) -> None:
+        """Force the publication of the complete status."""
+        self._publish_status(keyframe=True)
+        self._last_publish = time.time()
+
+    def advertise_codecs(self) -> None:
+        """Persist the codecs accepted in the command queues, for the clients
+        to negotiate the one of their commands."""
+        self._redis.set(GATEWAY_CODECS_KEY, ",".join(available_codecs()))
+
+    def publish_settings(self) -> bool:
+        """Persist the GRBL settings in Redis, if they changed since the last call.
+
+        Returns ``True`` if they were persisted.
+        """
+        settings = self.controller.get_grbl_settings()
+        if not settings or settings == self._last_settings:
+            return False
+
+        self._redis.set(GRBL_SETTINGS_KEY, json.dumps(settings))
+        self._last_settings = dict(settings)
+        return True
 
     def cleanup(self) -> None:
-        """Remove the gateway state keys from Redis on shutdown."""
+        """Remove the gateway state keys from Redis on shutdown.
+
+        The GRBL settings are kept, they are still valid while the gateway
+        is not running.
+        """
         self._redis.delete(GATEWAY_STATE_KEY)
         self._redis.delete(LAST_STATUS_KEY)
+        self._redis.delete(GATEWAY_CODECS_KEY)
 
     # ------------------------------------------------------------------
     # Internal
     # ------------------------------------------------------------------
 
-    def _publish_status(self) -> None:
-        status = self.controller.grbl_status
+    def _publish_status(self, keyframe: bool = False) -> bool:
+        """Publishes the changes of the status, or all of it in a keyframe.
+
+        The gateway state is updated first, from the file executor and the
+        active session.
+
+        Returns ``True`` if a message was published.
+        """
         session = self.session_manager.get_active_session()
+        if self.file_executor.is_running:
+            self.gateway_state = GW_STATE_FILE_EXECUTION
+        elif session is not None:
+            self.gateway_state = GW_STATE_STREAMING
+        else:
+            self.gateway_state = GW_STATE_IDLE
+
+        status = self.controller.grbl_status
+        record = status.get_status_record()
+        # Changes from the serial thread after this are flagged for the next message
+        changed = record.clear_dirty()
 
-        payload: dict[str, Any] = {
-            "status": status.get_status_report(),
+        sections: dict[str, Any] = {
             "parserstate": status.get_parser_state(),
             "gateway_state": self._gateway_state,
             "session": session,
             "file_progress": None,
         }
-
         if self.file_executor.is_running:
-            payload["file_progress"] = self.file_executor.get_progress()
+            sections["file_progress"] = self.file_executor.get_progress()
 
-        message = json.dumps(payload, default=str)
-        self._redis.publish(STATUS_CHANNEL, message)
-        # Persist snapshot for REST polling (GET /cnc/status)
-        self._redis.set(LAST_STATUS_KEY, message)
+        now = time.time()
+        if keyframe or not self._encoder.seq or now - self._last_keyframe >= KEYFRAME_INTERVAL:
+            payload = self._encoder.keyframe({**sections, "status": record.to_dict()})
+            self._last_keyframe = now
+        else:
+            status_changes = record.to_dict(changed) if changed != StatusField.NONE else {}
+            payload = self._encoder.delta(status_changes, sections)
+            if payload is None:
+                return False
+
+        self._redis.publish(STATUS_CHANNEL, encode(payload, self._codec))
+        # Persist snapshot for REST polling (GET /cnc/status) and new subscribers
+        self._redis.set(LAST_STATUS_KEY, encode(self._encoder.snapshot(), self._codec))
+        return True
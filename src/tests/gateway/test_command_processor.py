@@ -0,0 +1,44 @@
+from core.utilities.gateway.codec import encode
+from core.utilities.gateway.constants import ACTION_FEED_PLUS_10, MSG_REALTIME, QUEUE_CRITICAL
+from core.utilities.grbl.constants import GrblRealtimeCommand
+from gateway.commandListener import CommandListener
+from gateway.commandProcessor import CommandProcessor
+from pytest_mock.plugin import MockerFixture
+
+# Sent from a client whose clock is a minute ahead of the Gateway's
+OVERRIDE = {
+    "type": MSG_REALTIME,
+    "session_id": "abc",
+    "payload": {"action": ACTION_FEED_PLUS_10},
+    "timestamp": 1060.0,
+}
+
+
+class TestCommandProcessor:
+    def test_override_requested_when_received(self, mocker: MockerFixture):
+        controller = mocker.Mock()
+        command_processor = CommandProcessor(
+            controller, mocker.Mock(), mocker.Mock(), redis_conn=mocker.Mock()
+        )
+
+        # Call method under test
+        command_processor.process_message(QUEUE_CRITICAL, encode(OVERRIDE), received_at=1000.5)
+
+        # Assertions
+        # The latency is measured with the Gateway's clock only
+        controller.grbl_override.assert_called_once_with(
+            GrblRealtimeCommand.FEED_OVR_COARSE_PLUS, requested_at=1000.5
+        )
+
+    def test_listener_stamps_messages(self, mocker: MockerFixture):
+        mock_time = mocker.patch("gateway.commandListener.time")
+        mock_time.time.return_value = 1000.0
+        redis_conn = mocker.Mock()
+        redis_conn.blpop.return_value = (QUEUE_CRITICAL.encode(), encode(OVERRIDE))
+        listener = CommandListener(redis_conn, on_message=lambda: listener._stop_event.set())
+
+        # Call method under test
+        listener._run()
+
+        # Assertions
+        assert listener.get_message() == (QUEUE_CRITICAL.encode(), encode(OVERRIDE), 1000.0)
@@ -0,0 +1,223 @@
+import re
+from typing import Optional
+
+import pytest
+from core.utilities.gateway.constants import JOG_HOLD_TIMEOUT
+from gateway.continuousJog import (
+    DEFAULT_SEGMENT_TIME,
+    LOOKAHEAD_SEGMENTS,
+    MAX_PENDING_BYTES,
+    MAX_SEGMENT_TIME,
+    MIN_SEGMENT_TIME,
+    ContinuousJog,
+)
+from pytest_mock.plugin import MockerFixture
+
+
+class FakeController:
+    """The part of `GrblController` used by `ContinuousJog`."""
+
+    def __init__(self):
+        self.status_latency: Optional[float] = None
+        self.jog_cancel_pending = False
+        self.pending_bytes = 0
+        self.commands: list[str] = []
+        self.cancels = 0
+
+    def get_pending_bytes(self) -> int:
+        return self.pending_bytes
+
+    def send_command(self, command: str):
+        self.commands.append(command)
+        self.pending_bytes += len(command) + 1
+
+    def grbl_jog_cancel(self):
+        self.cancels += 1
+        self.commands.clear()
+        self.pending_bytes = 0
+
+
+def axis(command: str, letter: str) -> float:
+    match = re.search(rf"{letter}(-?[\d.]+)", command)
+    return float(match.group(1)) if match else 0.0
+
+
+class TestContinuousJog:
+    @pytest.fixture(autouse=True)
+    def setup_method(self, mocker: MockerFixture):
+        self.now = 100.0
+        mock_time = mocker.patch("gateway.continuousJog.time")
+        mock_time.monotonic.side_effect = lambda: self.now
+
+        self.controller = FakeController()
+        self.jog = ContinuousJog(self.controller)
+
+    def test_hold_fills_lookahead(self):
+        # Call method under test
+        self.jog.hold(1, 0, 0, 600)  # 10 mm/s
+
+        # Assertions
+        assert self.jog.is_active
+        assert len(self.controller.commands) == LOOKAHEAD_SEGMENTS
+        # Every segment lasts the default time
+        for command in self.controller.commands:
+            assert command.startswith("$J=G91")
+            assert axis(command, "X") == pytest.approx(10 * DEFAULT_SEGMENT_TIME)
+            assert axis(command, "F") == 600
+
+    def test_hold_normalizes_direction(self):
+        # Call method under test
+        self.jog.hold(3, 0, -4, 600)
+
+        # Assertions
+        command = self.controller.commands[0]
+        distance = 10 * DEFAULT_SEGMENT_TIME
+        assert axis(command, "X") == pytest.approx(0.6 * distance)
+        assert axis(command, "Z") == pytest.approx(-0.8 * distance)
+
+    def test_refill_bounded_by_pending_bytes(self):
+        self.controller.pending_bytes = MAX_PENDING_BYTES - 1
+
+        # Call method under test
+        self.jog.hold(1, 0, 0, 600)
+
+        # Assertions
+        # Room for one segment only, the rest waits for GRBL
+        assert len(self.controller.commands) == 1
+
+        self.controller.pending_bytes = 0
+        self.jog.tick()
+        assert len(self.controller.commands) == LOOKAHEAD_SEGMENTS
+
+    def test_tick_refills_as_motion_runs(self):
+        self.jog.hold(1, 0, 0, 600)
+
+        # Call method under test
+        self.now += DEFAULT_SEGMENT_TIME
+        self.jog.tick()
+
+        # Assertions
+        # The segment that ran meanwhile is replaced
+        assert len(self.controller.commands) == LOOKAHEAD_SEGMENTS + 1
+        self.jog.tick()
+        assert len(self.controller.commands) == LOOKAHEAD_SEGMENTS + 1
+
+    def test_no_segments_while_cancel_pending(self):
+        self.controller.jog_cancel_pending = True
+
+        # Call method under test
+        self.jog.hold(1, 0, 0, 600)
+
+        # Assertions
+        assert self.jog.is_active
+        assert self.controller.commands == []
+
+    def test_hold_expires(self):
+        self.jog.hold(1, 0, 0, 600)
+
+        # Still held just before the timeout
+        self.now += JOG_HOLD_TIMEOUT - 0.01
+        self.jog.tick()
+        assert self.controller.cancels == 0
+
+        # Call method under test
+        self.now += 0.01
+        self.jog.tick()
+
+        # Assertions
+        assert self.controller.cancels == 1
+        assert not self.jog.is_active
+        assert self.controller.commands == []
+
+    def test_hold_refresh_extends(self):
+        self.jog.hold(1, 0, 0, 600)
+
+        # Call method under test
+        self.now += JOG_HOLD_TIMEOUT - 0.01
+        self.jog.hold(1, 0, 0, 600)
+        self.now += JOG_HOLD_TIMEOUT - 0.01
+        self.jog.tick()
+
+        # Assertions
+        assert self.controller.cancels == 0
+        assert self.jog.is_active
+
+    @pytest.mark.parametrize(
+        "x,y,feedrate,units",
+        [(0, 1, 600, None), (1, 0, 1200, None), (1, 0, 600, "inches")],
+    )
+    def test_change_cancels_first(self, x, y, feedrate, units):
+        self.jog.hold(1, 0, 0, 600)
+
+        # Call method under test
+        self.jog.hold(x, y, 0, feedrate, units=units)
+
+        # Assertions
+        # The old segments are flushed, the new ones follow the new hold
+        assert self.controller.cancels == 1
+        assert len(self.controller.commands) == LOOKAHEAD_SEGMENTS
+        assert axis(self.controller.commands[0], "F") == feedrate
+
+    @pytest.mark.parametrize("x,feedrate", [(0, 600), (1, 0), (1, -600)])
+    def test_invalid_hold_releases(self, x, feedrate):
+        self.jog.hold(1, 0, 0, 600)
+
+        # Call method under test
+        self.jog.hold(x, 0, 0, feedrate)
+
+        # Assertions
+        assert self.controller.cancels == 1
+        assert not self.jog.is_active
+
+    def test_release(self):
+        self.jog.hold(1, 0, 0, 600)
+
+        # Call method under test
+        self.jog.release()
+
+        # Assertions
+        assert self.controller.cancels == 1
+        assert not self.jog.is_active
+        assert self.jog.segments_sent == 0
+
+    def test_stop_doesnt_cancel(self):
+        self.jog.hold(1, 0, 0, 600)
+
+        # Call method under test
+        self.jog.stop()
+        self.jog.tick()
+
+        # Assertions
+        assert self.controller.cancels == 0
+        assert not self.jog.is_active
+
+    def test_is_stale(self):
+        assert not self.jog.is_stale(50.0)
+
+        # Call method under test
+        self.jog.release(timestamp=60.0)
+        self.jog.release(timestamp=55.0)  # out of order, the latest cancel wins
+
+        # Assertions
+        assert self.jog.is_stale(50.0)
+        assert self.jog.is_stale(60.0)
+        assert not self.jog.is_stale(60.5)
+        assert not self.jog.is_stale(None)
+
+    @pytest.mark.parametrize(
+        "latency,expected",
+        [
+            (None, DEFAULT_SEGMENT_TIME),
+            (0.001, MIN_SEGMENT_TIME),
+            (0.06, 0.12),
+            (1.0, MAX_SEGMENT_TIME),
+        ],
+    )
+    def test_segment_time(self, latency, expected):
+        self.controller.status_latency = latency
+
+        # Call method under test
+        segment_time = self.jog.segment_time()
+
+        # Assertions
+        assert segment_time == pytest.approx(expected)
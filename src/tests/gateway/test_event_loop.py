@@ -0,0 +1,79 @@
+import threading
+
+import pytest
+from gateway.eventLoop import GatewayEventLoop
+from pytest_mock.plugin import MockerFixture
+
+
+@pytest.fixture
+def loop():
+    event_loop = GatewayEventLoop()
+    yield event_loop
+    event_loop.close()
+
+
+class RacingSocket:
+    """Wakeup socket calling `wake` from another thread during the first `recv`."""
+
+    def __init__(self, loop: GatewayEventLoop):
+        self.loop = loop
+        self.socket = loop._wakeup_recv
+        self.thread = threading.Thread(target=loop.wake)
+
+    def recv(self, size: int) -> bytes:
+        if self.thread.ident is None:
+            self.thread.start()
+            # Gives wake() the chance to send its byte before the drain
+            self.thread.join(timeout=0.1)
+        return self.socket.recv(size)
+
+
+class TestGatewayEventLoop:
+    def test_wake_runs_handlers(self, loop: GatewayEventLoop):
+        calls = []
+        loop.on_wake(lambda: calls.append(True))
+
+        # Call method under test
+        loop.wake()
+        loop.wake()
+        loop.run_once()
+
+        # Assertions
+        assert calls == [True]
+        assert loop._wakeup_pending is False
+
+    def test_wake_during_drain_is_not_lost(self, loop: GatewayEventLoop, mocker: MockerFixture):
+        loop.wake()
+        racing = RacingSocket(loop)
+        mocker.patch.object(loop, "_wakeup_recv", racing)
+
+        # Call method under test
+        loop._drain_wakeup()
+        racing.thread.join(timeout=1)
+        mocker.stopall()
+
+        # Assertions
+        # The wakeup from the other thread is still signalled
+        assert loop._wakeup_pending is True
+        assert loop._selector.select(timeout=1)
+
+        # And the next ones too, once drained
+        loop._drain_wakeup()
+        loop.wake()
+        assert loop._selector.select(timeout=1)
+
+    def test_timers(self, loop: GatewayEventLoop, mocker: MockerFixture):
+        now = 100.0
+        mock_time = mocker.patch("gateway.eventLoop.time")
+        mock_time.monotonic.side_effect = lambda: now
+        calls = []
+        loop.call_every(0.01, lambda: calls.append(True))
+        assert loop.next_timeout() == pytest.approx(0.01)
+
+        # Call method under test
+        now += 0.01
+        loop.run_once()
+
+        # Assertions
+        assert calls == [True]
+        assert loop.next_timeout() == pytest.approx(0.01)
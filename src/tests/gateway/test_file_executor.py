@@ -0,0 +1,145 @@
+import logging
+from pathlib import Path
+
+import pytest
+from core.utilities.gateway.codec import decode
+from core.utilities.gateway.constants import (
+    EVENT_FILE_FAILED,
+    EVENT_FILE_FINISHED,
+    EVENT_FILE_STARTED,
+    EXEC_MODE_STREAMING,
+)
+from core.utilities.grbl.grblController import GrblController
+from core.utilities.grbl.grblMonitor import GrblMonitor
+from core.utilities.serial.serialService import SerialService
+from gateway.fileExecutor import MAX_COMMAND_SIZE, FileExecutor
+from pytest_mock.plugin import MockerFixture
+
+# 15 characters, 16 bytes with the '\n': 8 of them would fill the 128 bytes up
+LINE = "G1 X1.00 Y1.000"
+LINES = 20
+
+
+def transmit(controller: GrblController) -> int:
+    """Does what serial_io does: sends the queued commands that fit, returns how many."""
+    sent = 0
+    while controller.queue.qsize() and controller.rx_buffer.fits(controller.queue.queue[0]):
+        controller.rx_buffer.push(controller.queue.get_nowait())
+        sent += 1
+    return sent
+
+
+class TestFileExecutorStreaming:
+    @pytest.fixture(autouse=True)
+    def setup_method(self, mocker: MockerFixture, tmp_path: Path):
+        # Mock logger methods
+        mocker.patch.object(GrblMonitor, "debug")
+        mocker.patch.object(GrblMonitor, "info")
+        mocker.patch.object(GrblMonitor, "error")
+        mocker.patch.object(GrblMonitor, "critical")
+        mocker.patch.object(GrblMonitor, "received")
+        mocker.patch.object(SerialService, "wake")
+
+        self.controller = GrblController(logging.getLogger("test_logger"))
+        self.redis = mocker.Mock()
+        self.file_executor = FileExecutor(self.controller, redis_conn=self.redis)
+        self.program = tmp_path / "program.gcode"
+
+    def start(self, lines: list[str]):
+        self.program.write_text("".join(f"{line}\n" for line in lines))
+        self.file_executor.start(str(self.program), task_id=1, mode=EXEC_MODE_STREAMING)
+
+    def events(self) -> list[dict]:
+        return [decode(call.args[1]) for call in self.redis.publish.call_args_list]
+
+    def test_admission_up_to_buffer_limit(self):
+        self.start([LINE] * LINES)
+
+        # Call method under test
+        self.file_executor.tick()
+
+        # Assertions
+        # 7 lines take 112 bytes, an 8th one would fill the buffer up
+        assert self.controller.queue.qsize() == 7
+        assert self.controller.get_pending_bytes() == 112
+        # And the controller sends them all, none is held back in the queue
+        assert transmit(self.controller) == 7
+        assert self.controller.queue.qsize() == 0
+
+        # Nothing more fits until GRBL acknowledges a line
+        self.file_executor.tick()
+        assert self.controller.queue.qsize() == 0
+
+    def test_ok_releases_lines(self):
+        self.start([LINE] * LINES)
+        self.file_executor.tick()
+        transmit(self.controller)
+
+        # Call method under test
+        self.controller.parse_response("ok")
+        self.controller.parse_response("ok")
+
+        # Assertions
+        # Refilled from the serial thread, on every 'ok'
+        assert self.controller.queue.qsize() == 2
+        assert transmit(self.controller) == 2
+        assert self.controller.rx_buffer.in_flight == 7
+        assert self.file_executor.get_progress()["sent_lines"] == 9
+
+    def test_streams_whole_program(self):
+        self.start([LINE] * LINES)
+
+        # Call method under test
+        self.file_executor.tick()
+        while transmit(self.controller):
+            for _ in range(self.controller.rx_buffer.in_flight):
+                self.controller.parse_response("ok")
+        self.file_executor.tick()
+
+        # Assertions
+        assert self.controller.get_commands_count() == LINES
+        assert self.file_executor.is_running is False
+        events = [event["type"] for event in self.events()]
+        assert events[0] == EVENT_FILE_STARTED
+        assert events[-1] == EVENT_FILE_FINISHED
+
+    @pytest.mark.parametrize("response", ["error:22", "ALARM:1"])
+    def test_error_stops_streaming(self, response):
+        self.start([LINE] * LINES)
+        self.file_executor.tick()
+        transmit(self.controller)
+
+        # Call method under test
+        self.controller.parse_response(response)
+        self.controller.parse_response("ok")  # a late 'ok' doesn't refill
+        queued = self.controller.queue.qsize()
+        self.file_executor.tick()
+
+        # Assertions
+        assert queued == 0
+        assert self.file_executor.is_running is False
+        event = self.events()[-1]
+        assert event["type"] == EVENT_FILE_FAILED
+        assert event["task_id"] == 1
+
+    def test_line_too_long(self):
+        # Call method under test
+        self.start([LINE, "G1 X" + "1" * MAX_COMMAND_SIZE, LINE])
+
+        # Assertions
+        # It could never be sent, the file is rejected before sending anything
+        assert self.file_executor.is_running is False
+        assert self.controller.queue.qsize() == 0
+        event = self.events()[-1]
+        assert event["type"] == EVENT_FILE_FAILED
+        assert event["error"] == f"Line 2 is longer than {MAX_COMMAND_SIZE} characters"
+
+    def test_longest_line(self):
+        self.start(["G1 X" + "1" * (MAX_COMMAND_SIZE - 4)])
+
+        # Call method under test
+        self.file_executor.tick()
+
+        # Assertions
+        assert transmit(self.controller) == 1
+        assert self.controller.rx_buffer.used_bytes == MAX_COMMAND_SIZE + 1
@@ -0,0 +1,106 @@
+import pytest
+import redis
+from gateway.redisBatch import REFRESH_INTERVAL, RedisBatch
+from pytest_mock.plugin import MockerFixture
+
+
+class TestRedisBatch:
+    @pytest.fixture(autouse=True)
+    def setup_method(self, mocker: MockerFixture):
+        self.now = 100.0
+        mock_time = mocker.patch("gateway.redisBatch.time")
+        mock_time.monotonic.side_effect = lambda: self.now
+
+        self.redis = mocker.Mock()
+        self.pipe = self.redis.pipeline.return_value
+        self.batch = RedisBatch(self.redis)
+
+    def test_writes_are_sent_in_one_pipeline(self):
+        self.batch.publish("channel", b"message")
+        self.batch.set("key", b"value")
+        self.batch.delete("other")
+
+        # Call method under test
+        sent = self.batch.flush()
+
+        # Assertions
+        assert sent == 3
+        self.redis.pipeline.assert_called_once_with(transaction=False)
+        self.pipe.publish.assert_called_once_with("channel", b"message")
+        self.pipe.set.assert_called_once_with("key", b"value")
+        self.pipe.delete.assert_called_once_with("other")
+        self.pipe.execute.assert_called_once()
+        # Nothing left to send
+        assert self.batch.flush() == 0
+        assert self.redis.pipeline.call_count == 1
+
+    def test_unchanged_set_is_skipped(self):
+        self.batch.set("key", b"value")
+        self.batch.flush()
+
+        # Call method under test
+        buffered = self.batch.set("key", b"value")
+        changed = self.batch.set("key", b"other")
+
+        # Assertions
+        assert buffered is False
+        assert changed is True
+        assert self.batch.stats.skipped == 1
+        assert self.batch.flush() == 1
+        self.pipe.set.assert_called_with("key", b"other")
+
+    def test_unchanged_set_is_refreshed(self):
+        self.batch.set("key", b"value")
+
+        # Call method under test
+        self.now += REFRESH_INTERVAL - 0.01
+        skipped = not self.batch.set("key", b"value")
+        self.now += 0.01
+        refreshed = self.batch.set("key", b"value")
+
+        # Assertions
+        assert skipped
+        assert refreshed
+
+    def test_delete_forgets_the_key(self):
+        self.batch.set("key", b"value")
+
+        # Call method under test
+        self.batch.delete("key")
+
+        # Assertions
+        # The key doesn't hold the value anymore, it must be written again
+        assert self.batch.set("key", b"value") is True
+
+    def test_failed_pipeline_forgets_the_keys(self):
+        self.pipe.execute.side_effect = redis.ConnectionError("Connection lost")
+        self.batch.set("key", b"value")
+
+        # Call method under test
+        sent = self.batch.flush()
+
+        # Assertions
+        # The write may not have been done, the next one isn't skipped
+        assert sent == 1
+        assert self.batch.set("key", b"value") is True
+
+    def test_round_trips_per_tick(self):
+        self.batch.get("key")
+        self.batch.exists("key")
+        self.batch.publish("channel", b"message")
+        self.batch.set("key", b"value")
+
+        # Call method under test
+        self.batch.end_tick()
+        # A tick without writes doesn't send a pipeline
+        self.batch.end_tick()
+
+        # Assertions
+        assert self.batch.last_tick_round_trips == 0
+        stats = self.batch.take_stats()
+        assert stats.ticks == 2
+        assert stats.round_trips == 3
+        assert stats.max_per_tick == 3
+        assert stats.per_tick == 1.5
+        assert stats.commands == 2
+        assert self.batch.stats.ticks == 0
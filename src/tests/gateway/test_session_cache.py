@@ -0,0 +1,122 @@
+import json
+
+import pytest
+from gateway.sessionCache import SESSION_REFRESH_INTERVAL, SessionCache
+from gateway.sessionManager import SessionManager
+from pytest_mock.plugin import MockerFixture
+
+SESSION = {"session_id": "abc", "user_id": 1, "client_type": "desktop"}
+
+
+class TestSessionCache:
+    @pytest.fixture(autouse=True)
+    def setup_method(self, mocker: MockerFixture):
+        self.now = 100.0
+        mock_time = mocker.patch("gateway.sessionCache.time")
+        mock_time.monotonic.side_effect = lambda: self.now
+
+        # Values of GET and PTTL of the session key
+        self.session = None
+        self.ttl_ms = -2
+        self.reads = 0
+        self.on_read = None
+
+        self.redis = mocker.Mock()
+        self.redis.connection_pool.connection_kwargs = {"db": 0}
+        self.redis.pipeline.return_value.execute.side_effect = self.execute
+        self.cache = SessionCache(self.redis)
+
+    def execute(self):
+        self.reads += 1
+        if self.on_read is not None:
+            self.on_read()
+        raw = json.dumps(self.session) if self.session is not None else None
+        return [raw, self.ttl_ms]
+
+    def test_get_is_cached(self):
+        self.session = SESSION
+
+        # Call method under test
+        first = self.cache.get()
+        second = self.cache.get()
+
+        # Assertions
+        assert first == second == SESSION
+        assert self.reads == 1
+
+    def test_invalidate_reloads(self):
+        self.cache.get()
+        self.session = SESSION
+
+        # Call method under test
+        self.cache.invalidate()
+        session = self.cache.get()
+
+        # Assertions
+        assert session == SESSION
+        assert self.reads == 2
+
+    def test_refresh_interval(self):
+        self.cache.get()
+
+        # Call method under test
+        self.now += SESSION_REFRESH_INTERVAL - 0.01
+        self.cache.get()
+        reads = self.reads
+        self.now += 0.01
+        self.cache.get()
+
+        # Assertions
+        # Read again even if no change was notified
+        assert reads == 1
+        assert self.reads == 2
+
+    def test_expiry_capped_by_ttl(self):
+        self.session = SESSION
+        self.ttl_ms = 2000
+        self.cache.get()
+
+        # Call method under test
+        self.now += 1.99
+        session = self.cache.get()
+        reads = self.reads
+        self.session = None
+        self.now += 0.01
+        expired = self.cache.get()
+
+        # Assertions
+        # The lock expires before the refresh interval, and so does the cache
+        assert session == SESSION
+        assert reads == 1
+        assert expired is None
+        assert self.reads == 2
+
+    def test_invalidate_during_load_is_not_lost(self):
+        self.on_read = self.cache.invalidate
+
+        # Call method under test
+        # Notified while the session was being read, it may be stale
+        self.cache.get()
+        self.on_read = None
+        self.session = SESSION
+        session = self.cache.get()
+
+        # Assertions
+        assert session == SESSION
+        assert self.reads == 2
+        self.cache.get()
+        assert self.reads == 2
+
+    def test_validate_session_refreshes_first(self):
+        session_manager = SessionManager(redis_conn=self.redis, session_cache=self.cache)
+        assert session_manager.validate_session("abc") is False
+
+        # Call method under test
+        # Acquired, but not notified yet
+        self.session = SESSION
+        valid = session_manager.validate_session("abc")
+
+        # Assertions
+        assert valid is True
+        assert self.reads == 3
+        assert session_manager.validate_session("xyz") is False
@@ -53,17 +53,72 @@ N90 G66
                     "unsupported_commands": ["G66"],
                 },
             ),
+            (
+                """; G0 in a comment
+G21 G90 (set units) G1 X1 F500 M3
+g1 x2 f800.5
+  (M0 pause in a comment)
+M0
+T1 M6
+M30""",
+                {
+                    "total_lines": 7,
+                    "pause_count": 1,
+                    "movement_lines": 2,
+                    "comment_count": 2,
+                    "tools": ["T1"],
+                    "max_feedrate": 800,
+                    "commands_usage": {
+                        "G21": 1,
+                        "G90": 1,
+                        "G1": 2,
+                        "M3": 1,
+                        "M0": 1,
+                        "M6": 1,
+                        "M30": 1,
+                    },
+                    "unsupported_commands": ["M6"],
+                },
+            ),
         ],
     )
-    def test_file_sender_start(self, mocker: MockerFixture, content, expected):
-        analyser = GcodeAnalyser("/path/to/file")
-
-        # Mock FS methods
-        mocked_file_data = mocker.mock_open(read_data=content)
-        mocker.patch("builtins.open", mocked_file_data)
+    def test_file_sender_start(self, tmp_path, content, expected):
+        gcode = tmp_path / "file.gcode"
+        gcode.write_text(content)
+        analyser = GcodeAnalyser(gcode)
 
         # Call method under test
         result = analyser.analyse()
 
         # Assertions
         assert result == expected
+
+    def test_analyse_in_small_blocks(self, tmp_path, mocker: MockerFixture):
+        content = "(header)\nG21 G90\n; G0 in a comment\nG1 X1 F500\n(M0 in a comment)\nM0\n" * 20
+        gcode = tmp_path / "file.gcode"
+        gcode.write_text(content)
+        expected = GcodeAnalyser(gcode).analyse()
+
+        # Scan the file in blocks of a few lines
+        mocker.patch("core.utilities.gcode.gcodeAnalyser.BLOCK_SIZE", 16)
+
+        # Call method under test
+        result = GcodeAnalyser(gcode).analyse()
+
+        # Assertions
+        assert result == expected
+        assert result["total_lines"] == 120
+        assert result["comment_count"] == 60
+        assert result["pause_count"] == 20
+
+    def test_analyse_empty_file(self, tmp_path):
+        gcode = tmp_path / "file.gcode"
+        gcode.write_text("")
+        analyser = GcodeAnalyser(gcode)
+
+        # Call method under test
+        result = analyser.analyse()
+
+        # Assertions
+        assert result["total_lines"] == 0
+        assert result["commands_usage"] == {}
@@ -0,0 +1,28 @@
+import pytest
+from core.utilities.gcode.gcodePreview import (
+    PREVIEW_SIZES,
+    get_preview_path,
+    select_preview_size,
+)
+
+
+@pytest.mark.parametrize(
+    "viewport,expected",
+    [
+        (100, 256),
+        (256, 256),
+        (800, 1024),
+        (2048, 2048),
+        (5000, 2048),
+    ],
+)
+def test_select_preview_size(viewport, expected):
+    assert select_preview_size(viewport) == expected
+
+
+def test_get_preview_path(tmp_path):
+    # Call method under test
+    path = get_preview_path("abc123", PREVIEW_SIZES[0], tmp_path)
+
+    # Assertions
+    assert path == tmp_path / "abc123" / "256.json"
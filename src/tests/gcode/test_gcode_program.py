@@ -0,0 +1,100 @@
+from core.utilities.gcode.gcodeProgram import ProgramCache, compile_program
+from pytest_mock.plugin import MockerFixture
+
+PROGRAM = """G90
+; feature prime pillar
+
+  G1 F3000
+(N50 G01 X10 F20)
+G1 X24.263 Y95.358 (move to start)
+G1 Z0.250 ; lower
+(only comments) ; here
+M2
+"""
+
+
+class TestGcodeProgram:
+    def test_compile_program(self, tmp_path):
+        gcode = tmp_path / "program.gcode"
+        gcode.write_text(PROGRAM)
+
+        program = compile_program(gcode)
+
+        # Assertions
+        assert len(program) == 5
+        assert program.total_lines == 9
+        assert [program.command(i) for i in range(len(program))] == [
+            "G90",
+            "G1 F3000",
+            "G1 X24.263 Y95.358",
+            "G1 Z0.250",
+            "M2",
+        ]
+        assert [program.source_line(i) for i in range(len(program))] == [1, 4, 6, 7, 9]
+        assert program.size(2) == len("G1 X24.263 Y95.358")
+
+    def test_find_longer(self, tmp_path):
+        gcode = tmp_path / "program.gcode"
+        gcode.write_text(PROGRAM)
+
+        program = compile_program(gcode)
+
+        # Assertions
+        assert program.find_longer(len("G1 X24.263 Y95.358")) is None
+        assert program.find_longer(9) == 2
+
+    def test_compile_empty_program(self, tmp_path):
+        gcode = tmp_path / "program.gcode"
+        gcode.write_text("; nothing to do\n\n")
+
+        program = compile_program(gcode)
+
+        # Assertions
+        assert len(program) == 0
+        assert program.total_lines == 2
+
+
+class TestProgramCache:
+    def test_get_or_compile_uses_cache(self, tmp_path, mocker: MockerFixture):
+        gcode = tmp_path / "program.gcode"
+        gcode.write_text(PROGRAM)
+        spy_compile = mocker.patch(
+            "core.utilities.gcode.gcodeProgram.compile_program",
+            wraps=compile_program,
+        )
+
+        cache = ProgramCache(max_bytes=1024)
+        first = cache.get_or_compile("hash", gcode)
+        second = cache.get_or_compile("hash", gcode)
+
+        # Assertions
+        assert first is second
+        assert spy_compile.call_count == 1
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        gcode = tmp_path / "program.gcode"
+        gcode.write_text(PROGRAM)
+        program = compile_program(gcode)
+
+        cache = ProgramCache(max_bytes=2 * program.nbytes)
+        cache.put("a", program)
+        cache.put("b", program)
+        cache.get("a")
+        cache.put("c", program)
+
+        # Assertions
+        assert len(cache) == 2
+        assert cache.get("a") is program
+        assert cache.get("b") is None
+        assert cache.get("c") is program
+
+    def test_keeps_last_program_over_budget(self, tmp_path):
+        gcode = tmp_path / "program.gcode"
+        gcode.write_text(PROGRAM)
+        program = compile_program(gcode)
+
+        cache = ProgramCache(max_bytes=1)
+        cache.put("a", program)
+
+        # Assertions
+        assert cache.get("a") is program
@@ -4,7 +4,12 @@ from queue import Empty, Queue
 
 import mocks.grbl as grbl_mocks
 import pytest
-from core.utilities.grbl.grblController import GrblController
+from core.utilities.grbl.constants import GrblRealtimeCommand
+from core.utilities.grbl.grblController import (
+    IDLE_READ_TIMEOUT,
+    GrblController,
+    SerialWriteStats,
+)
 from core.utilities.grbl.grblLineParser import GrblLineParser
 from core.utilities.grbl.grblMonitor import GrblMonitor
 from core.utilities.grbl.grblStatus import GrblStatus
@@ -13,7 +18,8 @@ from core.utilities.grbl.parsers.grblMsgTypes import (
     GRBL_MSG_STARTUP,
     GRBL_RESULT_OK,
 )
-from core.utilities.serial import SerialService
+from core.utilities.grbl.rxBufferTracker import RxBufferTracker
+from core.utilities.serial.serialService import SerialService
 from pytest_mock.plugin import MockerFixture
 from serial import SerialException
 
@@ -165,6 +171,29 @@ class TestGrblController:
         assert self.grbl_controller.queue.qsize() == 1
         assert self.grbl_controller.queue.get_nowait() == "$"
 
+    @pytest.mark.parametrize("command", ["", "   ", "; comment", "(comment)"])
+    def test_send_command_skips_comments(self, command):
+        # Set up command queue for test
+        self.grbl_controller.queue = Queue()
+        self.grbl_controller.restart_commands_count()
+
+        # Call method under test
+        self.grbl_controller.send_command(command)
+
+        # Assertions
+        assert self.grbl_controller.queue.qsize() == 0
+        assert self.grbl_controller.commands_count == 1
+
+    def test_send_program_command(self):
+        # Set up command queue for test
+        self.grbl_controller.queue = Queue()
+
+        # Call method under test
+        self.grbl_controller.send_program_command("G1 X10")
+
+        # Assertions
+        assert self.grbl_controller.queue.get_nowait() == "G1 X10"
+
     def test_handle_homing_cycle(self, mocker: MockerFixture):
         # Mock GRBL methods
         mock_disable_alarm = mocker.patch.object(GrblController, "disable_alarm")
@@ -312,7 +341,8 @@ class TestGrblController:
     )
     def test_get_buffer_fill(self, occupied, expected):
         # Set test value for controller's active state
-        self.grbl_controller._sumcline = occupied
+        if occupied:
+            self.grbl_controller.rx_buffer.push("G" * (occupied - 1))
 
         # Call methods under test
         value = self.grbl_controller.get_buffer_fill()
@@ -320,6 +350,19 @@ class TestGrblController:
         # Assertions
         assert value == expected
 
+    def test_get_pending_bytes(self):
+        # Set test values: bytes in GRBL buffer and queued commands
+        self.grbl_controller.rx_buffer.push("G1 X10 Y10 Z10 F500")  # 20 bytes with '\n'
+        self.grbl_controller.queue.put("G1 X10")
+        self.grbl_controller.queue.put("$G")
+
+        # Call method under test
+        value = self.grbl_controller.get_pending_bytes()
+
+        # Assertions
+        # 20 + len("G1 X10\n") + len("$G\n")
+        assert value == 30
+
     def test_empty_command_queue(self, mocker: MockerFixture):
         # Mock queue contents
         self.grbl_controller.queue.put("Command 1")
@@ -356,17 +399,17 @@ class TestGrblController:
         self.grbl_controller.parameters = {}
 
         # Simulate getting responses from GRBL
-        self.grbl_controller.parse_response("[G54:0.000,0.000,0.000]", [], [])
-        self.grbl_controller.parse_response("[G55:0.000,0.000,0.000]", [], [])
-        self.grbl_controller.parse_response("[G56:0.000,0.000,0.000]", [], [])
-        self.grbl_controller.parse_response("[G57:0.000,0.000,0.000]", [], [])
-        self.grbl_controller.parse_response("[G58:0.000,0.000,0.000]", [], [])
-        self.grbl_controller.parse_response("[G59:0.000,0.000,0.000]", [], [])
-        self.grbl_controller.parse_response("[G28:0.000,0.000,0.000]", [], [])
-        self.grbl_controller.parse_response("[G30:0.000,0.000,0.000]", [], [])
-        self.grbl_controller.parse_response("[G92:0.000,0.000,0.000]", [], [])
-        self.grbl_controller.parse_response("[TLO:0.000]", [], [])
-        self.grbl_controller.parse_response("[PRB:0.000,0.000,0.000:0]", [], [])
+        self.grbl_controller.parse_response("[G54:0.000,0.000,0.000]")
+        self.grbl_controller.parse_response("[G55:0.000,0.000,0.000]")
+        self.grbl_controller.parse_response("[G56:0.000,0.000,0.000]")
+        self.grbl_controller.parse_response("[G57:0.000,0.000,0.000]")
+        self.grbl_controller.parse_response("[G58:0.000,0.000,0.000]")
+        self.grbl_controller.parse_response("[G59:0.000,0.000,0.000]")
+        self.grbl_controller.parse_response("[G28:0.000,0.000,0.000]")
+        self.grbl_controller.parse_response("[G30:0.000,0.000,0.000]")
+        self.grbl_controller.parse_response("[G92:0.000,0.000,0.000]")
+        self.grbl_controller.parse_response("[TLO:0.000]")
+        self.grbl_controller.parse_response("[PRB:0.000,0.000,0.000:0]")
 
         # Assertions
         assert self.grbl_controller.parameters == {
@@ -388,8 +431,8 @@ class TestGrblController:
         self.grbl_controller.settings = {}
 
         # Simulate getting responses from GRBL
-        self.grbl_controller.parse_response("$0=100.200", [], [])
-        self.grbl_controller.parse_response("$102=1.000", [], [])
+        self.grbl_controller.parse_response("$0=100.200")
+        self.grbl_controller.parse_response("$102=1.000")
 
         # Assertions
         assert self.grbl_controller.settings == {
@@ -430,7 +473,7 @@ class TestGrblController:
 
         # Simulate getting responses from GRBL
         for message in messages:
-            self.grbl_controller.parse_response(message, [], [])
+            self.grbl_controller.parse_response(message)
 
         # Assertions
         assert self.grbl_controller.build_info == expected
@@ -445,7 +488,7 @@ class TestGrblController:
         mock_monitor_info = mocker.patch.object(GrblMonitor, "info")
 
         # Simulate getting responses from GRBL
-        self.grbl_controller.parse_response(message, [], [])
+        self.grbl_controller.parse_response(message)
 
         # Assertions
         assert mock_monitor_info.call_count == 1
@@ -459,7 +502,7 @@ class TestGrblController:
 
         # Simulate getting responses from GRBL
         self.grbl_controller.parse_response(
-            "[HLP:$$ $# $G $I $N $x=val $Nx=line $J=line $C $X $H ~ ! ? ctrl-x]", [], []
+            "[HLP:$$ $# $G $I $N $x=val $Nx=line $J=line $C $X $H ~ ! ? ctrl-x]"
         )
 
         # Assertions
@@ -470,7 +513,7 @@ class TestGrblController:
     def test_parser_receive_parser_state(self, mocker: MockerFixture):
         # Simulate getting responses from GRBL
         self.grbl_controller.parse_response(
-            "[GC:G38.2 G54 G17 G21 G91 G94 M0 M5 M7 M8 T0 F20. S0.]", [], []
+            "[GC:G38.2 G54 G17 G21 G91 G94 M0 M5 M7 M8 T0 F20. S0.]"
         )
 
         # Assertions
@@ -490,13 +533,11 @@ class TestGrblController:
             "feedrate": 20.0,
             "spindle": 0.0,
         }
-        assert self.grbl_status._state["parserstate"] == expected_parser_state
+        assert self.grbl_status.get_parser_state() == expected_parser_state
 
     def test_parser_receive_status_report(self):
         # Simulate getting responses from GRBL
-        self.grbl_controller.parse_response(
-            "<Idle|MPos:5.000,2.000,0.000|FS:0,0|Ov:100,100,100>", [], []
-        )
+        self.grbl_controller.parse_response("<Idle|MPos:5.000,2.000,0.000|FS:0,0|Ov:100,100,100>")
 
         # Assertions
         new_status = {
@@ -513,34 +554,51 @@ class TestGrblController:
             "line": None,
             "accessoryState": None,
         }
-        assert self.grbl_controller.grbl_status._state["status"] == new_status
+        assert self.grbl_controller.grbl_status.get_status_report() == new_status
 
     def test_parser_receive_disable_alarm_feedback(self):
         # Simulate getting responses from GRBL
-        self.grbl_controller.parse_response("[MSG:Caution: Unlocked]", [], [])
+        self.grbl_controller.parse_response("[MSG:Caution: Unlocked]")
 
         # Assertions
         assert self.grbl_status.is_alarm() is False
 
     def test_parser_receive_ok(self):
         # Set test values
-        cline = [1, 2, 3]
-        sline = ["$H", "G54", "G00 X0 Y0"]
-        self.grbl_controller._sumcline = 6  # sum([1, 2, 3])
+        for command in ["$H", "G54", "G00 X0 Y0"]:
+            self.grbl_controller.rx_buffer.push(command)
 
         # Simulate getting responses from GRBL
-        self.grbl_controller.parse_response("ok", cline, sline)
+        self.grbl_controller.parse_response("ok")
 
         # Assertions
-        assert cline == [2, 3]
-        assert sline == ["G54", "G00 X0 Y0"]
-        assert self.grbl_controller._sumcline == 5
+        assert self.grbl_controller.get_commands_in_flight() == 2
+        # len("G54\n") + len("G00 X0 Y0\n")
+        assert self.grbl_controller.rx_buffer.used_bytes == 14
+
+    def test_parser_receive_ok_notifies_ack(self, mocker: MockerFixture):
+        # Register a callback for acknowledgements
+        ack_callback = mocker.Mock()
+        self.grbl_controller.add_ack_listener(ack_callback)
+
+        # Simulate getting responses from GRBL
+        self.grbl_controller.rx_buffer.push("G54")
+        self.grbl_controller.parse_response("ok")
+        self.grbl_controller.parse_response("error:25")
+
+        # Assertions
+        assert ack_callback.call_count == 1
+
+        # Unregister the callback
+        self.grbl_controller.remove_ack_listener(ack_callback)
+        self.grbl_controller.rx_buffer.push("G54")
+        self.grbl_controller.parse_response("ok")
+        assert ack_callback.call_count == 1
 
     def test_parser_receive_error(self, mocker: MockerFixture):
         # Set test values
-        cline = [1, 2, 3]
-        sline = ["G54 G54", "G90", "G00 X0 Y0"]
-        self.grbl_controller._sumcline = 6  # sum([1, 2, 3])
+        for command in ["G54 G54", "G90", "G00 X0 Y0"]:
+            self.grbl_controller.rx_buffer.push(command)
 
         # Mock status methods
         mock_set_error = mocker.patch.object(GrblStatus, "set_error")
@@ -552,13 +610,12 @@ class TestGrblController:
         mock_pause = mocker.patch.object(self.grbl_controller, "grbl_pause")
 
         # Simulate getting responses from GRBL
-        self.grbl_controller.parse_response("error:25", cline, sline)
+        self.grbl_controller.parse_response("error:25")
 
         # Assertions
-        # cline and sline are cleared because GRBL discards buffered commands on error
-        assert cline == []
-        assert sline == []
-        assert self.grbl_controller._sumcline == 0
+        # The tracker is cleared because GRBL discards buffered commands on error
+        assert self.grbl_controller.get_commands_in_flight() == 0
+        assert self.grbl_controller.rx_buffer.used_bytes == 0
         assert mock_set_error.call_count == 1
         mock_set_error.assert_called_with(
             "G54 G54",
@@ -577,9 +634,8 @@ class TestGrblController:
 
     def test_parser_receive_alarm(self, mocker: MockerFixture):
         # Set test values
-        cline = [1, 2, 3]
-        sline = ["$H", "G54", "G00 X0 Y0"]
-        self.grbl_controller._sumcline = 6  # sum([1, 2, 3])
+        for command in ["$H", "G54", "G00 X0 Y0"]:
+            self.grbl_controller.rx_buffer.push(command)
 
         # Mock status methods
         mock_set_error = mocker.patch.object(GrblStatus, "set_error")
@@ -588,13 +644,12 @@ class TestGrblController:
         mock_monitor_critical = mocker.patch.object(GrblMonitor, "critical")
 
         # Simulate getting responses from GRBL
-        self.grbl_controller.parse_response("ALARM:6", cline, sline)
+        self.grbl_controller.parse_response("ALARM:6")
 
         # Assertions
-        # cline and sline are cleared because GRBL abandons buffered commands on alarm
-        assert cline == []
-        assert sline == []
-        assert self.grbl_controller._sumcline == 0
+        # The tracker is cleared because GRBL abandons buffered commands on alarm
+        assert self.grbl_controller.get_commands_in_flight() == 0
+        assert self.grbl_controller.rx_buffer.used_bytes == 0
         assert mock_set_error.call_count == 1
         mock_set_error.assert_called_with(
             "$H",
@@ -617,8 +672,8 @@ class TestGrblController:
     @pytest.mark.parametrize("paused", [True, False])
     def test_serial_io(self, mocker: MockerFixture, paused):
         # **Test case description (no pause)**
-        # Round 1: get command to send + read line + parse line + send command
-        # Round 2: get command to send + send command
+        # Round 1: get command to send + read line + parse line + send both commands
+        # Round 2: nothing to send + read line (no response)
         # Round 3: read line (no response) — then thread stops
 
         # Mock attributes
@@ -652,7 +707,7 @@ class TestGrblController:
         mock_serial_read_line = mocker.patch.object(
             SerialService, "readLine", side_effect=["test message", "", ""]
         )
-        mock_serial_send_line = mocker.patch.object(SerialService, "sendLine")
+        mock_serial_send_lines = mocker.patch.object(SerialService, "sendLines")
 
         # Mock monitor methods
         mock_monitor_sent = mocker.patch.object(GrblMonitor, "sent")
@@ -667,15 +722,21 @@ class TestGrblController:
         # Assertions
         # **Read serial section**
         assert mock_serial_waiting.call_count == 3
-        assert mock_serial_read_line.call_count == (3 if paused else 2)
+        assert mock_serial_read_line.call_count == 3
         assert mock_parse_response.call_count == 1
         # **Write serial section**
         # qsize() is always called (peek happens before the paused check),
         # so the count is 3 regardless of pause state.
         assert spy_queue_size.call_count == 3
         assert spy_queue_get.call_count == (0 if paused else 2)
-        assert mock_serial_send_line.call_count == (0 if paused else 2)
+        if paused:
+            mock_serial_send_lines.assert_not_called()
+        else:
+            # A single write
+            mock_serial_send_lines.assert_called_once_with(["Command 1", "Command 2"])
         assert mock_monitor_sent.call_count == (0 if paused else 2)
+        assert self.grbl_controller.write_stats.writes == (0 if paused else 1)
+        assert self.grbl_controller.write_stats.lines == (0 if paused else 2)
 
     @pytest.mark.parametrize("error_read,error_send", [(True, False), (False, True)])
     def test_serial_io_serial_error(self, mocker: MockerFixture, error_read, error_send):
@@ -694,8 +755,8 @@ class TestGrblController:
         mock_serial_read_line = mocker.patch.object(
             SerialService, "readLine", side_effect=SerialException("mocked-error")
         )
-        mock_serial_send_line = mocker.patch.object(
-            SerialService, "sendLine", side_effect=SerialException("mocked-error")
+        mock_serial_send_lines = mocker.patch.object(
+            SerialService, "sendLines", side_effect=SerialException("mocked-error")
         )
 
         # Mock status methods
@@ -710,7 +771,7 @@ class TestGrblController:
         # Assertions
         assert mock_serial_waiting.call_count == 1
         assert mock_serial_read_line.call_count == (1 if error_read else 0)
-        assert mock_serial_send_line.call_count == (1 if error_send else 0)
+        assert mock_serial_send_lines.call_count == (1 if error_send else 0)
         assert mock_parse_response.call_count == 0
         assert mock_monitor_error.call_count == 1
         assert mock_disconnect.call_count == 1
@@ -756,13 +817,13 @@ class TestGrblController:
             self.grbl_controller.serial_thread = None
             return False
 
-        # Mock builtin 'sum' function
-        mock_sum = mocker.patch("builtins.sum", return_value=500)
+        # Mock a full RX buffer
+        mock_fits = mocker.patch.object(RxBufferTracker, "fits", return_value=False)
 
         # Mock serial methods
         mocker.patch.object(SerialService, "waiting", side_effect=stop_thread)
-        mocker.patch.object(SerialService, "readLine", return_value="")
-        mock_send_line = mocker.patch.object(SerialService, "sendLine")
+        mock_read_line = mocker.patch.object(SerialService, "readLine", return_value="")
+        mock_send_lines = mocker.patch.object(SerialService, "sendLines")
 
         # Mock status methods
         mocker.patch.object(GrblStatus, "paused", return_value=False)
@@ -774,8 +835,10 @@ class TestGrblController:
         self.grbl_controller.serial_io()
 
         # Assertions
-        assert mock_sum.call_count == 3  # if-condition + elif-debug + finally
-        assert mock_send_line.call_count == 0
+        mock_fits.assert_called_with("Command 1")
+        # Waits for GRBL to make room
+        mock_read_line.assert_called_once_with(IDLE_READ_TIMEOUT)
+        assert mock_send_lines.call_count == 0
         assert mock_monitor_sent.call_count == 0
 
     def test_serial_io_end_command(self, mocker: MockerFixture):
@@ -788,7 +851,7 @@ class TestGrblController:
 
         # Mock serial methods
         mocker.patch.object(SerialService, "waiting", return_value=False)
-        mock_serial_send_line = mocker.patch.object(SerialService, "sendLine")
+        mock_serial_send_lines = mocker.patch.object(SerialService, "sendLines")
 
         # Mock status methods
         mocker.patch.object(GrblStatus, "paused", return_value=False)
@@ -800,7 +863,7 @@ class TestGrblController:
         self.grbl_controller.serial_io()
 
         # Assertions
-        assert mock_serial_send_line.call_count == 2
+        mock_serial_send_lines.assert_called_once_with(["Command 1", "M30"])
         assert mock_monitor_info.call_count == 3  # started + end cmd + exiting
         mock_monitor_info.assert_any_call("A program end command was found: M30")
         assert self.grbl_controller.grbl_status._flags["finished"] is True
@@ -808,8 +871,8 @@ class TestGrblController:
 
     # BUFFER MANAGEMENT
 
-    def test_cline_includes_newline_byte(self, mocker: MockerFixture):
-        """Verify that ``cline`` accounts for the '\\n' appended by ``sendLine``."""
+    def test_rx_buffer_includes_newline_byte(self, mocker: MockerFixture):
+        """Verify that ``rx_buffer`` accounts for the '\\n' appended by ``sendLines``."""
         # Mock attributes
         self.grbl_controller.serial_thread = threading.Thread()
 
@@ -825,7 +888,7 @@ class TestGrblController:
         # Mock serial methods
         mocker.patch.object(SerialService, "waiting", side_effect=stop_thread)
         mocker.patch.object(SerialService, "readLine", return_value="")
-        mock_send_line = mocker.patch.object(SerialService, "sendLine")
+        mock_send_lines = mocker.patch.object(SerialService, "sendLines")
 
         # Mock status methods
         mocker.patch.object(GrblStatus, "paused", return_value=False)
@@ -834,15 +897,15 @@ class TestGrblController:
         self.grbl_controller.serial_io()
 
         # Assertions
-        assert mock_send_line.call_count == 1
-        # _sumcline must equal len("G1 X10 Y20") + 1 (for '\n') = 11
-        assert self.grbl_controller._sumcline == len(command) + 1
+        assert mock_send_lines.call_count == 1
+        # Used bytes must equal len("G1 X10 Y20") + 1 (for '\n') = 11
+        assert self.grbl_controller.rx_buffer.used_bytes == len(command) + 1
 
-    def test_sumcline_updated_on_error(self, mocker: MockerFixture):
-        """After an error response, cline/sline are cleared and _sumcline resets to 0."""
-        cline = [10, 20, 30]
-        sline = ["bad cmd", "G90", "G00 X0 Y0"]
-        self.grbl_controller._sumcline = 60  # sum([10, 20, 30])
+    def test_rx_buffer_cleared_on_error(self, mocker: MockerFixture):
+        """After an error response, the commands in flight are forgotten and the
+        used bytes reset to 0."""
+        for command in ["bad cmd", "G90", "G00 X0 Y0"]:
+            self.grbl_controller.rx_buffer.push(command)
 
         # Mock status methods
         mocker.patch.object(GrblStatus, "set_error")
@@ -851,27 +914,27 @@ class TestGrblController:
         mocker.patch.object(self.grbl_controller, "grbl_pause")
 
         # Simulate error response
-        self.grbl_controller.parse_response("error:25", cline, sline)
+        self.grbl_controller.parse_response("error:25")
 
         # GRBL discards buffered commands on error — buffer accounting must reset
-        assert cline == []
-        assert self.grbl_controller._sumcline == 0
+        assert len(self.grbl_controller.rx_buffer) == 0
+        assert self.grbl_controller.rx_buffer.used_bytes == 0
 
-    def test_sumcline_updated_on_alarm(self, mocker: MockerFixture):
-        """After an alarm response, cline/sline are cleared and _sumcline resets to 0."""
-        cline = [10, 20, 30]
-        sline = ["$H", "G54", "G00 X0 Y0"]
-        self.grbl_controller._sumcline = 60  # sum([10, 20, 30])
+    def test_rx_buffer_cleared_on_alarm(self, mocker: MockerFixture):
+        """After an alarm response, the commands in flight are forgotten and the
+        used bytes reset to 0."""
+        for command in ["$H", "G54", "G00 X0 Y0"]:
+            self.grbl_controller.rx_buffer.push(command)
 
         # Mock status methods
         mocker.patch.object(GrblStatus, "set_error")
 
         # Simulate alarm response
-        self.grbl_controller.parse_response("ALARM:6", cline, sline)
+        self.grbl_controller.parse_response("ALARM:6")
 
         # GRBL abandons buffered commands on alarm — buffer accounting must reset
-        assert cline == []
-        assert self.grbl_controller._sumcline == 0
+        assert len(self.grbl_controller.rx_buffer) == 0
+        assert self.grbl_controller.rx_buffer.used_bytes == 0
 
     def test_buffer_will_not_overflow_rx_buffer(self, mocker: MockerFixture):
         """Verify that serial_io respects ``RX_BUFFER_SIZE`` including the '\\n' byte.
@@ -894,8 +957,8 @@ class TestGrblController:
         # Track how many commands are actually sent
         sent_commands: list[str] = []
 
-        def record_send(cmd):
-            sent_commands.append(cmd)
+        def record_send(commands):
+            sent_commands.extend(commands)
 
         # Let the loop run until the queue is drained or buffer is full.
         # We stop the thread when no more commands can be sent and the
@@ -913,7 +976,7 @@ class TestGrblController:
         # Mock serial methods
         mocker.patch.object(SerialService, "waiting", side_effect=waiting_side_effect)
         mocker.patch.object(SerialService, "readLine", return_value="")
-        mocker.patch.object(SerialService, "sendLine", side_effect=record_send)
+        mocker.patch.object(SerialService, "sendLines", side_effect=record_send)
 
         # Mock status methods
         mocker.patch.object(GrblStatus, "paused", return_value=False)
@@ -924,7 +987,7 @@ class TestGrblController:
         # Assertions
         # Only 6 commands should fit: 6 * 21 = 126 ≤ 128, but 7 * 21 = 147 > 128
         assert len(sent_commands) == 6
-        assert self.grbl_controller._sumcline <= RX_BUFFER_SIZE
+        assert self.grbl_controller.rx_buffer.used_bytes <= RX_BUFFER_SIZE
 
     def test_serial_io_alive_flag(self, mocker: MockerFixture):
         """``_serial_io_alive`` is True during execution and False after exit."""
@@ -1027,6 +1090,319 @@ class TestGrblController:
         assert call_count == 1
         mock_error.assert_called_once()
 
+    def test_send_command_wakes_serial_io(self, mocker: MockerFixture):
+        mock_wake = mocker.patch.object(SerialService, "wake")
+
+        # Call method under test
+        self.grbl_controller.send_command("G0 X10")
+        self.grbl_controller.send_command("G0 X20")
+
+        # Assertions
+        # Only when the queue was empty, otherwise serial_io is already busy
+        assert mock_wake.call_count == 1
+        assert self.grbl_controller.queue.qsize() == 2
+
+    def test_take_batch_fills_rx_buffer(self):
+        """The queued commands are taken while they fit in the RX buffer."""
+        # 100 bytes used, 27 bytes available
+        self.grbl_controller.rx_buffer.push("X" * 99)
+        for command in ["G0 X1", "G0 X2", "G0 X3", "G0 X4", "G0 X5"]:
+            self.grbl_controller.queue.put(command)
+        first = self.grbl_controller.queue.get_nowait()
+
+        # Call method under test
+        batch = self.grbl_controller._take_batch(first)
+
+        # Assertions
+        # 4 * 6 = 24 bytes, the fifth command would fill the buffer up
+        assert batch == ["G0 X1", "G0 X2", "G0 X3", "G0 X4"]
+        assert list(self.grbl_controller.queue.queue) == ["G0 X5"]
+
+    def test_take_batch_stops_at_program_end(self):
+        for command in ["G0 X1", "M30", "G0 X2"]:
+            self.grbl_controller.queue.put(command)
+        first = self.grbl_controller.queue.get_nowait()
+
+        # Call method under test
+        batch = self.grbl_controller._take_batch(first)
+
+        # Assertions
+        assert batch == ["G0 X1", "M30"]
+        assert list(self.grbl_controller.queue.queue) == ["G0 X2"]
+
+    def test_take_batch_stops_for_realtime_command(self):
+        for command in ["G0 X1", "G0 X2"]:
+            self.grbl_controller.queue.put(command)
+        first = self.grbl_controller.queue.get_nowait()
+        self.grbl_controller.queryStatusReport()
+
+        # Call method under test
+        batch = self.grbl_controller._take_batch(first)
+
+        # Assertions
+        # '?' is sent in its own write, before the next command
+        assert batch == ["G0 X1"]
+        assert list(self.grbl_controller.queue.queue) == ["G0 X2"]
+
+    def test_take_batch_paused(self, mocker: MockerFixture):
+        mocker.patch.object(GrblStatus, "paused", return_value=True)
+        for command in ["$G", "$#", "G0 X1", "$G"]:
+            self.grbl_controller.queue.put(command)
+        first = self.grbl_controller.queue.get_nowait()
+
+        # Call method under test
+        batch = self.grbl_controller._take_batch(first)
+
+        # Assertions
+        # Only queries while paused, in order
+        assert batch == ["$G", "$#"]
+        assert list(self.grbl_controller.queue.queue) == ["G0 X1", "$G"]
+
+    def test_serial_io_without_coalescing(self, mocker: MockerFixture):
+        self.grbl_controller.serial_thread = threading.Thread()
+        self.grbl_controller.coalesce_writes = False
+        for command in ["G0 X1", "G0 X2"]:
+            self.grbl_controller.queue.put(command)
+
+        def stop_when_empty():
+            if self.grbl_controller.queue.empty():
+                self.grbl_controller.serial_thread = None
+            return False
+
+        mocker.patch.object(SerialService, "waiting", side_effect=stop_when_empty)
+        mocker.patch.object(SerialService, "readLine", return_value="")
+        mock_send_lines = mocker.patch.object(SerialService, "sendLines")
+        mocker.patch.object(GrblStatus, "paused", return_value=False)
+
+        # Call method under test
+        self.grbl_controller.serial_io()
+
+        # Assertions
+        assert mock_send_lines.call_args_list == [mocker.call(["G0 X1"]), mocker.call(["G0 X2"])]
+
+    def test_serial_io_parses_pending_lines(self, mocker: MockerFixture):
+        """The responses received along with the one read are parsed before sending."""
+        self.grbl_controller.serial_thread = threading.Thread()
+
+        def stop_thread():
+            self.grbl_controller.serial_thread = None
+            return True
+
+        mocker.patch.object(SerialService, "waiting", side_effect=stop_thread)
+        mocker.patch.object(SerialService, "readLine", return_value="ok")
+        mocker.patch.object(SerialService, "readPendingLines", return_value=["ok", "", "ok"])
+        mock_parse_response = mocker.patch.object(GrblController, "parse_response")
+
+        # Call method under test
+        self.grbl_controller.serial_io()
+
+        # Assertions
+        assert mock_parse_response.call_args_list == [mocker.call("ok")] * 3
+
+    def test_take_write_stats(self, mocker: MockerFixture):
+        mock_time = mocker.patch("core.utilities.grbl.grblController.time")
+        mock_time.monotonic.return_value = 10.0
+        self.grbl_controller.write_stats = SerialWriteStats(writes=5, lines=20, started_at=8.0)
+
+        # Call method under test
+        stats = self.grbl_controller.take_write_stats()
+
+        # Assertions
+        assert stats.elapsed == 2.0
+        assert stats.writes_per_second == 2.5
+        assert stats.lines_per_second == 10.0
+        assert self.grbl_controller.write_stats.writes == 0
+        assert self.grbl_controller.write_stats.started_at == 10.0
+
+    def test_serial_io_measures_ok_to_send_latency(self, mocker: MockerFixture):
+        """A command waiting for room in the RX buffer is sent after the next
+        'ok', the time between both is measured."""
+        self.grbl_controller.serial_thread = threading.Thread()
+        assert self.grbl_controller.get_ok_to_send_latency() is None
+
+        # Fill the RX buffer: 6 * 21 = 126 bytes, the next command doesn't fit
+        mocker.patch.object(RxBufferTracker, "clear")
+        for _ in range(6):
+            self.grbl_controller.rx_buffer.push("G1 X100.000 Y200.000")
+        self.grbl_controller.queue.put("G1 X100.000 Y200.000")
+
+        def stop_thread(commands: list[str]):
+            self.grbl_controller.serial_thread = None
+
+        mocker.patch.object(SerialService, "waiting", return_value=False)
+        mock_read_line = mocker.patch.object(SerialService, "readLine", return_value="ok")
+        mock_send_lines = mocker.patch.object(SerialService, "sendLines", side_effect=stop_thread)
+        mocker.patch.object(GrblStatus, "paused", return_value=False)
+
+        self.grbl_controller.serial_io()
+
+        assert mock_read_line.call_count == 1
+        mock_send_lines.assert_called_once_with(["G1 X100.000 Y200.000"])
+        assert self.grbl_controller.get_commands_in_flight() == 6
+        latency = self.grbl_controller.get_ok_to_send_latency()
+        assert latency is not None
+        assert 0 <= latency < 1
+
+    def test_jog_cancel(self):
+        # grbl_jog_cancel() should only set the pending flag — no direct serial write
+        self.grbl_controller.grbl_jog_cancel()
+
+        assert self.grbl_controller.jog_cancel_pending is True
+
+    def test_serial_io_jog_cancel_drops_queued_jogs(self, mocker: MockerFixture):
+        """When a jog cancel is pending, serial_io drops the jog commands not
+        sent yet, then sends 0x85 and clears the flag."""
+        self.grbl_controller.serial_thread = threading.Thread()
+        for command in ["$J=G91X1F500", "G0 X0", "$J=G91X2F500"]:
+            self.grbl_controller.queue.put(command)
+        self.grbl_controller.grbl_jog_cancel()
+
+        sent_bytes: list[bytes] = []
+
+        def capture_and_stop(code: bytes):
+            sent_bytes.append(code)
+            self.grbl_controller.serial_thread = None
+
+        mocker.patch.object(SerialService, "sendBytes", side_effect=capture_and_stop)
+        mock_send_lines = mocker.patch.object(SerialService, "sendLines")
+        mocker.patch.object(SerialService, "waiting", return_value=False)
+        mocker.patch.object(SerialService, "readLine", return_value="")
+        mocker.patch.object(GrblStatus, "paused", return_value=False)
+
+        self.grbl_controller.serial_io()
+
+        assert sent_bytes == [b"\x85"]
+        assert list(self.grbl_controller.queue.queue) == ["G0 X0"]
+        assert self.grbl_controller.jog_cancel_pending is False
+        mock_send_lines.assert_not_called()
+
+    def test_grbl_override(self, mocker: MockerFixture):
+        mock_wake = mocker.patch.object(SerialService, "wake")
+
+        # Call method under test
+        self.grbl_controller.grbl_override(GrblRealtimeCommand.FEED_OVR_COARSE_PLUS, 5.0)
+
+        # Assertions
+        # Sent by serial_io, not from the caller thread
+        assert list(self.grbl_controller._overrides_pending) == [(b"\x91", 5.0)]
+        mock_wake.assert_called_once()
+
+    def test_serial_io_sends_overrides_first(self, mocker: MockerFixture):
+        """The pending overrides are sent in a single write, ahead of the
+        queued commands and even while paused; the time from the request
+        to the write is measured."""
+        mocker.patch("core.utilities.grbl.grblController.time.time", return_value=10.0)
+        self.grbl_controller.serial_thread = threading.Thread()
+        self.grbl_controller.queue.put("G1 X10 F100")
+        self.grbl_controller.grbl_override(GrblRealtimeCommand.FEED_OVR_COARSE_MINUS, 9.9)
+        self.grbl_controller.grbl_override(GrblRealtimeCommand.RAPID_OVR_LOW, 9.8)
+        assert self.grbl_controller.get_override_latency() is None
+
+        sent_bytes: list[bytes] = []
+
+        def capture_and_stop(code: bytes):
+            sent_bytes.append(code)
+            self.grbl_controller.serial_thread = None
+
+        mocker.patch.object(SerialService, "sendBytes", side_effect=capture_and_stop)
+        mock_send_lines = mocker.patch.object(SerialService, "sendLines")
+        mocker.patch.object(SerialService, "waiting", return_value=False)
+        mocker.patch.object(SerialService, "readLine", return_value="")
+        mocker.patch.object(GrblStatus, "paused", return_value=True)
+
+        self.grbl_controller.serial_io()
+
+        assert sent_bytes == [b"\x92\x97"]
+        assert not self.grbl_controller._overrides_pending
+        assert list(self.grbl_controller.queue.queue) == ["G1 X10 F100"]
+        mock_send_lines.assert_not_called()
+        assert self.grbl_controller.get_override_latency() == pytest.approx(0.15)
+
+    def test_serial_io_override_own_iteration(self, mocker: MockerFixture):
+        """No G-code line is written in the same loop iteration as an
+        override: both bytes in one burst corrupt grbl-sim's stream."""
+        events: list[str] = []
+
+        class LoopCounter:
+            """Stands for the serial thread, records every loop iteration."""
+
+            def __init__(self):
+                self.iterations = 0
+
+            def __bool__(self):
+                self.iterations += 1
+                events.append("iteration")
+                return self.iterations <= 2
+
+        self.grbl_controller.serial_thread = LoopCounter()
+        self.grbl_controller.queue.put("G1 X10 F100")
+        self.grbl_controller.grbl_override(GrblRealtimeCommand.FEED_OVR_COARSE_PLUS)
+
+        mocker.patch.object(
+            SerialService, "sendBytes", side_effect=lambda code: events.append("override")
+        )
+        mocker.patch.object(
+            SerialService, "sendLines", side_effect=lambda codes: events.append("gcode")
+        )
+        mocker.patch.object(SerialService, "waiting", return_value=False)
+        mocker.patch.object(SerialService, "readLine", return_value="")
+        mocker.patch.object(GrblStatus, "paused", return_value=False)
+
+        self.grbl_controller.serial_io()
+
+        assert events == ["iteration", "override", "iteration", "gcode", "iteration"]
+
+    def test_serial_io_override_serial_error(self, mocker: MockerFixture):
+        self.grbl_controller.serial_thread = threading.Thread()
+        self.grbl_controller.grbl_override(GrblRealtimeCommand.SPINDLE_OVR_RESET)
+
+        def raise_and_stop(code: bytes):
+            self.grbl_controller.serial_thread = None
+            raise SerialException("port error")
+
+        mocker.patch.object(SerialService, "sendBytes", side_effect=raise_and_stop)
+        mocker.patch.object(SerialService, "waiting", return_value=False)
+        mocker.patch.object(SerialService, "readLine", return_value="")
+        mocker.patch.object(GrblStatus, "paused", return_value=False)
+        mock_error = mocker.patch.object(GrblMonitor, "error")
+
+        self.grbl_controller.serial_io()
+
+        # Dropped, and not accounted
+        assert not self.grbl_controller._overrides_pending
+        assert self.grbl_controller.get_override_latency() is None
+        mock_error.assert_called_once()
+
+    def test_take_batch_stops_for_override(self):
+        for command in ["G0 X1", "G0 X2"]:
+            self.grbl_controller.queue.put(command)
+        first = self.grbl_controller.queue.get_nowait()
+        self.grbl_controller.grbl_override(GrblRealtimeCommand.FEED_OVR_RESET)
+
+        # Call method under test
+        batch = self.grbl_controller._take_batch(first)
+
+        # Assertions
+        assert batch == ["G0 X1"]
+        assert list(self.grbl_controller.queue.queue) == ["G0 X2"]
+
+    def test_status_latency(self, mocker: MockerFixture):
+        mocker.patch("core.utilities.grbl.grblController.time.monotonic", return_value=10.0)
+        report = "<Idle|MPos:5.000,2.000,0.000|FS:0,0|Ov:100,100,100>"
+
+        # A report nobody asked for is not accounted
+        self.grbl_controller.parse_response(report)
+        assert self.grbl_controller.status_latency is None
+
+        self.grbl_controller._status_query_sent_at = 9.9
+        self.grbl_controller.parse_response(report)
+        assert self.grbl_controller.status_latency == pytest.approx(0.1)
+
+        # Smoothed
+        self.grbl_controller._status_query_sent_at = 9.4
+        self.grbl_controller.parse_response(report)
+        assert self.grbl_controller.status_latency == pytest.approx(0.1 + 0.2 * 0.5)
+
     # QUERY COMMANDS BYPASS PAUSE
 
     def test_serial_io_query_command_bypasses_pause(self, mocker: MockerFixture):
@@ -1038,14 +1414,14 @@ class TestGrblController:
 
         sent_commands: list[str] = []
 
-        def record_and_stop(cmd: str):
-            sent_commands.append(cmd)
+        def record_and_stop(commands: list[str]):
+            sent_commands.extend(commands)
             self.grbl_controller.serial_thread = None
 
         mocker.patch.object(GrblStatus, "paused", return_value=True)
         mocker.patch.object(SerialService, "waiting", return_value=False)
         mocker.patch.object(SerialService, "readLine", return_value="")
-        mocker.patch.object(SerialService, "sendLine", side_effect=record_and_stop)
+        mocker.patch.object(SerialService, "sendLines", side_effect=record_and_stop)
 
         self.grbl_controller.serial_io()
 
@@ -1068,7 +1444,7 @@ class TestGrblController:
         mocker.patch.object(GrblStatus, "paused", return_value=True)
         mocker.patch.object(SerialService, "waiting", side_effect=stop_after_three)
         mocker.patch.object(SerialService, "readLine", return_value="")
-        mock_send = mocker.patch.object(SerialService, "sendLine")
+        mock_send = mocker.patch.object(SerialService, "sendLines")
 
         self.grbl_controller.serial_io()
 
@@ -1095,7 +1471,7 @@ class TestGrblController:
         mocker.patch.object(GrblStatus, "paused", return_value=True)
         mocker.patch.object(SerialService, "waiting", side_effect=stop_after_three)
         mocker.patch.object(SerialService, "readLine", return_value="")
-        mock_send = mocker.patch.object(SerialService, "sendLine")
+        mock_send = mocker.patch.object(SerialService, "sendLines")
 
         self.grbl_controller.serial_io()
 
@@ -1108,9 +1484,7 @@ class TestGrblController:
     def test_parser_receive_error_empties_queue(self, mocker: MockerFixture):
         """On error, the entire queue is emptied (stale queries will be
         re-issued by the main loop on the next polling cycle)."""
-        cline = [5]
-        sline = ["G54 G54"]
-        self.grbl_controller._sumcline = 5
+        self.grbl_controller.rx_buffer.push("G54 G54")
 
         self.grbl_controller.queue.put("G0 X50")
         self.grbl_controller.queue.put("$G")
@@ -1118,21 +1492,19 @@ class TestGrblController:
         mocker.patch.object(GrblStatus, "set_error")
         mocker.patch.object(self.grbl_controller, "grbl_pause")
 
-        self.grbl_controller.parse_response("error:25", cline, sline)
+        self.grbl_controller.parse_response("error:25")
 
         assert self.grbl_controller.queue.empty()
 
     def test_parser_receive_alarm_empties_queue(self, mocker: MockerFixture):
         """On alarm, the entire queue is emptied."""
-        cline = [5]
-        sline = ["$H"]
-        self.grbl_controller._sumcline = 5
+        self.grbl_controller.rx_buffer.push("$H")
 
         self.grbl_controller.queue.put("G1 Y100")
         self.grbl_controller.queue.put("$$")
 
         mocker.patch.object(GrblStatus, "set_error")
 
-        self.grbl_controller.parse_response("ALARM:6", cline, sline)
+        self.grbl_controller.parse_response("ALARM:6")
 
         assert self.grbl_controller.queue.empty()
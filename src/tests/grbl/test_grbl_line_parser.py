@@ -370,7 +370,61 @@ from core.utilities.grbl.grblLineParser import GrblLineParser
                 },
             ),
         ),
+        (
+            "<Jog|WPos:1.000,2.000,3.000|FS:100,0>",
+            (
+                "GrblMsgStatus",
+                {
+                    "activeState": "Jog",
+                    "wpos": {"x": 1.0, "y": 2.0, "z": 3.0},
+                    "feedrate": 100.0,
+                    "spindle": 0.0,
+                    "raw": "<Jog|WPos:1.000,2.000,3.000|FS:100,0>",
+                },
+            ),
+        ),
+        (
+            "[GC:G0 G54 G17 G21 G90 G94 M5 M9 T0 F0.0 S0 M8]",
+            (
+                "GrblMsgParserState",
+                {
+                    "modal": {
+                        "motion": "G0",
+                        "wcs": "G54",
+                        "plane": "G17",
+                        "units": "G21",
+                        "distance": "G90",
+                        "feedrate": "G94",
+                        "spindle": "M5",
+                        "coolant": ["M9", "M8"],
+                    },
+                    "tool": 0,
+                    "feedrate": 0.0,
+                    "spindle": 0.0,
+                    "raw": "[GC:G0 G54 G17 G21 G90 G94 M5 M9 T0 F0.0 S0 M8]",
+                },
+            ),
+        ),
+        ("[GC:invalid]", ("GrblMsgFeedback", {"message": "GC:invalid", "raw": "[GC:invalid]"})),
+        (
+            "[Reset to continue]",
+            ("GrblMsgFeedback", {"message": "Reset to continue", "raw": "[Reset to continue]"}),
+        ),
+        (
+            "ok 1.1 [custom]",
+            (
+                "GrblMsgStartup",
+                {
+                    "firmware": "ok",
+                    "version": "1.1",
+                    "message": " [custom]",
+                    "raw": "ok 1.1 [custom]",
+                },
+            ),
+        ),
         ("invalid", (None, {"raw": "invalid"})),
+        ("", (None, {"raw": ""})),
+        ("$$", (None, {"raw": "$$"})),
     ],
 )
 def test_grbl_parser(message, expected):
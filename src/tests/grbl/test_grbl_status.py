@@ -11,8 +11,8 @@ class TestGrblStatus:
 
     def test_getters(self):
         # Set test values for controller's parameters
-        self.grbl_status._state["status"] = grbl_mocks.grbl_status
-        self.grbl_status._state["parserstate"] = grbl_mocks.grbl_parserstate
+        self.grbl_status.update_status(grbl_mocks.grbl_status)
+        self.grbl_status.update_parser_state(grbl_mocks.grbl_parserstate)
 
         # Call methods under test
         status = self.grbl_status.get_status_report()
@@ -49,7 +49,7 @@ class TestGrblStatus:
     )
     def test_status_checkers(self, active_state):
         # Set test value for controller's active state
-        self.grbl_status._state["status"]["activeState"] = active_state
+        self.grbl_status.set_active_state(active_state)
 
         # Call methods under test
         is_alarm = self.grbl_status.is_alarm()
@@ -60,3 +60,15 @@ class TestGrblStatus:
         assert is_alarm == (active_state == GrblActiveState.ALARM.value)
         assert is_idle == (active_state == GrblActiveState.IDLE.value)
         assert is_checkmode == (active_state == GrblActiveState.CHECK.value)
+
+    def test_instances_do_not_share_state(self):
+        other = GrblStatus()
+
+        # Call methods under test
+        self.grbl_status.update_status({"activeState": "Run", "mpos": {"x": 1.0}})
+        self.grbl_status.set_tool(3)
+
+        # Assertions
+        assert other.get_status_report()["activeState"] == ""
+        assert other.get_position("mpos") == {"x": 0.0, "y": 0.0, "z": 0.0}
+        assert other.get_tool() == 0
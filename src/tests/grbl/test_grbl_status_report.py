@@ -0,0 +1,105 @@
+import threading
+
+from core.utilities.grbl.grblLineParser import GrblLineParser
+from core.utilities.grbl.grblStatusReport import StatusField, StatusReport
+
+
+def parse(line: str) -> dict:
+    _, payload = GrblLineParser.parse(line)
+    del payload["raw"]
+    return payload
+
+
+class TestStatusReport:
+    def test_update(self):
+        record = StatusReport()
+
+        # Call method under test
+        changed = record.update(parse("<Run|MPos:1.000,2.000,3.000|Bf:15,128|FS:500,0>"))
+
+        # Assertions
+        assert changed == (
+            StatusField.STATE
+            | StatusField.MPOS
+            | StatusField.FEEDRATE
+            | StatusField.SPINDLE
+            | StatusField.BUFFER
+        )
+        assert record.dirty == changed
+        assert record.to_dict() == {
+            "activeState": "Run",
+            "subState": None,
+            "mpos": {"x": 1.0, "y": 2.0, "z": 3.0},
+            "wpos": {"x": 0.0, "y": 0.0, "z": 0.0},
+            "wco": {"x": 0.0, "y": 0.0, "z": 0.0},
+            "feedrate": 500.0,
+            "spindle": 0.0,
+            "buffer": {"planner": 15, "rx": 128},
+            "line": None,
+            "ov": [],
+            "pinstate": None,
+            "accessoryState": None,
+        }
+
+    def test_only_changes_are_flagged(self):
+        record = StatusReport()
+        record.update(parse("<Run|MPos:1.000,2.000,3.000|FS:500,0|WCO:1.000,0.000,0.000>"))
+        record.clear_dirty()
+
+        # Call method under test
+        changed = record.update(parse("<Run|MPos:1.000,2.500,3.000|FS:500,0|Ov:100,100,100>"))
+
+        # Assertions
+        assert changed == StatusField.MPOS | StatusField.OVERRIDES
+        # fields missing from a report keep their value
+        assert record.get_position("wco") == {"x": 1.0, "y": 0.0, "z": 0.0}
+
+    def test_clear_dirty(self):
+        record = StatusReport()
+        record.update(parse("<Idle|MPos:1.000,2.000,3.000|FS:0,0>"))
+        record.set_active_state("Run")
+
+        # Call method under test
+        dirty = record.clear_dirty()
+
+        # Assertions
+        assert dirty & StatusField.STATE
+        assert dirty & StatusField.MPOS
+        assert record.dirty == StatusField.NONE
+        assert record.set_active_state("Run") == StatusField.NONE
+
+    def test_update_during_clear_dirty_is_not_lost(self):
+        record = StatusReport()
+        thread = threading.Thread(
+            target=record.update, args=(parse("<Run|MPos:1.000,2.000,3.000>"),)
+        )
+
+        # Call method under test
+        # The serial thread updates while another one is clearing the mask
+        with record._lock:
+            thread.start()
+            thread.join(timeout=0.05)
+            updated = not thread.is_alive()
+            dirty, record.dirty = record.dirty, StatusField.NONE
+        thread.join(timeout=1)
+
+        # Assertions
+        # The update waits for the mask to be cleared, and flags its changes after
+        assert not updated
+        assert dirty == StatusField.NONE
+        assert record.clear_dirty() == StatusField.STATE | StatusField.MPOS
+
+    def test_to_dict_fields(self):
+        record = StatusReport()
+        record.update(parse("<Hold:1|WPos:1.000,2.000,3.000|Ln:7>"))
+
+        # Call method under test
+        result = record.to_dict(StatusField.STATE | StatusField.WPOS | StatusField.FEEDRATE)
+
+        # Assertions
+        # the feed rate was never reported
+        assert result == {
+            "activeState": "Hold",
+            "subState": 1,
+            "wpos": {"x": 1.0, "y": 2.0, "z": 3.0},
+        }
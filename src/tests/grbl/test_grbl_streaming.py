@@ -0,0 +1,108 @@
+"""Streaming throughput against the GRBL emulator, through the whole serial stack."""
+
+import logging
+import time
+from pathlib import Path
+
+import pytest
+from core.utilities.gateway.constants import EXEC_MODE_STREAMING
+from core.utilities.grbl.constants import GrblRealtimeCommand
+from core.utilities.grbl.grblController import GrblController
+from core.utilities.grbl.grblMonitor import GrblMonitor
+from gateway.fileExecutor import FileExecutor
+from pytest_mock.plugin import MockerFixture
+
+# Every block takes 1 ms: at most 1000 lines per second
+EMULATOR_PORT = "emulator://?block_time=0.001"
+LINES = 500
+# Loose, so it holds on a loaded CI runner
+MIN_LINES_PER_SECOND = 100
+MAX_OVERRIDE_LATENCY = 0.1
+
+
+def program_line(index: int) -> str:
+    return f"G1 X{(index % 100) * 0.1:.3f} Y{(index // 100) * 0.1:.3f} F3000"
+
+
+def wait_for_commands(controller: GrblController, count: int, timeout: float, tick=None) -> float:
+    """Waits until *count* commands were acknowledged, returns the elapsed time."""
+    start = time.monotonic()
+    while controller.get_commands_count() < count and time.monotonic() - start < timeout:
+        if tick is not None:
+            tick()
+        time.sleep(0.005)
+    return time.monotonic() - start
+
+
+class TestGrblStreaming:
+    @pytest.fixture(autouse=True)
+    def setup_method(self, mocker: MockerFixture):
+        # Mock logger methods
+        mocker.patch.object(GrblMonitor, "debug")
+        mocker.patch.object(GrblMonitor, "info")
+        mocker.patch.object(GrblMonitor, "warning")
+        mocker.patch.object(GrblMonitor, "error")
+        mocker.patch.object(GrblMonitor, "critical")
+        mocker.patch.object(GrblMonitor, "sent")
+        mocker.patch.object(GrblMonitor, "received")
+
+        self.grbl_controller = GrblController(logging.getLogger("test_logger"))
+        response = self.grbl_controller.connect(EMULATOR_PORT, 115200)
+        assert response["version"] == "1.1h"
+        self.emulator = self.grbl_controller.serial.interface.emulator
+
+        yield
+
+        thread = self.grbl_controller.serial_thread
+        self.grbl_controller.disconnect()
+        if thread is not None:
+            thread.join(timeout=1)
+
+    def test_controller_streaming(self):
+        # Call method under test
+        for index in range(LINES):
+            self.grbl_controller.send_program_command(program_line(index))
+        elapsed = wait_for_commands(self.grbl_controller, LINES, timeout=10)
+
+        # Assertions
+        assert self.grbl_controller.get_commands_count() == LINES
+        assert self.grbl_controller.get_commands_in_flight() == 0
+        assert self.emulator.overflows == 0
+        assert LINES / elapsed > MIN_LINES_PER_SECOND
+
+    def test_file_executor_streaming(self, mocker: MockerFixture, tmp_path: Path):
+        program = tmp_path / "program.gcode"
+        program.write_text("".join(f"{program_line(index)}\n" for index in range(LINES)))
+        file_executor = FileExecutor(self.grbl_controller, redis_conn=mocker.Mock())
+
+        # Call method under test
+        file_executor.start(str(program), mode=EXEC_MODE_STREAMING)
+        elapsed = wait_for_commands(
+            self.grbl_controller, LINES, timeout=10, tick=file_executor.tick
+        )
+
+        # Assertions
+        assert self.grbl_controller.get_commands_count() == LINES
+        assert self.emulator.overflows == 0
+        assert LINES / elapsed > MIN_LINES_PER_SECOND
+
+    def test_override_while_streaming(self):
+        for index in range(LINES):
+            self.grbl_controller.send_program_command(program_line(index))
+        wait_for_commands(self.grbl_controller, 50, timeout=10)
+
+        # Call method under test
+        self.grbl_controller.grbl_override(GrblRealtimeCommand.FEED_OVR_COARSE_PLUS)
+        start = time.monotonic()
+        while self.emulator.overrides[0] == 100 and time.monotonic() - start < 1:
+            time.sleep(0.001)
+
+        # Assertions
+        # Applied in the middle of the program, not after it
+        assert self.emulator.overrides == (110, 100, 100)
+        assert self.grbl_controller.get_commands_count() < LINES
+        latency = self.grbl_controller.get_override_latency()
+        assert latency is not None
+        assert latency < MAX_OVERRIDE_LATENCY
+        wait_for_commands(self.grbl_controller, LINES, timeout=10)
+        assert self.emulator.overflows == 0
@@ -0,0 +1,66 @@
+from core.utilities.grbl.rxBufferTracker import RxBufferTracker
+from pytest_mock.plugin import MockerFixture
+
+
+class TestRxBufferTracker:
+    def test_push_and_pop(self):
+        tracker = RxBufferTracker(128)
+
+        # Call methods under test
+        tracker.push("G54")
+        tracker.push("G0 X10")
+
+        # Assertions
+        # len("G54\n") + len("G0 X10\n")
+        assert tracker.used_bytes == 11
+        assert tracker.in_flight == 2
+        assert tracker.fill == 11 * 100.0 / 128
+
+        assert tracker.pop() == "G54"
+        assert tracker.used_bytes == 7
+        assert tracker.pop() == "G0 X10"
+        assert tracker.used_bytes == 0
+
+        # Nothing in flight
+        assert tracker.pop() == ""
+        assert tracker.used_bytes == 0
+
+    def test_fits(self):
+        tracker = RxBufferTracker(16)
+        tracker.push("G0 X10")  # 7 bytes
+
+        # Assertions
+        assert tracker.fits("G0 Y1") is True  # 7 + 6 = 13
+        assert tracker.fits("G0 Y10.5") is False  # 7 + 9 = 16, the buffer must not fill up
+        # Sent after other 6 bytes in the same write
+        assert tracker.fits("G0", pending=5) is True  # 7 + 5 + 3 = 15
+        assert tracker.fits("G0", pending=6) is False  # 7 + 6 + 3 = 16
+
+    def test_clear(self):
+        tracker = RxBufferTracker(128)
+        tracker.push("G54")
+        tracker.push("G0 X10")
+
+        # Call method under test
+        tracker.clear()
+
+        # Assertions
+        assert len(tracker) == 0
+        assert tracker.used_bytes == 0
+        assert tracker.oldest_age() is None
+
+    def test_oldest_age(self, mocker: MockerFixture):
+        mock_time = mocker.patch("core.utilities.grbl.rxBufferTracker.time")
+        mock_time.monotonic.return_value = 10.0
+        tracker = RxBufferTracker(128)
+        assert tracker.oldest_age() is None
+
+        tracker.push("G54")
+        mock_time.monotonic.return_value = 10.5
+        tracker.push("G0 X10")
+        mock_time.monotonic.return_value = 11.0
+
+        # Assertions
+        assert tracker.oldest_age() == 1.0
+        tracker.pop()
+        assert tracker.oldest_age() == 0.5
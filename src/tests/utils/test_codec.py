@@ -0,0 +1,120 @@
+import json
+
+import pytest
+from core.utilities.gateway import codec
+from core.utilities.gateway.codec import (
+    CODEC_JSON,
+    CODEC_MSGPACK,
+    CodecError,
+    decode,
+    encode,
+    negotiate,
+    to_json,
+)
+
+MESSAGE = {
+    "type": "delta",
+    "seq": 42,
+    "status": {"mpos": {"x": 1.5, "y": -2.0, "z": 0.0}, "line": 120, "ov": [100, 100, 100]},
+    "session": None,
+}
+
+
+requires_msgpack = pytest.mark.skipif(codec.msgpack is None, reason="msgpack is not installed")
+
+
+@pytest.fixture
+def without_msgpack(monkeypatch):
+    monkeypatch.setattr(codec, "msgpack", None)
+
+
+@pytest.mark.parametrize("name", [CODEC_JSON, pytest.param(CODEC_MSGPACK, marks=requires_msgpack)])
+def test_encode_and_decode(name):
+    # Call methods under test
+    raw = encode(MESSAGE, name)
+    message = decode(raw)
+
+    # Assertions
+    assert message == MESSAGE
+    assert json.loads(to_json(raw)) == MESSAGE
+
+
+def test_json_is_untagged():
+    # Call method under test
+    raw = encode(MESSAGE, CODEC_JSON)
+
+    # Assertions
+    assert json.loads(raw) == MESSAGE
+    assert decode(json.dumps(MESSAGE)) == MESSAGE
+
+
+@requires_msgpack
+def test_msgpack_is_tagged():
+    # Call method under test
+    raw = encode(MESSAGE, CODEC_MSGPACK)
+
+    # Assertions
+    assert raw[:2] == bytes((codec.TAG_MARKER, codec.MSGPACK_VERSION))
+    assert len(raw) < len(encode(MESSAGE, CODEC_JSON))
+
+
+@requires_msgpack
+def test_encode_converts_unknown_values():
+    class Value:
+        def __str__(self):
+            return "value"
+
+    # Assertions
+    assert decode(encode({"key": Value()}, CODEC_JSON)) == {"key": "value"}
+    assert decode(encode({"key": Value()}, CODEC_MSGPACK)) == {"key": "value"}
+
+
+@pytest.mark.parametrize(
+    "raw",
+    [
+        b"not json",
+        b"\xc1",
+        b"\xc1\x7f\x80",
+        pytest.param(b"\xc1\x01\xc1", marks=requires_msgpack),
+        None,
+    ],
+)
+def test_decode_invalid_message(raw):
+    with pytest.raises(CodecError):
+        decode(raw)
+
+
+def test_encode_unknown_codec():
+    with pytest.raises(CodecError):
+        encode(MESSAGE, "xml")
+
+
+def test_without_msgpack(without_msgpack):
+    # Call methods under test
+    raw = encode(MESSAGE, CODEC_MSGPACK)
+
+    # Assertions
+    assert codec.available_codecs() == (CODEC_JSON,)
+    assert codec.resolve_codec(CODEC_MSGPACK) == CODEC_JSON
+    assert json.loads(raw) == MESSAGE
+    with pytest.raises(CodecError):
+        decode(b"\xc1\x01\x80")
+
+
+@pytest.mark.parametrize(
+    "preferred,remote,expected",
+    [
+        pytest.param(
+            CODEC_MSGPACK, [CODEC_MSGPACK, CODEC_JSON], CODEC_MSGPACK, marks=requires_msgpack
+        ),
+        (CODEC_MSGPACK, [CODEC_JSON], CODEC_JSON),
+        (CODEC_MSGPACK, None, CODEC_JSON),
+        (CODEC_JSON, [CODEC_MSGPACK, CODEC_JSON], CODEC_JSON),
+    ],
+)
+def test_negotiate(preferred, remote, expected):
+    assert negotiate(preferred, remote) == expected
+
+
+def test_negotiate_without_msgpack(without_msgpack):
+    assert negotiate(CODEC_MSGPACK, [CODEC_MSGPACK, CODEC_JSON]) == CODEC_JSON
@@ -1,3 +1,4 @@
+import json
 import shutil
 import time
 from pathlib import Path
@@ -6,9 +7,11 @@ from typing import BinaryIO
 import pytest
 from core.utilities.files import (
     FileSystemHelper,
+    LineReader,
     computeSHA256,
     computeSHA256FromFile,
     getFileNameInFolder,
+    streamJsonContent,
 )
 
 
@@ -72,6 +75,64 @@ def test_computeSHA256(mocker):
     assert computeSHA256(file_name) == expected_hash
 
 
+@pytest.mark.parametrize(
+    "content,expected",
+    [
+        (b"G1 X10\nG1 X20\n", [(0, b"G1 X10"), (7, b"G1 X20")]),
+        (b"G1 X10\r\n\r\nG1 X20", [(0, b"G1 X10"), (8, b""), (10, b"G1 X20")]),
+        (b"\n", [(0, b"")]),
+        (b"", []),
+    ],
+)
+def test_line_reader(tmp_path, content, expected):
+    file_path = tmp_path / "file.gcode"
+    file_path.write_bytes(content)
+
+    with LineReader(file_path) as reader:
+        lines = [(offset, bytes(line)) for offset, line in reader]
+
+    # Assertions
+    assert lines == expected
+
+
+def test_line_reader_blocks(tmp_path):
+    content = b"".join(b"G1 X%d Y%d\n" % (i, i) for i in range(100))
+    file_path = tmp_path / "file.gcode"
+    file_path.write_bytes(content)
+
+    with LineReader(file_path) as reader:
+        blocks = [bytes(block) for block in reader.blocks(size=64)]
+
+    # Assertions
+    assert b"".join(blocks) == content
+    assert all(block.endswith(b"\n") for block in blocks)
+    assert all(len(block) >= 64 for block in blocks[:-1])
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        'G1 X10\n(comment "quoted")\n',
+        "G1 X10\nG1 X20",
+        "",
+        "\n\n",
+        # 64 KB are reached with the last line
+        "G1 X10\n" * 9362 + "G1 X1",
+        "G1 X10\n" * 9362 + "G1 X1\n",
+        "G1 X10\n" * 20000 + "G1 X1",
+    ],
+)
+def test_streamJsonContent(tmp_path, content):
+    file_path = tmp_path / "file.gcode"
+    file_path.write_text(content)
+
+    # Call method under test
+    document = b"".join(streamJsonContent(LineReader(file_path)))
+
+    # Assertions
+    assert json.loads(document) == {"content": content}
+
+
 def test_save_file(mocker):
     file = BinaryIO()
     file_name = "file.gcode"
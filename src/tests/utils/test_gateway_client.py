@@ -0,0 +1,41 @@
+import asyncio
+
+import pytest
+from core.utilities.gateway.constants import EXEC_MODE_STREAMING, QUEUE_HIGH
+from core.utilities.gateway.gatewayClient import AsyncGatewayClient, GatewayClient
+from pytest_mock.plugin import MockerFixture
+
+
+class TestGatewayClient:
+    def test_request_file_execution(self, mocker: MockerFixture):
+        client = GatewayClient()
+        mock_push = mocker.patch.object(client, "_push")
+
+        # Call method under test
+        client.request_file_execution("session", "/files/a.gcode", mode=EXEC_MODE_STREAMING)
+
+        # Assertions
+        assert mock_push.call_args.args[0] == QUEUE_HIGH
+        assert mock_push.call_args.args[2]["mode"] == EXEC_MODE_STREAMING
+
+    def test_request_file_execution_unknown_mode(self, mocker: MockerFixture):
+        client = GatewayClient()
+        mock_push = mocker.patch.object(client, "_push")
+
+        # Call method under test
+        with pytest.raises(ValueError, match="Unknown file execution mode: fast"):
+            client.request_file_execution("session", "/files/a.gcode", mode="fast")
+
+        # Assertions
+        mock_push.assert_not_called()
+
+    def test_async_request_file_execution_unknown_mode(self, mocker: MockerFixture):
+        client = AsyncGatewayClient()
+        mock_push = mocker.patch.object(client, "_push")
+
+        # Call method under test
+        with pytest.raises(ValueError, match="Unknown file execution mode: fast"):
+            asyncio.run(client.request_file_execution("session", "/files/a.gcode", mode="fast"))
+
+        # Assertions
+        mock_push.assert_not_called()
@@ -0,0 +1,406 @@
+import io
+import select
+import socket
+import threading
+import time
+
+import pytest
+import serial
+from core.utilities.serial.emulatorServer import serve_client
+from core.utilities.serial.grblEmulator import STARTUP_MESSAGE, UNLOCK_MESSAGE, GrblEmulator
+from core.utilities.serial.transports import EmulatorTransport, create_transport
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def create_emulator(clock: FakeClock, **kwargs) -> GrblEmulator:
+    """Returns an emulator already started up."""
+    emulator = GrblEmulator(clock=clock, **kwargs)
+    emulator.read_output()
+    return emulator
+
+
+def read_lines(emulator: GrblEmulator) -> list[str]:
+    return emulator.read_output().decode().splitlines()
+
+
+class TestGrblEmulator:
+    def test_startup(self, clock: FakeClock):
+        emulator = GrblEmulator(clock=clock, startup_delay=0.5)
+
+        # Bytes received while booting are lost
+        emulator.receive(b"G0 X10\n")
+        assert emulator.read_output() == b""
+
+        clock.advance(0.5)
+
+        # Assertions
+        assert read_lines(emulator) == ["", STARTUP_MESSAGE]
+        assert emulator.state == "Idle"
+        assert emulator.position == (0.0, 0.0, 0.0)
+
+    def test_ok_waits_for_planner(self, clock: FakeClock):
+        emulator = create_emulator(clock, planner_size=2, block_time=1.0)
+
+        # Call method under test
+        emulator.receive(b"G0 X1\nG0 X2\nG0 X3\n")
+
+        # The third line waits for room in the planner
+        assert read_lines(emulator) == ["ok", "ok"]
+        assert emulator.state == "Run"
+        assert emulator.next_event() == clock.now + 1.0
+
+        clock.advance(1.0)
+        assert read_lines(emulator) == ["ok"]
+        assert emulator.executed_blocks == 1
+
+        clock.advance(2.0)
+        assert emulator.read_output() == b""
+        assert emulator.executed_blocks == 3
+        assert emulator.state == "Idle"
+        assert emulator.position == (3.0, 0.0, 0.0)
+        assert emulator.next_event() is None
+
+    def test_ok_delay(self, clock: FakeClock):
+        emulator = create_emulator(clock, ok_delay=0.01)
+
+        # Call method under test
+        emulator.receive(b"G90\nG21\n")
+
+        # Assertions
+        assert emulator.read_output() == b""
+        clock.advance(0.01)
+        assert read_lines(emulator) == ["ok"]
+        clock.advance(0.01)
+        assert read_lines(emulator) == ["ok"]
+
+    def test_rx_buffer_overflow(self, clock: FakeClock):
+        emulator = create_emulator(clock, planner_size=1, block_time=1.0)
+        emulator.receive(b"G0 X1\n")  # Fills the planner
+
+        # Call method under test
+        emulator.receive(b"G1 X2 F100\n" * 12)  # 132 bytes
+
+        # Assertions
+        assert emulator.overflows == 4
+        assert read_lines(emulator) == ["ok"]
+
+    def test_motion_time(self, clock: FakeClock):
+        emulator = create_emulator(clock)
+
+        # Call method under test
+        emulator.receive(b"G1 X10 F600\n")  # 10 mm at 10 mm/s
+
+        # Assertions
+        assert read_lines(emulator) == ["ok"]
+        clock.advance(0.5)
+        assert emulator.position == pytest.approx((5.0, 0.0, 0.0))
+        clock.advance(0.5)
+        assert emulator.state == "Idle"
+        assert emulator.position == (10.0, 0.0, 0.0)
+
+    def test_status_report(self, clock: FakeClock):
+        emulator = create_emulator(clock, planner_size=15)
+        emulator.receive(b"G1 X10 F600\nG1")
+
+        # Call method under test
+        clock.advance(0.25)
+        emulator.receive(b"?")
+
+        # Assertions
+        assert read_lines(emulator) == [
+            "ok",
+            "<Run|MPos:2.500,0.000,0.000|Bf:14,126|FS:600,0|Ov:100,100,100>",
+        ]
+
+    def test_feed_hold_and_cycle_start(self, clock: FakeClock):
+        emulator = create_emulator(clock, block_time=1.0)
+        emulator.receive(b"G0 X10\n")
+
+        # Call method under test
+        clock.advance(0.5)
+        emulator.receive(b"!")
+        clock.advance(10.0)
+
+        # Assertions
+        assert emulator.state == "Hold:0"
+        assert emulator.position == (5.0, 0.0, 0.0)
+
+        emulator.receive(b"~")
+        clock.advance(0.5)
+        assert emulator.state == "Idle"
+        assert emulator.position == (10.0, 0.0, 0.0)
+
+    def test_soft_reset_while_moving(self, clock: FakeClock):
+        emulator = create_emulator(clock, block_time=1.0)
+        emulator.receive(b"G0 X10\nG0 X20\n")
+        clock.advance(0.5)
+
+        # Call method under test
+        emulator.receive(b"\x18")
+
+        # Assertions
+        assert read_lines(emulator) == ["ok", "ok", "ALARM:3", "", STARTUP_MESSAGE, UNLOCK_MESSAGE]
+        assert emulator.state == "Alarm"
+        assert emulator.position == (5.0, 0.0, 0.0)
+
+        # G-code is locked until unlocked
+        emulator.receive(b"G0 X0\n$X\nG0 X0\n")
+        assert read_lines(emulator) == ["error:9", "[MSG:Caution: Unlocked]", "ok", "ok"]
+
+    def test_jog_cancel(self, clock: FakeClock):
+        emulator = create_emulator(clock, block_time=1.0)
+        emulator.receive(b"$J=G91 X10 F1000\n$J=G91 X10 F1000\n")
+        clock.advance(0.5)
+
+        # Call method under test
+        emulator.receive(b"\x85")
+
+        # Assertions
+        assert read_lines(emulator) == ["ok", "ok"]
+        assert emulator.state == "Idle"
+        assert emulator.position == (5.0, 0.0, 0.0)
+
+    def test_feed_override(self, clock: FakeClock):
+        emulator = create_emulator(clock)
+        emulator.receive(b"G1 X10 F600\n")  # 10 mm at 10 mm/s
+        clock.advance(0.5)
+
+        # Call method under test: the rest of the block runs at 200%
+        emulator.receive(b"\x91" * 12)
+
+        # Assertions
+        emulator.receive(b"?")
+        assert read_lines(emulator)[-1] == (
+            "<Run|MPos:5.000,0.000,0.000|Bf:14,128|FS:1200,0|Ov:200,100,100>"
+        )
+        clock.advance(0.125)
+        assert emulator.position == pytest.approx((7.5, 0.0, 0.0))
+        clock.advance(0.13)
+        assert emulator.position == (10.0, 0.0, 0.0)
+
+    def test_override_limits_and_reset(self, clock: FakeClock):
+        emulator = create_emulator(clock)
+
+        # Call method under test
+        emulator.receive(b"\x92" * 10 + b"\x93" + b"\x97" + b"\x9a\x9c")
+        emulator.receive(b"?")
+        lowered = read_lines(emulator)[-1]
+        emulator.receive(b"\x90\x95\x99?")
+
+        # Assertions
+        assert lowered.endswith("|Ov:11,25,111>")
+        assert read_lines(emulator)[-1].endswith("|Ov:100,100,100>")
+
+    def test_rapid_override(self, clock: FakeClock):
+        emulator = create_emulator(clock, block_time=1.0)
+        emulator.receive(b"\x96")  # 50%
+
+        # Call method under test
+        emulator.receive(b"G0 X10\nG1 X20 F600\n")
+
+        # Assertions: only the rapid move is slower
+        clock.advance(1.0)
+        assert emulator.position == pytest.approx((5.0, 0.0, 0.0))
+        clock.advance(1.0)
+        assert emulator.position == (10.0, 0.0, 0.0)
+        clock.advance(1.0)
+        assert emulator.position == (20.0, 0.0, 0.0)
+
+    def test_jog_not_overridden(self, clock: FakeClock):
+        emulator = create_emulator(clock, block_time=1.0)
+        emulator.receive(b"\x92" * 5)  # 50%
+
+        # Call method under test
+        emulator.receive(b"$J=G91 X10 F1000\n")
+
+        # Assertions
+        clock.advance(1.0)
+        assert emulator.state == "Idle"
+
+    def test_jog_while_running(self, clock: FakeClock):
+        emulator = create_emulator(clock, block_time=1.0)
+        emulator.receive(b"G0 X10\n")
+
+        # Call method under test
+        emulator.receive(b"$J=G91 X10 F1000\n")
+
+        # Assertions
+        assert read_lines(emulator) == ["ok", "error:8"]
+
+    @pytest.mark.parametrize(
+        "line,expected",
+        [
+            (b"$\n", ["[HLP:$$ $# $G $I $N $x=val $Nx=line $J=line $SLP $C $X $H ~ ! ? ctrl-x]"]),
+            (b"$G\n", ["[GC:G0 G54 G17 G21 G90 G94 M5 M9 T0 F0 S0]"]),
+            (b"$I\n", ["[VER:1.1h.20190830:]", "[OPT:V,15,128]"]),
+            (b"$N\n", ["$N0=", "$N1="]),
+            (b"$110=1000\n", []),
+            (b"$Y\n", ["error:3"]),
+            (b"G1 X10\n", ["error:22"]),
+            (b"HELLO\n", ["error:1"]),
+            (b"(comment)\n", []),
+        ],
+    )
+    def test_commands(self, clock: FakeClock, line, expected):
+        emulator = create_emulator(clock)
+
+        # Call method under test
+        emulator.receive(line)
+
+        # Assertions
+        lines = read_lines(emulator)
+        if not expected or not expected[-1].startswith("error"):
+            expected = expected + ["ok"]
+        assert lines == expected
+
+    def test_settings(self, clock: FakeClock):
+        emulator = create_emulator(clock)
+
+        # Call method under test
+        emulator.receive(b"$$\n")
+
+        # Assertions
+        lines = read_lines(emulator)
+        assert "$110=5000.000" in lines
+        assert lines[-1] == "ok"
+
+
+class TestEmulatorTransport:
+    def test_open_and_read(self):
+        transport = EmulatorTransport(timeout=1.0)
+
+        # Call method under test
+        transport.open()
+
+        # Assertions
+        assert transport.is_open
+        assert transport.readline() == b"\r\n"
+        assert transport.readline() == f"{STARTUP_MESSAGE}\r\n".encode()
+
+        transport.write(b"?")
+        assert (
+            transport.readline()
+            == b"<Idle|MPos:0.000,0.000,0.000|Bf:15,128|FS:0,0|Ov:100,100,100>\r\n"
+        )
+
+        transport.close()
+        assert not transport.is_open
+
+    def test_fileno_readable_with_output(self):
+        transport = EmulatorTransport(timeout=1.0)
+        transport.open()
+        transport.reset_input_buffer()
+
+        # Nothing to read
+        readable, _, _ = select.select([transport.fileno()], [], [], 0)
+        assert readable == []
+
+        # Call method under test
+        transport.write(b"G0 X1\n")
+
+        # Assertions
+        readable, _, _ = select.select([transport.fileno()], [], [], 1.0)
+        assert readable == [transport.fileno()]
+        assert transport.read(transport.in_waiting) == b"ok\r\n"
+        readable, _, _ = select.select([transport.fileno()], [], [], 0)
+        assert readable == []
+
+        transport.close()
+
+    def test_readline_timeout(self):
+        transport = EmulatorTransport(timeout=0.01, selectable=False)
+        transport.open()
+        transport.reset_input_buffer()
+
+        # Call method under test
+        response = transport.readline()
+
+        # Assertions
+        assert response == b""
+        with pytest.raises(io.UnsupportedOperation):
+            transport.fileno()
+
+        transport.close()
+
+    def test_write_closed(self):
+        transport = EmulatorTransport()
+
+        # Call method under test and assert exception
+        with pytest.raises(serial.SerialException):
+            transport.write(b"?")
+
+    def test_executes_in_real_time(self):
+        transport = EmulatorTransport(GrblEmulator(block_time=0.01), timeout=1.0)
+        transport.open()
+        transport.reset_input_buffer()
+
+        # Call method under test
+        transport.write(b"G0 X1\nG0 X2\n")
+
+        # Assertions
+        assert transport.readline() == b"ok\r\n"
+        assert transport.readline() == b"ok\r\n"
+        deadline = time.monotonic() + 1.0
+        while transport.emulator.executed_blocks < 2 and time.monotonic() < deadline:
+            time.sleep(0.005)
+        assert transport.emulator.position == (2.0, 0.0, 0.0)
+
+        transport.close()
+
+
+class TestCreateTransport:
+    def test_serial_port(self):
+        transport = create_transport("/dev/ttyUSB0")
+        assert type(transport) is serial.Serial
+
+    def test_url(self):
+        transport = create_transport("loop://")
+        assert not transport.is_open
+        assert transport.port == "loop://"
+
+    def test_emulator(self):
+        transport = create_transport("emulator://?speed=10&ok_delay=0.001&unknown=1")
+
+        # Assertions
+        assert isinstance(transport, EmulatorTransport)
+        assert not transport.is_open
+        assert transport.emulator.speed == 10.0
+        assert transport.emulator.ok_delay == 0.001
+
+
+def test_serve_client():
+    server_side, client_side = socket.socketpair()
+    client_side.settimeout(1.0)
+    emulator = GrblEmulator()
+    thread = threading.Thread(target=serve_client, args=(server_side, emulator))
+    thread.start()
+
+    # Call method under test
+    received = b""
+    while STARTUP_MESSAGE.encode() not in received:
+        received += client_side.recv(1024)
+    client_side.sendall(b"G0 X1\n")
+    response = client_side.recv(1024)
+
+    # Assertions
+    assert response == b"ok\r\n"
+
+    client_side.close()
+    thread.join(timeout=1.0)
+    assert not thread.is_alive()
+    server_side.close()
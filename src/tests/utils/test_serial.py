@@ -1,6 +1,12 @@
+import os
+import threading
+import time
+
 import pytest
 import serial
-from core.utilities.serial import SerialService
+from core.utilities.serial.grblEmulator import STARTUP_MESSAGE
+from core.utilities.serial.serialService import SerialService
+from core.utilities.serial.transports import EmulatorTransport
 from pytest_mock.plugin import MockerFixture
 
 
@@ -64,6 +70,21 @@ def test_send_line(mocker: MockerFixture):
     assert mock_write_port.call_count == 1
 
 
+def test_send_lines(mocker: MockerFixture):
+    # Sample messages with valid G-code
+    lines = ["G1 X10 Y20", " G1 X20 Y20\n"]
+
+    # Mock serial port methods
+    mock_write_port = mocker.patch.object(serial.Serial, "write")
+
+    # Call method under test
+    serial_service = SerialService()
+    serial_service.sendLines(lines)
+
+    # Assertions
+    mock_write_port.assert_called_once_with(b"G1 X10 Y20\nG1 X20 Y20\n")
+
+
 @pytest.mark.parametrize("received", ["", "worked great"])
 def test_read_line(mocker: MockerFixture, received):
     # Mock serial port methods
@@ -173,3 +194,127 @@ class TestSerialWriteLock:
         mock_lock.__enter__.assert_called_once()
         mock_lock.__exit__.assert_called_once()
         mock_write.assert_called_once_with(b"G0 X1\n")
+
+
+# ------------------------------------------------------------------
+# SerialService buffered reads
+# ------------------------------------------------------------------
+
+
+class PipePort:
+    """Port with a file descriptor, receives what is written to ``send``."""
+
+    def __init__(self):
+        self._read, self._write = os.pipe()
+        self.timeout = 1
+
+    def fileno(self) -> int:
+        return self._read
+
+    @property
+    def in_waiting(self) -> int:
+        return 0
+
+    def read(self, size: int) -> bytes:
+        return os.read(self._read, 4096)
+
+    def send(self, data: bytes):
+        os.write(self._write, data)
+
+    def close(self):
+        os.close(self._read)
+        os.close(self._write)
+
+
+@pytest.fixture
+def pipe_service():
+    serial_service = SerialService()
+    port = PipePort()
+    serial_service.interface = port
+    yield serial_service, port
+    port.close()
+
+
+class TestSerialBufferedReads:
+    def test_read_line_splits_lines(self, pipe_service):
+        serial_service, port = pipe_service
+        port.send(b"ok\r\n<Idle|MPos:0.000,0.000,0.000|FS:0,0>\r\nerr")
+
+        # Call method under test
+        assert serial_service.readLine() == "ok"
+        assert serial_service.waiting()
+        assert serial_service.readLine() == "<Idle|MPos:0.000,0.000,0.000|FS:0,0>"
+
+        # A partial line is kept until complete
+        assert serial_service.readLine(timeout=0.01) == ""
+        port.send(b"or:9\r\n")
+        assert serial_service.readLine() == "error:9"
+
+    def test_read_pending_lines(self, pipe_service):
+        serial_service, port = pipe_service
+        port.send(b"ok\r\nok\r\n\r\nok\r\nerr")
+        assert serial_service.readLine() == "ok"
+
+        # Call method under test
+        lines = serial_service.readPendingLines()
+
+        # Assertions
+        assert lines == ["ok", "", "ok"]
+        assert serial_service.readPendingLines() == []
+        port.send(b"or:9\r\n")
+        assert serial_service.readLine() == "error:9"
+
+    def test_wake_interrupts_read_line(self, pipe_service):
+        serial_service, _ = pipe_service
+        # Wait on the port once, so the wake-up pipe exists
+        assert serial_service.readLine(timeout=0) == ""
+
+        timer = threading.Timer(0.05, serial_service.wake)
+        timer.start()
+        start = time.monotonic()
+
+        # Call method under test
+        response = serial_service.readLine(timeout=5)
+
+        # Assertions
+        timer.join()
+        assert response == ""
+        assert time.monotonic() - start < 1
+
+        # Consumed, the next read waits again
+        assert serial_service.readLine(timeout=0.01) == ""
+
+
+def test_start_connection_emulator():
+    serial_service = SerialService()
+
+    # Call method under test
+    response = serial_service.startConnection("emulator://?startup_delay=0.01", 115200, 0.5)
+
+    # Assertions
+    assert response == STARTUP_MESSAGE
+    assert isinstance(serial_service.interface, EmulatorTransport)
+
+    serial_service.sendLine("G0 X1")
+    assert serial_service.readLine() == "ok"
+
+    serial_service.stopConnection()
+    assert not serial_service.interface.is_open
+
+
+def test_read_pending_lines_received():
+    serial_service = SerialService()
+    serial_service.startConnection("emulator://", 115200, 0.5)
+    serial_service.sendLines(["G0 X1", "G0 X2"])
+    deadline = time.monotonic() + 1
+    while serial_service.interface.in_waiting < len(b"ok\r\nok\r\n"):
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+
+    # Call method under test
+    lines = serial_service.readPendingLines()
+
+    # Assertions
+    assert lines == ["ok", "ok"]
+
+    serial_service.stopConnection()
@@ -0,0 +1,124 @@
+from core.utilities.gateway.statusDelta import (
+    STATUS_DELTA,
+    STATUS_KEYFRAME,
+    StatusEncoder,
+    StatusReassembler,
+)
+
+STATUS = {
+    "activeState": "Idle",
+    "mpos": {"x": 0.0, "y": 0.0, "z": 0.0},
+    "line": None,
+}
+SECTIONS = {
+    "parserstate": {"modal": {"motion": "G0"}, "tool": 0},
+    "gateway_state": "idle",
+    "session": None,
+    "file_progress": None,
+}
+
+
+class TestStatusEncoder:
+    def test_keyframe(self):
+        encoder = StatusEncoder()
+
+        # Call method under test
+        message = encoder.keyframe({**SECTIONS, "status": STATUS})
+
+        # Assertions
+        assert message == {"type": STATUS_KEYFRAME, "seq": 1, "status": STATUS, **SECTIONS}
+        assert encoder.snapshot() == message
+
+    def test_delta(self):
+        encoder = StatusEncoder()
+        encoder.keyframe({**SECTIONS, "status": STATUS})
+        parserstate = {"modal": {"motion": "G0"}, "tool": 0}
+
+        # Call method under test
+        unchanged = encoder.delta({}, {**SECTIONS, "parserstate": parserstate})
+        parserstate["modal"]["motion"] = "G1"
+        changed = encoder.delta(
+            {"mpos": {"x": 1.0, "y": 0.0, "z": 0.0}},
+            {**SECTIONS, "parserstate": parserstate, "gateway_state": "streaming"},
+        )
+
+        # Assertions
+        assert unchanged is None
+        assert changed == {
+            "type": STATUS_DELTA,
+            "seq": 2,
+            "status": {"mpos": {"x": 1.0, "y": 0.0, "z": 0.0}},
+            "parserstate": {"modal": {"motion": "G1"}, "tool": 0},
+            "gateway_state": "streaming",
+        }
+        snapshot = encoder.snapshot()
+        assert snapshot["seq"] == 2
+        assert snapshot["status"] == {**STATUS, "mpos": {"x": 1.0, "y": 0.0, "z": 0.0}}
+        assert snapshot["parserstate"]["modal"]["motion"] == "G1"
+
+
+class TestStatusReassembler:
+    def test_rebuilds_the_status(self):
+        encoder = StatusEncoder()
+        reassembler = StatusReassembler()
+        messages = [
+            encoder.keyframe({**SECTIONS, "status": STATUS}),
+            encoder.delta({"activeState": "Run"}, SECTIONS),
+            encoder.delta({"line": 5}, {**SECTIONS, "file_progress": {"sent_lines": 5}}),
+        ]
+
+        # Call method under test
+        states = [reassembler.apply(message) for message in messages]
+
+        # Assertions
+        assert states[-1] == {
+            section: value
+            for section, value in encoder.snapshot().items()
+            if section not in ("type", "seq")
+        }
+        assert states[1]["status"]["activeState"] == "Run"
+        assert states[1]["status"]["line"] is None
+
+    def test_missed_delta(self):
+        encoder = StatusEncoder()
+        reassembler = StatusReassembler()
+        reassembler.apply(encoder.keyframe({**SECTIONS, "status": STATUS}))
+        encoder.delta({"activeState": "Run"}, SECTIONS)
+
+        # Call method under test
+        state = reassembler.apply(encoder.delta({"line": 5}, SECTIONS))
+
+        # Assertions
+        assert state is None
+        assert reassembler.needs_keyframe
+        assert reassembler.apply(encoder.delta({"line": 6}, SECTIONS)) is None
+        # the snapshot includes every change
+        state = reassembler.apply(encoder.snapshot())
+        assert state["status"] == {**STATUS, "activeState": "Run", "line": 6}
+
+    def test_deltas_included_in_the_snapshot_are_ignored(self):
+        encoder = StatusEncoder()
+        encoder.keyframe({**SECTIONS, "status": STATUS})
+        delta = encoder.delta({"activeState": "Run"}, SECTIONS)
+        reassembler = StatusReassembler()
+        reassembler.apply(encoder.snapshot())
+
+        # Call method under test
+        state = reassembler.apply(delta)
+
+        # Assertions
+        assert state is None
+        assert not reassembler.needs_keyframe
+
+    def test_full_payload(self):
+        reassembler = StatusReassembler()
+
+        # Call method under test
+        state = reassembler.apply({"status": STATUS, **SECTIONS})
+
+        # Assertions
+        assert state == {"status": STATUS, **SECTIONS}
+        assert reassembler.apply({"type": STATUS_DELTA, "status": {"line": 1}}) == {
+            "status": {**STATUS, "line": 1},
+            **SECTIONS,
+        }
@@ -0,0 +1,186 @@
+import math
+
+import numpy as np
+import pytest
+from worker.utils.gcodeEstimator import MachineLimits, estimate_time, plan_blocks
+from worker.utils.gcodeParser import GcodeParser
+
+LIMITS = MachineLimits(
+    max_rate=np.array([100.0, 100.0, 50.0]),
+    acceleration=np.array([10.0, 10.0, 5.0]),
+    junction_deviation=0.01,
+)
+
+
+def parse(tmp_path, content: str):
+    gcode = tmp_path / "file.gcode"
+    gcode.write_text(content)
+    return GcodeParser().parseFile(str(gcode))
+
+
+def reference_plan(delta: np.ndarray, rate: np.ndarray, limits: MachineLimits) -> list[float]:
+    """Block by block version of the planner, as GRBL does it."""
+    n = len(delta)
+    length = [math.sqrt(sum(v * v for v in d)) for d in delta]
+    unit = [[v / length[i] for v in d] for i, d in enumerate(delta)]
+
+    def limit_by_axis(values, vector):
+        return min(values[k] / abs(vector[k]) for k in range(3) if vector[k] != 0)
+
+    nominal = [min(rate[i], limit_by_axis(limits.max_rate, unit[i])) for i in range(n)]
+    accel = [limit_by_axis(limits.acceleration, unit[i]) for i in range(n)]
+    step = [2 * accel[i] * length[i] for i in range(n)]
+
+    entry = [0.0] * (n + 1)
+    for i in range(1, n):
+        cos_theta = -sum(unit[i - 1][k] * unit[i][k] for k in range(3))
+        if cos_theta > 0.999999:
+            junction = 0.0
+        elif cos_theta < -0.999999:
+            junction = math.inf
+        else:
+            vector = [unit[i][k] - unit[i - 1][k] for k in range(3)]
+            norm = math.sqrt(sum(v * v for v in vector))
+            junction_accel = limit_by_axis(limits.acceleration, [v / norm for v in vector])
+            sin_theta_d2 = math.sqrt(0.5 * (1 - cos_theta))
+            junction = junction_accel * limits.junction_deviation * sin_theta_d2
+            junction /= 1 - sin_theta_d2
+        entry[i] = min(junction, nominal[i - 1] ** 2, nominal[i] ** 2)
+        entry[i] = min(entry[i], sum(step[i : i + limits.block_buffer_size]))
+
+    for i in range(n - 1, -1, -1):
+        entry[i] = min(entry[i], entry[i + 1] + step[i])
+    for i in range(n):
+        entry[i + 1] = min(entry[i + 1], entry[i] + step[i])
+
+    times = []
+    for i in range(n):
+        v0, v1 = math.sqrt(entry[i]), math.sqrt(entry[i + 1])
+        peak = math.sqrt(min(nominal[i] ** 2, (step[i] + entry[i] + entry[i + 1]) / 2))
+        ramps = (2 * peak**2 - entry[i] - entry[i + 1]) / (2 * accel[i])
+        times.append((2 * peak - v0 - v1) / accel[i] + max(length[i] - ramps, 0) / peak)
+    return times
+
+
+class TestMachineLimits:
+    def test_from_grbl_settings(self):
+        settings = {
+            "$11": {"value": "0.020", "message": "", "units": "", "description": ""},
+            "$110": {"value": "1200.000", "message": "", "units": "", "description": ""},
+            "$122": {"value": "50.000", "message": "", "units": "", "description": ""},
+        }
+
+        # Call method under test
+        limits = MachineLimits.from_grbl_settings(settings)
+
+        # Assertions
+        assert limits.junction_deviation == 0.02
+        assert limits.max_rate.tolist() == [20.0, 500 / 60, 500 / 60]
+        assert limits.acceleration.tolist() == [10.0, 10.0, 50.0]
+
+    def test_defaults(self):
+        # Call method under test
+        limits = MachineLimits.from_grbl_settings(None)
+
+        # Assertions
+        assert limits.junction_deviation == 0.01
+        assert limits.acceleration.tolist() == [10.0, 10.0, 10.0]
+
+
+class TestPlanBlocks:
+    def test_trapezoid(self):
+        # 100 mm at 20 mm/s: 2 s accelerating (20 mm), 2 s decelerating
+        # (20 mm) and 60 mm at nominal speed
+        times = plan_blocks(np.array([[100.0, 0, 0]]), np.array([20.0]), LIMITS)
+
+        # Assertions
+        assert times == pytest.approx([2 + 2 + 3])
+
+    def test_triangle(self):
+        # 10 mm can't reach 20 mm/s: peak of 10 mm/s, 1 s + 1 s
+        times = plan_blocks(np.array([[10.0, 0, 0]]), np.array([20.0]), LIMITS)
+
+        # Assertions
+        assert times == pytest.approx([2])
+
+    def test_axis_limits(self):
+        # Z is limited to 50 mm/s and 5 mm/s^2: 10 s ramps (250 mm each)
+        # and 100 mm at nominal speed
+        times = plan_blocks(np.array([[0, 0, -600.0]]), np.array([np.inf]), LIMITS)
+
+        # Assertions
+        assert times == pytest.approx([10 + 10 + 2])
+
+    def test_stops(self):
+        delta = np.array([[10.0, 0, 0], [10.0, 0, 0]])
+        rate = np.array([20.0, 20.0])
+
+        # Call method under test
+        straight = plan_blocks(delta, rate, LIMITS)
+        stopped = plan_blocks(delta, rate, LIMITS, stops=np.array([False, True]))
+
+        # Assertions
+        assert straight.sum() < stopped.sum()
+        assert stopped == pytest.approx([2, 2])
+
+    def test_matches_reference(self):
+        rng = np.random.default_rng(1234)
+        delta = rng.uniform(-5, 5, size=(300, 3))
+        delta[::7] *= 0.01
+        delta[50:80] = [1.0, 0.0, 0.0]
+        delta[80:90, 2] = 0.0
+        rate = rng.uniform(1, 150, size=300)
+
+        # Call method under test
+        times = plan_blocks(delta, rate, LIMITS)
+
+        # Assertions
+        assert times == pytest.approx(reference_plan(delta, rate, LIMITS))
+
+
+class TestEstimateTime:
+    def test_estimate_time(self, tmp_path):
+        model = parse(
+            tmp_path,
+            """T1
+G1 X100 F1200
+G4 P1.5
+T2
+G1 X0 F1200
+""",
+        )
+
+        # Call method under test
+        estimate = estimate_time(model, LIMITS)
+
+        # Assertions
+        assert estimate.total_time == pytest.approx(7 + 1.5 + 7)
+        assert estimate.tool_times() == pytest.approx({"T1": 8.5, "T2": 7})
+        assert estimate.eta(1) == 0
+        assert estimate.eta(2) == pytest.approx(8.5)
+        assert estimate.eta(5) == pytest.approx(15.5)
+
+    def test_report(self, tmp_path):
+        model = parse(tmp_path, "".join(f"G1 X{i} F600\n" for i in range(1, 101)))
+        estimate = estimate_time(model, LIMITS)
+
+        # Call method under test
+        report = estimate.report(size=10)
+
+        # Assertions
+        assert report["estimated_time"] == pytest.approx(estimate.total_time, abs=1e-3)
+        assert report["tool_times"] == {"T0": report["estimated_time"]}
+        assert len(report["eta_index"]) == 10
+        assert report["eta_index"][-1] == (100, report["estimated_time"])
+        lines = [line for line, _ in report["eta_index"]]
+        assert lines == sorted(lines)
+
+    def test_empty_program(self, tmp_path):
+        model = parse(tmp_path, "; nothing to do\n")
+
+        # Call method under test
+        estimate = estimate_time(model, LIMITS)
+
+        # Assertions
+        assert estimate.total_time == 0
+        assert estimate.report()["eta_index"] == []
@@ -0,0 +1,93 @@
+import json
+
+import numpy as np
+from worker.utils.gcodeLod import build_levels, save_levels, simplify
+from worker.utils.gcodeParser import MOVE_ARC, MOVE_LINEAR, MOVE_RAPID, GcodeParser
+
+
+def parse(tmp_path, content: str):
+    gcode = tmp_path / "file.gcode"
+    gcode.write_text(content)
+    return GcodeParser().parseFile(str(gcode))
+
+
+class TestSimplify:
+    def test_collinear_points(self):
+        points = np.array([[float(i), 0.0, 0.0] for i in range(10)])
+
+        # Call method under test
+        kept = simplify(points, np.array([0, 9]), tolerance=0.01)
+
+        # Assertions
+        assert kept.tolist() == [0, 9]
+
+    def test_corners_and_breaks(self):
+        points = np.array(
+            [[0, 0, 0], [1, 0.001, 0], [2, 0, 0], [2, 1, 0], [2, 2, 0], [3, 2, 0]],
+            dtype=float,
+        )
+
+        # Call method under test
+        kept = simplify(points, np.array([0, 4, 5]), tolerance=0.01)
+
+        # Assertions
+        # the corner is kept, as well as the breaks
+        assert kept.tolist() == [0, 2, 4, 5]
+
+
+class TestBuildLevels:
+    def test_levels(self, tmp_path):
+        model = parse(
+            tmp_path,
+            "G0 X10 Y0\nG3 X-10 Y0 I-10 J0 F600\nG1 X-10 Y-5\nG1 X-10 Y-10\nG0 Z5\n",
+        )
+
+        # Call method under test
+        levels = build_levels(model, sizes=(16, 1024))
+
+        # Assertions
+        assert [level.size for level in levels] == [1024, 16]
+        fine, coarse = levels
+        assert len(coarse) < len(fine) < len(model)
+        assert fine.tolerance < coarse.tolerance
+        for level in levels:
+            assert len(level.points) == len(level) + 1
+            # the ends of the toolpath are kept
+            assert level.points[0].tolist() == [0, 0, 0]
+            assert level.points[-1].tolist() == [-10, -10, 5]
+            # every move type is kept, in the same order
+            types = level.types.tolist()
+            runs = [t for i, t in enumerate(types) if i == 0 or types[i - 1] != t]
+            assert runs == [MOVE_RAPID, MOVE_ARC, MOVE_LINEAR, MOVE_RAPID]
+            # the arc stays on its circle
+            arc = level.points[1:][level.types == MOVE_ARC]
+            assert np.allclose(np.hypot(arc[:, 0], arc[:, 1]), 10)
+
+    def test_empty_file(self, tmp_path):
+        model = parse(tmp_path, "; nothing to do\n")
+
+        # Call method under test
+        levels = build_levels(model)
+
+        # Assertions
+        assert all(len(level) == 0 for level in levels)
+        assert len(levels[0].toolpath()) == 0
+
+
+class TestSaveLevels:
+    def test_save_levels(self, tmp_path):
+        model = parse(tmp_path, "G0 X10 Y0\nG1 X10.12345 Y10 F600\n")
+        levels = build_levels(model, sizes=(256, 512))
+
+        # Call method under test
+        paths = save_levels(levels, model, "abc123", tmp_path / "previews")
+
+        # Assertions
+        assert [path.name for path in paths] == ["512.json", "256.json"]
+        preview = json.loads(paths[1].read_text())
+        assert preview["size"] == 256
+        assert preview["total_moves"] == 2
+        assert preview["bbox"]["xmax"] == 10.12345
+        assert preview["x"] == [0, 10, 10.123]
+        assert preview["y"] == [0, 0, 10]
+        assert preview["type"] == [MOVE_RAPID, MOVE_LINEAR]
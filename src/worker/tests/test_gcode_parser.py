@@ -0,0 +1,200 @@
+import numpy as np
+import pytest
+from worker.utils.gcodeParser import (
+    MAX_ARC_SEGMENTS,
+    MOVE_ARC,
+    MOVE_LINEAR,
+    MOVE_RAPID,
+    GcodeParser,
+)
+
+PROGRAM = """G21 G90
+G0 X10 Y0 ; rapid to start
+G1 Z-1 F300
+(cut the square)
+G1 X10 Y10 F600
+G1 X0
+G91
+G1 Y-10
+G90
+G92 X0 Y0
+G0 X5 Z5
+"""
+
+
+class TestGcodeModel:
+    def test_parse_file(self, tmp_path):
+        gcode = tmp_path / "file.gcode"
+        gcode.write_text(PROGRAM)
+
+        # Call method under test
+        model = GcodeParser().parseFile(str(gcode))
+
+        # Assertions
+        assert len(model) == 6
+        assert model.x.tolist() == [10, 10, 10, 0, 0, 5]
+        assert model.y.tolist() == [0, 0, 10, 10, 0, 0]
+        assert model.z.tolist() == [0, -1, -1, -1, -1, 5]
+        assert model.F.tolist() == [0, 300, 600, 600, 600, 600]
+        assert model.type.tolist() == [
+            MOVE_RAPID,
+            MOVE_LINEAR,
+            MOVE_LINEAR,
+            MOVE_LINEAR,
+            MOVE_LINEAR,
+            MOVE_RAPID,
+        ]
+        assert model.line.tolist() == [2, 3, 5, 6, 8, 11]
+
+    def test_metrics(self, tmp_path):
+        gcode = tmp_path / "file.gcode"
+        gcode.write_text(PROGRAM)
+
+        # Call method under test
+        model = GcodeParser().parseFile(str(gcode))
+
+        # Assertions
+        assert np.allclose(model.distances, [10, 1, 10, 10, 10, np.sqrt(5**2 + 6**2)])
+        assert model.distance == float(model.distances.sum())
+        assert (model.bbox.xmin, model.bbox.xmax) == (0, 10)
+        assert (model.bbox.ymin, model.bbox.ymax) == (0, 10)
+        assert (model.bbox.zmin, model.bbox.zmax) == (-1, 5)
+
+    def test_select(self, tmp_path):
+        gcode = tmp_path / "file.gcode"
+        gcode.write_text(PROGRAM)
+        model = GcodeParser().parseFile(str(gcode))
+
+        # Call method under test
+        rapids = model.select(MOVE_RAPID)
+        cuts = model.select(MOVE_LINEAR)
+
+        # Assertions
+        assert len(rapids) == 2
+        assert rapids.x.tolist() == [10, 5]
+        assert rapids.line.tolist() == [2, 11]
+        assert len(cuts) == 4
+        assert cuts.z.tolist() == [-1, -1, -1, -1]
+
+    def test_empty_file(self, tmp_path):
+        gcode = tmp_path / "file.gcode"
+        gcode.write_text("; nothing to do\n")
+
+        # Call method under test
+        model = GcodeParser().parseFile(str(gcode))
+
+        # Assertions
+        assert len(model) == 0
+        assert model.distance == 0
+        assert model.bbox.dx() == 0
+
+    def test_modal_words(self, tmp_path):
+        gcode = tmp_path / "file.gcode"
+        gcode.write_text(
+            """N10 G01X1Y1F300 (no spaces)
+X2
+T2 M6
+N20 G4 P0.5
+G00 Y5 G91
+X1 F100
+"""
+        )
+
+        # Call method under test
+        model = GcodeParser().parseFile(str(gcode))
+
+        # Assertions
+        assert model.x.tolist() == [1, 2, 2, 3]
+        # G91 applies to the move in its own line
+        assert model.y.tolist() == [1, 1, 6, 6]
+        assert model.F.tolist() == [300, 300, 300, 100]
+        assert model.type.tolist() == [MOVE_LINEAR, MOVE_LINEAR, MOVE_RAPID, MOVE_RAPID]
+        assert model.tools.tolist() == [0, 0, 2, 2]
+        assert model.dwells == [(2, 0.5)]
+
+    def test_axis_words_without_move(self, tmp_path):
+        gcode = tmp_path / "file.gcode"
+        gcode.write_text(
+            """G1 X10 Y10 F100
+G10 L20 P1 X0 Y0
+G30 X5 Y5
+G1 X20
+"""
+        )
+
+        # Call method under test
+        model = GcodeParser().parseFile(str(gcode))
+
+        # Assertions
+        # G10 and G30 don't move in the current motion mode
+        assert model.x.tolist() == [10, 20]
+        assert model.y.tolist() == [10, 10]
+        assert model.line.tolist() == [1, 4]
+        assert np.allclose(model.distances, [np.sqrt(10**2 + 10**2), 10])
+
+    @pytest.mark.parametrize(
+        "program",
+        [
+            # I/J offsets
+            "G0 X10 Y0\nG3 X-10 Y0 I-10 J0 F600\n",
+            # radius
+            "G0 X10 Y0\nG3 X-10 Y0 R10 F600\n",
+        ],
+    )
+    def test_arc(self, tmp_path, program):
+        gcode = tmp_path / "file.gcode"
+        gcode.write_text(program)
+
+        # Call method under test
+        model = GcodeParser(arc_tolerance=0.01).parseFile(str(gcode))
+        arc = model.select(MOVE_ARC)
+
+        # Assertions
+        # half a circle of radius 10, counter-clockwise (through Y+)
+        assert len(arc) > 10
+        assert np.allclose(np.hypot(arc.x, arc.y), 10)
+        assert (arc.y >= -1e-9).all()
+        assert (arc.x[-1], arc.y[-1]) == (-10, 0)
+        assert arc.line.tolist() == [2] * len(arc)
+        # exact length, not the sum of the chords
+        assert model.distances[1:].sum() == pytest.approx(10 * np.pi)
+        assert model.distance == pytest.approx(10 + 10 * np.pi)
+
+    def test_arc_planes(self, tmp_path):
+        gcode = tmp_path / "file.gcode"
+        gcode.write_text(
+            """G18 G2 X10 Z0 I5 K0 F600
+G19 G2 Y10 Z0 R5
+G17 G91 G2 X0 Y0 I5 J0 Z-1
+"""
+        )
+
+        # Call method under test
+        model = GcodeParser().parseFile(str(gcode))
+
+        # Assertions
+        arcs = [(model.type == MOVE_ARC) & (model.line == line) for line in (1, 2, 3)]
+        # ZX plane: the arc stays in Y=0
+        assert np.allclose(model.y[arcs[0]], 0)
+        assert np.allclose(np.hypot(model.x[arcs[0]] - 5, model.z[arcs[0]]), 5)
+        # YZ plane: the arc stays in X=10
+        assert np.allclose(model.x[arcs[1]], 10)
+        assert np.allclose(np.hypot(model.y[arcs[1]] - 5, model.z[arcs[1]]), 5)
+        # helix: a full circle going down 1 mm
+        assert np.allclose(np.hypot(model.x[arcs[2]] - 15, model.y[arcs[2]] - 10), 5)
+        assert model.z[arcs[2]][-1] == pytest.approx(-1)
+        helix = model.distances[arcs[2]].sum()
+        assert helix == pytest.approx(np.hypot(2 * np.pi * 5, 1))
+
+    def test_arc_segments_are_bounded(self, tmp_path):
+        gcode = tmp_path / "file.gcode"
+        gcode.write_text("G2 X0 Y0 I10000 J0 F600\nG2 X0 Y0.1 I0 J0.05\n")
+
+        # Call method under test
+        model = GcodeParser(arc_tolerance=0.001).parseFile(str(gcode))
+
+        # Assertions
+        lines = model.line.tolist()
+        assert lines.count(1) == MAX_ARC_SEGMENTS
+        # the sagitta of a single segment would already be within tolerance
+        assert lines.count(2) < 20
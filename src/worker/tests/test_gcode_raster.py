@@ -0,0 +1,90 @@
+import numpy as np
+import pytest
+from PIL import Image
+from worker.utils.gcodeParser import GcodeParser
+from worker.utils.gcodeRaster import MOVE_COLORS, GcodeRasterRenderer, project
+
+# A square cut at Z=-1, reached with rapids
+PROGRAM = """G0 X10 Y10 Z5
+G1 Z-1 F300
+G1 X90
+G1 Y90
+G1 X10
+G1 Y10
+G0 Z5
+"""
+
+RAPID, LINEAR = MOVE_COLORS[0], MOVE_COLORS[1]
+
+
+def render(tmp_path, moves: bool, **kwargs) -> np.ndarray:
+    gcode = tmp_path / "file.gcode"
+    gcode.write_text(PROGRAM)
+    output = tmp_path / "thumbnail.png"
+
+    GcodeRasterRenderer(supersample=1, **kwargs).run(str(gcode), str(output), moves)
+    return np.asarray(Image.open(output).convert("RGB"))
+
+
+def count(pixels: np.ndarray, color) -> int:
+    return int((pixels == color).all(axis=2).sum())
+
+
+class TestGcodeRasterRenderer:
+    def test_top_view(self, tmp_path):
+        # Call method under test
+        pixels = render(tmp_path, moves=False, width=200, height=200, projection="top")
+
+        # Assertions
+        assert pixels.shape == (200, 200, 3)
+        assert count(pixels, LINEAR) > 4 * 150
+        assert count(pixels, RAPID) == 0
+        # the square fills the image, except for the margins
+        assert (pixels[100, 10] == LINEAR).all()
+        assert (pixels[100, 190] == LINEAR).all()
+        assert (pixels[100, 100] == 255).all()
+
+    def test_moves(self, tmp_path):
+        # Call method under test
+        pixels = render(tmp_path, moves=True, width=200, height=200, projection="front")
+
+        # Assertions
+        assert count(pixels, RAPID) > 0
+        assert count(pixels, LINEAR) > 0
+
+    @pytest.mark.parametrize("projection", ["top", "front", "iso"])
+    def test_render(self, tmp_path, projection):
+        gcode = tmp_path / "file.gcode"
+        gcode.write_text(PROGRAM + "G2 X10 Y10 I0 J40\n")
+        model = GcodeParser().parseFile(str(gcode))
+
+        # Call method under test
+        image = GcodeRasterRenderer(width=80, height=60, projection=projection).render(
+            model.toolpath()
+        )
+
+        # Assertions
+        assert image.size == (80, 60)
+        assert (np.asarray(image) != 255).any()
+
+    def test_render_empty(self, tmp_path):
+        gcode = tmp_path / "file.gcode"
+        gcode.write_text("; nothing\n")
+        model = GcodeParser().parseFile(str(gcode))
+
+        # Call method under test
+        image = GcodeRasterRenderer(width=80, height=60).render(model.toolpath())
+
+        # Assertions
+        assert (np.asarray(image) == 255).all()
+
+    def test_invalid_projection(self):
+        with pytest.raises(ValueError):
+            GcodeRasterRenderer(projection="side")
+
+    def test_project_iso(self):
+        u, v = project(np.array([1.0, 0.0]), np.array([0.0, 1.0]), np.array([0.0, 0.0]), "iso")
+
+        # Assertions
+        assert u[0] == pytest.approx(-u[1])
+        assert v[0] == pytest.approx(v[1])
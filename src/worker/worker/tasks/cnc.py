@@ -11,7 +11,6 @@ The heavy lifting (serial I/O, line-by-line sending, pause/resume) is handled
 entirely by the CNC Gateway process.
 """
 
-import json
 import logging
 
 from celery.utils.log import get_task_logger
@@ -20,6 +19,7 @@ from core.database.base import SessionLocal
 from core.database.models import TaskStatus
 from core.database.repositories.taskRepository import TaskRepository
 from core.utilities.files import FileSystemHelper
+from core.utilities.gateway.codec import CodecError, decode
 from core.utilities.gateway.constants import (
     EVENT_FILE_FAILED,
     EVENT_FILE_FINISHED,
@@ -88,7 +88,12 @@ def executeTask(self, task_id: int) -> None:
         repository.update_task_status(task.id, TaskStatus.IN_PROGRESS.value)
         worker_logger.info("Comenzada la ejecución del archivo: %s", file_path)
 
-        gateway.request_file_execution(session_id, str(file_path), task.id)
+        gateway.request_file_execution(
+            session_id,
+            str(file_path),
+            task.id,
+            file_hash=task.file.file_hash,
+        )
 
         # 6. Wait for file_finished or file_failed
         _wait_for_completion(pubsub, task.id, worker_logger)
@@ -161,8 +166,8 @@ def _wait_for_completion(
             continue
 
         try:
-            event = json.loads(raw_message["data"])
-        except (json.JSONDecodeError, TypeError):
+            event = decode(raw_message["data"])
+        except CodecError:
             continue
 
         event_type = event.get("type", "")
@@ -1,10 +1,21 @@
+from pathlib import Path
+
+from celery.utils.log import get_task_logger
 from core.config import FILES_FOLDER_PATH, IMAGES_FOLDER_PATH
 from core.database.base import SessionLocal
 from core.database.repositories.fileRepository import FileRepository
 from core.utilities.files import FileSystemHelper
+from core.utilities.gateway.gatewayClient import GatewayClient
 from core.utilities.gcode.gcodeAnalyser import GcodeAnalyser
+from redis.exceptions import RedisError
 from worker.main import app
-from worker.utils.gcode2png import GcodeRenderer
+from worker.utils.gcodeEstimator import MachineLimits, TimeReport, estimate_time
+from worker.utils.gcodeLod import build_levels, save_levels
+from worker.utils.gcodeParser import GcodeParser
+from worker.utils.gcodeRaster import GcodeRasterRenderer
+
+# Level of the previews used to draw the thumbnails
+THUMBNAIL_PREVIEW_SIZE = 1024
 
 
 @app.task(name="create_thumbnail", ignore_result=True)
@@ -21,12 +32,16 @@ def createThumbnail(file_id: int) -> None:
         files_helper = FileSystemHelper(FILES_FOLDER_PATH)
         file_path = files_helper.get_file_path(file.user_id, file.file_name)
 
-        # 2. Instantiate the G-code renderer
-        renderer = GcodeRenderer()
+        # 2. Build the level-of-detail pyramid of the toolpath for the previews
+        model = GcodeParser().parseFile(str(file_path))
+        levels = build_levels(model)
+        save_levels(levels, model, file.file_hash)
 
-        # 3. Generate the thumbnail and save it to images folder
+        # 3. Generate the thumbnail from the level of its size and save it to images folder
+        renderer = GcodeRasterRenderer()
+        level = next(level for level in levels if level.size == THUMBNAIL_PREVIEW_SIZE)
         output = IMAGES_FOLDER_PATH + "/img" + str(file.id) + ".png"
-        renderer.run(str(file_path), output, moves=False)
+        renderer.render(level.toolpath(), moves=False).save(output)
     finally:
         db_session.close()
 
@@ -48,8 +63,35 @@ def generateFileReport(file_id: int) -> None:
         # 2. Instantiate the G-code analyser
         analyser = GcodeAnalyser(file_path)
 
-        # 3. Analyse and save the generated report
+        # 3. Analyse, estimate the machining time and save the generated report
         report = analyser.analyse()
+        time_report = estimateMachiningTime(file_path)
+        if time_report:
+            report.update(time_report)
         repository.save_file_report(file_id, report)
     finally:
         db_session.close()
+
+
+def estimateMachiningTime(file_path: Path) -> TimeReport | None:
+    """Estimates the machining time of a file, with the settings of the machine.
+
+    Returns ``None`` if the file can't be simulated (e.g. it uses inches).
+    """
+    worker_logger = get_task_logger(__name__)
+
+    # The settings are persisted by the gateway, GRBL defaults are used
+    # until it connects to the machine for the first time
+    try:
+        settings = GatewayClient().get_grbl_settings()
+    except RedisError:
+        worker_logger.warning("Could not get the GRBL settings, using the defaults")
+        settings = None
+
+    try:
+        model = GcodeParser().parseFile(str(file_path))
+    except Exception as error:
+        worker_logger.warning(f"Could not estimate the machining time of {file_path}: {error}")
+        return None
+
+    return estimate_time(model, MachineLimits.from_grbl_settings(settings)).report()
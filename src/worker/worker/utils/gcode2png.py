@@ -1,5 +1,6 @@
 from typing import TypedDict
 
+import numpy as np
 from mayavi import mlab
 from PIL import Image
 from pyvirtualdisplay import Display
@@ -8,7 +9,7 @@ import worker.utils.gcodeParser as gcode
 
 # Types definition
 Color = tuple[float, float, float]
-Points = TypedDict("Points", {"x": list[float], "y": list[float], "z": list[float]})
+Points = TypedDict("Points", {"x": np.ndarray, "y": np.ndarray, "z": np.ndarray})
 Coordinates = TypedDict("Coordinates", {"object": Points, "moves": Points})
 
 
@@ -20,15 +21,11 @@ class GcodeRenderer:
         self.path = ""
         self.moves = False
 
-        self.coords: Coordinates = {}
-        self.coords["object"] = {}
-        self.coords["moves"] = {}
-        self.coords["object"]["x"] = []
-        self.coords["object"]["y"] = []
-        self.coords["object"]["z"] = []
-        self.coords["moves"]["x"] = []
-        self.coords["moves"]["y"] = []
-        self.coords["moves"]["z"] = []
+        empty = np.empty(0)
+        self.coords: Coordinates = {
+            "object": {"x": empty, "y": empty, "z": empty},
+            "moves": {"x": empty, "y": empty, "z": empty},
+        }
 
         self.bedsize = [210, 210]
         red = (1, 0, 0)
@@ -55,17 +52,13 @@ class GcodeRenderer:
         parser = gcode.GcodeParser()
         model = parser.parseFile(path)
 
-        for seg in model.segments:
-            if seg.type == "G1":
-                self.coords["object"]["x"].append(seg.coords["x"])
-                self.coords["object"]["y"].append(seg.coords["y"])
-                self.coords["object"]["z"].append(seg.coords["z"])
-                continue
-
-            if self.moves:
-                self.coords["moves"]["x"].append(seg.coords["x"])
-                self.coords["moves"]["y"].append(seg.coords["y"])
-                self.coords["moves"]["z"].append(seg.coords["z"])
+        self.coords["object"] = self._points(model.select(gcode.MOVE_LINEAR, gcode.MOVE_ARC))
+        if self.moves:
+            self.coords["moves"] = self._points(model.select(gcode.MOVE_RAPID))
+
+    @staticmethod
+    def _points(toolpath: gcode.Toolpath) -> Points:
+        return {"x": toolpath.x, "y": toolpath.y, "z": toolpath.z}
 
     def createScene(self):
         fig1 = mlab.figure(bgcolor=(1, 1, 1), size=(self.imgwidth, self.imgheight))
@@ -0,0 +1,254 @@
+"""Machining time estimation.
+
+Replays a parsed toolpath (see `GcodeModel`) through a model of GRBL's
+motion planner: every move is a block with a nominal speed, an acceleration
+and a maximum entry speed given by the junction deviation, and the speeds at
+the junctions are planned backwards and forwards so that each block can
+accelerate and decelerate within its length. The time of each block follows
+from its trapezoidal (or triangular) velocity profile.
+
+The planner passes are recurrences of the form
+``v[i]^2 = min(limit[i], v[i+1]^2 + 2*a[i]*d[i])``, which are solved for
+all the blocks at once with cumulative sums and running minimums, so the
+whole estimation is a handful of vectorized NumPy operations.
+"""
+
+from typing import NamedTuple, TypedDict
+
+import numpy as np
+from core.utilities.grbl.types import GrblSettings
+
+from worker.utils.gcodeParser import MOVE_RAPID, GcodeModel
+
+# Types definition
+TimeReport = TypedDict(
+    "TimeReport",
+    {
+        "estimated_time": float,
+        "tool_times": dict[str, float],
+        "eta_index": list[tuple[int, float]],
+    },
+)
+
+# GRBL settings used by the planner, and their default values in GRBL v1.1
+SETTING_JUNCTION_DEVIATION = "$11"  # mm
+SETTINGS_MAX_RATE = ("$110", "$111", "$112")  # mm/min
+SETTINGS_ACCELERATION = ("$120", "$121", "$122")  # mm/sec^2
+DEFAULT_JUNCTION_DEVIATION = 0.010
+DEFAULT_MAX_RATE = 500.0
+DEFAULT_ACCELERATION = 10.0
+# Planned blocks in GRBL, the last one is always planned to stop
+DEFAULT_BLOCK_BUFFER_SIZE = 15
+# Junctions sharper/flatter than these cosines are reversals/straight lines
+JUNCTION_COS_REVERSAL = 0.999999
+JUNCTION_COS_STRAIGHT = -0.999999
+# Moves shorter than this are dropped by GRBL (mm)
+MIN_MOVE_LENGTH = 1e-6
+# Maximum amount of entries of the line -> ETA index in the report
+ETA_INDEX_SIZE = 1000
+
+
+class MachineLimits(NamedTuple):
+    """Kinematic limits of the machine, in mm and seconds."""
+
+    max_rate: np.ndarray  # mm/sec, per axis
+    acceleration: np.ndarray  # mm/sec^2, per axis
+    junction_deviation: float  # mm
+    block_buffer_size: int = DEFAULT_BLOCK_BUFFER_SIZE
+
+    @classmethod
+    def from_grbl_settings(
+        cls, settings: GrblSettings | None, block_buffer_size: int = DEFAULT_BLOCK_BUFFER_SIZE
+    ) -> "MachineLimits":
+        """Builds the limits from GRBL settings (see `GrblController.settings`).
+
+        Missing settings take the default values of GRBL.
+        """
+        settings = settings or {}
+
+        def value(key: str, default: float) -> float:
+            try:
+                return float(settings[key]["value"])
+            except (KeyError, TypeError, ValueError):
+                return default
+
+        return cls(
+            max_rate=np.array([value(key, DEFAULT_MAX_RATE) for key in SETTINGS_MAX_RATE]) / 60,
+            acceleration=np.array(
+                [value(key, DEFAULT_ACCELERATION) for key in SETTINGS_ACCELERATION]
+            ),
+            junction_deviation=value(SETTING_JUNCTION_DEVIATION, DEFAULT_JUNCTION_DEVIATION),
+            block_buffer_size=block_buffer_size,
+        )
+
+
+class TimeEstimate:
+    """Result of `estimate_time`.
+
+    Holds the time at which each move ends (seconds from the start of the
+    program), which is the line -> ETA index of the program.
+    """
+
+    def __init__(self, lines: np.ndarray, tools: np.ndarray, durations: np.ndarray):
+        self.lines = lines
+        self.tools = tools
+        self.durations = durations
+        self.end_times = np.cumsum(durations)
+
+    @property
+    def total_time(self) -> float:
+        return float(self.end_times[-1]) if len(self.end_times) else 0.0
+
+    def eta(self, line: int) -> float:
+        """Returns the elapsed time (seconds) when the given line is done."""
+        index = np.searchsorted(self.lines, line, side="right")
+        return float(self.end_times[index - 1]) if index else 0.0
+
+    def tool_times(self) -> dict[str, float]:
+        """Returns the time spent with each tool, keyed by tool (e.g. "T1")."""
+        times = np.bincount(self.tools, weights=self.durations)
+        return {f"T{tool}": float(times[tool]) for tool in np.unique(self.tools)}
+
+    def report(self, size: int = ETA_INDEX_SIZE) -> TimeReport:
+        """Summary to be stored in the file report, with a reduced ETA index."""
+        step = max(1, -(-len(self.lines) // size))
+        index = list(range(step - 1, len(self.lines), step))
+        if len(self.lines) and index[-1] != len(self.lines) - 1:
+            index.append(len(self.lines) - 1)
+
+        return {
+            "estimated_time": round(self.total_time, 3),
+            "tool_times": {tool: round(time, 3) for tool, time in self.tool_times().items()},
+            "eta_index": [(int(self.lines[i]), round(float(self.end_times[i]), 3)) for i in index],
+        }
+
+
+def _limit_by_axis(limits: np.ndarray, unit: np.ndarray) -> np.ndarray:
+    """Maximum value along each unit vector, so that no axis exceeds its limit."""
+    with np.errstate(divide="ignore"):
+        return np.min(limits / np.abs(unit), axis=1)
+
+
+def _suffix_min_plus(limit: np.ndarray, step: np.ndarray) -> np.ndarray:
+    """Solves w[i] = min(limit[i], w[i+1] + step[i]) backwards, with w[n] = limit[n].
+
+    Unrolled, w[i] = min over j >= i of (limit[j] + S[i] - S[j]), where S is
+    the suffix sum of the steps, that is S[i] + a running minimum.
+    """
+    suffix = np.zeros(len(limit))
+    suffix[:-1] = np.cumsum(step[::-1])[::-1]
+    return suffix + np.minimum.accumulate((limit - suffix)[::-1])[::-1]
+
+
+def _prefix_min_plus(limit: np.ndarray, step: np.ndarray) -> np.ndarray:
+    """Solves w[i+1] = min(limit[i+1], w[i] + step[i]) forwards, with w[0] = limit[0]."""
+    prefix = np.zeros(len(limit))
+    prefix[1:] = np.cumsum(step)
+    return prefix + np.minimum.accumulate(limit - prefix)
+
+
+def plan_blocks(
+    delta: np.ndarray,
+    nominal_rate: np.ndarray,
+    limits: MachineLimits,
+    stops: np.ndarray | None = None,
+) -> np.ndarray:
+    """Returns the duration (seconds) of each block of a program.
+
+    - delta: (n, 3) array, displacement of each block (mm)
+    - nominal_rate: requested speed of each block (mm/sec), capped by the
+      maximum rates of the axes
+    - stops: boolean array, blocks that start with the machine stopped
+      (e.g. after a dwell)
+    """
+    n = len(delta)
+    if n == 0:
+        return np.empty(0)
+
+    length = np.sqrt(np.einsum("ij,ij->i", delta, delta))
+    unit = delta / length[:, None]
+
+    nominal = np.minimum(nominal_rate, _limit_by_axis(limits.max_rate, unit))
+    acceleration = _limit_by_axis(limits.acceleration, unit)
+    nominal_sqr = nominal**2
+    # squared speed that can be gained (or lost) along each block
+    step = 2 * acceleration * length
+
+    # maximum entry speed, given by the junction with the previous block
+    # (GRBL's junction deviation) and the nominal speeds of both blocks
+    entry_sqr = np.zeros(n + 1)
+    if n > 1:
+        previous, current = unit[:-1], unit[1:]
+        cos_theta = -np.einsum("ij,ij->i", previous, current)
+        junction = current - previous
+        norm = np.sqrt(np.einsum("ij,ij->i", junction, junction))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            junction_acceleration = _limit_by_axis(limits.acceleration, junction / norm[:, None])
+            sin_theta_d2 = np.sqrt(0.5 * (1.0 - cos_theta))
+            junction_sqr = (
+                junction_acceleration
+                * limits.junction_deviation
+                * sin_theta_d2
+                / (1.0 - sin_theta_d2)
+            )
+        junction_sqr[cos_theta > JUNCTION_COS_REVERSAL] = 0.0
+        junction_sqr[cos_theta < JUNCTION_COS_STRAIGHT] = np.inf
+        entry_sqr[1:n] = np.minimum(junction_sqr, np.minimum(nominal_sqr[:-1], nominal_sqr[1:]))
+    if stops is not None:
+        entry_sqr[:n][stops] = 0.0
+
+    # GRBL only looks ahead the blocks in its buffer, and plans the last one
+    # to stop: a block can't be entered faster than what allows stopping at
+    # the end of the buffer
+    suffix = np.zeros(n + 1)
+    suffix[:-1] = np.cumsum(step[::-1])[::-1]
+    horizon = np.minimum(np.arange(n + 1) + limits.block_buffer_size, n)
+    entry_sqr = np.minimum(entry_sqr, suffix - suffix[horizon])
+
+    # backward pass: decelerate in time for the next junction
+    entry_sqr = _suffix_min_plus(entry_sqr, step)
+    # forward pass: accelerate from the previous junction
+    entry_sqr = np.maximum(_prefix_min_plus(entry_sqr, step), 0.0)
+    exit_sqr = entry_sqr[1:]
+    entry_sqr = entry_sqr[:-1]
+
+    # trapezoidal profile: accelerate, cruise at nominal speed and decelerate,
+    # or a triangle when the block is too short to reach the nominal speed
+    peak_sqr = np.minimum(nominal_sqr, (step + entry_sqr + exit_sqr) / 2)
+    peak = np.sqrt(peak_sqr)
+    entry, exit = np.sqrt(entry_sqr), np.sqrt(exit_sqr)
+    ramps_length = (2 * peak_sqr - entry_sqr - exit_sqr) / (2 * acceleration)
+    cruise_length = np.maximum(length - ramps_length, 0.0)
+    return (2 * peak - entry - exit) / acceleration + cruise_length / peak
+
+
+def estimate_time(model: GcodeModel, limits: MachineLimits) -> TimeEstimate:
+    """Estimates the time needed to run a parsed program in a GRBL machine."""
+    # the model starts at 0
+    x = np.concatenate(([0.0], model.x))
+    y = np.concatenate(([0.0], model.y))
+    z = np.concatenate(([0.0], model.z))
+    delta = np.column_stack((np.diff(x), np.diff(y), np.diff(z)))
+
+    # rapids go at the maximum rate, the rest at the programmed feedrate
+    # (or the maximum rate, when there is none)
+    nominal_rate = np.where((model.type == MOVE_RAPID) | (model.F <= 0), np.inf, model.F / 60)
+
+    # GRBL discards the moves that don't move
+    moving = model.distances > MIN_MOVE_LENGTH
+    blocks = int(moving.sum())
+    # index of the block of each move
+    block_index = np.concatenate(([0], np.cumsum(moving)))
+
+    # dwells wait for the machine to stop, their time is added to the move
+    # before them
+    durations = np.zeros(len(model))
+    stops = np.zeros(blocks, dtype=bool)
+    for index, seconds in model.dwells:
+        if block_index[index] < blocks:
+            stops[block_index[index]] = True
+        if len(durations):
+            durations[max(index - 1, 0)] += seconds
+
+    durations[moving] += plan_blocks(delta[moving], nominal_rate[moving], limits, stops)
+    return TimeEstimate(model.line, model.tools, durations)
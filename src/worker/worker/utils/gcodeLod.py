@@ -0,0 +1,175 @@
+"""Level-of-detail pyramid of a toolpath, see `core.utilities.gcode.gcodePreview`.
+
+Each level is the toolpath simplified with the Ramer-Douglas-Peucker
+algorithm, with a tolerance of about a pixel of its viewport size. Levels
+are built from the finest to the coarsest, each one from the previous one,
+so the big toolpaths are only simplified once.
+"""
+
+import json
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+from core.utilities.gcode.gcodePreview import PREVIEW_SIZES, get_preview_path
+
+from worker.utils.gcodeParser import GcodeModel, Toolpath
+
+# Tolerance of each level, as a fraction of a pixel
+PIXEL_TOLERANCE = 0.5
+# Decimals of the stored coordinates
+COORDINATES_DECIMALS = 3
+
+
+def _segment_distances(points: np.ndarray, start: np.ndarray, end: np.ndarray) -> np.ndarray:
+    """Distances from each point to its segment, from start to end."""
+    direction = end - start
+    offsets = points - start
+    length_sqr = np.einsum("ij,ij->i", direction, direction)
+    # degenerated segments measure the distance to their start
+    position = np.einsum("ij,ij->i", offsets, direction)
+    np.divide(position, length_sqr, out=position, where=length_sqr > 0)
+    position[length_sqr == 0] = 0.0
+    closest = offsets - np.clip(position, 0.0, 1.0)[:, None] * direction
+    return np.sqrt(np.einsum("ij,ij->i", closest, closest))
+
+
+def simplify(points: np.ndarray, breaks: np.ndarray, tolerance: float) -> np.ndarray:
+    """Simplifies a polyline, returns the indices of the points to keep.
+
+    - points: (n, 3) array
+    - breaks: indices of the points that must be kept, including the first
+      and the last one
+    - tolerance: maximum distance from the dropped points to the polyline
+
+    All the pending ranges of the recursion are split at once, so it takes
+    about log(n) rounds over the points instead of a loop per range.
+    """
+    keep = np.zeros(len(points), dtype=bool)
+    keep[breaks] = True
+
+    first, last = breaks[:-1], breaks[1:]
+    while True:
+        pending = last - first > 1
+        first, last = first[pending], last[pending]
+        if not len(first):
+            break
+
+        # the inner points of every range, one after the other
+        counts = last - first - 1
+        offsets = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        owner = np.repeat(np.arange(len(first)), counts)
+        inner = np.arange(counts.sum()) - offsets[owner] + first[owner] + 1
+
+        distances = _segment_distances(points[inner], points[first[owner]], points[last[owner]])
+
+        # the farthest point of each range (the first one on ties)
+        farthest = np.maximum.reduceat(distances, offsets)
+        candidates = np.flatnonzero(distances == farthest[owner])
+        ranges, first_candidate = np.unique(owner[candidates], return_index=True)
+        split = inner[candidates[first_candidate]]
+
+        divided = farthest[ranges] > tolerance
+        ranges, split = ranges[divided], split[divided]
+        keep[split] = True
+        first, last = (
+            np.concatenate((first[ranges], split)),
+            np.concatenate((split, last[ranges])),
+        )
+
+    return np.flatnonzero(keep)
+
+
+class ToolpathLevel:
+    """A simplified toolpath: the points of its polyline and the type of each segment."""
+
+    def __init__(self, size: int, tolerance: float, points: np.ndarray, types: np.ndarray):
+        self.size = size
+        self.tolerance = tolerance
+        self.points = points
+        self.types = types
+
+    def __len__(self):
+        return len(self.types)
+
+    def to_json(self, total_moves: int, bbox: dict[str, float]) -> dict[str, Any]:
+        points = np.round(self.points, COORDINATES_DECIMALS)
+        return {
+            "size": self.size,
+            "tolerance": self.tolerance,
+            "total_moves": total_moves,
+            "bbox": bbox,
+            "x": points[:, 0].tolist(),
+            "y": points[:, 1].tolist(),
+            "z": points[:, 2].tolist(),
+            "type": self.types.tolist(),
+        }
+
+    def toolpath(self) -> Toolpath:
+        """The level as a toolpath, starting at its first point (e.g. for `GcodeRasterRenderer`)."""
+        moves = len(self.types)
+        empty = np.zeros(moves)
+        return Toolpath(
+            self.points[1:, 0],
+            self.points[1:, 1],
+            self.points[1:, 2],
+            empty,
+            self.types,
+            np.zeros(moves, dtype=np.uint32),
+            np.zeros(moves, dtype=np.uint16),
+        )
+
+
+def build_levels(model: GcodeModel, sizes: tuple[int, ...] = PREVIEW_SIZES) -> list[ToolpathLevel]:
+    """Builds a simplified toolpath for each viewport size, from the biggest to the smallest."""
+    # the toolpath starts at 0
+    points = np.column_stack(
+        (
+            np.concatenate(([0.0], model.x)),
+            np.concatenate(([0.0], model.y)),
+            np.concatenate(([0.0], model.z)),
+        )
+    )
+    types = np.asarray(model.type)
+    bbox = model.bbox
+    diagonal = np.sqrt(bbox.dx() ** 2 + bbox.dy() ** 2 + bbox.dz() ** 2) if bbox else 0.0
+
+    levels = []
+    for size in sorted(sizes, reverse=True):
+        tolerance = PIXEL_TOLERANCE * diagonal / size
+        if len(types):
+            # the points where the move type changes are kept
+            breaks = np.concatenate(([0], np.flatnonzero(np.diff(types)) + 1, [len(types)]))
+            kept = simplify(points, breaks, tolerance)
+            # each segment has the type of the moves it replaces
+            points, types = points[kept], types[kept[:-1]]
+        levels.append(ToolpathLevel(size, tolerance, points, types))
+
+    return levels
+
+
+def save_levels(
+    levels: list[ToolpathLevel],
+    model: GcodeModel,
+    file_hash: str,
+    folder: str | Path | None = None,
+) -> list[Path]:
+    """Stores the levels as the preview of a file, returns their paths."""
+    bbox = model.bbox
+    bbox_json = {
+        "xmin": bbox.xmin,
+        "xmax": bbox.xmax,
+        "ymin": bbox.ymin,
+        "ymax": bbox.ymax,
+        "zmin": bbox.zmin,
+        "zmax": bbox.zmax,
+    }
+
+    paths = []
+    for level in levels:
+        path = get_preview_path(file_hash, level.size, folder)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w") as file:
+            json.dump(level.to_json(len(model), bbox_json), file, separators=(",", ":"))
+        paths.append(path)
+    return paths
@@ -1,15 +1,55 @@
 import math
 import re
-from typing import Literal, TypedDict
+from array import array
+from typing import Callable, Literal, NamedTuple, TypedDict
+
+import numpy as np
 
 # Types definition
 Offset = TypedDict("Offset", {"x": float, "y": float, "z": float})
 Coordinate = TypedDict("Coordinate", {"x": float, "y": float, "z": float, "F": float})
 
+AXES = ("x", "y", "z")
+# Axes of each plane (first, second, linear) and words of the arc center offsets
+PLANES = {
+    "G17": ("x", "y", "z"),
+    "G18": ("z", "x", "y"),
+    "G19": ("y", "z", "x"),
+}
+ARC_OFFSET_WORDS = {"x": "i", "y": "j", "z": "k"}
+
+# Maximum distance between an arc and its segments (mm)
+ARC_TOLERANCE = 0.01
+# Maximum amount of segments of an arc
+MAX_ARC_SEGMENTS = 360
+# Arcs ending at their start are full circles (radians, as GRBL)
+ARC_ANGULAR_TRAVEL_EPSILON = 5e-7
+
+
+# A word is a letter followed by a number, e.g. "G1", "X-10.5" or "F 1200"
+word_pattern = re.compile(r"([A-Za-z])[ \t]*([-+]?(?:\d+\.?\d*|\.\d+))")
+# Round-bracket and semicolon comments
+comment_pattern = re.compile(r"\([^)]*\)|;.*")
+
+# Motion modes, the axis words of a line are a move in the current one
+MOTION_CODES = {"G0", "G1", "G2", "G3", "G38.2", "G38.3", "G38.4", "G38.5", "G80"}
+# Codes that use the axis words of their line (so there is no move)
+AXIS_WORDS_CODES = {"G10", "G28", "G30", "G92"}
+
+# Move type codes, stored in `GcodeModel.type`
+MOVE_RAPID = 0
+MOVE_LINEAR = 1
+MOVE_ARC = 2
+MOVE_TYPES = {"G0": MOVE_RAPID, "G1": MOVE_LINEAR, "G2": MOVE_ARC, "G3": MOVE_ARC}
+
 
 class GcodeParser:
-    def __init__(self):
-        self.model = GcodeModel(self)
+    def __init__(self, arc_tolerance: float = ARC_TOLERANCE):
+        self.model = GcodeModel(self, arc_tolerance)
+        # current motion mode, applied to lines with only axis words
+        self.motion = "G0"
+        # handler of each G/M word, as written in the file (see getHandler)
+        self._handlers: dict[str, tuple[str, Callable[[dict[str, float]], None] | None]] = {}
 
     def parseFile(self, path: str):
         with open(path, "r") as f:
@@ -28,62 +68,98 @@ class GcodeParser:
         return self.model
 
     def parseLine(self):
-        # strip comments:
-        # first handle round brackets
-        command = re.sub(r"\([^)]*\)", "", self.line)
-        # then semicolons
-        idx = command.find(";")
-        if idx >= 0:
-            command = command[0:idx].strip()
-        # detect unterminated round bracket comments, just in case
-        idx = command.find("(")
-        if idx >= 0:
-            self.warn("Stripping unterminated round-bracket comment")
-            command = command[0:idx].strip()
-
-        # TODO strip logical line number & checksum
-
-        # code is first word, then args
-        comm = command.split(None, 1)
-        code = comm[0] if (len(comm) > 0) else None
-        args = comm[1] if (len(comm) > 1) else None
-
-        if code:
-            if hasattr(self, "parse_" + code):
-                getattr(self, "parse_" + code)(args)
+        command = self.line
+        # strip comments
+        if "(" in command or ";" in command:
+            command = comment_pattern.sub("", command)
+            # detect unterminated round bracket comments, just in case
+            idx = command.find("(")
+            if idx >= 0:
+                self.warn("Stripping unterminated round-bracket comment")
+                command = command[0:idx]
+
+        # split the line in codes (G and M words) and args (the other words)
+        codes = []
+        args: dict[str, float] = {}
+        for letter, value in word_pattern.findall(command.lower()):
+            if letter in "gm":
+                codes.append(self.getHandler(letter + value))
             else:
-                self.warn(f"Unknown code '{code}'")
-
-    def parseArgs(self, args: str | None) -> dict[str, float]:
-        if not args:
-            return {}
-
-        dic = {}
-        bits = args.split()
-        for bit in bits:
-            identifier = bit[0].lower()
-            try:
-                coord = float(bit[1:])
-            except ValueError:
-                coord = 1
-            dic[identifier] = coord
-        return dic
-
-    def parse_G00(self, args):
-        # G0: Rapid move
-        self.model.do_G0_G1(self.parseArgs(args), "G0")
+                args[letter] = float(value)
+
+        # modal words first, as GRBL does
+        if "t" in args:
+            self.model.setTool(int(args["t"]))
+        if "f" in args:
+            self.model.setFeedrate(args["f"])
+
+        moves = "x" in args or "y" in args or "z" in args
+        for code, handler in codes:
+            if code in MOTION_CODES:
+                self.motion = code
+            else:
+                if handler is not None:
+                    handler(args)
+                # even without a handler, e.g. G10 and G30
+                if code in AXIS_WORDS_CODES:
+                    moves = False
+
+        # then the move, in the current motion mode
+        if moves:
+            handler = self.getHandler(self.motion)[1]
+            if handler is not None:
+                handler(args)
+
+    def getHandler(self, word: str) -> tuple[str, Callable[[dict[str, float]], None] | None]:
+        """Returns the normalized code of a G/M word (e.g. "G01" -> "G1") and its handler."""
+        try:
+            return self._handlers[word]
+        except KeyError:
+            pass
+
+        # strip leading zeros
+        letter, number = word[0].upper(), word[1:]
+        integer, dot, decimal = number.partition(".")
+        code = letter + (integer.lstrip("0") or "0") + dot + decimal
+
+        handler = getattr(self, "parse_" + code.replace(".", "_"), None)
+        if handler is None:
+            # only warned once per code
+            self.warn(f"Unknown code '{code}'")
+        self._handlers[word] = (code, handler)
+        return code, handler
 
     def parse_G0(self, args):
         # G0: Rapid move
-        self.model.do_G0_G1(self.parseArgs(args), "G0")
-
-    def parse_G01(self, args):
-        # G1: Controlled move
-        self.model.do_G0_G1(self.parseArgs(args), "G1")
+        self.model.do_G0_G1(args, "G0")
 
     def parse_G1(self, args):
         # G1: Controlled move
-        self.model.do_G0_G1(self.parseArgs(args), "G1")
+        self.model.do_G0_G1(args, "G1")
+
+    def parse_G2(self, args):
+        # G2: Clockwise arc
+        self.model.do_G2_G3(args, "G2")
+
+    def parse_G3(self, args):
+        # G3: Counter-clockwise arc
+        self.model.do_G2_G3(args, "G3")
+
+    def parse_G4(self, args):
+        # G4: Dwell, P in seconds
+        self.model.do_G4(args)
+
+    def parse_G17(self, args):
+        # G17: XY plane selection
+        self.model.setPlane("G17")
+
+    def parse_G18(self, args):
+        # G18: ZX plane selection
+        self.model.setPlane("G18")
+
+    def parse_G19(self, args):
+        # G19: YZ plane selection
+        self.model.setPlane("G19")
 
     def parse_G20(self, args):
         # G20: Set Units to Inches
@@ -96,7 +172,7 @@ class GcodeParser:
 
     def parse_G28(self, args):
         # G28: Move to Origin
-        self.model.do_G28(self.parseArgs(args))
+        self.model.do_G28(args)
 
     def parse_G90(self, args):
         # G90: Set to Absolute Positioning
@@ -108,7 +184,7 @@ class GcodeParser:
 
     def parse_G92(self, args):
         # G92: Set Position
-        self.model.do_G92(self.parseArgs(args))
+        self.model.do_G92(args)
 
     def warn(self, msg: str):
         print(f"[WARN] Line {self.lineNb}: {msg} (Text:'{self.line}')")
@@ -118,10 +194,10 @@ class GcodeParser:
 
 
 class BBox(object):
-    def __init__(self, coords):
-        self.xmin = self.xmax = coords["x"]
-        self.ymin = self.ymax = coords["y"]
-        self.zmin = self.zmax = coords["z"]
+    def __init__(self, x: np.ndarray, y: np.ndarray, z: np.ndarray):
+        self.xmin, self.xmax = float(x.min()), float(x.max())
+        self.ymin, self.ymax = float(y.min()), float(y.max())
+        self.zmin, self.zmax = float(z.min()), float(z.max())
 
     def dx(self):
         return self.xmax - self.xmin
@@ -141,58 +217,180 @@ class BBox(object):
     def cz(self):
         return (self.zmax + self.zmin) / 2
 
-    def extend(self, coords):
-        self.xmin = min(self.xmin, coords["x"])
-        self.xmax = max(self.xmax, coords["x"])
-        self.ymin = min(self.ymin, coords["y"])
-        self.ymax = max(self.ymax, coords["y"])
-        self.zmin = min(self.zmin, coords["z"])
-        self.zmax = max(self.zmax, coords["z"])
+    def __str__(self):
+        return (
+            f"<BBox: x=[{self.xmin}, {self.xmax}], "
+            f"y=[{self.ymin}, {self.ymax}], "
+            f"z=[{self.zmin}, {self.zmax}]>"
+        )
+
+
+class Toolpath(NamedTuple):
+    """Columnar view of a set of moves, one entry per move."""
+
+    x: np.ndarray
+    y: np.ndarray
+    z: np.ndarray
+    F: np.ndarray
+    type: np.ndarray
+    line: np.ndarray
+    tool: np.ndarray
+
+    def __len__(self):
+        return len(self.x)
 
 
 class GcodeModel:
-    def __init__(self, parser: GcodeParser):
+    """Toolpath of a G-code file, stored as columns.
+
+    Every move is an entry in the x/y/z/F arrays (absolute end point and
+    feedrate), the `type` array (MOVE_RAPID, MOVE_LINEAR or MOVE_ARC), the
+    `line` array (line number in the file) and the `tool` array (active tool
+    number, 0 until a T word is found). While parsing, the values are appended
+    to compact `array.array` buffers, `postProcess` turns them into NumPy
+    arrays and computes the metrics over the whole toolpath at once.
+
+    Arcs are split in segments, as many as needed to keep them closer than
+    `arc_tolerance` to the arc (up to MAX_ARC_SEGMENTS), while their length
+    is computed exactly.
+    """
+
+    def __init__(self, parser: GcodeParser, arc_tolerance: float = ARC_TOLERANCE):
         # save parser for messages
         self.parser = parser
+        self.arc_tolerance = arc_tolerance
         # latest coordinates & extrusion relative to offset, feedrate
         self.relative: Coordinate = {"x": 0.0, "y": 0.0, "z": 0.0, "F": 0.0}
         # offsets for relative coordinates and position reset (G92)
         self.offset: Offset = {"x": 0.0, "y": 0.0, "z": 0.0}
         # if true, args for move (G1) are given relatively (default: absolute)
         self.isRelative = False
-        # the segments
-        self.segments: list[Segment] = []
-        self.distance = 0
+        # plane of the arcs
+        self.plane = "G17"
+        # active tool (T word)
+        self.tool = 0
+        # dwells (G4), as (number of moves before the dwell, seconds)
+        self.dwells: list[tuple[int, float]] = []
+        # the moves, filled while parsing
+        self._buffers = {
+            "x": array("d"),
+            "y": array("d"),
+            "z": array("d"),
+            "F": array("d"),
+            "type": array("B"),
+            "line": array("I"),
+            "tool": array("H"),
+        }
+        self._appenders = tuple(buffer.append for buffer in self._buffers.values())
+        # the arcs, as their first move, amount of moves and length
+        self._arcs = {
+            "start": array("I"),
+            "count": array("I"),
+            "length": array("d"),
+        }
+        # the moves, as arrays (see postProcess)
+        self.x = np.empty(0)
+        self.y = np.empty(0)
+        self.z = np.empty(0)
+        self.F = np.empty(0)
+        self.type = np.empty(0, dtype=np.uint8)
+        self.line = np.empty(0, dtype=np.uint32)
+        self.tools = np.empty(0, dtype=np.uint16)
+        # length of each move
+        self.distances = np.empty(0)
+        self.distance = 0.0
         self.bbox: BBox | None = None
 
+    def __len__(self):
+        return len(self.x)
+
     def do_G0_G1(self, args: dict, type: Literal["G0", "G1"]):
         # G0/G1: Rapid/Controlled move
-        # clone previous coords
-        coords = Coordinate(
-            x=self.relative["x"], y=self.relative["y"], z=self.relative["z"], F=self.relative["F"]
-        )
-        # update changed coords
-        for axis in args.keys():
-            if axis in coords:
+        self.updateCoords(args)
+        self.addLinearMove(MOVE_TYPES[type])
+
+    def do_G2_G3(self, args: dict, type: Literal["G2", "G3"]):
+        # G2/G3: Clockwise/Counter-clockwise arc
+        axis_0, axis_1, axis_linear = PLANES[self.plane]
+        relative = self.relative
+        start = (relative[axis_0], relative[axis_1], relative[axis_linear])
+        self.updateCoords(args)
+        x, y = relative[axis_0] - start[0], relative[axis_1] - start[1]
+        clockwise = type == "G2"
+
+        # offset from the start to the center
+        if "r" in args:
+            # radius format, see GRBL's gcode.c
+            radius = args["r"]
+            h_x2_div_d = 4.0 * radius * radius - x * x - y * y
+            if h_x2_div_d < 0 or (x == 0 and y == 0):
+                self.warn("Invalid arc radius, replaced by a line")
+                self.addLinearMove(MOVE_ARC)
+                return
+            h_x2_div_d = -math.sqrt(h_x2_div_d) / math.hypot(x, y)
+            if not clockwise:
+                h_x2_div_d = -h_x2_div_d
+            if radius < 0:
+                h_x2_div_d = -h_x2_div_d
+            offset_0 = 0.5 * (x - (y * h_x2_div_d))
+            offset_1 = 0.5 * (y + (x * h_x2_div_d))
+        else:
+            offset_0 = args.get(ARC_OFFSET_WORDS[axis_0], 0.0)
+            offset_1 = args.get(ARC_OFFSET_WORDS[axis_1], 0.0)
+
+        radius = math.hypot(offset_0, offset_1)
+        if radius == 0:
+            self.warn("Arc without radius, replaced by a line")
+            self.addLinearMove(MOVE_ARC)
+            return
+
+        # angle travelled around the center, full circles end at the start
+        r_0, r_1 = -offset_0, -offset_1
+        rt_0, rt_1 = x - offset_0, y - offset_1
+        angular_travel = math.atan2(r_0 * rt_1 - r_1 * rt_0, r_0 * rt_0 + r_1 * rt_1)
+        if clockwise:
+            if angular_travel >= -ARC_ANGULAR_TRAVEL_EPSILON:
+                angular_travel -= 2 * math.pi
+        elif angular_travel <= ARC_ANGULAR_TRAVEL_EPSILON:
+            angular_travel += 2 * math.pi
+        travel_linear = relative[axis_linear] - start[2]
+
+        # segments whose sagitta is at most the tolerance
+        tolerance = min(self.arc_tolerance, radius)
+        segment_angle = 2 * math.acos(1 - tolerance / radius)
+        segments = min(max(math.ceil(abs(angular_travel) / segment_angle), 1), MAX_ARC_SEGMENTS)
+
+        steps = np.arange(1, segments + 1) / segments
+        angles = math.atan2(r_1, r_0) + angular_travel * steps
+        coords = {
+            axis_0: start[0] + offset_0 + radius * np.cos(angles),
+            axis_1: start[1] + offset_1 + radius * np.sin(angles),
+            axis_linear: start[2] + travel_linear * steps,
+        }
+        # end exactly at the target
+        for axis in AXES:
+            coords[axis][-1] = relative[axis]
+            coords[axis] += self.offset[axis]
+
+        arcs = self._arcs
+        arcs["start"].append(len(self._buffers["x"]))
+        arcs["count"].append(segments)
+        arcs["length"].append(math.hypot(radius * angular_travel, travel_linear))
+        self.addMoves(MOVE_ARC, coords["x"], coords["y"], coords["z"], relative["F"])
+
+    def updateCoords(self, args: dict):
+        # update the coords given in the args
+        relative = self.relative
+        for axis in AXES:
+            if axis in args:
                 if self.isRelative:
-                    coords[axis] += args[axis]
+                    relative[axis] += args[axis]
                 else:
-                    coords[axis] = args[axis]
-            else:
-                self.warn(f"Unknown axis '{axis}'")
-        # build segment
-        absolute: Coordinate = {
-            "x": self.offset["x"] + coords["x"],
-            "y": self.offset["y"] + coords["y"],
-            "z": self.offset["z"] + coords["z"],
-            "F": coords["F"],  # no feedrate offset
-        }
-
-        seg = Segment(type, absolute, self.parser.lineNb, self.parser.line)
-        self.addSegment(seg)
+                    relative[axis] = args[axis]
 
-        # update model coords
-        self.relative = coords
+    def do_G4(self, args: dict):
+        # G4: Dwell
+        self.dwells.append((len(self._buffers["x"]), args.get("p", 0.0)))
 
     def do_G28(self, args):
         # G28: Move to Origin
@@ -200,25 +398,64 @@ class GcodeModel:
 
     def do_G92(self, args: dict):
         # G92: Set Position
-        # this changes the current coords, without moving, so do not generate a segment
+        # this changes the current coords, without moving, so do not generate a move
 
         # no axes mentioned == all axes to 0
-        if not len(args.keys()):
-            args = {"x": 0.0, "y": 0.0, "z": 0.0, "E": 0.0}
+        if not any(axis in args for axis in AXES):
+            args = {"x": 0.0, "y": 0.0, "z": 0.0}
         # update specified axes
-        for axis in args.keys():
-            if axis in self.offset:
+        for axis in AXES:
+            if axis in args:
                 # transfer value from relative to offset
                 self.offset[axis] += self.relative[axis] - args[axis]
                 self.relative[axis] = args[axis]
-            else:
-                self.warn(f"Unknown axis '{axis}'")
 
     def setRelative(self, isRelative):
         self.isRelative = isRelative
 
-    def addSegment(self, segment):
-        self.segments.append(segment)
+    def setFeedrate(self, feedrate: float):
+        # feedrate is modal and never relative
+        self.relative["F"] = feedrate
+
+    def setTool(self, tool: int):
+        self.tool = tool
+
+    def setPlane(self, plane: str):
+        self.plane = plane
+
+    def addLinearMove(self, type: int):
+        # move to the current coords in a straight line
+        relative, offset = self.relative, self.offset
+        self.addMove(
+            type,
+            offset["x"] + relative["x"],
+            offset["y"] + relative["y"],
+            offset["z"] + relative["z"],
+            relative["F"],  # no feedrate offset
+        )
+
+    def addMove(self, type: int, x: float, y: float, z: float, F: float):
+        append_x, append_y, append_z, append_F, append_type, append_line, append_tool = (
+            self._appenders
+        )
+        append_x(x)
+        append_y(y)
+        append_z(z)
+        append_F(F)
+        append_type(type)
+        append_line(self.parser.lineNb)
+        append_tool(self.tool)
+
+    def addMoves(self, type: int, x: np.ndarray, y: np.ndarray, z: np.ndarray, F: float):
+        buffers = self._buffers
+        count = len(x)
+        buffers["x"].frombytes(x.astype(np.float64).tobytes())
+        buffers["y"].frombytes(y.astype(np.float64).tobytes())
+        buffers["z"].frombytes(z.astype(np.float64).tobytes())
+        buffers["F"].extend([F] * count)
+        buffers["type"].extend([type] * count)
+        buffers["line"].extend([self.parser.lineNb] * count)
+        buffers["tool"].extend([self.tool] * count)
 
     def warn(self, msg: str):
         self.parser.warn(msg)
@@ -226,65 +463,55 @@ class GcodeModel:
     def error(self, msg: str):
         self.parser.error(msg)
 
-    def calcMetrics(self):
-        # init distance
-        self.distance = 0
-
-        # extender helper
-        def extend(bbox: BBox | None, coords):
-            if bbox is None:
-                return BBox(coords)
-            else:
-                bbox.extend(coords)
-                return bbox
-
-        # start model at 0
-        coords = {"x": 0.0, "y": 0.0, "z": 0.0, "F": 0.0, "E": 0.0, "EE": 0.0}
-
-        # init model bbox
-        self.bbox = extend(self.bbox, coords)
-
-        # for all segments
-        for seg in self.segments:
-            # calc xyz distance
-            d = (seg.coords["x"] - coords["x"]) ** 2
-            d += (seg.coords["y"] - coords["y"]) ** 2
-            d += (seg.coords["z"] - coords["z"]) ** 2
-            seg.distance = math.sqrt(d)
-
-            # execute segment
-            coords = seg.coords
+    def select(self, *types: int) -> Toolpath:
+        """Returns the moves of the given types."""
+        mask = np.isin(self.type, types)
+        return Toolpath(
+            self.x[mask],
+            self.y[mask],
+            self.z[mask],
+            self.F[mask],
+            self.type[mask],
+            self.line[mask],
+            self.tools[mask],
+        )
 
-            # include end point
-            extend(self.bbox, coords)
+    def toolpath(self) -> Toolpath:
+        """Returns all the moves."""
+        return Toolpath(self.x, self.y, self.z, self.F, self.type, self.line, self.tools)
 
-            # accumulate total metrics
-            self.distance += seg.distance
+    def calcMetrics(self):
+        # the model starts at 0
+        x = np.concatenate(([0.0], self.x))
+        y = np.concatenate(([0.0], self.y))
+        z = np.concatenate(([0.0], self.z))
+
+        # xyz distance of each move, from the end of the previous one
+        self.distances = np.sqrt(np.diff(x) ** 2 + np.diff(y) ** 2 + np.diff(z) ** 2)
+
+        # arcs: the segments share the length of the arc
+        count = np.frombuffer(self._arcs["count"], dtype=np.uint32).astype(np.int64)
+        if len(count):
+            start = np.frombuffer(self._arcs["start"], dtype=np.uint32).astype(np.int64)
+            length = np.frombuffer(self._arcs["length"], dtype=np.float64)
+            first = np.repeat(start - np.cumsum(count) + count, count)
+            segments = first + np.arange(count.sum())
+            self.distances[segments] = np.repeat(length / count, count)
+        self.distance = float(self.distances.sum())
+        self.bbox = BBox(x, y, z)
 
     def postProcess(self):
-        self.calcMetrics()
-
-    def __str__(self):
-        return (
-            f"<GcodeModel: len(segments)={len(self.segments)}, "
-            f"distance={self.distance}, "
-            f"bbox={self.bbox}, "
-        )
-
+        # move the buffers into arrays, without copying them
+        buffers = self._buffers
+        self.x = np.frombuffer(buffers["x"], dtype=np.float64)
+        self.y = np.frombuffer(buffers["y"], dtype=np.float64)
+        self.z = np.frombuffer(buffers["z"], dtype=np.float64)
+        self.F = np.frombuffer(buffers["F"], dtype=np.float64)
+        self.type = np.frombuffer(buffers["type"], dtype=np.uint8)
+        self.line = np.frombuffer(buffers["line"], dtype=np.uint32)
+        self.tools = np.frombuffer(buffers["tool"], dtype=np.uint16)
 
-class Segment:
-    def __init__(self, type: str, coords: Coordinate, lineNb: int, line: str):
-        self.type = type
-        self.coords = coords
-        self.lineNb = lineNb
-        self.line = line
-        self.distance: float | None = None
+        self.calcMetrics()
 
     def __str__(self):
-        return (
-            f"<Segment: type={self.type}, "
-            f"<Coords: type={self.coords}, "
-            f"lineNb={self.lineNb}, "
-            f"line={self.line}, "
-            f"distance={self.distance}, "
-        )
+        return f"<GcodeModel: len(moves)={len(self)}, distance={self.distance}, bbox={self.bbox}>"
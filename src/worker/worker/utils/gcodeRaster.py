@@ -0,0 +1,139 @@
+"""Raster renderer for G-code thumbnails.
+
+Projects the toolpath to 2D and draws it straight into a PIL image, so no
+3D engine nor display is needed. The image is drawn `supersample` times
+bigger and then reduced, which smooths the lines.
+"""
+
+import math
+from typing import Literal
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+import worker.utils.gcodeParser as gcode
+
+# Types definition
+Color = tuple[int, int, int]
+Projection = Literal["top", "front", "iso"]
+
+PROJECTIONS: tuple[Projection, ...] = ("top", "front", "iso")
+
+BACKGROUND_COLOR: Color = (255, 255, 255)
+MOVE_COLORS: dict[int, Color] = {
+    gcode.MOVE_RAPID: (255, 0, 0),
+    gcode.MOVE_LINEAR: (0, 127, 254),
+    gcode.MOVE_ARC: (0, 160, 120),
+}
+
+# Space left around the toolpath (fraction of the image)
+MARGIN = 0.05
+
+
+def project(
+    x: np.ndarray, y: np.ndarray, z: np.ndarray, projection: Projection
+) -> tuple[np.ndarray, np.ndarray]:
+    """Projects 3D points to the plane of the view, returns their (u, v) coordinates."""
+    if projection == "top":
+        return x, y
+    if projection == "front":
+        return x, z
+    if projection == "iso":
+        cos30, sin30 = math.cos(math.pi / 6), 0.5
+        return (x - y) * cos30, z + (x + y) * sin30
+    raise ValueError(f"Unknown projection '{projection}', must be one of: {PROJECTIONS}")
+
+
+class GcodeRasterRenderer:
+    def __init__(
+        self,
+        width: int = 800,
+        height: int = 600,
+        projection: Projection = "iso",
+        line_width: int = 1,
+        supersample: int = 2,
+    ):
+        if projection not in PROJECTIONS:
+            raise ValueError(f"Unknown projection '{projection}', must be one of: {PROJECTIONS}")
+
+        self.width = width
+        self.height = height
+        self.projection: Projection = projection
+        self.line_width = line_width
+        self.supersample = supersample
+
+    def run(self, path_src: str, path_out: str, moves: bool):
+        parser = gcode.GcodeParser()
+        model = parser.parseFile(path_src)
+
+        image = self.render(model.toolpath(), moves)
+        image.save(path_out)
+
+    def render(self, toolpath: gcode.Toolpath, moves: bool = False) -> Image.Image:
+        """Draws the toolpath, rapid moves are only drawn if `moves` is true."""
+        scale = self.supersample
+        width, height = self.width * scale, self.height * scale
+        image = Image.new("RGB", (width, height), BACKGROUND_COLOR)
+
+        # the toolpath starts at 0
+        u, v = project(
+            np.concatenate(([0.0], toolpath.x)),
+            np.concatenate(([0.0], toolpath.y)),
+            np.concatenate(([0.0], toolpath.z)),
+            self.projection,
+        )
+        types = np.asarray(toolpath.type)
+
+        if len(types):
+            # fit the view to the drawn moves (a move goes from point i to i + 1)
+            drawn = np.ones(len(types), dtype=bool) if moves else types != gcode.MOVE_RAPID
+            fit = np.concatenate((drawn, [False])) | np.concatenate(([False], drawn))
+            if not fit.any():
+                fit[:] = True
+            pixels = self._fit(u, v, fit, width, height)
+            self._draw(ImageDraw.Draw(image), pixels, types, moves)
+
+        if scale > 1:
+            image = image.resize((self.width, self.height), Image.Resampling.LANCZOS)
+        return image
+
+    def _fit(
+        self,
+        u: np.ndarray,
+        v: np.ndarray,
+        fit: np.ndarray,
+        width: int,
+        height: int,
+    ) -> np.ndarray:
+        """Scales the view so that the `fit` points fill the image (keeping their
+        aspect), returns the pixel of each point."""
+        u_min, u_max = float(u[fit].min()), float(u[fit].max())
+        v_min, v_max = float(v[fit].min()), float(v[fit].max())
+        usable_width = width * (1 - 2 * MARGIN)
+        usable_height = height * (1 - 2 * MARGIN)
+        span = max((u_max - u_min) / usable_width, (v_max - v_min) / usable_height)
+        factor = 1 / span if span > 0 else 1.0
+
+        pixels = np.empty((len(u), 2))
+        pixels[:, 0] = width / 2 + (u - (u_min + u_max) / 2) * factor
+        # the image's Y axis goes down
+        pixels[:, 1] = height / 2 - (v - (v_min + v_max) / 2) * factor
+        return pixels
+
+    def _draw(self, draw: ImageDraw.ImageDraw, pixels: np.ndarray, types: np.ndarray, moves: bool):
+        """Draws the moves, as one polyline per run of moves of the same type."""
+        starts = np.concatenate(([0], np.flatnonzero(np.diff(types)) + 1))
+        ends = np.concatenate((starts[1:], [len(types)]))
+        width = self.line_width * self.supersample
+
+        # rapids first, the cuts are drawn over them
+        runs = sorted(
+            zip(starts.tolist(), ends.tolist(), strict=True),
+            key=lambda run: types[run[0]] != gcode.MOVE_RAPID,
+        )
+        for start, end in runs:
+            move_type = int(types[start])
+            if move_type == gcode.MOVE_RAPID and not moves:
+                continue
+            # the moves of the run start at the end of the previous one
+            draw.line(pixels[start : end + 1].ravel().tolist(), MOVE_COLORS[move_type], width)